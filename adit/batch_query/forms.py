@@ -12,6 +12,7 @@ from django.utils.translation import gettext_lazy as _
 from adit.core.errors import BatchFileContentError, BatchFileFormatError, BatchFileSizeError
 from adit.core.fields import DicomNodeChoiceField, RestrictedFileField
 from adit.core.models import DicomNode
+from adit.core.parsers import PARSE_CHUNK_SIZE
 
 from .models import BatchQueryJob, BatchQueryTask
 from .parsers import BatchQueryFileParser
@@ -22,7 +23,7 @@ class BatchQueryJobForm(forms.ModelForm):
         max_upload_size=5242880,
         label="Batch file",
         help_text=(
-            "The Excel file (*.xlsx) which contains the data for the queries. "
+            "The Excel (*.xlsx) or CSV (*.csv) file which contains the data for the queries. "
             "See [Help] for how to format this file."
         ),
     )
@@ -91,7 +92,7 @@ class BatchQueryJobForm(forms.ModelForm):
         try:
             self.tasks = parser.parse(batch_file, self.max_batch_size)
         except BatchFileFormatError:
-            raise ValidationError("Invalid Excel (.xlsx) file.")
+            raise ValidationError("Invalid Excel (.xlsx) or CSV (.csv) file.")
         except BatchFileSizeError as err:
             raise ValidationError(
                 f"Too many batch tasks (max. {self.max_batch_size} tasks)"
@@ -114,7 +115,7 @@ class BatchQueryJobForm(forms.ModelForm):
             task.job = job
             task.source = self.cleaned_data["source"]
 
-        BatchQueryTask.objects.bulk_create(self.tasks)
+        BatchQueryTask.objects.bulk_create(self.tasks, batch_size=PARSE_CHUNK_SIZE)
 
     def save(self, commit=True):
         job = super().save(commit=commit)
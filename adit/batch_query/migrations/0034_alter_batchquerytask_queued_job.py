@@ -0,0 +1,37 @@
+# Generated by Django 6.0.3 on 2026-10-17 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from adit_radis_shared.common.utils.migration_utils import procrastinate_on_delete_sql
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("batch_query", "0033_batchqueryjob_convert_to_nifti"),
+        ("procrastinate", "0041_post_retry_failed_job"),
+    ]
+
+    # Altering the field recreates the foreign key constraint (in both directions),
+    # so the ON DELETE behavior of the database must be set again afterwards.
+    operations = [
+        migrations.RunSQL(
+            sql=migrations.RunSQL.noop,
+            reverse_sql=procrastinate_on_delete_sql("batch_query", "batchquerytask"),
+        ),
+        migrations.AlterField(
+            model_name="batchquerytask",
+            name="queued_job",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="procrastinate.procrastinatejob",
+            ),
+        ),
+        migrations.RunSQL(
+            sql=procrastinate_on_delete_sql("batch_query", "batchquerytask"),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 6.0.3 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+from adit.core.utils.migration_utils import TASK_COUNT_FIELDS, set_related_counts
+
+
+def set_task_counts(apps, schema_editor):
+    BatchQueryJob = apps.get_model("batch_query.BatchQueryJob")
+    BatchQueryTask = apps.get_model("batch_query.BatchQueryTask")
+    set_related_counts(BatchQueryJob, BatchQueryTask, TASK_COUNT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("batch_query", "0034_alter_batchquerytask_queued_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="batchqueryjob",
+            name="pending_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchqueryjob",
+            name="in_progress_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchqueryjob",
+            name="canceled_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchqueryjob",
+            name="success_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchqueryjob",
+            name="warning_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchqueryjob",
+            name="failure_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_task_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("batch_query", "0035_batchqueryjob_task_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="batchquerytask",
+            index=models.Index(fields=["job", "status"], name="batch_query_job_id_524c7a_idx"),
+        ),
+    ]
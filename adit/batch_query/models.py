@@ -5,8 +5,10 @@ from django.contrib.postgres.fields import ArrayField
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.urls import reverse
+from procrastinate.contrib.django.models import ProcrastinateJob
 
 from adit.core.models import DicomAppSettings, DicomJob, DicomTask
+from adit.core.utils.model_utils import queue_tasks
 from adit.core.validators import (
     integer_string_validator,
     letters_validator,
@@ -34,9 +36,37 @@ class BatchQueryJob(DicomJob):
     def get_absolute_url(self):
         return reverse("batch_query_job_detail", args=[str(self.pk)])
 
+    def queue_pending_tasks(self):
+        """Queues all pending tasks of this job (in chunks of BATCH_QUERY_TASKS_PER_CHUNK)."""
+        chunk_size = settings.BATCH_QUERY_TASKS_PER_CHUNK
+        if chunk_size <= 1:
+            return super().queue_pending_tasks()
+
+        assert self.status == DicomJob.Status.PENDING
+
+        priority = self.default_priority
+        if self.urgent:
+            priority = self.urgent_priority
+
+        pending_tasks = self.tasks.filter(status=DicomTask.Status.PENDING)
+        assert not pending_tasks.filter(queued_job__isnull=False).exists()
+
+        queue_tasks(
+            pending_tasks,
+            "adit.core.tasks.process_dicom_tasks",
+            priority,
+            tasks_per_job=chunk_size,
+        )
+        self.update_task_counts()
+
 
 class BatchQueryTask(DicomTask):
     job = models.ForeignKey(BatchQueryJob, on_delete=models.CASCADE, related_name="tasks")
+    # Not one-to-one as the tasks of a chunk are processed by the same queued job
+    # (see BatchQueryJob.queue_pending_tasks)
+    queued_job = models.ForeignKey(
+        ProcrastinateJob, null=True, on_delete=models.SET_NULL, related_name="+"
+    )
     lines = ArrayField(models.PositiveSmallIntegerField())
     patient_id = models.CharField(
         blank=True,
@@ -124,6 +154,19 @@ class BatchQueryTask(DicomTask):
     def get_absolute_url(self):
         return reverse("batch_query_task_detail", args=[self.pk])
 
+    @property
+    def is_killable(self) -> bool:
+        # Killing the queued job of a chunk would also abort the other tasks of the
+        # chunk, so only the job as a whole can be canceled then
+        if not super().is_killable:
+            return False
+        return not (
+            BatchQueryTask.objects.filter(queued_job_id=self.queued_job_id)
+            .exclude(pk=self.pk)
+            .filter(status__in=[DicomTask.Status.PENDING, DicomTask.Status.IN_PROGRESS])
+            .exists()
+        )
+
 
 class BatchQueryResult(models.Model):
     job = models.ForeignKey(BatchQueryJob, on_delete=models.CASCADE, related_name="results")
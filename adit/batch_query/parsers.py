@@ -1,5 +1,7 @@
+import pandas as pd
+
 from adit.core.parsers import BatchFileParser
-from adit.core.utils.dicom_utils import person_name_to_dicom
+from adit.core.utils.dicom_utils import PERSON_NAME_SEPARATOR
 
 from .models import BatchQueryTask
 from .serializers import BatchQueryTaskSerializer
@@ -25,15 +27,16 @@ class BatchQueryFileParser(BatchFileParser[BatchQueryTask]):
     def __init__(self) -> None:
         super().__init__(mapping)
 
-    def transform_value(self, field: str, value: str) -> str | list[str] | None:
+    def transform_column(self, field: str, column: pd.Series) -> pd.Series:
         if field in ["patient_birth_date", "study_date_start", "study_date_end"]:
-            if not value:
-                return None
+            return column.astype(object).where(column != "", None)
 
         if field in ["modalities", "series_numbers"]:
-            return [x.strip() for x in value.split(",") if x.strip()]
+            # Remove the whitespace and empty items around the commas before splitting
+            column = column.str.replace(r"\s*,[\s,]*", ",", regex=True).str.strip(",")
+            return column.map(lambda value: value.split(",") if value else [])
 
         if field == "patient_name":
-            return person_name_to_dicom(value)
+            return column.str.replace(PERSON_NAME_SEPARATOR, "^", regex=True)
 
-        return value
+        return column
@@ -6,6 +6,7 @@ from adit.core.processors import DicomTaskProcessor
 from adit.core.types import DicomLogEntry, ProcessingResult
 from adit.core.utils.dicom_dataset import QueryDataset, ResultDataset
 from adit.core.utils.dicom_operator import DicomOperator
+from adit.core.utils.parallel_queries import merge_results, run_queries
 
 from .models import BatchQueryResult, BatchQuerySettings, BatchQueryTask
 
@@ -21,7 +22,8 @@ class BatchQueryTaskProcessor(DicomTaskProcessor):
 
         source = self.query_task.source
         assert source.node_type == DicomNode.NodeType.SERVER
-        self.operator = DicomOperator(source.dicomserver)
+        self.source_server = source.dicomserver
+        self.operator = DicomOperator(self.source_server)
 
     def _get_logs(self) -> list[DicomLogEntry]:
         logs: list[DicomLogEntry] = []
@@ -97,71 +99,77 @@ class BatchQueryTaskProcessor(DicomTaskProcessor):
         study_date = (start_date, end_date)
 
         if not self.query_task.modalities:
-            study_results = list(
-                self.operator.find_studies(
+            queries = [
+                QueryDataset.create(
+                    PatientID=patient_id,
+                    PatientName=self.query_task.patient_name,
+                    PatientBirthDate=self.query_task.patient_birth_date,
+                    AccessionNumber=self.query_task.accession_number,
+                    StudyDate=study_date,
+                    StudyDescription=self.query_task.study_description,
+                )
+            ]
+        else:
+            # ModalitiesInStudy does not support to query multiple modalities at once,
+            # so we have to query them one by one (but concurrently, see run_queries).
+            queries = [
+                QueryDataset.create(
+                    PatientID=patient_id,
+                    PatientName=self.query_task.patient_name,
+                    PatientBirthDate=self.query_task.patient_birth_date,
+                    AccessionNumber=self.query_task.accession_number,
+                    StudyDate=study_date,
+                    StudyDescription=self.query_task.study_description,
+                    ModalitiesInStudy=modality,
+                )
+                for modality in self.query_task.modalities
+            ]
+
+        study_results = merge_results(
+            run_queries(self.operator, "find_studies", queries), "StudyInstanceUID"
+        )
+        return sorted(study_results, key=lambda study: study.StudyDate)
+
+    def _find_series_of_studies(
+        self, patient_id: str, study_uids: list[str]
+    ) -> list[list[ResultDataset]]:
+        """Finds the series of multiple studies (with all the queries sent at once)."""
+        series_numbers = self.query_task.series_numbers
+
+        queries: list[QueryDataset] = []
+        for study_uid in study_uids:
+            if not series_numbers:
+                queries.append(
                     QueryDataset.create(
                         PatientID=patient_id,
-                        PatientName=self.query_task.patient_name,
-                        PatientBirthDate=self.query_task.patient_birth_date,
-                        AccessionNumber=self.query_task.accession_number,
-                        StudyDate=study_date,
-                        StudyDescription=self.query_task.study_description,
+                        StudyInstanceUID=study_uid,
+                        SeriesDescription=self.query_task.series_description,
                     )
                 )
-            )
-        else:
-            seen: set[str] = set()
-            study_results: list[ResultDataset] = []
-            for modality in self.query_task.modalities:
-                # ModalitiesInStudy does not support to query multiple modalities at once,
-                # so we have to query them one by one.
-                studies = list(
-                    self.operator.find_studies(
+            else:
+                for series_number in series_numbers:
+                    queries.append(
                         QueryDataset.create(
                             PatientID=patient_id,
-                            PatientName=self.query_task.patient_name,
-                            PatientBirthDate=self.query_task.patient_birth_date,
-                            AccessionNumber=self.query_task.accession_number,
-                            StudyDate=study_date,
-                            StudyDescription=self.query_task.study_description,
-                            ModalitiesInStudy=modality,
+                            StudyInstanceUID=study_uid,
+                            SeriesDescription=self.query_task.series_description,
+                            SeriesNumber=series_number,
                         )
                     )
-                )
-                for study in studies:
-                    if study.StudyInstanceUID not in seen:
-                        seen.add(study.StudyInstanceUID)
-                        study_results.append(study)
-
-        return sorted(study_results, key=lambda study: study.StudyDate)
 
-    def _find_series(self, patient_id: str, study_uid: str) -> list[ResultDataset]:
-        series_numbers = self.query_task.series_numbers
+        results = run_queries(self.operator, "find_series", queries)
 
-        if not series_numbers:
-            series_query = QueryDataset.create(
-                PatientID=patient_id,
-                StudyInstanceUID=study_uid,
-                SeriesDescription=self.query_task.series_description,
+        # The queries of each study are consecutive
+        queries_per_study = len(series_numbers) or 1
+        series_of_studies: list[list[ResultDataset]] = []
+        for index in range(len(study_uids)):
+            study_results = results[index * queries_per_study : (index + 1) * queries_per_study]
+            series_results = merge_results(study_results, "SeriesInstanceUID")
+            series_of_studies.append(
+                sorted(series_results, key=lambda series: int(series.get("SeriesNumber", 0)))
             )
-            series_results = list(self.operator.find_series(series_query))
-        else:
-            seen: set[str] = set()
-            series_results: list[ResultDataset] = []
-            for series_number in series_numbers:
-                series_query = QueryDataset.create(
-                    PatientID=patient_id,
-                    StudyInstanceUID=study_uid,
-                    SeriesDescription=self.query_task.series_description,
-                    SeriesNumber=series_number,
-                )
-                series_list = list(self.operator.find_series(series_query))
-                for series in series_list:
-                    if series.SeriesInstanceUID not in seen:
-                        seen.add(series.SeriesInstanceUID)
-                        series_results.append(series)
 
-        return sorted(series_results, key=lambda series: int(series.get("SeriesNumber", 0)))
+        return series_of_studies
 
     def _query_studies(self, patient_ids: list[str]) -> list[BatchQueryResult]:
         results: list[BatchQueryResult] = []
@@ -214,8 +222,10 @@ class BatchQueryTaskProcessor(DicomTaskProcessor):
                     }
                 )
 
-            for study in studies:
-                series_list = self._find_series(patient_id, study.StudyInstanceUID)
+            series_of_studies = self._find_series_of_studies(
+                patient_id, [study.StudyInstanceUID for study in studies]
+            )
+            for study, series_list in zip(studies, series_of_studies, strict=True):
                 for series in series_list:
                     batch_query_result = BatchQueryResult(
                         job=self.query_task.job,
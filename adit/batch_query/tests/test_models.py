@@ -2,9 +2,12 @@ from datetime import date
 
 import pytest
 from django.core.exceptions import ValidationError
+from procrastinate.contrib.django.models import ProcrastinateJob
+from pytest_django.fixtures import Settings
 
-from adit.batch_query.factories import BatchQueryTaskFactory
+from adit.batch_query.factories import BatchQueryJobFactory, BatchQueryTaskFactory
 from adit.batch_query.models import BatchQueryTask
+from adit.core.models import DicomJob
 
 
 class TestBatchQueryTask:
@@ -45,3 +48,66 @@ class TestBatchQueryTask:
 
         with pytest.raises(ValidationError):
             task.clean()
+
+
+class TestBatchQueryJob:
+    @pytest.mark.django_db
+    def test_queue_pending_tasks_in_chunks(self, settings: Settings):
+        settings.BATCH_QUERY_TASKS_PER_CHUNK = 2
+        job = BatchQueryJobFactory.create(status=DicomJob.Status.PENDING)
+        tasks = BatchQueryTaskFactory.create_batch(3, job=job, status=BatchQueryTask.Status.PENDING)
+
+        job.queue_pending_tasks()
+
+        for task in tasks:
+            task.refresh_from_db()
+        assert tasks[0].queued_job_id is not None
+        assert tasks[0].queued_job_id == tasks[1].queued_job_id
+        assert tasks[2].queued_job_id not in (None, tasks[0].queued_job_id)
+
+        queued_jobs = ProcrastinateJob.objects.order_by("id")
+        assert [queued_job.task_name for queued_job in queued_jobs] == [
+            "adit.core.tasks.process_dicom_tasks"
+        ] * 2
+        assert [queued_job.args["task_ids"] for queued_job in queued_jobs] == [
+            [tasks[0].pk, tasks[1].pk],
+            [tasks[2].pk],
+        ]
+
+    @pytest.mark.django_db
+    def test_tasks_of_a_chunk_are_not_killable_on_their_own(self, settings: Settings):
+        settings.BATCH_QUERY_TASKS_PER_CHUNK = 2
+        job = BatchQueryJobFactory.create(status=DicomJob.Status.PENDING)
+        tasks = BatchQueryTaskFactory.create_batch(3, job=job, status=BatchQueryTask.Status.PENDING)
+        job.queue_pending_tasks()
+        job.tasks.update(status=BatchQueryTask.Status.IN_PROGRESS)
+
+        for task in tasks:
+            task.refresh_from_db()
+        assert not tasks[0].is_killable
+        assert tasks[2].is_killable
+
+        # The last unfinished task of a chunk can be killed
+        BatchQueryTask.objects.filter(pk=tasks[1].pk).update(status=BatchQueryTask.Status.SUCCESS)
+        assert tasks[0].is_killable
+
+    @pytest.mark.django_db
+    def test_queue_pending_tasks_in_batches(self, settings: Settings):
+        settings.BATCH_QUERY_TASKS_PER_CHUNK = 1
+        settings.DICOM_TASK_QUEUE_BATCH_SIZE = 2
+        job = BatchQueryJobFactory.create(status=DicomJob.Status.PENDING)
+        tasks = BatchQueryTaskFactory.create_batch(5, job=job, status=BatchQueryTask.Status.PENDING)
+
+        job.queue_pending_tasks()
+
+        queued_jobs = ProcrastinateJob.objects.order_by("id")
+        assert [queued_job.task_name for queued_job in queued_jobs] == [
+            "adit.core.tasks.process_dicom_task"
+        ] * 5
+        for task, queued_job in zip(tasks, queued_jobs, strict=True):
+            task.refresh_from_db()
+            assert task.queued_job_id == queued_job.id
+            assert queued_job.args == {
+                "model_label": "batch_query.batchquerytask",
+                "task_id": task.pk,
+            }
@@ -3,6 +3,7 @@ from io import BytesIO
 
 import pandas as pd
 import pytest
+from pytest_mock import MockerFixture
 
 from adit.batch_query.parsers import BatchQueryFileParser
 from adit.core.errors import (
@@ -256,3 +257,57 @@ def test_no_max_batch_size_allows_any_number(columns):
     tasks = parse(df, max_batch_size=None)
 
     assert len(tasks) == 5
+
+
+# --- CSV and chunked parsing -----------------------------------------------
+
+
+def build_csv_file(df: pd.DataFrame, sep: str = ",") -> BytesIO:
+    csv_file = BytesIO(df.to_csv(index=False, sep=sep).encode("utf-8"))
+    csv_file.name = "batch_query.csv"
+    return csv_file
+
+
+@pytest.mark.parametrize("sep", [",", ";"])
+def test_parses_csv_file(columns, sep):
+    df = pd.DataFrame(
+        [
+            ["1001", "", "", "", "2019-06-03", "", "CT, SR", "", "", "", ""],
+            ["", "Coconut, Coco", "1976-12-09", "", "", "", "MR", "", "", "1, 2", ""],
+        ],
+        columns=columns,
+    )
+
+    parser = BatchQueryFileParser()
+    tasks = parser.parse(build_csv_file(df, sep), 100)
+
+    assert len(tasks) == 2
+    assert tasks[0].patient_id == "1001"
+    assert tasks[0].study_date_start == date(2019, 6, 3)
+    assert tasks[0].modalities == ["CT", "SR"]
+    assert tasks[1].patient_name == "Coconut^Coco"
+    assert tasks[1].series_numbers == ["1", "2"]
+    assert tasks[1].lines == [3]
+
+
+def test_rows_are_parsed_in_chunks(columns, mocker: MockerFixture):
+    mocker.patch("adit.core.parsers.PARSE_CHUNK_SIZE", 2)
+    rows = [[str(1000 + i), "", "", "", "", "", "CT", "", "", "", ""] for i in range(5)]
+    rows[2] = [""] * len(columns)
+    df = pd.DataFrame(rows, columns=columns)
+
+    tasks = parse(df)
+
+    assert [task.patient_id for task in tasks] == ["1000", "1001", "1003", "1004"]
+    assert [task.lines for task in tasks] == [[2], [3], [5], [6]]
+
+
+def test_too_many_rows_are_rejected_before_validating_all_chunks(columns, mocker: MockerFixture):
+    mocker.patch("adit.core.parsers.PARSE_CHUNK_SIZE", 2)
+    rows = [[str(1000 + i), "", "", "", "", "", "CT", "", "", "", ""] for i in range(6)]
+    # The last row is invalid, but the size error is raised before it is validated
+    rows[5][6] = "123"
+    df = pd.DataFrame(rows, columns=columns)
+
+    with pytest.raises(BatchFileSizeError):
+        parse(df, max_batch_size=3)
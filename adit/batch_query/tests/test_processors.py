@@ -5,6 +5,8 @@ needed: each processor's `operator` attribute is replaced with a mock whose
 `find_patients` / `find_studies` / `find_series` return crafted ResultDatasets.
 """
 
+import threading
+import time
 from datetime import date
 from unittest.mock import MagicMock
 
@@ -104,6 +106,7 @@ def _make_processor(
     )
     processor = BatchQueryTaskProcessor(task)
     operator = mocker.MagicMock()
+    operator.server = processor.source_server
     processor.operator = operator
     operator.get_logs.return_value = []
     # Each processor instance must not share the class-level logs list
@@ -251,7 +254,7 @@ def test_find_studies_with_modalities_deduplicates(mocker: MockerFixture):
 
 
 # ---------------------------------------------------------------------------
-# _find_series
+# _find_series_of_studies
 # ---------------------------------------------------------------------------
 
 
@@ -262,7 +265,7 @@ def test_find_series_without_series_numbers(mocker: MockerFixture):
         [_series(series_uid="1.2.3.4", number=2), _series(series_uid="1.2.3.5", number=1)]
     )
 
-    series = processor._find_series("1001", "1.2.3")
+    (series,) = processor._find_series_of_studies("1001", ["1.2.3"])
 
     # Sorted by SeriesNumber ascending
     assert [s.SeriesInstanceUID for s in series] == ["1.2.3.5", "1.2.3.4"]
@@ -280,13 +283,57 @@ def test_find_series_with_series_numbers_deduplicates(mocker: MockerFixture):
         iter([s1, s2]),
     ]
 
-    series = processor._find_series("1001", "1.2.3")
+    (series,) = processor._find_series_of_studies("1001", ["1.2.3"])
 
     uids = [s.SeriesInstanceUID for s in series]
     assert uids == ["1.2.3.5", "1.2.3.4"]
     assert operator.find_series.call_count == 2
 
 
+@pytest.mark.django_db
+def test_find_series_of_studies_queries_concurrently(mocker: MockerFixture):
+    processor, operator = _make_processor(mocker, series_numbers=["1", "2"])
+    processor.source_server.max_parallel_queries = 2
+
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    class FakeOperator:
+        def __init__(self, server, persistent=False):
+            pass
+
+        def find_series(self, query):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            number = query.SeriesNumber
+            return iter([_series(series_uid=f"{query.StudyInstanceUID}.{number}", number=number)])
+
+        def get_logs(self):
+            return []
+
+        def close(self):
+            pass
+
+    mocker.patch("adit.core.utils.parallel_queries.DicomOperator", FakeOperator)
+
+    series_of_studies = processor._find_series_of_studies("1001", ["1.2.3", "1.2.4", "1.2.5"])
+
+    # The results are in the order of the studies and series numbers
+    assert [[s.SeriesInstanceUID for s in series] for series in series_of_studies] == [
+        ["1.2.3.1", "1.2.3.2"],
+        ["1.2.4.1", "1.2.4.2"],
+        ["1.2.5.1", "1.2.5.2"],
+    ]
+    assert max_running == 2
+    operator.find_series.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # process() — full study and series flows
 # ---------------------------------------------------------------------------
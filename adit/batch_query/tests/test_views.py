@@ -1,12 +1,23 @@
+import io
+
+import pyarrow.parquet as pq
 import pytest
 from adit_radis_shared.accounts.factories import UserFactory
+from asgiref.sync import async_to_sync
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.test import Client
 
 from adit.core.models import DicomJob, DicomTask
 
-from ..factories import BatchQueryJobFactory, BatchQueryTaskFactory
+from ..factories import BatchQueryJobFactory, BatchQueryResultFactory, BatchQueryTaskFactory
+
+
+def _read_streaming_content(response) -> bytes:
+    async def read():
+        return b"".join([block async for block in response.streaming_content])
+
+    return async_to_sync(read)()
 
 
 @pytest.mark.django_db
@@ -122,6 +133,34 @@ def test_batch_query_result_download_view(client: Client):
     assert response.status_code == 200
 
 
+@pytest.mark.django_db
+def test_batch_query_result_download_view_streams_csv_and_parquet(client: Client):
+    user = UserFactory.create(is_active=True)
+    job = BatchQueryJobFactory.create(owner=user)
+    task = BatchQueryTaskFactory.create(
+        job=job, pseudonym="", series_description="", series_numbers=[]
+    )
+    results = BatchQueryResultFactory.create_batch(3, job=job, query=task)
+    client.force_login(user)
+
+    response = client.get(f"/batch-query/jobs/{job.pk}/download/?format=csv")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/csv"
+    lines = _read_streaming_content(response).decode().splitlines()
+    assert lines[0].startswith("PatientID,PatientName,BirthDate")
+    assert [line.split(",")[0] for line in lines[1:]] == [r.patient_id for r in results]
+
+    response = client.get(f"/batch-query/jobs/{job.pk}/download/?format=parquet")
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(_read_streaming_content(response)))
+    assert table.column("StudyInstanceUID").to_pylist() == [r.study_uid for r in results]
+    assert "Pseudonym" not in table.column_names
+    assert "SeriesInstanceUID" not in table.column_names
+
+    response = client.get(f"/batch-query/jobs/{job.pk}/download/?format=pdf")
+    assert response.status_code == 400
+
+
 @pytest.mark.django_db
 def test_batch_query_task_detail_view(client: Client):
     user = UserFactory.create(is_active=True)
@@ -1,31 +1,138 @@
+import csv
+import tempfile
+from collections.abc import AsyncIterator, Iterator
+from itertools import islice
 from typing import IO, Any
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from openpyxl import Workbook
 
 from adit.core.templatetags.core_extras import person_name_from_dicom
 
-from ..models import BatchQueryJob, BatchQueryResult, BatchQueryTask
+from ..models import BatchQueryJob, BatchQueryResult
+
+# How many results are fetched at once from the database (with a server-side cursor)
+# and written as one row group of a Parquet file
+EXPORT_CHUNK_SIZE = 2000
+
+# The size of the blocks a written Excel file is streamed in
+EXPORT_BLOCK_SIZE = 64 * 1024
+
+# The Arrow types of the columns that are no strings
+PARQUET_COLUMN_TYPES: dict[str, pa.DataType] = {
+    "BirthDate": pa.date32(),
+    "StudyDate": pa.date32(),
+    "StudyTime": pa.time64("us"),
+    "NumberOfStudyRelatedInstances": pa.int64(),
+}
+
+
+class _StreamBuffer:
+    """A write-only file object whose written bytes are taken out while writing."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
 
 
 def write_results(job: BatchQueryJob, file: IO) -> None:
-    query_tasks = job.tasks.prefetch_related("results").all()
+    """Writes the results of the job as Excel file (with a constant memory usage)."""
+    has_pseudonyms, has_series = get_columns(job)
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(get_header(has_pseudonyms, has_series))
+    for result in iter_results(job):
+        worksheet.append(get_result_row(result, has_pseudonyms, has_series))
+    workbook.save(file)
+
+
+def stream_results_xlsx(job: BatchQueryJob) -> Iterator[bytes]:
+    # The XLSX file is a zip archive which can only be finished as a whole
+    with tempfile.TemporaryFile() as file:
+        write_results(job, file)
+        file.seek(0)
+        while block := file.read(EXPORT_BLOCK_SIZE):
+            yield block
+
+
+def stream_results_csv(job: BatchQueryJob) -> Iterator[bytes]:
+    has_pseudonyms, has_series = get_columns(job)
+
+    buffer = _StreamBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(get_header(has_pseudonyms, has_series))
 
-    has_pseudonyms = False
-    has_series = False
-    for query_task in query_tasks:
-        if query_task.pseudonym:
-            has_pseudonyms = True
-        if query_task.series_description or query_task.series_numbers:
-            has_series = True
+    results = iter_results(job)
+    while chunk := list(islice(results, EXPORT_CHUNK_SIZE)):
+        writer.writerows(get_result_row(result, has_pseudonyms, has_series) for result in chunk)
+        yield buffer.take()
+
+    yield buffer.take()
+
+
+def stream_results_parquet(job: BatchQueryJob) -> Iterator[bytes]:
+    has_pseudonyms, has_series = get_columns(job)
 
     header = get_header(has_pseudonyms, has_series)
-    data = []
-    for query_task in query_tasks:
-        result_rows = get_result_rows(query_task, has_pseudonyms, has_series)
-        data += result_rows
+    schema = pa.schema([(name, PARQUET_COLUMN_TYPES.get(name, pa.string())) for name in header])
+
+    buffer = _StreamBuffer()
+    with pq.ParquetWriter(buffer, schema) as writer:
+        results = iter_results(job)
+        while chunk := list(islice(results, EXPORT_CHUNK_SIZE)):
+            rows = [get_result_row(result, has_pseudonyms, has_series) for result in chunk]
+            records = [dict(zip(header, row, strict=True)) for row in rows]
+            writer.write_batch(pa.RecordBatch.from_pylist(records, schema))
+            yield buffer.take()
+
+    # The footer with the metadata of the file
+    yield buffer.take()
+
+
+async def aiter_blocks(blocks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Iterates the (database accessing) blocks in a thread, so that they can be streamed
+    by ASGI without being consumed as a whole beforehand."""
+    next_block = sync_to_async(next)
+    while (block := await next_block(blocks, None)) is not None:
+        if block:
+            yield block
+
+
+def get_columns(job: BatchQueryJob) -> tuple[bool, bool]:
+    """Returns if the results have pseudonyms and if they are of series."""
+    has_pseudonyms = job.tasks.exclude(pseudonym="").exists()
+    has_series = job.tasks.filter(~Q(series_description="") | Q(series_numbers__len__gt=0)).exists()
+    return has_pseudonyms, has_series
 
-    df = pd.DataFrame(data, columns=header)
-    df.to_excel(file, index=False, engine="openpyxl")
+
+def iter_results(job: BatchQueryJob) -> Iterator[BatchQueryResult]:
+    return job.results.order_by("query_id", "id").iterator(chunk_size=EXPORT_CHUNK_SIZE)
 
 
 def get_header(has_pseudonyms: bool, has_series: bool) -> list[str]:
@@ -61,46 +168,37 @@ def get_header(has_pseudonyms: bool, has_series: bool) -> list[str]:
     return header
 
 
-def get_result_rows(
-    query_task: BatchQueryTask, has_pseudonyms: bool, has_series: bool
-) -> list[list[Any]]:
-    result_rows = []
+def get_result_row(result: BatchQueryResult, has_pseudonyms: bool, has_series: bool) -> list[Any]:
+    patient_name = person_name_from_dicom(result.patient_name)
+    modalities = ", ".join(result.modalities) if result.modalities else ""
 
-    result: BatchQueryResult
-    for result in query_task.results.all():
-        patient_name = person_name_from_dicom(result.patient_name)
-        modalities = ", ".join(result.modalities) if result.modalities else ""
-        image_count = result.image_count if result.image_count is not None else ""
+    result_row: list[Any] = []
 
-        result_row = []
+    if has_pseudonyms:
+        result_row.append(result.pseudonym)
 
-        if has_pseudonyms:
-            result_row.append(result.pseudonym)
+    result_row.extend(
+        [
+            result.patient_id,
+            patient_name,
+            result.patient_birth_date,
+            modalities,
+            result.study_date,
+            result.study_time,
+            result.study_description,
+            result.image_count,  # an empty cell if unknown
+            result.accession_number,
+            result.study_uid,
+        ]
+    )
 
+    if has_series:
         result_row.extend(
             [
-                result.patient_id,
-                patient_name,
-                result.patient_birth_date,
-                modalities,
-                result.study_date,
-                result.study_time,
-                result.study_description,
-                image_count,
-                result.accession_number,
-                result.study_uid,
+                result.series_uid,
+                result.series_description,
+                result.series_number,
             ]
         )
 
-        if has_series:
-            result_row.extend(
-                [
-                    result.series_uid,
-                    result.series_description,
-                    result.series_number,
-                ]
-            )
-
-        result_rows.append(result_row)
-
-    return result_rows
+    return result_row
@@ -1,4 +1,3 @@
-from io import BytesIO
 from typing import Any, cast
 
 from adit_radis_shared.common.mixins import PageSizeSelectMixin, RelatedFilterMixin
@@ -6,7 +5,8 @@ from adit_radis_shared.common.types import AuthenticatedHttpRequest
 from adit_radis_shared.common.views import BaseUpdatePreferencesView
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http.response import HttpResponse
+from django.core.exceptions import BadRequest
+from django.http.response import StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views.generic import DetailView
 from django.views.generic.base import View
@@ -34,12 +34,26 @@ from .forms import BatchQueryJobForm
 from .mixins import BatchQueryLockedMixin
 from .models import BatchQueryJob, BatchQueryTask
 from .tables import BatchQueryJobTable, BatchQueryResultTable, BatchQueryTaskTable
-from .utils.exporters import write_results
+from .utils.exporters import (
+    aiter_blocks,
+    stream_results_csv,
+    stream_results_parquet,
+    stream_results_xlsx,
+)
 
 BATCH_QUERY_SOURCE = "batch_query_source"
 BATCH_QUERY_URGENT = "batch_query_urgent"
 BATCH_QUERY_SEND_FINISHED_MAIL = "batch_query_send_finished_mail"
 
+RESULT_FILE_FORMATS = {
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        stream_results_xlsx,
+    ),
+    "csv": ("text/csv", stream_results_csv),
+    "parquet": ("application/vnd.apache.parquet", stream_results_parquet),
+}
+
 
 class BatchQueryUpdatePreferencesView(BatchQueryLockedMixin, BaseUpdatePreferencesView):
     allowed_keys = [
@@ -197,13 +211,17 @@ class BatchQueryResultDownloadView(
         job = cast(BatchQueryJob, self.get_object())
         self.object = job
 
-        file = BytesIO()
-        write_results(job, file)
+        file_format = request.GET.get("format", "xlsx")
+        if file_format not in RESULT_FILE_FORMATS:
+            raise BadRequest(f"Invalid file format: {file_format}")
+        content_type, stream_results = RESULT_FILE_FORMATS[file_format]
 
-        response = HttpResponse(
-            content=file.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        # The results are streamed while the file is generated, so that also jobs with
+        # millions of results can be downloaded without loading them all into memory.
+        response = StreamingHttpResponse(
+            streaming_content=aiter_blocks(stream_results(job)),
+            content_type=content_type,
         )
-        filename = f"batch_query_job_{job.pk}_results.xlsx"
+        filename = f"batch_query_job_{job.pk}_results.{file_format}"
         response["Content-Disposition"] = f"attachment;filename={filename}"
         return response
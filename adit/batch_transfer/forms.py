@@ -12,6 +12,7 @@ from django.utils.translation import gettext_lazy as _
 from adit.core.errors import BatchFileContentError, BatchFileFormatError, BatchFileSizeError
 from adit.core.fields import DicomNodeChoiceField, RestrictedFileField
 from adit.core.models import DicomNode
+from adit.core.parsers import PARSE_CHUNK_SIZE
 
 from .models import BatchTransferJob, BatchTransferTask
 from .parsers import BatchTransferFileParser
@@ -22,7 +23,7 @@ class BatchTransferJobForm(forms.ModelForm):
         max_upload_size=5242880,
         label="Batch file",
         help_text=(
-            "The Excel file (*.xlsx) which contains the data to transfer between "
+            "The Excel (*.xlsx) or CSV (*.csv) file which contains the data to transfer between "
             "two DICOM nodes. See [Help] for how to format this file."
         ),
     )
@@ -131,7 +132,7 @@ class BatchTransferJobForm(forms.ModelForm):
         try:
             self.tasks = parser.parse(batch_file, self.max_batch_size)
         except BatchFileFormatError:
-            raise ValidationError("Invalid Excel (.xlsx) file.")
+            raise ValidationError("Invalid Excel (.xlsx) or CSV (.csv) file.")
         except BatchFileSizeError as err:
             raise ValidationError(
                 f"Too many batch tasks (max. {self.max_batch_size} tasks)"
@@ -157,7 +158,7 @@ class BatchTransferJobForm(forms.ModelForm):
             task.source = self.cleaned_data["source"]
             task.destination = self.cleaned_data["destination"]
 
-        BatchTransferTask.objects.bulk_create(self.tasks)
+        BatchTransferTask.objects.bulk_create(self.tasks, batch_size=PARSE_CHUNK_SIZE)
 
     def save(self, commit=True):
         batch_job = super().save(commit=commit)
@@ -0,0 +1,52 @@
+# Generated by Django 6.0.3 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+from adit.core.utils.migration_utils import TASK_COUNT_FIELDS, set_related_counts
+
+
+def set_task_counts(apps, schema_editor):
+    BatchTransferJob = apps.get_model("batch_transfer.BatchTransferJob")
+    BatchTransferTask = apps.get_model("batch_transfer.BatchTransferTask")
+    set_related_counts(BatchTransferJob, BatchTransferTask, TASK_COUNT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("batch_transfer", "0030_batchtransferjob_convert_to_nifti"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="batchtransferjob",
+            name="pending_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchtransferjob",
+            name="in_progress_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchtransferjob",
+            name="canceled_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchtransferjob",
+            name="success_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchtransferjob",
+            name="warning_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="batchtransferjob",
+            name="failure_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_task_counts, migrations.RunPython.noop),
+    ]
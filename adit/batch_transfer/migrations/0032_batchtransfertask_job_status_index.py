@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("batch_transfer", "0031_batchtransferjob_task_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="batchtransfertask",
+            index=models.Index(fields=["job", "status"], name="batch_trans_job_id_a5294c_idx"),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from collections import defaultdict
-from typing import IO
+from typing import IO, Any
+
+import pandas as pd
 
 from adit.core.parsers import BatchFileParser
 
@@ -22,18 +24,17 @@ class BatchTransferFileParser(BatchFileParser[BatchTransferTask]):
         self.can_transfer_unpseudonymized = can_transfer_unpseudonymized
         super().__init__(mapping)
 
-    def transform_value(self, field: str, value: str):
+    def transform_column(self, field: str, column: pd.Series) -> pd.Series:
         if field == "series_uids":
-            if value.strip():
-                return [value]
-            return []
+            return column.map(lambda value: [value] if value else [])
 
-        return value
+        return column
 
-    def get_serializer(self, data: dict[str, str]):
+    def get_serializer(self, data: list[dict[str, Any]], context: dict[str, Any]):
         return BatchTransferTaskSerializer(
             data=data,
             many=True,
+            context=context,
             can_transfer_unpseudonymized=self.can_transfer_unpseudonymized,
         )
 
@@ -9,8 +9,16 @@ class BatchTransferTaskListSerializer(BatchTaskListSerializer):
     def validate(self, attrs):
         attrs = super().validate(attrs)
 
+        # The maps are kept in the context shared by the serializers of all chunks
+        # of a batch file, so that also rows of different chunks are checked.
+        study_uid_to_patient_id: dict[str, str] = self.context.setdefault(
+            "study_uid_to_patient_id", {}
+        )
+        patient_id_to_pseudonym: dict[str, str] = self.context.setdefault(
+            "patient_id_to_pseudonym", {}
+        )
+
         # Check that the same study_uid belongs to only one patient_id
-        study_uid_to_patient_id = {}
         for data in attrs:
             study_uid = data["study_uid"]
             patient_id = data["patient_id"]
@@ -22,7 +30,6 @@ class BatchTransferTaskListSerializer(BatchTaskListSerializer):
                 )
 
         # Check that the same patient_id only has one pseudonym
-        patient_id_to_pseudonym = {}
         for data in attrs:
             patient_id = data["patient_id"]
             pseudonym = data.get("pseudonym", "")
@@ -2,6 +2,7 @@ from io import BytesIO
 
 import pandas as pd
 import pytest
+from pytest_mock import MockerFixture
 
 from adit.batch_transfer.parsers import BatchTransferFileParser
 from adit.core.errors import (
@@ -118,6 +119,26 @@ def test_same_patient_id_with_different_pseudonym_raises(create_batch_file):
     assert "can't have different pseudonyms" in str(exc_info.value)
 
 
+def test_conflicting_rows_in_different_chunks_raise(create_batch_file, mocker: MockerFixture):
+    mocker.patch("adit.core.parsers.PARSE_CHUNK_SIZE", 2)
+    # The first and the last row map StudyInstanceUID 1.2.3 to different PatientIDs
+    df = pd.DataFrame(
+        [
+            ["111", "1.2.3", "1.2.3.1", "pseudo1"],
+            ["222", "1.2.4", "1.2.4.1", "pseudo2"],
+            ["333", "1.2.3", "1.2.3.2", "pseudo3"],
+        ],
+        columns=["PatientID", "StudyInstanceUID", "SeriesInstanceUID", "Pseudonym"],
+    )
+    file = create_batch_file(df)
+
+    parser = BatchTransferFileParser(can_transfer_unpseudonymized=True)
+    with pytest.raises(BatchFileContentError) as exc_info:
+        parser.parse(file, 100)
+
+    assert "can't belong to different Patient IDs" in str(exc_info.value)
+
+
 def test_unpseudonymized_batch_passes_cross_row_validation(create_batch_file):
     # No Pseudonym column at all (an unpseudonymized transfer). The cross-row
     # validation must not raise KeyError on the absent pseudonym field.
@@ -2,6 +2,8 @@ from adit_radis_shared.accounts.forms import GroupAdminForm
 from django.contrib import admin
 from django.contrib.auth.admin import GroupAdmin
 from django.contrib.auth.models import Group
+from django.utils.html import format_html
+from pydicom.uid import UID
 
 from .models import (
     DicomFolder,
@@ -61,7 +63,31 @@ class DicomNodeGroupAccessInline(admin.TabularInline):
 class DicomServerAdmin(admin.ModelAdmin):
     list_display = ("name", "ae_title", "host", "port")
     exclude = ("node_type",)
+    readonly_fields = ("get_negotiated_contexts",)
     inlines = (DicomNodeGroupAccessInline,)
+    actions = ("clear_negotiated_contexts",)
+
+    def get_negotiated_contexts(self, obj: DicomServer):
+        lines: list[str] = []
+        for service, data in sorted((obj.negotiated_contexts or {}).items()):
+            accepted: dict[str, str] = data.get("accepted", {})
+            rejected: list[str] = data.get("rejected", [])
+            lines.append(f"{service} (negotiated at {data.get('negotiated_at')})")
+            lines.append(f"  Accepted: {len(accepted)}")
+            for abstract_syntax, transfer_syntax in sorted(accepted.items()):
+                lines.append(f"    {UID(abstract_syntax).name}: {UID(transfer_syntax).name}")
+            lines.append(f"  Rejected: {len(rejected)}")
+            for abstract_syntax in rejected:
+                lines.append(f"    {UID(abstract_syntax).name}")
+        if not lines:
+            return "Not negotiated yet."
+        return format_html("<pre>{}</pre>", "\n".join(lines))
+
+    get_negotiated_contexts.short_description = "Negotiated presentation contexts"
+
+    @admin.action(description="Clear negotiated presentation contexts")
+    def clear_negotiated_contexts(self, request, queryset):
+        queryset.update(negotiated_contexts={})
 
 
 admin.site.register(DicomServer, DicomServerAdmin)
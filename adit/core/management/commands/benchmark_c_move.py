@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from adit.core.models import DicomServer
+from adit.core.utils.dicom_dataset import QueryDataset
+from adit.core.utils.dicom_operator import DicomOperator
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetches all studies of a DICOM server with C-MOVE (through the receiver) and "
+        "reports the received instances per second. Run it once with and once without "
+        "RECEIVER_SPOOL_DIR set (for receiver and workers) to compare both delivery modes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", default="ORTHANC1", help="AE title of the server.")
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        server = DicomServer.objects.filter(ae_title=options["server"]).first()
+        if not server:
+            raise CommandError(f"DICOM server with AE title {options['server']} not found.")
+
+        # Only use C-MOVE, regardless of what else the server supports. The server
+        # instance is not saved.
+        server.dicomweb_wado_support = False
+        server.patient_root_get_support = False
+        server.study_root_get_support = False
+        server.max_parallel_retrievals = 1
+        if not (server.patient_root_move_support or server.study_root_move_support):
+            raise CommandError(f"DICOM server {server} does not support C-MOVE.")
+
+        operator = DicomOperator(server)
+        studies = list(operator.find_studies(QueryDataset.create(QueryRetrieveLevel="STUDY")))
+        if not studies:
+            raise CommandError(f"DICOM server {server} has no studies.")
+
+        mode = "spool directory" if settings.RECEIVER_SPOOL_DIR else "stream"
+        self.stdout.write(f"Fetching {len(studies)} studies with C-MOVE ({mode} delivery)...")
+
+        rates: list[float] = []
+        for round_number in range(1, options["rounds"] + 1):
+            received = 0
+
+            def count(_):
+                nonlocal received
+                received += 1
+
+            start = time.perf_counter()
+            for study in studies:
+                operator.fetch_study(study.PatientID, study.StudyInstanceUID, count)
+            elapsed = time.perf_counter() - start
+
+            rates.append(received / elapsed)
+            self.stdout.write(
+                f"Round {round_number}: {received} instances in {elapsed:.2f}s "
+                f"({rates[-1]:.1f} instances/s)"
+            )
+
+        self.stdout.write(f"Best: {max(rates):.1f} instances/s ({mode} delivery)")
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from adit.batch_query.factories import BatchQueryJobFactory, BatchQueryTaskFactory
+from adit.batch_query.models import BatchQueryTask
+from adit.core.factories import DicomServerFactory
+from adit.core.models import DicomJob, DicomTask
+from adit.core.utils.model_utils import queue_tasks, reset_tasks
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Queues the tasks of a (temporary) batch query job once task by task and once in "
+        "batches, and reports the queued tasks per second. Everything is rolled back "
+        "afterwards, so no worker ever sees the queued jobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=5000, help="Number of tasks.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._benchmark(options["tasks"])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _benchmark(self, task_count: int) -> None:
+        job = BatchQueryJobFactory.create(status=DicomJob.Status.PENDING)
+        # The build strategy also only builds (and doesn't save) the source of the tasks
+        source = DicomServerFactory.create()
+        BatchQueryTask.objects.bulk_create(
+            BatchQueryTaskFactory.build_batch(
+                task_count, job=job, source=source, status=DicomTask.Status.PENDING
+            )
+        )
+        self.stdout.write(f"Queueing {task_count} tasks...")
+
+        start = time.perf_counter()
+        for task in job.tasks.all():
+            task.queue_pending_task()
+        self._report("one by one", task_count, time.perf_counter() - start)
+
+        reset_tasks(job.tasks.all())
+
+        start = time.perf_counter()
+        queue_tasks(job.tasks.all(), "adit.core.tasks.process_dicom_task", job.default_priority)
+        self._report("in batches", task_count, time.perf_counter() - start)
+
+    def _report(self, mode: str, task_count: int, elapsed: float) -> None:
+        self.stdout.write(f"{mode}: {elapsed:.2f}s, {task_count / elapsed:.0f} tasks/s")
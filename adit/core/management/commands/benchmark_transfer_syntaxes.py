@@ -0,0 +1,101 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from pydicom import Dataset
+from pydicom.uid import UID
+
+from adit.core.models import DicomServer
+from adit.core.utils.dicom_dataset import QueryDataset
+from adit.core.utils.dicom_operator import DicomOperator
+from adit.core.utils.dicom_utils import transcode_dataset, write_dataset
+
+
+def _encoded_size(ds: Dataset) -> int:
+    buffer = io.BytesIO()
+    write_dataset(ds, buffer)
+    return buffer.getbuffer().nbytes
+
+
+class Command(BaseCommand):
+    help = (
+        "Transfers all studies from one DICOM server to another (e.g. ORTHANC1 to ORTHANC2) "
+        "once with uncompressed and once with the given preferred transfer syntax, and "
+        "reports the transferred bytes. Also reports the disk bytes when the images would "
+        "be stored in a folder transcoded to the given folder transfer syntax."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default="ORTHANC1", help="AE title of the source.")
+        parser.add_argument(
+            "--destination", default="ORTHANC2", help="AE title of the destination."
+        )
+        parser.add_argument(
+            "--transfer-syntax",
+            default="1.2.840.10008.1.2.4.70",  # JPEG Lossless SV1
+            help="Transfer syntax preferred by both servers in the second round.",
+        )
+        parser.add_argument(
+            "--folder-transfer-syntax",
+            default="1.2.840.10008.1.2.5",  # RLE Lossless
+            help="Transfer syntax the images are transcoded to for the disk bytes.",
+        )
+
+    def handle(self, *args, **options):
+        source = self._get_server(options["source"])
+        destination = self._get_server(options["destination"])
+
+        # The transfer syntax preference applies to DIMSE (C-GET and C-STORE) only. The
+        # servers are not saved, so these changes only apply to this command.
+        source.dicomweb_wado_support = False
+        destination.dicomweb_stow_support = False
+
+        studies = list(
+            DicomOperator(source).find_studies(QueryDataset.create(QueryRetrieveLevel="STUDY"))
+        )
+        if not studies:
+            raise CommandError(f"DICOM server {source} has no studies.")
+
+        self.stdout.write(f"Transferring {len(studies)} studies from {source} to {destination}.")
+
+        folder_transfer_syntax = options["folder_transfer_syntax"]
+        uncompressed_bytes = 0
+        for preferred in ([], [options["transfer_syntax"]]):
+            source.preferred_transfer_syntaxes = preferred
+            destination.preferred_transfer_syntaxes = preferred
+            source_operator = DicomOperator(source)
+            dest_operator = DicomOperator(destination)
+
+            images = 0
+            network_bytes = 0
+            disk_bytes = 0
+
+            def transfer(ds: Dataset) -> None:
+                nonlocal images, network_bytes, disk_bytes
+                images += 1
+                network_bytes += _encoded_size(ds)
+                dest_operator.upload_images([ds])
+
+                transcode_dataset(ds, folder_transfer_syntax)
+                disk_bytes += _encoded_size(ds)
+
+            start = time.perf_counter()
+            for study in studies:
+                source_operator.fetch_study(study.PatientID, study.StudyInstanceUID, transfer)
+            elapsed = time.perf_counter() - start
+
+            if not preferred:
+                uncompressed_bytes = network_bytes
+            saved = 1 - network_bytes / uncompressed_bytes if uncompressed_bytes else 0
+            mode = UID(preferred[0]).name if preferred else "uncompressed"
+            self.stdout.write(
+                f"{mode}: {images} images in {elapsed:.2f}s, "
+                f"{network_bytes / 1024 / 1024:.1f} MB retrieved ({saved:.0%} saved), "
+                f"{disk_bytes / 1024 / 1024:.1f} MB on disk as {UID(folder_transfer_syntax).name}"
+            )
+
+    def _get_server(self, ae_title: str) -> DicomServer:
+        server = DicomServer.objects.filter(ae_title=ae_title).first()
+        if not server:
+            raise CommandError(f"DICOM server with AE title {ae_title} not found.")
+        return server
@@ -24,7 +24,14 @@ class Command(AsyncServerCommand):
     paths_to_watch = settings.SOURCE_PATHS
 
     async def run_server_async(self, **options):
-        with tempfile.TemporaryDirectory(prefix="adit_receiver_") as tmpdir:
+        # With a spool directory shared with the workers only the file paths are
+        # transmitted to them (see settings.RECEIVER_SPOOL_DIR).
+        spool_dir = settings.RECEIVER_SPOOL_DIR or None
+        if spool_dir:
+            Path(spool_dir).mkdir(parents=True, exist_ok=True)
+        self._by_reference = spool_dir is not None
+
+        with tempfile.TemporaryDirectory(prefix="adit_receiver_", dir=spool_dir) as tmpdir:
             self.stdout.write(f"Using receiver directory: {tmpdir}")
 
             # In Docker swarm mode the host "receiver" resolves to a virtual IP address as multiple
@@ -51,6 +58,7 @@ class Command(AsyncServerCommand):
                     tg.create_task(self._file_transmit.start())
                     tg.create_task(store_scp_thread)
                     tg.create_task(self._send_files())
+                    tg.create_task(self._log_transmit_metrics())
             except ExceptionGroup as err:
                 # Explicitly stop the  Store SCP server as it is running in a separate thread not
                 # using asyncio and can't be stopped by the task group using a CancelledError.
@@ -74,13 +82,17 @@ class Command(AsyncServerCommand):
             series_uid = "Unknown"
             instance_uid = "Unknown"
             try:
-                ds = read_dataset(file_path)
+                # Only the UIDs are needed here, the workers read the whole file anyway
+                ds = read_dataset(file_path, stop_before_pixels=True)
                 study_uid = ds.StudyInstanceUID
                 series_uid = ds.SeriesInstanceUID
                 instance_uid = ds.SOPInstanceUID
                 topic = f"{calling_ae}\\{study_uid}"
                 await self._file_transmit.publish_file(
-                    topic, file_path, {"SOPInstanceUID": instance_uid}
+                    topic,
+                    file_path,
+                    {"SOPInstanceUID": instance_uid},
+                    by_reference=self._by_reference,
                 )
 
             except Exception as err:
@@ -94,6 +106,12 @@ class Command(AsyncServerCommand):
             finally:
                 os.unlink(file_path)
 
+    async def _log_transmit_metrics(self):
+        while True:
+            await asyncio.sleep(60)
+            for topic, metrics in self._file_transmit.get_metrics().items():
+                logger.debug(f"File transmit metrics of topic {topic}: {metrics}")
+
     def on_shutdown(self):
         self._store_scp.stop()
         asyncio.run_coroutine_threadsafe(self._file_transmit.stop(), self.loop)
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.3 on 2026-10-17 09:12
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_review_fixes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dicomserver",
+            name="max_parallel_retrievals",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text=(
+                    "Fetch the series of a study over this many associations at once "
+                    "(C-GET/C-MOVE). Only increase it if the server can handle multiple "
+                    "simultaneous retrievals."
+                ),
+                validators=[django.core.validators.MinValueValidator(1)],
+            ),
+        ),
+    ]
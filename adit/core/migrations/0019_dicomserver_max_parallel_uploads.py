@@ -0,0 +1,27 @@
+# Generated by Django 6.0.3 on 2026-10-17 11:40
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0018_dicomserver_max_parallel_retrievals"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dicomserver",
+            name="max_parallel_uploads",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text=(
+                    "Upload the images of a transfer over this many associations at once "
+                    "(C-STORE). Only increase it if the server can handle multiple "
+                    "simultaneous uploads."
+                ),
+                validators=[django.core.validators.MinValueValidator(1)],
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.3 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0019_dicomserver_max_parallel_uploads"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dicomserver",
+            name="negotiated_contexts",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 6.0.3 on 2026-10-17 15:20
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0020_dicomserver_negotiated_contexts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dicomserver",
+            name="preferred_transfer_syntaxes",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(
+                    choices=[
+                        ("1.2.840.10008.1.2", "Implicit VR Little Endian"),
+                        ("1.2.840.10008.1.2.1", "Explicit VR Little Endian"),
+                        ("1.2.840.10008.1.2.4.50", "JPEG Baseline (Process 1)"),
+                        ("1.2.840.10008.1.2.4.51", "JPEG Extended (Process 2 and 4)"),
+                        (
+                            "1.2.840.10008.1.2.4.57",
+                            "JPEG Lossless, Non-Hierarchical (Process 14)",
+                        ),
+                        (
+                            "1.2.840.10008.1.2.4.70",
+                            "JPEG Lossless, Non-Hierarchical, First-Order Prediction "
+                            "(Process 14 [Selection Value 1])",
+                        ),
+                        ("1.2.840.10008.1.2.4.80", "JPEG-LS Lossless Image Compression"),
+                        (
+                            "1.2.840.10008.1.2.4.81",
+                            "JPEG-LS Lossy (Near-Lossless) Image Compression",
+                        ),
+                        ("1.2.840.10008.1.2.4.90", "JPEG 2000 Image Compression (Lossless Only)"),
+                        ("1.2.840.10008.1.2.4.91", "JPEG 2000 Image Compression"),
+                        ("1.2.840.10008.1.2.5", "RLE Lossless"),
+                    ],
+                    max_length=64,
+                ),
+                blank=True,
+                default=list,
+                help_text=(
+                    "Transfer syntaxes (comma separated, most preferred first) proposed first "
+                    "for C-GET and C-STORE, e.g. a lossless compression to reduce the network "
+                    "traffic. Leave empty to prefer uncompressed transfer syntaxes."
+                ),
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="dicomfolder",
+            name="transfer_syntax",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("1.2.840.10008.1.2.1.99", "Deflated Explicit VR Little Endian"),
+                    ("1.2.840.10008.1.2.5", "RLE Lossless"),
+                    ("1.2.840.10008.1.2.4.80", "JPEG-LS Lossless Image Compression"),
+                    ("1.2.840.10008.1.2.4.90", "JPEG 2000 Image Compression (Lossless Only)"),
+                ],
+                help_text=(
+                    "Transcode uncompressed images to this lossless transfer syntax before "
+                    "storing them. Leave empty to store the images as received."
+                ),
+                max_length=64,
+            ),
+        ),
+    ]
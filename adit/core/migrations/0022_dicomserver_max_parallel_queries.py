@@ -0,0 +1,27 @@
+# Generated by Django 6.0.3 on 2026-10-17 14:05
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0021_transfer_syntax_preferences"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dicomserver",
+            name="max_parallel_queries",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text=(
+                    "Send independent queries (e.g. per modality or study of a batch query) "
+                    "over this many associations at once (C-FIND/QIDO-RS). Only increase it "
+                    "if the server can handle multiple simultaneous queries."
+                ),
+                validators=[django.core.validators.MinValueValidator(1)],
+            ),
+        ),
+    ]
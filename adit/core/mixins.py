@@ -0,0 +1,71 @@
+from typing import Any
+
+from django.http import HttpRequest
+
+from .utils.keyset_pagination import KeysetPage
+
+# The maximum number of rows on a keyset paginated page
+KEYSET_MAX_PER_PAGE = 1000
+
+
+class KeysetPaginationMixin:
+    """Paginates the table of a SingleTableMixin view with keyset pagination.
+
+    Only applies as long as the table is shown in its default ordering. When sorted by
+    a column the table falls back to the (offset) pagination of django-tables2.
+    """
+
+    request: HttpRequest
+    table_class: Any
+    table_pagination: Any
+    keyset_page: KeysetPage | None = None
+
+    def get_keyset_per_page(self) -> int:
+        default = 25
+        if isinstance(self.table_pagination, dict):
+            default = self.table_pagination.get("per_page", default)
+        try:
+            per_page = int(self.request.GET.get("per_page", default))
+        except ValueError:
+            per_page = default
+        return max(1, min(per_page, KEYSET_MAX_PER_PAGE))
+
+    def get_table_data(self):
+        data = super().get_table_data()  # type: ignore
+        if self.request.GET.get("sort"):
+            return data
+
+        order_by = self.table_class._meta.order_by
+        if order_by:
+            data = data.order_by(*order_by)
+
+        self.keyset_page = KeysetPage(
+            data,
+            self.get_keyset_per_page(),
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+        return self.keyset_page.object_list
+
+    def get_table_pagination(self, table):
+        if self.keyset_page is not None:
+            return False
+        return super().get_table_pagination(table)  # type: ignore
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)  # type: ignore
+        context["keyset_page"] = self.keyset_page
+
+        if self.keyset_page is not None and self.keyset_page.has_other_pages:
+            query = self.request.GET.copy()
+            for key in ("after", "before", "page"):
+                query.pop(key, None)
+            if self.keyset_page.has_previous:
+                query["before"] = self.keyset_page.previous_cursor
+                context["keyset_previous_query"] = query.urlencode()
+                query.pop("before")
+            if self.keyset_page.has_next:
+                query["after"] = self.keyset_page.next_cursor
+                context["keyset_next_query"] = query.urlencode()
+
+        return context
@@ -14,7 +14,11 @@ from procrastinate.contrib.django import app
 from procrastinate.contrib.django.models import ProcrastinateJob
 
 from .utils.mail import send_job_finished_mail
-from .utils.model_utils import get_model_label, reset_tasks
+from .utils.model_utils import get_model_label, queue_tasks, reset_tasks
+from .utils.presentation_contexts import (
+    LOSSLESS_TRANSFER_SYNTAX_CHOICES,
+    TRANSFER_SYNTAX_CHOICES,
+)
 from .validators import (
     no_backslash_char_validator,
     no_control_chars_validator,
@@ -157,6 +161,53 @@ class DicomServer(DicomNode):
     # C-FIND result limit before recursive time-window splitting
     max_search_results = models.PositiveIntegerField(default=200, validators=[MinValueValidator(1)])
 
+    # Number of associations used concurrently when fetching the series of a study
+    max_parallel_retrievals = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text=(
+            "Fetch the series of a study over this many associations at once (C-GET only). "
+            "Only increase it if the server can handle multiple simultaneous retrievals."
+        ),
+    )
+
+    # Number of associations used concurrently when uploading images with C-STORE
+    max_parallel_uploads = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text=(
+            "Upload the images of a transfer over this many associations at once (C-STORE). "
+            "Only increase it if the server can handle multiple simultaneous uploads."
+        ),
+    )
+
+    # Number of associations used concurrently for independent queries (e.g. of a batch query)
+    max_parallel_queries = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text=(
+            "Send independent queries (e.g. per modality or study of a batch query) over "
+            "this many associations at once (C-FIND/QIDO-RS). Only increase it if the "
+            "server can handle multiple simultaneous queries."
+        ),
+    )
+
+    # Ordered transfer syntaxes proposed first when retrieving (C-GET) or storing (C-STORE)
+    preferred_transfer_syntaxes = ArrayField(
+        models.CharField(max_length=64, choices=TRANSFER_SYNTAX_CHOICES),
+        blank=True,
+        default=list,
+        help_text=(
+            "Transfer syntaxes (comma separated, most preferred first) proposed first for "
+            "C-GET and C-STORE, e.g. a lossless compression to reduce the network traffic. "
+            "Leave empty to prefer uncompressed transfer syntaxes."
+        ),
+    )
+
+    # Outcome of the last full presentation context negotiation per DIMSE service
+    # (see adit.core.utils.negotiation_cache)
+    negotiated_contexts = models.JSONField(default=dict, blank=True, editable=False)
+
     objects: DicomNodeManager["DicomServer"] = DicomNodeManager["DicomServer"]()
 
 
@@ -174,10 +225,24 @@ class DicomFolder(DicomNode):
         blank=True,
         help_text="When to warn the admins by Email (used space in GB).",
     )
+    transfer_syntax = models.CharField(
+        blank=True,
+        max_length=64,
+        choices=LOSSLESS_TRANSFER_SYNTAX_CHOICES,
+        help_text=(
+            "Transcode uncompressed images to this lossless transfer syntax before storing "
+            "them. Leave empty to store the images as received."
+        ),
+    )
 
     objects: DicomNodeManager["DicomFolder"] = DicomNodeManager["DicomFolder"]()
 
 
+def _task_count_field(status: str) -> str:
+    # The field of a job with the number of its tasks of that status (e.g. success_task_count)
+    return f"{DicomTask.Status(status).name.lower()}_task_count"
+
+
 class DicomJob(models.Model):
     class Status(models.TextChoices):
         UNVERIFIED = "UV", "Unverified"
@@ -208,6 +273,15 @@ class DicomJob(models.Model):
     start = models.DateTimeField(null=True, blank=True)
     end = models.DateTimeField(null=True, blank=True)
 
+    # The number of tasks per status, so that the progress of a job can be shown without
+    # counting its tasks (kept up to date by post_process and update_task_counts)
+    pending_task_count = models.PositiveIntegerField(default=0)
+    in_progress_task_count = models.PositiveIntegerField(default=0)
+    canceled_task_count = models.PositiveIntegerField(default=0)
+    success_task_count = models.PositiveIntegerField(default=0)
+    warning_task_count = models.PositiveIntegerField(default=0)
+    failure_task_count = models.PositiveIntegerField(default=0)
+
     tasks: models.QuerySet["DicomTask"]
 
     class Meta:
@@ -235,17 +309,37 @@ class DicomJob(models.Model):
         if self.urgent:
             priority = self.urgent_priority
 
-        for dicom_task in self.tasks.filter(status=DicomTask.Status.PENDING):
-            assert dicom_task.queued_job is None
+        pending_tasks = self.tasks.filter(status=DicomTask.Status.PENDING)
+        assert not pending_tasks.filter(queued_job__isnull=False).exists()
+
+        queue_tasks(pending_tasks, "adit.core.tasks.process_dicom_task", priority)
+        self.update_task_counts()
+
+    def count_tasks(self) -> dict[str, int]:
+        """Returns the number of tasks per status (determined by one grouped query)."""
+        # Without the default ordering of the tasks, which would otherwise also be grouped by
+        return dict(
+            self.tasks.order_by()
+            .values("status")
+            .annotate(count=models.Count("id"))
+            .values_list("status", "count")
+        )
+
+    def set_task_counts(self, task_counts: dict[str, int]) -> None:
+        for status in DicomTask.Status:
+            setattr(self, _task_count_field(status), task_counts.get(status, 0))
 
-            model_label = get_model_label(dicom_task.__class__)
-            queued_job_id = app.configure_task(
-                "adit.core.tasks.process_dicom_task",
-                allow_unknown=False,
-                priority=priority,
-            ).defer(model_label=model_label, task_id=dicom_task.pk)
-            dicom_task.queued_job_id = queued_job_id
-            dicom_task.save()
+    def update_task_counts(self) -> None:
+        """Updates the task counters of the job to the current status of its tasks.
+
+        Only the counters are saved, so that other fields of the job, which may have been
+        changed in the meantime, are not overwritten.
+        """
+        self.set_task_counts(self.count_tasks())
+        fields = [_task_count_field(status) for status in DicomTask.Status]
+        self.__class__.objects.filter(pk=self.pk).update(
+            **{field: getattr(self, field) for field in fields}
+        )
 
     def reset_tasks(self, only_failed=False) -> None:
         if only_failed:
@@ -263,23 +357,26 @@ class DicomJob(models.Model):
         Returns:
             True if the job is finished, False otherwise
         """
-        if not self.tasks.exists():
+        status_counts = self.count_tasks()
+        self.set_task_counts(status_counts)
+
+        if not status_counts:
             self.status = DicomJob.Status.SUCCESS
             self.message = "No tasks to process."
             self.end = timezone.now()
             self.save()
             return True
 
-        if self.tasks.filter(status=DicomTask.Status.PENDING).exists():
+        if status_counts.get(DicomTask.Status.PENDING):
             if self.status != DicomJob.Status.CANCELING:
                 self.status = DicomJob.Status.PENDING
-                self.save()
+            self.save()
             return False
 
-        if self.tasks.filter(status=DicomTask.Status.IN_PROGRESS).exists():
+        if status_counts.get(DicomTask.Status.IN_PROGRESS):
             if self.status != DicomJob.Status.CANCELING:
                 self.status = DicomJob.Status.IN_PROGRESS
-                self.save()
+            self.save()
             return False
 
         if self.status == DicomJob.Status.CANCELING:
@@ -288,10 +385,10 @@ class DicomJob(models.Model):
             return False
 
         # Job is finished and we evaluate its final status
-        has_success = self.tasks.filter(status=DicomTask.Status.SUCCESS).exists()
-        has_warning = self.tasks.filter(status=DicomTask.Status.WARNING).exists()
-        has_failure = self.tasks.filter(status=DicomTask.Status.FAILURE).exists()
-        has_canceled = self.tasks.filter(status=DicomTask.Status.CANCELED).exists()
+        has_success = bool(status_counts.get(DicomTask.Status.SUCCESS))
+        has_warning = bool(status_counts.get(DicomTask.Status.WARNING))
+        has_failure = bool(status_counts.get(DicomTask.Status.FAILURE))
+        has_canceled = bool(status_counts.get(DicomTask.Status.CANCELED))
 
         # An "All tasks ..." message would be untrue when some tasks were canceled instead.
         if has_success and not has_warning and not has_failure:
@@ -367,6 +464,19 @@ class DicomJob(models.Model):
         )
         return self.tasks.exclude(status__in=non_processed)
 
+    @property
+    def processed_task_count(self) -> int:
+        return (
+            self.canceled_task_count
+            + self.success_task_count
+            + self.warning_task_count
+            + self.failure_task_count
+        )
+
+    @property
+    def total_task_count(self) -> int:
+        return self.pending_task_count + self.in_progress_task_count + self.processed_task_count
+
 
 class TransferJob(DicomJob):
     trial_protocol_id = models.CharField(
@@ -420,6 +530,8 @@ class DicomTask(models.Model):
     class Meta:
         abstract = True
         ordering = ("id",)
+        # For the (status filtered) tasks of a job
+        indexes = [models.Index(fields=["job", "status"])]
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__} [{self.pk}]"
@@ -1,8 +1,12 @@
 from abc import ABC
-from typing import IO, TypeVar, cast
+from collections.abc import Iterator
+from itertools import islice
+from typing import IO, Any, TypeVar, cast
 from zipfile import BadZipFile
 
 import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
 
 from .errors import (
     BatchFileContentError,
@@ -14,6 +18,12 @@ from .serializers import BatchTaskListSerializer, BatchTaskSerializer
 
 T = TypeVar("T", bound=DicomTask)
 
+# How many rows of a batch file are read, transformed and validated at once
+PARSE_CHUNK_SIZE = 1000
+
+# The delimiters a CSV batch file may use (e.g. Excel uses a semicolon in some locales)
+CSV_DELIMITERS = ",;\t"
+
 
 class BatchFileParser[T](ABC):
     serializer_class: type[BatchTaskSerializer] | None = None
@@ -21,58 +31,172 @@ class BatchFileParser[T](ABC):
     def __init__(self, mapping: dict[str, str]) -> None:
         self.mapping = mapping
 
-    def get_serializer(self, data: list[dict[str, str]]) -> BatchTaskListSerializer:
+    def get_serializer(
+        self, data: list[dict[str, Any]], context: dict[str, Any]
+    ) -> BatchTaskListSerializer:
         if not self.serializer_class:
             raise ValueError("Unknown serializer class.")
         # many=True automatically returns the list serializer
-        return cast(BatchTaskListSerializer, self.serializer_class(data=data, many=True))
+        return cast(
+            BatchTaskListSerializer,
+            self.serializer_class(data=data, many=True, context=context),
+        )
 
     def parse(self, batch_file: IO, max_batch_size: int | None) -> list[T]:
-        data: list[dict[str, str]] = []
+        """Parses an Excel (.xlsx) or CSV (.csv) batch file to (unsaved) tasks.
+
+        The rows are read, transformed and validated in chunks, so that too large and
+        invalid files are rejected as soon as a chunk exceeds the limit or has errors.
+        The serializers of all chunks share one context, so that list serializers can
+        validate rows against those of previous chunks.
+        """
+        tasks: list[T] = []
+        data_count = 0
+        context: dict[str, Any] = {}
+
+        for chunk in self.read_chunks(batch_file):
+            data = self.build_data(chunk)
+            if not data:
+                continue
 
-        try:
-            # We only extract strings and let the serializer handle the parsing
-            # of the dates so that all errors are handled there.
-            df = pd.read_excel(batch_file, dtype="string", engine="openpyxl")
-        except (BadZipFile, ValueError):
-            raise BatchFileFormatError
+            data_count += len(data)
+            if max_batch_size is not None and data_count > max_batch_size:
+                raise BatchFileSizeError(data_count, max_batch_size)
 
-        df.fillna("", inplace=True)
-        for col in df:
-            df[col] = df[col].str.strip()
+            serializer = self.get_serializer(data, context)
 
-        for idx, (_, row) in enumerate(df.iterrows()):
-            data_row = {}
+            if not serializer.is_valid():
+                raise BatchFileContentError(
+                    self.mapping,
+                    data,
+                    serializer.errors,
+                )
 
-            row_empty = True
-            for field, column in self.mapping.items():
-                value = str(row.get(column, ""))
-                if value:
-                    row_empty = False
-                    data_row[field] = self.transform_value(field, value)
+            tasks.extend(serializer.get_tasks())
 
-            if row_empty:
-                continue
+        return tasks
 
-            # + 2 because the first row is the header and the index starts at 0
-            data_row["lines"] = [idx + 2]
+    def read_chunks(self, batch_file: IO) -> Iterator[pd.DataFrame]:
+        """Yields the rows of the batch file in chunks of string columns.
 
-            data.append(data_row)
+        The index of the rows is their position in the file (without the header).
+        We only extract strings and let the serializer handle the parsing of the dates,
+        so that all errors are handled there.
+        """
+        batch_file.seek(0)
+        if str(getattr(batch_file, "name", "")).lower().endswith(".csv"):
+            chunks = self._read_csv_chunks(batch_file)
+        else:
+            chunks = self._read_excel_chunks(batch_file)
 
-        if max_batch_size is not None and len(data) > max_batch_size:
-            raise BatchFileSizeError(len(data), max_batch_size)
+        for chunk in chunks:
+            yield chunk.fillna("").apply(lambda column: column.str.strip())
 
-        serializer = self.get_serializer(data)
+    def _read_excel_chunks(self, batch_file: IO) -> Iterator[pd.DataFrame]:
+        try:
+            # In read-only mode the rows are read lazily from the file
+            workbook = load_workbook(batch_file, read_only=True, data_only=True)
+        except (BadZipFile, InvalidFileException, KeyError, ValueError):
+            raise BatchFileFormatError
+
+        try:
+            worksheet = workbook.active
+            if worksheet is None:
+                return
+
+            # The dimensions stored in the file can't be trusted (depends on the writer)
+            worksheet.reset_dimensions()  # type: ignore
+            rows = worksheet.iter_rows(values_only=True)
+
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = _unique_columns(header)
+
+            start = 0
+            while chunk := list(islice(rows, PARSE_CHUNK_SIZE)):
+                values = [
+                    [_cell_to_string(cell) for cell in row[: len(columns)]]
+                    + [None] * (len(columns) - len(row))
+                    for row in chunk
+                ]
+                index = pd.RangeIndex(start, start + len(chunk))
+                yield pd.DataFrame(values, columns=columns, index=index, dtype="string")
+                start += len(chunk)
+        finally:
+            workbook.close()
+
+    def _read_csv_chunks(self, batch_file: IO) -> Iterator[pd.DataFrame]:
+        sample = batch_file.readline()
+        batch_file.seek(0)
+        if isinstance(sample, bytes):
+            sample = sample.decode("utf-8", errors="replace")
+        delimiter = max(CSV_DELIMITERS, key=sample.count)
 
-        if not serializer.is_valid():
-            raise BatchFileContentError(
-                self.mapping,
-                data,
-                serializer.errors,
+        try:
+            yield from pd.read_csv(
+                batch_file,
+                sep=delimiter,
+                dtype="string",
+                keep_default_na=False,
+                skip_blank_lines=False,
+                encoding="utf-8-sig",
+                chunksize=PARSE_CHUNK_SIZE,
             )
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+            raise BatchFileFormatError
 
-        return serializer.get_tasks()
+    def build_data(self, chunk: pd.DataFrame) -> list[dict[str, Any]]:
+        """Builds the data for the serializer of the non empty rows of a chunk."""
+        empty = pd.Series("", index=chunk.index, dtype="string")
+        raw = pd.DataFrame(
+            {field: chunk.get(column, empty) for field, column in self.mapping.items()}
+        )
+
+        present = raw != ""
+        non_empty_rows = present.any(axis=1)
+        raw = raw[non_empty_rows]
+        present = present[non_empty_rows]
+
+        fields = list(self.mapping)
+        transformed = [self.transform_column(field, raw[field]).tolist() for field in fields]
+        # + 2 because the first row is the header and the index starts at 0
+        lines = (raw.index + 2).tolist()
+
+        data: list[dict[str, Any]] = []
+        for row, row_present in enumerate(present.to_numpy(dtype=bool)):
+            data_row: dict[str, Any] = {
+                field: transformed[col][row] for col, field in enumerate(fields) if row_present[col]
+            }
+            data_row["lines"] = [lines[row]]
+            data.append(data_row)
 
-    # Method that can be overridden to adapt the value for a specific field
-    def transform_value(self, field: str, value: str):
-        return value
+        return data
+
+    # Method that can be overridden to adapt the values of a specific field. The column
+    # contains the stripped strings of the file (an empty string for an empty cell).
+    def transform_column(self, field: str, column: pd.Series) -> pd.Series:
+        return column
+
+
+def _cell_to_string(value: Any) -> str | None:
+    if value is None:
+        return None
+    # Like pandas, integers that Excel stores as floats are no floats
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _unique_columns(header: tuple[Any, ...]) -> list[str]:
+    # Like pandas, duplicate column titles get a suffix (e.g. PatientID.1)
+    columns: list[str] = []
+    for title in header:
+        column = str(title) if title is not None else ""
+        unique_column = column
+        suffix = 1
+        while unique_column in columns:
+            unique_column = f"{column}.{suffix}"
+            suffix += 1
+        columns.append(unique_column)
+    return columns
@@ -19,8 +19,10 @@ from .models import DicomAppSettings, DicomNode, DicomTask, TransferTask
 from .types import DicomLogEntry, ProcessingResult
 from .utils.dicom_dataset import QueryDataset, ResultDataset
 from .utils.dicom_operator import DicomOperator
-from .utils.dicom_utils import write_dataset
+from .utils.dicom_utils import transcode_dataset, write_dataset
 from .utils.sanitize import sanitize_filename
+from .utils.series_catalog import SeriesCatalog
+from .utils.streaming_uploader import StreamingUploader
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +63,10 @@ class TransferTaskProcessor(DicomTaskProcessor):
         self.dest_operator = None
         destination = self.transfer_task.destination
         if destination.node_type == DicomNode.NodeType.SERVER:
-            self.dest_operator = DicomOperator(destination.dicomserver)
+            self.dest_operator = DicomOperator(destination.dicomserver, persistent=True)
+
+        # The series of a study are only queried once (see _get_series_catalog)
+        self._series_catalogs: dict[str, SeriesCatalog] = {}
 
     def _get_logs(self) -> list[DicomLogEntry]:
         logs: list[DicomLogEntry] = []
@@ -96,10 +101,32 @@ class TransferTaskProcessor(DicomTaskProcessor):
         }
 
     def _transfer_to_server(self) -> None:
-        with tempfile.TemporaryDirectory(prefix="adit_") as tmpdir:
-            patient_folder = self._download_to_folder(Path(tmpdir))
-            assert self.dest_operator
-            self.dest_operator.upload_images(patient_folder)
+        assert self.dest_operator
+
+        study = self._find_study()
+        series_uids = self.transfer_task.series_uids
+        for series_uid in series_uids:
+            # Make sure that the selected series exist
+            self._find_series_list(series_uid=series_uid)
+
+        modifier = self._create_modifier()
+
+        # The images are uploaded while they are fetched, without a temporary folder
+        with StreamingUploader(self.dest_operator) as uploader:
+
+            def callback(ds: Dataset | None) -> None:
+                if ds is None:
+                    return
+
+                modifier(ds)
+                uploader.put(ds)
+
+            self._fetch_study(
+                study.PatientID,
+                study.StudyInstanceUID,
+                callback,
+                series_uids=series_uids or None,
+            )
 
     def _transfer_to_archive(self) -> None:
         assert self.transfer_task.destination.node_type == DicomNode.NodeType.FOLDER
@@ -140,11 +167,8 @@ class TransferTaskProcessor(DicomTaskProcessor):
         if excluded:
             task_series_uids = set(self.transfer_task.series_uids)
             convertible = []
-            for s in self.source_operator.find_series(
-                QueryDataset.create(
-                    PatientID=self.transfer_task.patient_id,
-                    StudyInstanceUID=self.transfer_task.study_uid,
-                )
+            for s in self._get_series_catalog(
+                self.transfer_task.patient_id, self.transfer_task.study_uid
             ):
                 if task_series_uids and s.SeriesInstanceUID not in task_series_uids:
                     continue
@@ -204,7 +228,8 @@ class TransferTaskProcessor(DicomTaskProcessor):
         assert self.transfer_task.destination.node_type == DicomNode.NodeType.FOLDER
         dicom_folder = Path(self.transfer_task.destination.dicomfolder.path)
         download_folder = dicom_folder / self._create_destination_name()
-        self._download_to_folder(download_folder)
+        transfer_syntax = self.transfer_task.destination.dicomfolder.transfer_syntax
+        self._download_to_folder(download_folder, transfer_syntax=transfer_syntax)
 
     def _create_destination_name(self) -> str:
         transfer_job = self.transfer_task.job
@@ -219,6 +244,7 @@ class TransferTaskProcessor(DicomTaskProcessor):
         self,
         download_folder: Path,
         series_uids_override: list[str] | None = None,
+        transfer_syntax: str = "",
     ) -> Path:
         pseudonym = self.transfer_task.pseudonym or None
         if pseudonym:
@@ -245,9 +271,6 @@ class TransferTaskProcessor(DicomTaskProcessor):
         if series_uids:
             modalities = set()
             for series_uid in series_uids:
-                # TODO: this seems to be very ineffective as we do a c-find for every series
-                # in a study and check if it is a wanted series. Better fetch all series of
-                # a study and check then.
                 for series in self._find_series_list(series_uid=series_uid):
                     modalities.add(series.Modality)
 
@@ -258,14 +281,7 @@ class TransferTaskProcessor(DicomTaskProcessor):
         study_folder = patient_folder / f"{prefix}-{modalities}"
         os.makedirs(study_folder, exist_ok=True)
 
-        dicom_manipulator = DicomManipulator()
-
-        modifier = partial(
-            dicom_manipulator.manipulate,
-            pseudonym=pseudonym,
-            trial_protocol_id=self.transfer_task.job.trial_protocol_id,
-            trial_protocol_name=self.transfer_task.job.trial_protocol_name,
-        )
+        modifier = self._create_modifier()
 
         if series_uids:
             self._download_study(
@@ -274,6 +290,7 @@ class TransferTaskProcessor(DicomTaskProcessor):
                 study_folder,
                 modifier,
                 series_uids=series_uids,
+                transfer_syntax=transfer_syntax,
             )
         else:
             self._download_study(
@@ -281,10 +298,20 @@ class TransferTaskProcessor(DicomTaskProcessor):
                 study.StudyInstanceUID,
                 study_folder,
                 modifier,
+                transfer_syntax=transfer_syntax,
             )
 
         return patient_folder
 
+    def _create_modifier(self) -> Callable[[Dataset], None]:
+        dicom_manipulator = DicomManipulator()
+        return partial(
+            dicom_manipulator.manipulate,
+            pseudonym=self.transfer_task.pseudonym or None,
+            trial_protocol_id=self.transfer_task.job.trial_protocol_id,
+            trial_protocol_name=self.transfer_task.job.trial_protocol_name,
+        )
+
     def _find_study(self) -> ResultDataset:
         studies = list(
             self.source_operator.find_studies(
@@ -332,20 +359,22 @@ class TransferTaskProcessor(DicomTaskProcessor):
 
         return study
 
-    def _find_series_list(self, series_uid: str) -> list[ResultDataset]:
-        series_list = list(
-            self.source_operator.find_series(
-                QueryDataset.create(
-                    PatientID=self.transfer_task.patient_id,
-                    StudyInstanceUID=self.transfer_task.study_uid,
+    def _get_series_catalog(self, patient_id: str, study_uid: str) -> SeriesCatalog:
+        # Only keyed by the study, as the PatientID of the task and the one of the found
+        # study may differ (see _find_study)
+        if study_uid not in self._series_catalogs:
+            self._series_catalogs[study_uid] = SeriesCatalog(
+                self.source_operator.find_series(
+                    QueryDataset.create(PatientID=patient_id, StudyInstanceUID=study_uid)
                 )
             )
-        )
+        return self._series_catalogs[study_uid]
 
-        results = []
-        for series in series_list:
-            if series.SeriesInstanceUID == series_uid:
-                results.append(series)
+    def _find_series_list(self, series_uid: str) -> list[ResultDataset]:
+        catalog = self._get_series_catalog(
+            self.transfer_task.patient_id, self.transfer_task.study_uid
+        )
+        results = catalog.by_uid(series_uid)
 
         if len(results) == 0:
             raise DicomError(f"No series found with Series Instance UID {series_uid}.")
@@ -361,6 +390,7 @@ class TransferTaskProcessor(DicomTaskProcessor):
         study_folder: Path,
         modifier: Callable,
         series_uids: list[str] | None = None,
+        transfer_syntax: str = "",
     ) -> None:
         def callback(ds: Dataset | None) -> None:
             if ds is None:
@@ -368,6 +398,9 @@ class TransferTaskProcessor(DicomTaskProcessor):
 
             modifier(ds)
 
+            if transfer_syntax:
+                transcode_dataset(ds, transfer_syntax)
+
             final_folder: Path
             if settings.CREATE_SERIES_SUB_FOLDERS:
                 series_number = ds.get("SeriesNumber")
@@ -386,6 +419,15 @@ class TransferTaskProcessor(DicomTaskProcessor):
             file_path = final_folder / file_name
             write_dataset(ds, file_path)
 
+        self._fetch_study(patient_id, study_uid, callback, series_uids=series_uids)
+
+    def _fetch_study(
+        self,
+        patient_id: str,
+        study_uid: str,
+        callback: Callable[[Dataset | None], None],
+        series_uids: list[str] | None = None,
+    ) -> None:
         pseudonymize = bool(self.transfer_task.pseudonym)
         exclude_modalities = settings.EXCLUDE_MODALITIES
 
@@ -393,17 +435,10 @@ class TransferTaskProcessor(DicomTaskProcessor):
             # If specific series are selected we transfer only those series. When pseudonymizing
             # we have to check if a modality should be excluded.
             if pseudonymize and exclude_modalities:
+                catalog = self._get_series_catalog(patient_id, study_uid)
                 filtered_series = []
                 for series_uid in series_uids:
-                    series_list = list(
-                        self.source_operator.find_series(
-                            QueryDataset.create(
-                                PatientID=patient_id,
-                                StudyInstanceUID=study_uid,
-                                SeriesInstanceUID=series_uid,
-                            )
-                        )
-                    )
+                    series_list = catalog.by_uid(series_uid)
                     if not series_list:
                         logger.warning(f"Series with UID {series_uid} not found.")
                         continue
@@ -429,12 +464,7 @@ class TransferTaskProcessor(DicomTaskProcessor):
         elif pseudonymize:
             # If the whole study should be transferred and pseudonymized, we transfer on the
             # series level to exclude the specified modalities.
-            series_list = list(
-                self.source_operator.find_series(
-                    QueryDataset.create(PatientID=patient_id, StudyInstanceUID=study_uid)
-                )
-            )
-            for series in series_list:
+            for series in self._get_series_catalog(patient_id, study_uid):
                 series_uid = series.SeriesInstanceUID
                 modality = series.Modality
                 if modality in settings.EXCLUDE_MODALITIES:
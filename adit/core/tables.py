@@ -22,13 +22,16 @@ class RecordIdColumn(tables.TemplateColumn):
 
 class DicomJobTable(tables.Table):
     id = RecordIdColumn(verbose_name="Job ID")
+    processed_tasks = tables.Column(
+        verbose_name="Processed Tasks", accessor="processed_task_count", orderable=False
+    )
     created = tables.Column(verbose_name="Created At")
 
     class Meta:
         model: type[DicomJob]
         order_by = ("-id",)
         # owner is dynamically excluded for non staff users (see views.py)
-        fields = ("id", "status", "message", "created", "owner")
+        fields = ("id", "status", "message", "processed_tasks", "created", "owner")
         empty_text = "No jobs to show"
         attrs = {
             "id": "dicom_job_table",
@@ -39,6 +42,10 @@ class DicomJobTable(tables.Table):
         css_class = dicom_job_status_css_class(record.status)
         return format_html('<span class="{} text-nowrap">{}</span>', css_class, value)
 
+    def render_processed_tasks(self, value, record):
+        # Uses the task counters of the job, so no tasks are counted per row
+        return f"{value} of {record.total_task_count}"
+
 
 class TransferJobTable(DicomJobTable):
     pass
@@ -16,9 +16,11 @@ from procrastinate.contrib.django import app
 from .errors import DicomError, RetriableDicomError
 from .models import DicomFolder, DicomJob, DicomTask
 from .types import ProcessingResult
+from .utils.association_pool import get_association_pool
 from .utils.db_utils import ensure_db_connection
 from .utils.mail import send_mail_to_admins
-from .utils.task_utils import get_dicom_processor, get_dicom_task
+from .utils.model_utils import get_model_label
+from .utils.task_utils import get_dicom_processor, get_dicom_task, get_dicom_tasks
 
 DISTRIBUTED_LOCK = "process_dicom_task_lock"
 
@@ -54,6 +56,34 @@ DICOM_TASK_RETRY_STRATEGY = RetryStrategy(
 )
 
 
+def _start_dicom_job(dicom_job: DicomJob) -> None:
+    # When the first DICOM task of a job is processed then the status of the
+    # job switches from PENDING to IN_PROGRESS
+    if dicom_job.status == DicomJob.Status.PENDING:
+        dicom_job.status = DicomJob.Status.IN_PROGRESS
+        dicom_job.start = timezone.now()
+        dicom_job.save()
+        logger.info(f"Processing of {dicom_job} started.")
+
+
+def get_dicom_job_lock_id(dicom_job: DicomJob) -> str:
+    """The ID of the advisory lock under which the tasks of a job are evaluated.
+
+    Scoped per job, so that tasks of different jobs finishing at the same time don't
+    wait for each other.
+    """
+    return f"{DISTRIBUTED_LOCK}:{get_model_label(dicom_job.__class__)}:{dicom_job.pk}"
+
+
+def _evaluate_dicom_job(dicom_job: DicomJob) -> None:
+    with pglock.advisory(get_dicom_job_lock_id(dicom_job)):
+        dicom_job.refresh_from_db()
+        job_finished = dicom_job.post_process()
+
+    if job_finished:
+        logger.info(f"Processing of {dicom_job} ended.")
+
+
 def _run_dicom_task(
     context: JobContext,
     model_label: str,
@@ -71,19 +101,14 @@ def _run_dicom_task(
     # IN_PROGRESS so the retry can proceed.
     assert dicom_task.status in (DicomTask.Status.PENDING, DicomTask.Status.IN_PROGRESS)
 
-    # When the first DICOM task of a job is processed then the status of the
-    # job switches from PENDING to IN_PROGRESS
     dicom_job = dicom_task.job
-    if dicom_job.status == DicomJob.Status.PENDING:
-        dicom_job.status = DicomJob.Status.IN_PROGRESS
-        dicom_job.start = timezone.now()
-        dicom_job.save()
-        logger.info(f"Processing of {dicom_job} started.")
+    _start_dicom_job(dicom_job)
 
     dicom_task.status = DicomTask.Status.IN_PROGRESS
     dicom_task.start = timezone.now()
     dicom_task.attempts += 1
     dicom_task.save()
+    dicom_job.update_task_counts()
 
     logger.info(f"Processing of {dicom_task} started.")
 
@@ -93,7 +118,14 @@ def _run_dicom_task(
         processor = get_dicom_processor(dicom_task)
 
         logger.info(f"Start processing of {dicom_task}.")
-        return processor.process()
+        try:
+            return processor.process()
+        finally:
+            # The task process exits afterwards, so gracefully release the associations
+            # that were kept open for reuse during processing.
+            pool = get_association_pool()
+            logger.debug("Association pool statistics of %s: %s", dicom_task, pool.stats())
+            pool.clear()
 
     @concurrent.thread()
     def _monitor_task(context: JobContext, future: ProcessFuture) -> None:
@@ -161,15 +193,163 @@ def _run_dicom_task(
 
     finally:
         dicom_task.end = timezone.now()
-        dicom_task.save()
+        # Only the fields set here, as the processor (in its own process) may have
+        # changed other fields of the task in the meantime
+        dicom_task.save(update_fields=["status", "message", "log", "end"])
         logger.info(f"Processing of {dicom_task} ended.")
 
-        with pglock.advisory(DISTRIBUTED_LOCK):
-            dicom_job.refresh_from_db()
-            job_finished = dicom_job.post_process()
+        _evaluate_dicom_job(dicom_job)
+
+        # TODO: https://github.com/procrastinate-org/procrastinate/issues/1106
+        db.close_old_connections()
+
 
-        if job_finished:
-            logger.info(f"Processing of {dicom_job} ended.")
+def _run_dicom_tasks(
+    context: JobContext,
+    model_label: str,
+    task_ids: list[int],
+    *,
+    process_timeout: int | None = None,
+):
+    """Processes multiple DICOM tasks of the same job one after another in one process.
+
+    Tasks that are processed quickly (like the rows of a batch query) share the process,
+    the database connections and the pooled associations, and the job is only evaluated
+    once at the end. Each task still gets its own status, message and log, which are
+    saved as soon as the task is processed. Tasks that were canceled or reset in the
+    meantime (or already processed in a previous attempt) are skipped.
+    """
+    assert context.job
+
+    processable = (DicomTask.Status.PENDING, DicomTask.Status.IN_PROGRESS)
+    dicom_tasks = list(get_dicom_tasks(model_label, task_ids).filter(status__in=processable))
+    if not dicom_tasks:
+        return
+
+    dicom_job = dicom_tasks[0].job
+    assert all(dicom_task.job_id == dicom_job.pk for dicom_task in dicom_tasks)
+    _start_dicom_job(dicom_job)
+
+    for dicom_task in dicom_tasks:
+        dicom_task.status = DicomTask.Status.IN_PROGRESS
+        dicom_task.attempts += 1
+    get_dicom_tasks(model_label, task_ids).bulk_update(dicom_tasks, ["status", "attempts"])
+    dicom_job.update_task_counts()
+
+    task_ids = [dicom_task.pk for dicom_task in dicom_tasks]
+    logger.info(f"Processing of {len(task_ids)} tasks of {dicom_job} started.")
+
+    @concurrent.process(timeout=process_timeout, daemon=True)
+    def _process_dicom_tasks(model_label: str, task_ids: list[int]) -> None:
+        in_progress = get_dicom_tasks(model_label, task_ids).filter(
+            status=DicomTask.Status.IN_PROGRESS
+        )
+        try:
+            for dicom_task in in_progress:
+                logger.info(f"Start processing of {dicom_task}.")
+                dicom_task.start = timezone.now()
+                try:
+                    result = get_dicom_processor(dicom_task).process()
+                    dicom_task.status = result["status"]
+                    dicom_task.message = result["message"]
+                    dicom_task.log = result["log"]
+                except RetriableDicomError:
+                    # Stops processing, the remaining tasks are retried (see below)
+                    raise
+                except Exception as err:
+                    if isinstance(err, DicomError):
+                        logger.exception("Error during %s.", dicom_task)
+                    else:
+                        logger.exception("Unexpected error during %s.", dicom_task)
+
+                    dicom_task.status = DicomTask.Status.FAILURE
+                    dicom_task.message = str(err)
+                    if dicom_task.log:
+                        dicom_task.log += "\n---\n"
+                    dicom_task.log += traceback.format_exc()
+
+                dicom_task.end = timezone.now()
+                dicom_task.save()
+                logger.info(f"Processing of {dicom_task} ended.")
+        finally:
+            pool = get_association_pool()
+            logger.debug("Association pool statistics of %s: %s", dicom_job, pool.stats())
+            pool.clear()
+
+    @concurrent.thread()
+    def _monitor_task(context: JobContext, future: ProcessFuture) -> None:
+        while not future.done():
+            if context.should_abort():
+                future.cancel()
+                sleep(settings.DICOM_TASK_CANCELED_MONITOR_INTERVAL)
+        db.close_old_connections()
+
+    # The tasks that are still in progress when the process ended (early)
+    def unprocessed_tasks() -> list[DicomTask]:
+        return list(
+            get_dicom_tasks(model_label, task_ids).filter(status=DicomTask.Status.IN_PROGRESS)
+        )
+
+    unprocessed: list[DicomTask] = []
+    try:
+        future = cast(ProcessFuture, _process_dicom_tasks(model_label, task_ids))
+        _monitor_task(context, future)
+        future.result()
+        ensure_db_connection()
+
+    except futures.CancelledError:
+        ensure_db_connection()
+        unprocessed = unprocessed_tasks()
+        for dicom_task in unprocessed:
+            dicom_task.status = DicomTask.Status.CANCELED
+            dicom_task.message = "Task was canceled."
+
+    except futures.TimeoutError:
+        ensure_db_connection()
+        unprocessed = unprocessed_tasks()
+        for dicom_task in unprocessed:
+            dicom_task.status = DicomTask.Status.FAILURE
+            dicom_task.message = "Task was aborted due to timeout."
+
+    except RetriableDicomError as err:
+        logger.exception("Retriable error occurred during tasks of %s.", dicom_job)
+
+        ensure_db_connection()
+        unprocessed = unprocessed_tasks()
+        # See _run_dicom_task for why the attempts of the Procrastinate job are used
+        for dicom_task in unprocessed:
+            if context.job.attempts + 1 < settings.DICOM_TASK_MAX_ATTEMPTS:
+                dicom_task.status = DicomTask.Status.PENDING
+                dicom_task.message = "Task failed, but will be retried."
+                if dicom_task.log:
+                    dicom_task.log += "\n"
+                dicom_task.log += str(err)
+            else:
+                dicom_task.status = DicomTask.Status.FAILURE
+                dicom_task.message = str(err)
+
+        raise err
+
+    except Exception as err:
+        logger.exception("Unexpected error during tasks of %s.", dicom_job)
+
+        ensure_db_connection()
+        unprocessed = unprocessed_tasks()
+        for dicom_task in unprocessed:
+            dicom_task.status = DicomTask.Status.FAILURE
+            dicom_task.message = str(err)
+            if dicom_task.log:
+                dicom_task.log += "\n---\n"
+            dicom_task.log += traceback.format_exc()
+
+    finally:
+        for dicom_task in unprocessed:
+            dicom_task.end = timezone.now()
+            dicom_task.save()
+
+        logger.info(f"Processing of {len(task_ids)} tasks of {dicom_job} ended.")
+
+        _evaluate_dicom_job(dicom_job)
 
         # TODO: https://github.com/procrastinate-org/procrastinate/issues/1106
         db.close_old_connections()
@@ -195,3 +375,19 @@ def process_dicom_task(context: JobContext, model_label: str, task_id: int):
     _run_dicom_task(
         context, model_label, task_id, process_timeout=settings.DICOM_TASK_PROCESS_TIMEOUT
     )
+
+
+@app.task(
+    queue="dicom",
+    pass_context=True,
+    retry=DICOM_TASK_RETRY_STRATEGY,
+)
+def process_dicom_tasks(context: JobContext, model_label: str, task_ids: list[int]):
+    """Processes a chunk of DICOM tasks (see _run_dicom_tasks)."""
+    _run_dicom_tasks(
+        context,
+        model_label,
+        task_ids,
+        # The timeout is meant for a single task
+        process_timeout=settings.DICOM_TASK_PROCESS_TIMEOUT * len(task_ids),
+    )
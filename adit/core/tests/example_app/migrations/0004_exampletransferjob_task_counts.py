@@ -0,0 +1,52 @@
+# Generated by Django 6.0.3 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+from adit.core.utils.migration_utils import TASK_COUNT_FIELDS, set_related_counts
+
+
+def set_task_counts(apps, schema_editor):
+    ExampleTransferJob = apps.get_model("example_app.ExampleTransferJob")
+    ExampleTransferTask = apps.get_model("example_app.ExampleTransferTask")
+    set_related_counts(ExampleTransferJob, ExampleTransferTask, TASK_COUNT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("example_app", "0003_exampletransferjob_convert_to_nifti"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exampletransferjob",
+            name="pending_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exampletransferjob",
+            name="in_progress_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exampletransferjob",
+            name="canceled_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exampletransferjob",
+            name="success_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exampletransferjob",
+            name="warning_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exampletransferjob",
+            name="failure_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_task_counts, migrations.RunPython.noop),
+    ]
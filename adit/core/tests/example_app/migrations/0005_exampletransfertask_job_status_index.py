@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("example_app", "0004_exampletransferjob_task_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="exampletransfertask",
+            index=models.Index(fields=["job", "status"], name="example_app_job_id_cc2640_idx"),
+        ),
+    ]
@@ -32,6 +32,53 @@ class TestDicomJob:
         assert job.message == "All tasks succeeded."
         assert job.end is not None
 
+    @pytest.mark.django_db
+    def test_job_post_process_aggregates_task_status_in_one_query(self, django_assert_num_queries):
+        job = ExampleTransferJobFactory.create(
+            status=DicomJob.Status.IN_PROGRESS, send_finished_mail=False
+        )
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.SUCCESS)
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.WARNING)
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.CANCELED)
+
+        # One query for the status counts of the tasks and one for saving the job
+        with django_assert_num_queries(2):
+            result = job.post_process()
+
+        assert result is True
+        assert job.status == DicomJob.Status.WARNING
+        assert job.message == "Some tasks have warnings."
+
+        job.refresh_from_db()
+        assert job.success_task_count == 1
+        assert job.warning_task_count == 1
+        assert job.canceled_task_count == 1
+        assert job.processed_task_count == 3
+
+    @pytest.mark.django_db
+    def test_job_update_task_counts(self):
+        job = ExampleTransferJobFactory.create(status=DicomJob.Status.IN_PROGRESS)
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.PENDING)
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.IN_PROGRESS)
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.SUCCESS)
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.FAILURE)
+        ExampleTransferTaskFactory.create(job=job, status=DicomTask.Status.FAILURE)
+
+        # Changed in the meantime (e.g. by a view) and must not be overwritten
+        type(job).objects.filter(pk=job.pk).update(message="Changed")
+
+        job.update_task_counts()
+
+        job.refresh_from_db()
+        assert job.message == "Changed"
+        assert job.pending_task_count == 1
+        assert job.in_progress_task_count == 1
+        assert job.success_task_count == 1
+        assert job.failure_task_count == 2
+        assert job.warning_task_count == 0
+        assert job.processed_task_count == 3
+        assert job.total_task_count == 5
+
     @pytest.mark.django_db
     def test_job_post_process_some_tasks_fail(self):
         job = ExampleTransferJobFactory.create(status=DicomJob.Status.PENDING)
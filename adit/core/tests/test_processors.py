@@ -58,6 +58,14 @@ def test_transfer_to_server_succeeds(mocker: MockerFixture):
     source_operator_mock.find_studies.return_value = iter([study])
     dest_operator_mock = mocker.create_autospec(DicomOperator)
 
+    ds = Dataset()
+    ds.PatientID = task.patient_id
+    ds.StudyInstanceUID = task.study_uid
+    ds.SOPInstanceUID = "1.2.3.4.5.6"
+    source_operator_mock.fetch_study.side_effect = lambda patient_id, study_uid, callback: (
+        callback(ds)
+    )
+
     processor = TransferTaskProcessor(task)
     mocker.patch.object(processor, "source_operator", source_operator_mock)
     mocker.patch.object(processor, "dest_operator", dest_operator_mock)
@@ -68,14 +76,67 @@ def test_transfer_to_server_succeeds(mocker: MockerFixture):
     # Assert
     source_operator_mock.fetch_study.assert_called_with(task.patient_id, task.study_uid, mocker.ANY)
 
-    upload_path = dest_operator_mock.upload_images.call_args.args[0]
-    assert upload_path.match(f"*/{study.PatientID}")
+    # The fetched image is uploaded directly (without a temporary folder)
+    dest_operator_mock.upload_images.assert_called_once_with([ds], invalidate_cache=False)
 
     assert result["status"] == TransferTask.Status.SUCCESS
     assert result["message"] == "Transfer task completed successfully."
     assert result["log"] == ""
 
 
+@pytest.mark.django_db
+def test_transfer_of_selected_series_queries_series_only_once(mocker: MockerFixture, settings):
+    # Arrange
+    settings.EXCLUDE_MODALITIES = ["SR"]
+    user = UserFactory.create(username="kai")
+    group = create_example_transfer_group()
+    add_user_to_group(user, group)
+    job = ExampleTransferJobFactory.create(
+        status=TransferJob.Status.PENDING,
+        archive_password="",
+        owner=user,
+    )
+    task = ExampleTransferTaskFactory.create(
+        source=DicomServerFactory(),
+        destination=DicomServerFactory(),
+        status=TransferTask.Status.PENDING,
+        series_uids=["1.2.3.1", "1.2.3.2", "1.2.3.3"],
+        pseudonym="SECRET01",
+        job=job,
+    )
+    grant_access(group, task.source, source=True)
+    grant_access(group, task.destination, destination=True)
+
+    _, study = create_resources(task)
+
+    source_operator_mock = mocker.create_autospec(DicomOperator)
+    source_operator_mock.find_studies.return_value = iter([study])
+    source_operator_mock.find_series.return_value = iter(
+        [
+            _make_series("1.2.3.1", "CT"),
+            _make_series("1.2.3.2", "MR"),
+            _make_series("1.2.3.3", "SR"),
+        ]
+    )
+    dest_operator_mock = mocker.create_autospec(DicomOperator)
+
+    processor = TransferTaskProcessor(task)
+    mocker.patch.object(processor, "source_operator", source_operator_mock)
+    mocker.patch.object(processor, "dest_operator", dest_operator_mock)
+
+    # Act
+    result = processor.process()
+
+    # Assert
+    assert result["status"] == TransferTask.Status.SUCCESS
+    assert source_operator_mock.find_studies.call_count == 1
+    assert source_operator_mock.find_series.call_count == 1
+    fetched_series_uids = [
+        call.kwargs["series_uid"] for call in source_operator_mock.fetch_series.call_args_list
+    ]
+    assert fetched_series_uids == ["1.2.3.1", "1.2.3.2"]
+
+
 @pytest.mark.django_db
 @time_machine.travel("2020-01-01")
 def test_transfer_to_folder_succeeds(mocker: MockerFixture):
@@ -1,9 +1,13 @@
+import threading
+import time
 from concurrent import futures
 from types import SimpleNamespace
 from typing import cast
 
+import pglock
 import pytest
 from adit_radis_shared.common.utils.testing_helpers import run_worker_once
+from django import db
 from procrastinate import JobContext
 from pytest_mock import MockerFixture
 
@@ -467,6 +471,164 @@ def test_run_dicom_task_accepts_in_progress_task_on_retry(mocker: MockerFixture)
     assert dicom_task.message == "recovered"
 
 
+def _install_inline_pebble_stubs(mocker: MockerFixture) -> None:
+    """Like _install_pebble_stubs, but runs the processing function in-process."""
+
+    def fake_process(*p_args, **p_kwargs):
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                try:
+                    return _FakeFuture(result=func(*args, **kwargs))
+                except Exception as err:
+                    return _FakeFuture(exc=err)
+
+            return wrapper
+
+        return decorator
+
+    def fake_thread(*t_args, **t_kwargs):
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                return None
+
+            return wrapper
+
+        return decorator
+
+    mocker.patch.object(tasks_module.concurrent, "process", side_effect=fake_process)
+    mocker.patch.object(tasks_module.concurrent, "thread", side_effect=fake_thread)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_dicom_tasks_reports_status_per_task(mocker: MockerFixture):
+    dicom_job = ExampleTransferJobFactory.create(status=DicomJob.Status.PENDING)
+    dicom_tasks = [
+        ExampleTransferTaskFactory.create(status=DicomTask.Status.PENDING, job=dicom_job)
+        for _ in range(3)
+    ]
+    model_label = get_model_label(ExampleTransferTask)
+
+    def process(self):
+        if self.dicom_task.pk == dicom_tasks[1].pk:
+            raise DicomError("No patient found.")
+        return {"status": DicomTask.Status.SUCCESS, "message": "Found", "log": ""}
+
+    mocker.patch.object(ExampleProcessor, "process", process)
+    _install_inline_pebble_stubs(mocker)
+    post_process_spy = mocker.spy(DicomJob, "post_process")
+
+    tasks_module._run_dicom_tasks(
+        _make_context(), model_label, [dicom_task.pk for dicom_task in dicom_tasks]
+    )
+
+    for dicom_task in dicom_tasks:
+        dicom_task.refresh_from_db()
+        assert dicom_task.attempts == 1
+        assert dicom_task.start is not None
+        assert dicom_task.end is not None
+    assert [dicom_task.status for dicom_task in dicom_tasks] == [
+        DicomTask.Status.SUCCESS,
+        DicomTask.Status.FAILURE,
+        DicomTask.Status.SUCCESS,
+    ]
+    assert dicom_tasks[1].message == "No patient found."
+
+    # The job is only evaluated once for all the tasks
+    assert post_process_spy.call_count == 1
+    dicom_job.refresh_from_db()
+    assert dicom_job.status == DicomJob.Status.FAILURE
+    assert dicom_job.message == "Some tasks failed."
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_dicom_tasks_retries_only_unprocessed_tasks(mocker: MockerFixture):
+    dicom_job = ExampleTransferJobFactory.create(status=DicomJob.Status.PENDING)
+    dicom_tasks = [
+        ExampleTransferTaskFactory.create(status=DicomTask.Status.PENDING, job=dicom_job)
+        for _ in range(3)
+    ]
+    task_ids = [dicom_task.pk for dicom_task in dicom_tasks]
+    model_label = get_model_label(ExampleTransferTask)
+
+    processed: list[int] = []
+
+    def process(self):
+        processed.append(self.dicom_task.pk)
+        if self.dicom_task.pk == dicom_tasks[1].pk and len(processed) == 2:
+            raise RetriableDicomError("transient")
+        return {"status": DicomTask.Status.SUCCESS, "message": "Found", "log": ""}
+
+    mocker.patch.object(ExampleProcessor, "process", process)
+    _install_inline_pebble_stubs(mocker)
+
+    with pytest.raises(RetriableDicomError, match="transient"):
+        tasks_module._run_dicom_tasks(_make_context(attempts=0), model_label, task_ids)
+
+    for dicom_task in dicom_tasks:
+        dicom_task.refresh_from_db()
+    assert dicom_tasks[0].status == DicomTask.Status.SUCCESS
+    assert dicom_tasks[1].status == DicomTask.Status.PENDING
+    assert dicom_tasks[1].message == "Task failed, but will be retried."
+    assert dicom_tasks[2].status == DicomTask.Status.PENDING
+
+    # The retry of the queued job skips the already processed task
+    tasks_module._run_dicom_tasks(_make_context(attempts=1), model_label, task_ids)
+
+    assert processed == [task_ids[0], task_ids[1], task_ids[1], task_ids[2]]
+    for dicom_task in dicom_tasks:
+        dicom_task.refresh_from_db()
+        assert dicom_task.status == DicomTask.Status.SUCCESS
+    assert [dicom_task.attempts for dicom_task in dicom_tasks] == [1, 2, 2]
+
+    dicom_job.refresh_from_db()
+    assert dicom_job.status == DicomJob.Status.SUCCESS
+
+
+@pytest.mark.django_db(transaction=True)
+def test_evaluate_dicom_job_does_not_wait_for_other_jobs():
+    busy_job = ExampleTransferJobFactory.create(status=DicomJob.Status.IN_PROGRESS)
+    ExampleTransferTaskFactory.create(status=DicomTask.Status.IN_PROGRESS, job=busy_job)
+    dicom_job = ExampleTransferJobFactory.create(
+        status=DicomJob.Status.IN_PROGRESS, send_finished_mail=False
+    )
+    ExampleTransferTaskFactory.create(status=DicomTask.Status.SUCCESS, job=dicom_job)
+
+    lock_acquired = threading.Event()
+    release_lock = threading.Event()
+
+    def hold_lock_of_busy_job():
+        # Like a worker (with its own database session) evaluating the busy job
+        try:
+            with pglock.advisory(tasks_module.get_dicom_job_lock_id(busy_job)):
+                lock_acquired.set()
+                release_lock.wait(timeout=10)
+        finally:
+            db.connection.close()
+
+    thread = threading.Thread(target=hold_lock_of_busy_job)
+    thread.start()
+    try:
+        assert lock_acquired.wait(timeout=10)
+
+        # The evaluation of the busy job has to wait for the lock ...
+        with pglock.advisory(
+            tasks_module.get_dicom_job_lock_id(busy_job), timeout=0, side_effect=pglock.Return
+        ) as acquired:
+            assert not acquired
+
+        # ... but the other job is evaluated without any lock wait
+        start = time.perf_counter()
+        with pglock.lock_timeout(1):
+            tasks_module._evaluate_dicom_job(dicom_job)
+        assert time.perf_counter() - start < 1
+    finally:
+        release_lock.set()
+        thread.join()
+
+    dicom_job.refresh_from_db()
+    assert dicom_job.status == DicomJob.Status.SUCCESS
+
+
 @pytest.mark.django_db
 def test_check_disk_space_warns_when_over_limit(mocker: MockerFixture):
     from adit.core.factories import DicomFolderFactory
@@ -0,0 +1,310 @@
+"""Tests for the per-process pool of DIMSE associations."""
+
+import time
+
+import pytest
+from pynetdicom.events import EVT_C_STORE
+
+from adit.core.errors import DicomError, RetriableDicomError
+from adit.core.factories import DicomServerFactory
+from adit.core.utils.association_pool import AssociationKey, AssociationPool
+from adit.core.utils.dicom_dataset import QueryDataset
+from adit.core.utils.dicom_operator import DicomOperator
+from adit.core.utils.dimse_connector import DimseConnector
+from adit.core.utils.testing_helpers import DicomTestHelper, create_association_mock
+
+
+def _alive_association_mock():
+    assoc = create_association_mock()
+    assoc.is_alive.return_value = True
+    return assoc
+
+
+class TestAssociationPool:
+    def test_released_association_is_reused(self):
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        key = AssociationKey(server_id=1, service="C-FIND")
+        assoc = _alive_association_mock()
+
+        assert pool.acquire(key, lambda: assoc) is assoc
+        pool.release(key, assoc)
+        assert pool.acquire(key, _alive_association_mock) is assoc
+
+        assert pool.stats()["hits"] == 1
+        assert pool.stats()["misses"] == 1
+        assert not assoc.release.called
+
+    def test_dead_association_is_not_reused(self):
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        key = AssociationKey(server_id=1, service="C-FIND")
+        assoc = _alive_association_mock()
+
+        pool.acquire(key, lambda: assoc)
+        pool.release(key, assoc)
+        assoc.is_alive.return_value = False
+
+        new_assoc = _alive_association_mock()
+        assert pool.acquire(key, lambda: new_assoc) is new_assoc
+        assert pool.stats()["misses"] == 2
+
+    def test_idle_association_expires_after_ttl(self):
+        pool = AssociationPool(max_per_server=2, idle_ttl=0.01, acquire_timeout=1)
+        key = AssociationKey(server_id=1, service="C-FIND")
+        assoc = _alive_association_mock()
+
+        pool.acquire(key, lambda: assoc)
+        pool.release(key, assoc)
+        time.sleep(0.02)
+
+        new_assoc = _alive_association_mock()
+        assert pool.acquire(key, lambda: new_assoc) is new_assoc
+        assert assoc.release.called
+        assert pool.stats()["evictions"] == 1
+
+    def test_evict_expired_releases_idle_associations(self):
+        pool = AssociationPool(max_per_server=2, idle_ttl=0.01, acquire_timeout=1)
+        key = AssociationKey(server_id=1, service="C-FIND")
+        assoc = _alive_association_mock()
+
+        pool.acquire(key, lambda: assoc)
+        pool.release(key, assoc)
+        time.sleep(0.02)
+        pool.evict_expired()
+
+        assert assoc.release.called
+        assert pool.stats()["open"] == 0
+
+    def test_reaper_evicts_idle_associations_without_acquire(self):
+        pool = AssociationPool(max_per_server=2, idle_ttl=0.01, acquire_timeout=1)
+        key = AssociationKey(server_id=1, service="C-FIND")
+        assoc = _alive_association_mock()
+
+        pool.acquire(key, lambda: assoc)
+        pool.release(key, assoc)
+        pool.start_reaper(interval=0.01)
+        try:
+            for _ in range(100):
+                if assoc.release.called:
+                    break
+                time.sleep(0.01)
+        finally:
+            pool.stop_reaper()
+
+        assert assoc.release.called
+        assert pool.stats()["open"] == 0
+
+    def test_associations_for_other_services_are_not_reused(self):
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        find_key = AssociationKey(server_id=1, service="C-FIND")
+        get_key = AssociationKey(server_id=1, service="C-GET")
+        find_assoc = _alive_association_mock()
+
+        pool.acquire(find_key, lambda: find_assoc)
+        pool.release(find_key, find_assoc)
+
+        get_assoc = _alive_association_mock()
+        assert pool.acquire(get_key, lambda: get_assoc) is get_assoc
+
+    def test_idle_association_of_other_service_is_evicted_at_capacity(self):
+        pool = AssociationPool(max_per_server=1, idle_ttl=60, acquire_timeout=1)
+        find_key = AssociationKey(server_id=1, service="C-FIND")
+        get_key = AssociationKey(server_id=1, service="C-GET")
+        find_assoc = _alive_association_mock()
+
+        pool.acquire(find_key, lambda: find_assoc)
+        pool.release(find_key, find_assoc)
+
+        get_assoc = _alive_association_mock()
+        assert pool.acquire(get_key, lambda: get_assoc) is get_assoc
+        assert find_assoc.release.called
+        assert pool.stats()["open"] == 1
+
+    def test_acquire_times_out_when_all_associations_in_use(self):
+        pool = AssociationPool(max_per_server=1, idle_ttl=60, acquire_timeout=0.01)
+        key = AssociationKey(server_id=1, service="C-FIND")
+
+        pool.acquire(key, _alive_association_mock)
+        with pytest.raises(RetriableDicomError, match="Timed out waiting for a free association"):
+            pool.acquire(key, _alive_association_mock)
+
+        # Other servers are not affected by the limit
+        other_key = AssociationKey(server_id=2, service="C-FIND")
+        pool.acquire(other_key, _alive_association_mock)
+
+    def test_failed_association_frees_its_slot(self):
+        pool = AssociationPool(max_per_server=1, idle_ttl=60, acquire_timeout=0.01)
+        key = AssociationKey(server_id=1, service="C-FIND")
+
+        def fail():
+            raise RetriableDicomError("Could not connect")
+
+        with pytest.raises(RetriableDicomError):
+            pool.acquire(key, fail)
+
+        assert pool.stats()["open"] == 0
+        pool.acquire(key, _alive_association_mock)
+
+    def test_clear_releases_idle_associations(self):
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        key = AssociationKey(server_id=1, service="C-FIND")
+        assoc = _alive_association_mock()
+
+        pool.acquire(key, lambda: assoc)
+        pool.release(key, assoc)
+        pool.clear()
+
+        assert assoc.release.called
+        assert pool.stats()["open"] == 0
+
+
+@pytest.mark.django_db
+class TestDimseConnectorWithPool:
+    def test_consecutive_finds_share_one_association(self, mocker, settings):
+        settings.DIMSE_ASSOCIATION_POOL_ENABLED = True
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        mocker.patch("adit.core.utils.dimse_connector.get_association_pool", return_value=pool)
+
+        associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+        assoc = _alive_association_mock()
+        associate_mock.return_value = assoc
+        assoc.send_c_find.side_effect = lambda *args: (
+            DicomTestHelper.create_successful_c_find_responses([{"PatientID": "1"}])
+        )
+
+        server = DicomServerFactory.create()
+        query = QueryDataset.create(QueryRetrieveLevel="STUDY", PatientID="1")
+        for _ in range(3):
+            connector = DimseConnector(server)
+            assert len(list(connector.send_c_find(query))) == 1
+            assert connector.assoc is None
+
+        assert associate_mock.call_count == 1
+        assert not assoc.release.called
+        assert pool.stats()["hits"] == 2
+
+    def test_aborted_association_is_not_returned_to_pool(self, mocker, settings):
+        settings.DIMSE_ASSOCIATION_POOL_ENABLED = True
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        mocker.patch("adit.core.utils.dimse_connector.get_association_pool", return_value=pool)
+
+        associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+        associate_mock.side_effect = lambda *args, **kwargs: _alive_association_mock()
+
+        connector = DimseConnector(DicomServerFactory.create(), auto_close=False)
+        connector.open_connection("C-FIND")
+        connector.abort_connection()
+
+        assert pool.stats() == {"hits": 0, "misses": 1, "evictions": 0, "idle": 0, "open": 0}
+
+    def test_operators_share_pooled_association(self, mocker, settings):
+        settings.DIMSE_ASSOCIATION_POOL_ENABLED = True
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        mocker.patch("adit.core.utils.dimse_connector.get_association_pool", return_value=pool)
+
+        associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+        assoc = _alive_association_mock()
+        associate_mock.return_value = assoc
+        assoc.send_c_find.side_effect = lambda *args: (
+            DicomTestHelper.create_successful_c_find_responses(
+                [{"PatientID": "1", "StudyInstanceUID": "1.123"}]
+            )
+        )
+
+        server = DicomServerFactory.create()
+        query = QueryDataset.create(PatientID="1")
+        for _ in range(2):
+            operator = DicomOperator(server)
+            assert len(list(operator.find_studies(query))) == 1
+            operator.close()
+
+        assert associate_mock.call_count == 1
+        assert pool.stats()["idle"] == 1
+
+    def test_association_is_discarded_after_error(self, mocker, settings):
+        settings.DIMSE_ASSOCIATION_POOL_ENABLED = True
+        pool = AssociationPool(max_per_server=1, idle_ttl=60, acquire_timeout=1)
+        mocker.patch("adit.core.utils.dimse_connector.get_association_pool", return_value=pool)
+
+        associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+        failing_assoc = _alive_association_mock()
+        # A non retriable error, so that the operation is not retried with stamina
+        failing_assoc.send_c_find.side_effect = DicomError("Connection lost")
+        new_assoc = _alive_association_mock()
+        new_assoc.send_c_find.return_value = DicomTestHelper.create_successful_c_find_responses(
+            [{"PatientID": "1"}]
+        )
+        associate_mock.side_effect = [failing_assoc, new_assoc]
+
+        server = DicomServerFactory.create()
+        query = QueryDataset.create(QueryRetrieveLevel="STUDY", PatientID="1")
+        with pytest.raises(DicomError, match="Connection lost"):
+            list(DimseConnector(server).send_c_find(query))
+
+        # The broken association is aborted and its slot is free again
+        assert failing_assoc.abort.called
+        assert pool.stats() == {"hits": 0, "misses": 1, "evictions": 0, "idle": 0, "open": 0}
+
+        assert len(list(DimseConnector(server).send_c_find(query))) == 1
+        assert associate_mock.call_count == 2
+
+    def test_c_get_store_handler_is_unbound_before_reuse(self, mocker, settings):
+        settings.DIMSE_ASSOCIATION_POOL_ENABLED = True
+        pool = AssociationPool(max_per_server=2, idle_ttl=60, acquire_timeout=1)
+        mocker.patch("adit.core.utils.dimse_connector.get_association_pool", return_value=pool)
+
+        associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+        assoc = _alive_association_mock()
+        associate_mock.return_value = assoc
+        assoc.send_c_get.side_effect = lambda *args: (
+            DicomTestHelper.create_successful_c_get_response()
+        )
+
+        server = DicomServerFactory.create()
+        query = QueryDataset.create(
+            QueryRetrieveLevel="STUDY", PatientID="1", StudyInstanceUID="1.123"
+        )
+        first_handler = mocker.MagicMock()
+        second_handler = mocker.MagicMock()
+        DimseConnector(server).send_c_get(query, first_handler, [])
+        DimseConnector(server).send_c_get(query, second_handler, [])
+
+        assert associate_mock.call_count == 1
+        handler_calls = [
+            (call[0], call.args[1])
+            for call in assoc.mock_calls
+            if call[0] in ("bind", "unbind") and call.args[0] == EVT_C_STORE
+        ]
+        assert handler_calls == [
+            ("bind", first_handler),
+            ("unbind", first_handler),
+            ("bind", second_handler),
+            ("unbind", second_handler),
+        ]
+
+    def test_associations_with_other_options_are_not_shared(self, mocker, settings):
+        settings.DIMSE_ASSOCIATION_POOL_ENABLED = True
+        pool = AssociationPool(max_per_server=4, idle_ttl=60, acquire_timeout=1)
+        mocker.patch("adit.core.utils.dimse_connector.get_association_pool", return_value=pool)
+
+        associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+
+        def associate(*args, **kwargs):
+            assoc = _alive_association_mock()
+            assoc.send_c_find.return_value = DicomTestHelper.create_successful_c_find_responses(
+                [{"PatientID": "1"}]
+            )
+            return assoc
+
+        associate_mock.side_effect = associate
+
+        server = DicomServerFactory.create()
+        query = QueryDataset.create(QueryRetrieveLevel="STUDY", PatientID="1")
+        list(DimseConnector(server, dimse_timeout=60).send_c_find(query))
+        list(DimseConnector(server, dimse_timeout=30).send_c_find(query))
+        server.preferred_transfer_syntaxes = ["1.2.840.10008.1.2.4.70"]
+        list(DimseConnector(server, dimse_timeout=30).send_c_find(query))
+        list(DimseConnector(server, dimse_timeout=30).send_c_find(query))
+
+        # Only the last connector has the same timeouts and transfer syntaxes as another
+        assert associate_mock.call_count == 3
+        assert pool.stats()["hits"] == 1
@@ -15,7 +15,7 @@ from pytest_django.fixtures import Settings
 from pytest_mock import MockerFixture
 
 from adit.core.errors import DicomError
-from adit.core.factories import DicomWebServerFactory
+from adit.core.factories import DicomServerFactory, DicomWebServerFactory
 from adit.core.utils.dicom_dataset import QueryDataset, ResultDataset
 from adit.core.utils.dicom_operator import DicomOperator
 from adit.core.utils.dicom_utils import read_dataset
@@ -216,6 +216,53 @@ def test_download_series_with_c_move(settings: Settings, mocker: MockerFixture):
     assert received_ds[0] == ds
 
 
+@pytest.mark.django_db
+def test_download_series_with_c_move_fails_on_spool_dir_mismatch(
+    settings: Settings, mocker: MockerFixture, tmp_path: Path
+):
+    # The receiver sends the images by reference, but the worker has no spool directory
+    settings.FILE_TRANSMIT_HOST = "127.0.0.1"
+    settings.FILE_TRANSMIT_PORT = 17998
+    settings.RECEIVER_SPOOL_DIR = ""
+    # The error must be raised right away instead of after the download timeout
+    settings.C_MOVE_DOWNLOAD_TIMEOUT = 3600
+    associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+    association_mock = create_association_mock()
+    associate_mock.return_value = association_mock
+    association_mock.send_c_move.return_value = DicomTestHelper.create_successful_c_move_response()
+    dicom_operator = create_dicom_operator()
+    dicom_operator.server.study_root_get_support = False
+    dicom_operator.server.patient_root_get_support = False
+    path = Path(settings.BASE_PATH) / "samples" / "dicoms"
+    file_path = tmp_path / "1.dcm"
+    file_path.write_bytes(next(path.rglob("*.dcm")).read_bytes())
+    ds = read_dataset(file_path)
+    association_mock.send_c_find.return_value = DicomTestHelper.create_successful_c_find_responses(
+        [{"SOPInstanceUID": ds.SOPInstanceUID}]
+    )
+
+    def start_transmit_server():
+        transmit_server = FileTransmitServer("127.0.0.1", 17998)
+
+        async def on_subscribe(topic: str):
+            await transmit_server.publish_file(
+                topic, file_path, {"SOPInstanceUID": ds.SOPInstanceUID}, by_reference=True
+            )
+
+        transmit_server.set_subscribe_handler(on_subscribe)
+        asyncio.run(transmit_server.start(), debug=True)
+
+    threading.Thread(target=start_transmit_server, daemon=True).start()
+
+    # Make sure transmit server is started
+    sleep(0.5)
+
+    with pytest.raises(DicomError, match="must use the same spool directory"):
+        dicom_operator.fetch_series(
+            ds.PatientID, ds.StudyInstanceUID, ds.SeriesInstanceUID, lambda ds: None
+        )
+
+
 # ---------------------------------------------------------------------------
 # DICOMweb (QIDO) find paths and programmatic filtering
 # ---------------------------------------------------------------------------
@@ -514,6 +561,108 @@ def test_fetch_study_raises_when_no_method(mocker: MockerFixture):
         operator.fetch_study("1", "1.123", lambda ds: None)
 
 
+@pytest.mark.django_db
+def test_fetch_study_fetches_series_in_parallel(mocker: MockerFixture):
+    operator = create_dicom_operator()
+    operator.server.max_parallel_retrievals = 3
+    series_uids = ["1.2.3.1", "1.2.3.2", "1.2.3.3", "1.2.3.4"]
+    mocker.patch.object(
+        operator,
+        "find_series",
+        return_value=iter([_make_result(SeriesInstanceUID=uid) for uid in series_uids]),
+    )
+    fetch_series_threads: set[int] = set()
+
+    def fetch_series(self, patient_id, study_uid, series_uid, callback):
+        fetch_series_threads.add(threading.get_ident())
+        image = Dataset()
+        image.SeriesInstanceUID = series_uid
+        callback(image)
+
+    fetch_series_mock = mocker.patch.object(
+        DicomOperator, "fetch_series", autospec=True, side_effect=fetch_series
+    )
+
+    received: list[Dataset] = []
+    operator.fetch_study("1", "1.123", received.append)
+
+    assert fetch_series_mock.call_count == len(series_uids)
+    assert sorted(ds.SeriesInstanceUID for ds in received) == series_uids
+    assert threading.get_ident() not in fetch_series_threads
+
+
+@pytest.mark.django_db
+def test_fetch_study_in_parallel_is_capped_by_pool(settings: Settings, mocker: MockerFixture):
+    settings.DIMSE_ASSOCIATION_POOL_ENABLED = True
+    settings.DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER = 2
+    operator = create_dicom_operator()
+    operator.server.max_parallel_retrievals = 4
+    operator.dimse_connector.network_timeout = 300
+    series_uids = ["1.2.3.1", "1.2.3.2", "1.2.3.3", "1.2.3.4"]
+    mocker.patch.object(
+        operator,
+        "find_series",
+        return_value=iter([_make_result(SeriesInstanceUID=uid) for uid in series_uids]),
+    )
+    running = 0
+    max_running = 0
+    network_timeouts: list[int | None] = []
+    lock = threading.Lock()
+
+    def fetch_series(self, patient_id, study_uid, series_uid, callback):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+            network_timeouts.append(self.dimse_connector.network_timeout)
+        sleep(0.05)
+        with lock:
+            running -= 1
+
+    mocker.patch.object(DicomOperator, "fetch_series", autospec=True, side_effect=fetch_series)
+
+    operator.fetch_study("1", "1.123", lambda ds: None)
+
+    assert max_running == 2
+    assert network_timeouts == [300] * len(series_uids)
+
+
+@pytest.mark.django_db
+def test_fetch_study_with_c_move_is_not_parallel(mocker: MockerFixture):
+    operator = create_dicom_operator()
+    operator.server.patient_root_get_support = False
+    operator.server.study_root_get_support = False
+    operator.server.max_parallel_retrievals = 3
+    fetch_series_mock = mocker.patch.object(DicomOperator, "fetch_series", autospec=True)
+    c_move_mock = mocker.patch.object(operator, "_fetch_images_with_c_move")
+
+    operator.fetch_study("1", "1.123", lambda ds: None)
+
+    # The receiver transmits the images by study, so the whole study is moved at once
+    c_move_mock.assert_called_once()
+    fetch_series_mock.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_fetch_study_in_parallel_raises_first_error(mocker: MockerFixture):
+    operator = create_dicom_operator()
+    operator.server.max_parallel_retrievals = 2
+    mocker.patch.object(
+        operator,
+        "find_series",
+        return_value=iter([_make_result(SeriesInstanceUID=uid) for uid in ["1.1", "1.2"]]),
+    )
+
+    def fetch_series(self, patient_id, study_uid, series_uid, callback):
+        if series_uid == "1.2":
+            raise DicomError("Failed to fetch series.")
+
+    mocker.patch.object(DicomOperator, "fetch_series", autospec=True, side_effect=fetch_series)
+
+    with pytest.raises(DicomError, match="Failed to fetch series"):
+        operator.fetch_study("1", "1.123", lambda ds: None)
+
+
 @pytest.mark.django_db
 def test_fetch_series_raises_when_no_method(mocker: MockerFixture):
     operator = create_dicom_operator()
@@ -793,3 +942,119 @@ def test_abort_aborts_both_connectors(mocker: MockerFixture):
 
     dimse_abort.assert_called_once()
     web_abort.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_operations_are_bounded_per_server(settings: Settings, mocker: MockerFixture):
+    settings.DICOM_ASYNC_MAX_PER_SERVER = 2
+    operator = DicomOperator(DicomServerFactory.build())
+    other_operator = DicomOperator(DicomServerFactory.build())
+    running: dict[str, int] = {}
+    max_running: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def find_studies(self, query, limit_results=None):
+        ae_title = self.server.ae_title
+        with lock:
+            running[ae_title] = running.get(ae_title, 0) + 1
+            max_running[ae_title] = max(max_running.get(ae_title, 0), running[ae_title])
+        sleep(0.05)
+        with lock:
+            running[ae_title] -= 1
+        return iter([_make_result(StudyInstanceUID=ae_title)])
+
+    mocker.patch.object(DicomOperator, "find_studies", autospec=True, side_effect=find_studies)
+
+    results = await asyncio.gather(
+        *[operator.afind_studies(QueryDataset.create()) for _ in range(6)],
+        other_operator.afind_studies(QueryDataset.create()),
+    )
+
+    assert [len(result) for result in results] == [1] * 7
+    assert max_running[operator.server.ae_title] == 2
+    assert max_running[other_operator.server.ae_title] == 1
+
+
+@pytest.mark.asyncio
+async def test_afetch_series_yields_modified_images(mocker: MockerFixture):
+    operator = DicomOperator(DicomServerFactory.build())
+
+    def fetch_series(patient_id, study_uid, series_uid, callback):
+        for i in range(3):
+            image = Dataset()
+            image.SOPInstanceUID = f"{series_uid}.{i}"
+            callback(image)
+
+    mocker.patch.object(operator, "fetch_series", side_effect=fetch_series)
+
+    def modifier(ds: Dataset) -> None:
+        ds.PatientID = "Pseudonym"
+
+    images = [ds async for ds in operator.afetch_series("1", "1.2", "1.2.3", modifier)]
+
+    assert [ds.SOPInstanceUID for ds in images] == ["1.2.3.0", "1.2.3.1", "1.2.3.2"]
+    assert all(ds.PatientID == "Pseudonym" for ds in images)
+
+
+@pytest.mark.asyncio
+async def test_afetch_study_raises_fetch_error(mocker: MockerFixture):
+    operator = DicomOperator(DicomServerFactory.build())
+    mocker.patch.object(operator, "fetch_study", side_effect=DicomError("Fetch failed."))
+
+    with pytest.raises(DicomError, match="Fetch failed"):
+        async for _ in operator.afetch_study("1", "1.2"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_afetch_study_aborts_fetch_when_consumer_stops(mocker: MockerFixture):
+    operator = DicomOperator(DicomServerFactory.build())
+    fetched: list[str] = []
+    fetch_finished = threading.Event()
+
+    def fetch_study(patient_id, study_uid, callback):
+        try:
+            for i in range(100):
+                image = Dataset()
+                image.SOPInstanceUID = f"{study_uid}.{i}"
+                fetched.append(image.SOPInstanceUID)
+                operator._handle_fetched_image(image, callback)
+                sleep(0.001)
+        finally:
+            fetch_finished.set()
+
+    mocker.patch.object(operator, "fetch_study", side_effect=fetch_study)
+
+    images = operator.afetch_study("1", "1.2")
+    async for _ in images:
+        break
+    await images.aclose()  # type: ignore
+
+    assert await asyncio.to_thread(fetch_finished.wait, 5)
+    assert len(fetched) < 100
+
+
+@pytest.mark.asyncio
+async def test_afetch_study_waits_for_slow_consumer(mocker: MockerFixture):
+    mocker.patch("adit.core.utils.dicom_operator.AFETCH_QUEUE_SIZE", 2)
+    operator = DicomOperator(DicomServerFactory.build())
+    fetched: list[str] = []
+
+    def fetch_study(patient_id, study_uid, callback):
+        for i in range(10):
+            image = Dataset()
+            image.SOPInstanceUID = f"{study_uid}.{i}"
+            fetched.append(image.SOPInstanceUID)
+            callback(image)
+
+    mocker.patch.object(operator, "fetch_study", side_effect=fetch_study)
+
+    images = operator.afetch_study("1", "1.2")
+    first = await anext(images)
+    await asyncio.sleep(0.2)
+
+    # Besides the consumed image only the full queue and the image waiting for it
+    assert len(fetched) <= 4
+
+    rest = [ds async for ds in images]
+    assert [ds.SOPInstanceUID for ds in [first, *rest]] == [f"1.2.{i}" for i in range(10)]
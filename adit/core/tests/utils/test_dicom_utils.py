@@ -3,7 +3,9 @@ from pathlib import Path
 
 import pytest
 from django.test import override_settings
-from pydicom import Dataset
+from pydicom import Dataset, dcmread
+from pydicom.data import get_testdata_file
+from pydicom.uid import DeflatedExplicitVRLittleEndian, ExplicitVRLittleEndian, RLELossless
 
 from adit.core.utils.dicom_utils import (
     construct_download_file_path,
@@ -15,6 +17,7 @@ from adit.core.utils.dicom_utils import (
     convert_to_python_time,
     has_wildcards,
     person_name_to_dicom,
+    transcode_dataset,
 )
 
 
@@ -308,3 +311,21 @@ def test_download_path_dot_pseudonym_falls_back_to_safe_default():
 
     assert "safe_default" in str(path)
     assert path.resolve().is_relative_to(base.resolve())
+
+
+def test_transcode_uncompressed_dataset_to_lossless_transfer_syntaxes():
+    original = dcmread(get_testdata_file("CT_small.dcm"))
+    assert original.file_meta.TransferSyntaxUID == ExplicitVRLittleEndian
+
+    for transfer_syntax in (RLELossless, DeflatedExplicitVRLittleEndian):
+        ds = dcmread(get_testdata_file("CT_small.dcm"))
+        assert transcode_dataset(ds, transfer_syntax)
+        assert ds.file_meta.TransferSyntaxUID == transfer_syntax
+        assert (ds.pixel_array == original.pixel_array).all()
+
+
+def test_transcode_does_not_recompress_compressed_dataset():
+    ds = dcmread(get_testdata_file("MR_small_RLE.dcm"))
+
+    assert not transcode_dataset(ds, "1.2.840.10008.1.2.4.80")  # JPEG-LS Lossless
+    assert ds.file_meta.TransferSyntaxUID == RLELossless
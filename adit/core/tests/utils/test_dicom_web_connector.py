@@ -388,7 +388,7 @@ class TestSendWadoRs:
 
 
 class TestSendStowRs:
-    def test_stores_each_dataset(self):
+    def test_stores_datasets_with_single_request(self):
         connector = DicomWebConnector(make_server())
         fake_client = MagicMock()
         ds1 = make_dataset("1.1")
@@ -396,10 +396,8 @@ class TestSendStowRs:
         with patch_client(fake_client):
             connector.send_stow_rs([ds1, ds2])
 
-        assert fake_client.store_instances.call_count == 2
-        # Each call stores a single-element list with the right dataset.
-        stored = [call.args[0][0] for call in fake_client.store_instances.call_args_list]
-        assert stored == [ds1, ds2]
+        # The datasets in memory are stored with a single request.
+        fake_client.store_instances.assert_called_once_with([ds1, ds2])
 
     def test_modifier_applied_before_store(self):
         connector = DicomWebConnector(make_server())
@@ -7,15 +7,37 @@ from typing import cast
 from unittest.mock import MagicMock, patch
 
 import pytest
-from pydicom import Dataset
+from pydicom import Dataset, dcmread
+from pydicom.data import get_testdata_file
+from pydicom.dataset import FileMetaDataset
+from pydicom.uid import UID, RLELossless
+from pynetdicom.presentation import build_context
 from pynetdicom.status import Status
 
 from adit.core.errors import DicomError, RetriableDicomError
 from adit.core.factories import DicomMoveServerFactory, DicomServerFactory
 from adit.core.utils.dicom_dataset import QueryDataset
+from adit.core.utils.dicom_utils import write_dataset
 from adit.core.utils.dimse_connector import DimseConnector
 from adit.core.utils.testing_helpers import DicomTestHelper, create_association_mock
 
+CT_IMAGE_STORAGE = "1.2.840.10008.5.1.4.1.1.2"
+MR_IMAGE_STORAGE = "1.2.840.10008.5.1.4.1.1.4"
+
+
+def _write_image(path: Path, sop_class_uid: str, sop_instance_uid: str) -> None:
+    ds = Dataset()
+    ds.SOPClassUID = sop_class_uid
+    ds.SOPInstanceUID = sop_instance_uid
+    ds.StudyInstanceUID = "1.123"
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = UID(sop_class_uid)
+    file_meta.MediaStorageSOPInstanceUID = UID(sop_instance_uid)
+    file_meta.TransferSyntaxUID = UID("1.2.840.10008.1.2")  # Implicit VR Little Endian
+    ds.file_meta = file_meta
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_dataset(ds, path)
+
 
 def _status(code: int, **kwargs) -> Dataset:
     ds = Dataset()
@@ -480,6 +502,18 @@ class TestSendCStore:
 
         association_mock.send_c_store.assert_called_once()
 
+    def test_store_without_accepted_context_is_not_retried(self, mocker):
+        connector, association_mock = self._connector_with_assoc(mocker)
+        association_mock.send_c_store.side_effect = ValueError("No presentation context")
+        ds = Dataset()
+        ds.SOPInstanceUID = "1.2.3"
+        ds.StudyInstanceUID = "1.123"
+
+        with pytest.raises(DicomError, match="does not accept this image"):
+            connector.send_c_store([ds])
+
+        association_mock.send_c_store.assert_called_once()
+
     def test_store_unsupported_server_raises(self, mocker):
         server = DicomServerFactory.create()
         server.store_scp_support = False
@@ -500,6 +534,70 @@ class TestSendCStore:
             connector.send_c_store(Path(tmp_dir))
         association_mock.send_c_store.assert_not_called()
 
+    def test_store_folder_groups_files_and_logs_throughput(self, mocker, tmp_path):
+        connector, association_mock = self._connector_with_assoc(mocker)
+        _write_image(tmp_path / "a.dcm", MR_IMAGE_STORAGE, "1.2.3.1")
+        _write_image(tmp_path / "b.dcm", CT_IMAGE_STORAGE, "1.2.3.2")
+        _write_image(tmp_path / "sub" / "c.dcm", MR_IMAGE_STORAGE, "1.2.3.3")
+
+        connector.send_c_store(tmp_path)
+
+        stored = [call.args[0] for call in association_mock.send_c_store.call_args_list]
+        assert [ds.SOPClassUID for ds in stored] == [
+            CT_IMAGE_STORAGE,
+            MR_IMAGE_STORAGE,
+            MR_IMAGE_STORAGE,
+        ]
+        assert connector.logs[-1]["level"] == "Info"
+        assert "Uploaded 3 images" in connector.logs[-1]["message"]
+
+    def test_store_folder_over_multiple_associations(self, mocker, tmp_path):
+        server = DicomServerFactory.create(max_parallel_uploads=2)
+        connector = DimseConnector(server, auto_connect=True)
+        associations = []
+
+        def create_association(*_args, **_kwargs):
+            association_mock = create_association_mock()
+            association_mock.is_alive.return_value = True
+            association_mock.send_c_store.return_value = _status(Status.SUCCESS)
+            associations.append(association_mock)
+            return association_mock
+
+        mocker.patch("adit.core.utils.dimse_connector.AE.associate", side_effect=create_association)
+        for i in range(4):
+            _write_image(tmp_path / f"{i}.dcm", CT_IMAGE_STORAGE, f"1.2.3.{i}")
+
+        connector.send_c_store(tmp_path)
+
+        assert len(associations) == 2
+        assert [assoc.send_c_store.call_count for assoc in associations] == [2, 2]
+        assert all(assoc.release.called for assoc in associations)
+        assert "over 2 associations" in connector.logs[-1]["message"]
+
+    def test_store_folder_failure_on_other_association_is_raised(self, mocker, tmp_path):
+        server = DicomServerFactory.create(max_parallel_uploads=2)
+        connector = DimseConnector(server, auto_connect=True)
+        associations = []
+
+        def create_association(*_args, **_kwargs):
+            association_mock = create_association_mock()
+            association_mock.is_alive.return_value = True
+            association_mock.send_c_store.return_value = _status(Status.SUCCESS)
+            if associations:
+                # The helper association (created second) can't send the images
+                association_mock.send_c_store.side_effect = ValueError("No presentation context")
+            associations.append(association_mock)
+            return association_mock
+
+        mocker.patch("adit.core.utils.dimse_connector.AE.associate", side_effect=create_association)
+        for i in range(4):
+            _write_image(tmp_path / f"{i}.dcm", CT_IMAGE_STORAGE, f"1.2.3.{i}")
+
+        with pytest.raises(ValueError, match="No presentation context"):
+            connector.send_c_store(tmp_path)
+
+        assert associations[1].abort.called
+
 
 @pytest.mark.django_db
 class TestOpenCloseConnection:
@@ -553,3 +651,89 @@ class TestOpenCloseConnection:
         assoc.release.assert_called_once()
         assert connector.assoc is None
         assert connector._current_service is None
+
+
+@pytest.mark.django_db
+class TestNegotiationCache:
+    def _open_and_close(self, mocker, server, assoc) -> list:
+        ae_mock = mocker.patch("adit.core.utils.dimse_connector.AE")
+        ae_mock.return_value.associate.return_value = assoc
+        connector = DimseConnector(server, auto_connect=False)
+        connector.open_connection("C-STORE")
+        connector.close_connection()
+        return ae_mock.return_value.requested_contexts
+
+    def test_rejected_contexts_are_not_proposed_again(self, mocker, settings):
+        settings.DIMSE_NEGOTIATION_CACHE_TTL = 60
+        server = DicomServerFactory.create()
+        jpeg_lossless = "1.2.840.10008.1.2.4.70"
+
+        assoc = create_association_mock()
+        assoc.accepted_contexts = [build_context(CT_IMAGE_STORAGE, jpeg_lossless)]
+        assoc.rejected_contexts = [build_context(MR_IMAGE_STORAGE)]
+        full_contexts = self._open_and_close(mocker, server, assoc)
+
+        server.refresh_from_db()
+        assert server.negotiated_contexts["C-STORE"]["accepted"] == {
+            CT_IMAGE_STORAGE: jpeg_lossless
+        }
+        assert server.negotiated_contexts["C-STORE"]["rejected"] == [MR_IMAGE_STORAGE]
+
+        assoc = create_association_mock()
+        assoc.accepted_contexts = [build_context(CT_IMAGE_STORAGE, jpeg_lossless)]
+        assoc.rejected_contexts = []
+        slimmed_contexts = self._open_and_close(mocker, server, assoc)
+
+        proposed = {cx.abstract_syntax: cx.transfer_syntax for cx in slimmed_contexts}
+        assert len(slimmed_contexts) == len(full_contexts) - 1
+        assert MR_IMAGE_STORAGE not in proposed
+        assert proposed[CT_IMAGE_STORAGE][0] == jpeg_lossless
+
+    def test_expired_negotiation_proposes_all_contexts(self, mocker, settings):
+        settings.DIMSE_NEGOTIATION_CACHE_TTL = 60
+        server = DicomServerFactory.create(
+            negotiated_contexts={
+                "C-STORE": {
+                    "negotiated_at": "2020-01-01T00:00:00+00:00",
+                    "accepted": {},
+                    "rejected": [MR_IMAGE_STORAGE],
+                }
+            }
+        )
+
+        contexts = self._open_and_close(mocker, server, create_association_mock())
+
+        assert MR_IMAGE_STORAGE in {cx.abstract_syntax for cx in contexts}
+
+
+@pytest.mark.django_db
+class TestTransferSyntaxPreference:
+    def test_preferred_transfer_syntaxes_are_proposed_first(self, mocker):
+        server = DicomServerFactory.create(preferred_transfer_syntaxes=[RLELossless])
+        ae_mock = mocker.patch("adit.core.utils.dimse_connector.AE")
+        ae_mock.return_value.associate.return_value = create_association_mock()
+
+        connector = DimseConnector(server, auto_connect=False)
+        connector.open_connection("C-STORE")
+
+        requested_contexts = ae_mock.return_value.requested_contexts
+        contexts = {cx.abstract_syntax: cx.transfer_syntax for cx in requested_contexts}
+        assert contexts[CT_IMAGE_STORAGE][0] == RLELossless
+        # Not offered for non-image SOP classes
+        assert RLELossless not in contexts["1.2.840.10008.5.1.4.1.1.88.11"]  # Basic Text SR
+
+    def test_store_transcodes_to_accepted_transfer_syntax(self, mocker):
+        server = DicomServerFactory.create()
+        connector = DimseConnector(server, auto_connect=True)
+        associate_mock = mocker.patch("adit.core.utils.dimse_connector.AE.associate")
+        association_mock = create_association_mock()
+        association_mock.is_alive.return_value = True
+        association_mock.accepted_contexts = [build_context(CT_IMAGE_STORAGE, RLELossless)]
+        association_mock.send_c_store.return_value = _status(Status.SUCCESS)
+        associate_mock.return_value = association_mock
+
+        ds = dcmread(get_testdata_file("CT_small.dcm"))
+        connector.send_c_store([ds])
+
+        stored = association_mock.send_c_store.call_args.args[0]
+        assert stored.file_meta.TransferSyntaxUID == RLELossless
@@ -6,7 +6,13 @@ from aiofiles import os
 from django.conf import settings
 
 from adit.core.utils.dicom_utils import read_dataset
-from adit.core.utils.file_transmit import FileTransmitClient, FileTransmitServer, Metadata
+from adit.core.utils.file_transmit import (
+    FileTransmitClient,
+    FileTransmitError,
+    FileTransmitServer,
+    FileTransmitSession,
+    Metadata,
+)
 
 HOST = "127.0.0.1"
 PORT = 9999
@@ -59,3 +65,168 @@ async def test_start_transmit_file():
     await asyncio.gather(client_task, server_task)
 
     assert counter == NUM_TRANSFER_FILES
+
+
+@pytest.mark.asyncio
+async def test_transmit_file_by_reference(tmp_path: Path):
+    samples_path = Path(f"{settings.BASE_PATH}/samples/dicoms")
+    sample_files = list(samples_path.rglob("*.dcm"))[:NUM_TRANSFER_FILES]
+
+    spool_files: list[Path] = []
+    for i, sample_file in enumerate(sample_files):
+        spool_file = tmp_path / f"{i}.dcm"
+        spool_file.write_bytes(sample_file.read_bytes())
+        spool_files.append(spool_file)
+
+    server = FileTransmitServer(HOST, PORT)
+
+    async def subscribe_handler(topic: str):
+        for file in spool_files:
+            await server.publish_file("foobar", file, {"filename": file.name}, by_reference=True)
+
+    async def unsubscribe_handler(topic: str):
+        await server.stop()
+
+    server.set_subscribe_handler(subscribe_handler)
+    server.set_unsubscribe_handler(unsubscribe_handler)
+    server_task = asyncio.create_task(server.start())
+
+    # Make sure transmit server is started
+    await asyncio.sleep(0.5)
+
+    client = FileTransmitClient(HOST, PORT, spool_dir=tmp_path)
+
+    counter = 0
+
+    async def file_received_handler(filename: str, metadata: Metadata):
+        nonlocal counter
+
+        # The client gets its own hard link to the file in the spool directory
+        assert Path(filename).parent == tmp_path
+        assert Path(filename) != spool_files[counter]
+        assert metadata == {"filename": spool_files[counter].name}
+        assert (
+            read_dataset(filename).SOPInstanceUID
+            == read_dataset(sample_files[counter]).SOPInstanceUID
+        )
+        await os.remove(filename)
+
+        counter += 1
+        return counter == NUM_TRANSFER_FILES
+
+    client_task = asyncio.create_task(client.subscribe("foobar", file_received_handler))
+
+    await asyncio.gather(client_task, server_task)
+
+    assert counter == NUM_TRANSFER_FILES
+    assert sorted(tmp_path.iterdir()) == sorted(spool_files)
+
+
+@pytest.mark.asyncio
+async def test_file_reference_outside_of_spool_dir_raises(tmp_path: Path):
+    samples_path = Path(f"{settings.BASE_PATH}/samples/dicoms")
+    sample_file = next(samples_path.rglob("*.dcm"))
+
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    outside_dir = tmp_path / "outside"
+    outside_dir.mkdir()
+    outside_file = outside_dir / "1.dcm"
+    outside_file.write_bytes(sample_file.read_bytes())
+
+    server = FileTransmitServer(HOST, PORT)
+
+    async def subscribe_handler(topic: str):
+        await server.publish_file(
+            "foobar", outside_file, {"filename": "outside"}, by_reference=True
+        )
+        await server.publish_file("foobar", sample_file, {"filename": "inside"})
+
+    async def unsubscribe_handler(topic: str):
+        await server.stop()
+
+    server.set_subscribe_handler(subscribe_handler)
+    server.set_unsubscribe_handler(unsubscribe_handler)
+    server_task = asyncio.create_task(server.start())
+
+    # Make sure transmit server is started
+    await asyncio.sleep(0.5)
+
+    client = FileTransmitClient(HOST, PORT, spool_dir=spool_dir)
+
+    received: list[str] = []
+
+    async def file_received_handler(filename: str, metadata: Metadata):
+        received.append(metadata["filename"])
+        await os.remove(filename)
+
+    with pytest.raises(FileTransmitError, match="outside of the spool directory"):
+        await client.subscribe("foobar", file_received_handler)
+
+    await server_task
+
+    # The reference is neither passed to the handler nor deleted by the client
+    assert received == []
+    assert len(list(outside_dir.iterdir())) == 2
+
+
+@pytest.mark.asyncio
+async def test_publish_file_fans_out_to_all_subscribers():
+    samples_path = Path(f"{settings.BASE_PATH}/samples/dicoms")
+    sample_files = list(samples_path.rglob("*.dcm"))[:NUM_TRANSFER_FILES]
+
+    server = FileTransmitServer(HOST, PORT, session_queue_size=2)
+    server_task = asyncio.create_task(server.start())
+
+    # Make sure transmit server is started
+    await asyncio.sleep(0.5)
+
+    received: dict[int, list[str]] = {0: [], 1: []}
+
+    def create_handler(client_number: int):
+        async def file_received_handler(filename: str, metadata: Metadata):
+            received[client_number].append(metadata["filename"])
+            await os.remove(filename)
+            return len(received[client_number]) == NUM_TRANSFER_FILES
+
+        return file_received_handler
+
+    client_tasks = [
+        asyncio.create_task(FileTransmitClient(HOST, PORT).subscribe("foobar", create_handler(i)))
+        for i in range(2)
+    ]
+
+    while server.get_metrics().get("foobar", {}).get("sessions") != 2:
+        await asyncio.sleep(0.1)
+
+    for file in sample_files:
+        await server.publish_file("foobar", file, {"filename": file.name})
+
+    await asyncio.gather(*client_tasks)
+
+    expected = [file.name for file in sample_files]
+    assert received == {0: expected, 1: expected}
+
+    await server.stop()
+    await server_task
+    assert server.get_metrics() == {}
+
+
+@pytest.mark.asyncio
+async def test_closed_session_discards_files_of_waiting_publishers(tmp_path: Path):
+    spool_file = tmp_path / "1.dcm"
+    spool_file.write_bytes(b"foobar")
+
+    session = FileTransmitSession("foobar", asyncio.StreamReader(), None, queue_size=1)  # type: ignore
+    await session.send_file_reference(spool_file)
+
+    # The queue is full, so the second publisher waits for a free slot
+    waiting_publisher = asyncio.create_task(session.send_file_reference(spool_file))
+    await asyncio.sleep(0.1)
+    assert not waiting_publisher.done()
+
+    session.close()
+    await waiting_publisher
+
+    assert session.queue_depth == 0
+    assert list(tmp_path.iterdir()) == [spool_file]
@@ -0,0 +1,72 @@
+import threading
+from time import sleep
+
+from pydicom import Dataset
+from pytest_django.fixtures import Settings
+from pytest_mock import MockerFixture
+
+from adit.core.utils.dicom_dataset import QueryDataset, ResultDataset
+from adit.core.utils.dicom_operator import DicomOperator
+from adit.core.utils.parallel_queries import merge_results, run_queries
+
+
+def _make_result(study_uid: str) -> ResultDataset:
+    ds = Dataset()
+    ds.StudyInstanceUID = study_uid
+    return ResultDataset(ds)
+
+
+def test_run_queries_concurrently_in_order_of_queries(settings: Settings, mocker: MockerFixture):
+    settings.DIMSE_ASSOCIATION_POOL_ENABLED = False
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_parallel_queries=2)
+    operator.logs = []
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def find_studies(query):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        sleep(0.02)
+        with lock:
+            running -= 1
+        return iter([_make_result(query.PatientID)])
+
+    thread_operator_class = mocker.patch("adit.core.utils.parallel_queries.DicomOperator")
+    thread_operator_class.return_value.find_studies.side_effect = find_studies
+    thread_operator_class.return_value.get_logs.return_value = []
+
+    queries = [QueryDataset.create(PatientID=str(i)) for i in range(6)]
+    results = run_queries(operator, "find_studies", queries)
+
+    assert [[r.StudyInstanceUID for r in result] for result in results] == [
+        [str(i)] for i in range(6)
+    ]
+    assert max_running == 2
+    operator.find_studies.assert_not_called()
+    # Each worker thread has its own operator, which is closed afterwards
+    thread_operator_class.assert_called_with(operator.server, persistent=True)
+    assert thread_operator_class.return_value.close.call_count == thread_operator_class.call_count
+
+
+def test_run_queries_with_operator_when_not_parallel(mocker: MockerFixture):
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_parallel_queries=1)
+    operator.find_series.side_effect = lambda query: iter([_make_result(query.PatientID)])
+
+    results = run_queries(operator, "find_series", [QueryDataset.create(PatientID="1")])
+
+    assert [[r.StudyInstanceUID for r in result] for result in results] == [["1"]]
+    operator.find_series.assert_called_once()
+
+
+def test_merge_results_without_duplicates():
+    merged = merge_results(
+        [[_make_result("1.1"), _make_result("1.2")], [_make_result("1.2"), _make_result("1.3")]],
+        "StudyInstanceUID",
+    )
+
+    assert [r.StudyInstanceUID for r in merged] == ["1.1", "1.2", "1.3"]
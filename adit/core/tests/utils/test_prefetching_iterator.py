@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from adit.core.utils.prefetching_iterator import PrefetchingIterator
+
+
+def test_yields_all_items_in_order():
+    with PrefetchingIterator(range(100), max_prefetched=3) as items:
+        assert list(items) == list(range(100))
+
+
+def test_reraises_error_of_iterable():
+    def produce():
+        yield 1
+        raise ValueError("Discovery failed")
+
+    with PrefetchingIterator(produce(), max_prefetched=3) as items:
+        iterator = iter(items)
+        assert next(iterator) == 1
+        with pytest.raises(ValueError, match="Discovery failed"):
+            next(iterator)
+
+
+def test_producer_runs_ahead_only_up_to_max_prefetched():
+    produced: list[int] = []
+    blocked = threading.Event()
+
+    def produce():
+        for i in range(100):
+            produced.append(i)
+            if i == 4:
+                blocked.set()
+            yield i
+
+    with PrefetchingIterator(produce(), max_prefetched=3) as items:
+        iterator = iter(items)
+        assert next(iterator) == 0
+        assert blocked.wait(timeout=5)
+        time.sleep(0.2)
+        # Besides the consumed and the queued items the producer only holds the one
+        # it waits to queue
+        assert len(produced) == 5
+
+
+def test_leaving_early_stops_producer():
+    closed = threading.Event()
+    producer_threads: list[threading.Thread] = []
+
+    def produce():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            producer_threads.append(threading.current_thread())
+            closed.set()
+
+    with pytest.raises(RuntimeError):
+        with PrefetchingIterator(produce(), max_prefetched=3) as items:
+            for i in items:
+                if i == 10:
+                    raise RuntimeError("Transfer failed")
+
+    assert closed.is_set()
+    assert producer_threads[0] is not threading.current_thread()
@@ -0,0 +1,115 @@
+import pytest
+from django.core.cache import caches
+from pydicom import Dataset
+from pytest_django.fixtures import Settings
+from pytest_mock import MockerFixture
+
+from adit.core.factories import DicomServerFactory
+from adit.core.utils.dicom_dataset import QueryDataset, ResultDataset
+from adit.core.utils.dicom_operator import DicomOperator
+from adit.core.utils.query_cache import get_query_stats, reset_query_stats
+
+
+@pytest.fixture(autouse=True)
+def query_cache(settings: Settings):
+    settings.DICOM_QUERY_CACHE_ENABLED = True
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.DICOM_QUERY_CACHE_ALIAS: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test_dicom_query_cache",
+        },
+    }
+    caches[settings.DICOM_QUERY_CACHE_ALIAS].clear()
+    reset_query_stats()
+    yield
+    reset_query_stats()
+
+
+def _create_operator(mocker: MockerFixture, query_cache: bool = True):
+    server = DicomServerFactory.create()
+    operator = DicomOperator(server, query_cache=query_cache)
+
+    def send_c_find(query, limit_results=None):
+        ds = Dataset()
+        ds.PatientID = "1001"
+        ds.StudyInstanceUID = f"1.2.{send_c_find_mock.call_count}"
+        yield ResultDataset(ds)
+        yield ResultDataset(ds)
+
+    send_c_find_mock = mocker.patch.object(
+        operator.dimse_connector, "send_c_find", side_effect=send_c_find
+    )
+    return operator, send_c_find_mock
+
+
+@pytest.mark.django_db
+def test_identical_queries_are_cached(mocker: MockerFixture):
+    operator, send_c_find_mock = _create_operator(mocker)
+
+    first = list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+    second = list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+
+    assert send_c_find_mock.call_count == 1
+    assert [r.StudyInstanceUID for r in second] == [r.StudyInstanceUID for r in first]
+    assert get_query_stats() == {"STUDY": (1, 1)}
+
+
+@pytest.mark.django_db
+def test_different_queries_are_not_mixed_up(mocker: MockerFixture):
+    operator, send_c_find_mock = _create_operator(mocker)
+
+    list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+    list(operator.find_studies(QueryDataset.create(PatientID="1001"), limit_results=1))
+    list(operator.find_studies(QueryDataset.create(PatientID="1002")))
+    list(operator.find_series(QueryDataset.create(PatientID="1001", StudyInstanceUID="1.2")))
+
+    assert send_c_find_mock.call_count == 4
+
+
+@pytest.mark.django_db
+def test_upload_invalidates_cached_queries_of_server(mocker: MockerFixture):
+    operator, send_c_find_mock = _create_operator(mocker)
+    mocker.patch.object(operator.dimse_connector, "send_c_store")
+
+    list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+    operator.upload_images([Dataset()])
+    results = list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+
+    assert send_c_find_mock.call_count == 2
+    assert results[0].StudyInstanceUID == "1.2.2"
+
+
+@pytest.mark.django_db
+def test_partially_consumed_queries_are_not_cached(mocker: MockerFixture):
+    operator, send_c_find_mock = _create_operator(mocker)
+
+    next(operator.find_studies(QueryDataset.create(PatientID="1001")))
+    list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+
+    assert send_c_find_mock.call_count == 2
+
+
+@pytest.mark.django_db
+def test_queries_are_not_cached_without_opt_in(mocker: MockerFixture):
+    operator, send_c_find_mock = _create_operator(mocker, query_cache=False)
+
+    list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+    list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+
+    assert send_c_find_mock.call_count == 2
+    assert get_query_stats() == {}
+
+
+@pytest.mark.django_db
+def test_generation_is_fetched_once_per_operator(mocker: MockerFixture):
+    operator, _ = _create_operator(mocker)
+    get_generation_mock = mocker.patch(
+        "adit.core.utils.dicom_operator.get_generation", return_value=1
+    )
+
+    list(operator.find_studies(QueryDataset.create(PatientID="1001")))
+    list(operator.find_studies(QueryDataset.create(PatientID="1002")))
+    list(operator.find_series(QueryDataset.create(PatientID="1001", StudyInstanceUID="1.2")))
+
+    get_generation_mock.assert_called_once_with(operator.server)
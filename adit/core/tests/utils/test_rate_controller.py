@@ -0,0 +1,103 @@
+import pytest
+from django.core.cache import caches
+from pytest_django.fixtures import Settings
+from pytest_mock import MockerFixture
+
+from adit.core.factories import DicomServerFactory
+from adit.core.utils.rate_controller import RateController
+
+
+@pytest.fixture(autouse=True)
+def pacing(settings: Settings):
+    settings.DICOM_PACING_ENABLED = True
+    settings.DICOM_PACING_INITIAL_DELAY = 0.5
+    settings.DICOM_PACING_DECREASE_STEP = 0.1
+    settings.DICOM_PACING_BACKOFF_FACTOR = 2
+    settings.DICOM_PACING_MIN_BACKOFF = 1
+    settings.DICOM_PACING_MAX_DELAY = 5
+    settings.DICOM_PACING_LATENCY_TOLERANCE = 3
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.DICOM_PACING_CACHE_ALIAS: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test_dicom_pacing",
+        },
+    }
+    caches[settings.DICOM_PACING_CACHE_ALIAS].clear()
+
+
+@pytest.mark.django_db
+def test_healthy_server_is_no_longer_paced():
+    controller = RateController(DicomServerFactory.create())
+    assert controller.get_state().delay == 0.5
+
+    for _ in range(4):
+        controller.record_latency(0.01)
+    assert controller.get_state().delay == pytest.approx(0.1)
+
+    for _ in range(4):
+        controller.record_latency(0.01)
+    assert controller.get_state().delay == 0
+
+
+@pytest.mark.django_db
+def test_congestion_backs_off_multiplicatively_up_to_max_delay():
+    controller = RateController(DicomServerFactory.create())
+
+    controller.record_congestion()
+    assert controller.get_state().delay == 1
+    controller.record_congestion()
+    assert controller.get_state().delay == 2
+    controller.record_congestion()
+    controller.record_congestion()
+    assert controller.get_state().delay == 5
+
+
+@pytest.mark.django_db
+def test_latency_far_above_the_usual_one_backs_off():
+    controller = RateController(DicomServerFactory.create())
+    controller.record_latency(0.01)
+    controller.record_latency(0.01)
+    assert controller.get_state().delay == pytest.approx(0.3)
+
+    controller.record_latency(0.02)
+    assert controller.get_state().delay == pytest.approx(0.2)
+
+    controller.record_latency(0.5)
+    assert controller.get_state().delay == 1
+
+
+@pytest.mark.django_db
+def test_pacing_is_shared_per_server():
+    server = DicomServerFactory.create()
+    other_server = DicomServerFactory.create()
+
+    RateController(server).record_congestion()
+
+    assert RateController(server).get_state().delay == 1
+    assert RateController(other_server).get_state().delay == 0.5
+
+
+@pytest.mark.django_db
+def test_wait_sleeps_the_delay(mocker: MockerFixture):
+    sleep_mock = mocker.patch("adit.core.utils.rate_controller.time.sleep")
+    controller = RateController(DicomServerFactory.create())
+
+    controller.wait()
+    sleep_mock.assert_called_once_with(0.5)
+
+    sleep_mock.reset_mock()
+    for _ in range(6):
+        controller.record_latency(0.01)
+    controller.wait()
+    sleep_mock.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_disabled_pacing_has_no_delay(settings: Settings):
+    settings.DICOM_PACING_ENABLED = False
+    controller = RateController(DicomServerFactory.create())
+
+    controller.record_congestion()
+
+    assert controller.get_state().delay == 0
@@ -0,0 +1,63 @@
+from adit.core.utils.received_images_tracker import ReceivedImagesTracker
+
+
+def test_tracks_received_images():
+    tracker = ReceivedImagesTracker(["1", "2", "3"])
+
+    assert tracker.mark_received("2", size=100)
+    assert tracker.mark_received("1", size=50)
+
+    assert not tracker.complete
+    assert tracker.missing == {"3"}
+    assert tracker.received_count == 2
+    assert tracker.total_bytes == 150
+    received = tracker.get_received("2")
+    assert received and received.size == 100
+
+    assert tracker.mark_received("3")
+    assert tracker.complete
+    assert tracker.missing == set()
+
+
+def test_duplicate_and_unexpected_images_are_counted_but_not_handled():
+    tracker = ReceivedImagesTracker(["1", "2"])
+
+    assert tracker.mark_received("1", size=10)
+    assert not tracker.mark_received("1", size=10)
+    assert not tracker.mark_received("99", size=10)
+
+    progress = tracker.progress()
+    assert progress.expected == 2
+    assert progress.received == 1
+    assert progress.duplicates == 1
+    assert progress.unexpected == 1
+    assert progress.total_bytes == 10
+    assert tracker.missing == {"2"}
+
+
+class _ComparedUid(str):
+    """An image UID that counts how often it is compared with other UIDs."""
+
+    comparisons = 0
+
+    def __eq__(self, other: object) -> bool:
+        _ComparedUid.comparisons += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+def test_tracking_50k_images_needs_constant_comparisons_per_image():
+    # Very large series (e.g. breast tomosynthesis) need O(1) bookkeeping per image.
+    # A list based bookkeeping would compare each received UID with O(n) others.
+    image_uids = [_ComparedUid(f"1.2.840.99999.{i}") for i in range(50_000)]
+    tracker = ReceivedImagesTracker(image_uids)
+
+    _ComparedUid.comparisons = 0
+    for image_uid in reversed(image_uids):
+        # An equal but not identical UID, as received from the receiver
+        tracker.mark_received(_ComparedUid(str(image_uid)), size=512 * 1024)
+
+    assert tracker.complete
+    assert tracker.progress().total_bytes == 50_000 * 512 * 1024
+    assert _ComparedUid.comparisons <= 5 * len(image_uids)
@@ -35,8 +35,10 @@ from unittest.mock import MagicMock
 import pytest
 from pydicom import Dataset
 from pydicom.dataset import FileMetaDataset
+from pynetdicom.presentation import AllStoragePresentationContexts
 
 from adit.core.utils import store_scp as store_scp_module
+from adit.core.utils.presentation_contexts import StorageScpPresentationContexts
 from adit.core.utils.store_scp import StoreScp
 
 
@@ -257,6 +259,17 @@ def test_handle_store_write_failure_does_not_call_handler(store_scp, monkeypatch
 # ---------------------------------------------------------------------------
 
 
+def test_supported_contexts_accept_compressed_images():
+    """The PACS must not have to decompress images it sends us with C-MOVE."""
+    ct_image_storage = "1.2.840.10008.5.1.4.1.1.2"
+    contexts = {cx.abstract_syntax: cx.transfer_syntax for cx in StorageScpPresentationContexts}
+
+    assert "1.2.840.10008.1.2.4.70" in contexts[ct_image_storage]  # JPEG Lossless SV1
+    assert "1.2.840.10008.1.2" in contexts[ct_image_storage]  # Implicit VR Little Endian
+    # Still all storage SOP classes known to pynetdicom are supported
+    assert {cx.abstract_syntax for cx in AllStoragePresentationContexts} <= contexts.keys()
+
+
 def test_start_rejects_nonexistent_folder():
     scp = StoreScp(
         folder=Path("/this/folder/definitely/does/not/exist"),
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+from pydicom import Dataset
+from pydicom.dataset import FileMetaDataset
+from pydicom.uid import ImplicitVRLittleEndian
+
+from adit.core.errors import DicomError
+from adit.core.utils.streaming_uploader import StreamingUploader, UploadCancelled
+
+
+def _create_image(sop_instance_uid: str) -> Dataset:
+    ds = Dataset()
+    ds.SOPInstanceUID = sop_instance_uid
+    ds.SOPClassUID = "1.2.840.10008.5.1.4.1.1.2"  # CT Image Storage
+    ds.PatientID = "1001"
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ImplicitVRLittleEndian
+    return ds
+
+
+def test_spills_images_to_disk_when_upload_is_slow(mocker):
+    upload_started = threading.Event()
+    continue_upload = threading.Event()
+    uploaded: list[str] = []
+
+    def upload_images(images, invalidate_cache=True):
+        upload_started.set()
+        continue_upload.wait(timeout=5)
+        uploaded.extend(ds.SOPInstanceUID for ds in images)
+
+    operator = mocker.MagicMock()
+    operator.upload_images.side_effect = upload_images
+
+    with StreamingUploader(operator, max_queued_images=2) as uploader:
+        uploader.put(_create_image("1.1"))
+        upload_started.wait(timeout=5)
+        for i in range(2, 6):
+            uploader.put(_create_image(f"1.{i}"))
+        continue_upload.set()
+
+    assert uploaded == ["1.1", "1.2", "1.3", "1.4", "1.5"]
+    assert uploader.uploaded_images == 5
+    assert uploader.spilled_images == 3
+    # The images queued during the first upload are uploaded in batches
+    assert [len(call.args[0]) for call in operator.upload_images.call_args_list] == [1, 2, 2]
+
+
+def test_invalidates_cache_and_closes_association_once(mocker):
+    invalidate_server = mocker.patch("adit.core.utils.streaming_uploader.invalidate_server")
+    operator = mocker.MagicMock()
+
+    with StreamingUploader(operator, max_queued_images=10) as uploader:
+        for i in range(1, 4):
+            uploader.put(_create_image(f"1.{i}"))
+
+    assert uploader.uploaded_images == 3
+    assert all(
+        call.kwargs == {"invalidate_cache": False} for call in operator.upload_images.call_args_list
+    )
+    invalidate_server.assert_called_once_with(operator.server)
+    operator.close.assert_called_once()
+
+
+def test_upload_error_stops_fetch_and_is_reraised(mocker):
+    upload_failed = threading.Event()
+
+    def upload_images(images, invalidate_cache=True):
+        upload_failed.set()
+        raise DicomError("C-STORE rejected")
+
+    operator = mocker.MagicMock()
+    operator.upload_images.side_effect = upload_images
+
+    with pytest.raises(DicomError, match="C-STORE rejected"):
+        with StreamingUploader(operator, max_queued_images=2) as uploader:
+            uploader.put(_create_image("1.1"))
+            upload_failed.wait(timeout=5)
+            while uploader._error is None:
+                time.sleep(0.01)
+            with pytest.raises(UploadCancelled):
+                uploader.put(_create_image("1.2"))
+            raise UploadCancelled()
+
+    assert operator.upload_images.call_count == 1
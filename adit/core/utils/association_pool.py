@@ -0,0 +1,286 @@
+"""A per-process pool of established DIMSE associations.
+
+Negotiating an association (up to 128 presentation contexts for C-GET) is expensive
+and some PACS servers get overwhelmed by rapid-fire association requests. Instead of
+releasing an association after each DIMSE operation the DimseConnector hands it back to
+this pool, so that the next operation with the same server, service and association
+options can reuse it.
+
+Idle associations are health checked with `is_alive()` before they are handed out and
+evicted after `DIMSE_ASSOCIATION_POOL_IDLE_TTL` seconds (the PACS or the pynetdicom
+network timeout might close them anyway). A reaper thread evicts them even when no
+further associations are acquired, e.g. in long-lived web processes. The number of open
+associations (idle and in use) per server is capped by
+`DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER`.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from pynetdicom.association import Association
+
+from ..errors import RetriableDicomError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AssociationKey:
+    """Identifies associations that are interchangeable with each other.
+
+    Associations are only reused for the same server, the same DIMSE service (which
+    determines the proposed presentation contexts) and the same association options
+    (timeouts, transfer syntaxes, ...).
+    """
+
+    server_id: int
+    service: str
+    options: tuple = ()
+
+
+@dataclass
+class _IdleAssociation:
+    assoc: Association
+    idle_since: float = field(default_factory=time.monotonic)
+
+
+class AssociationPool:
+    def __init__(self, max_per_server: int, idle_ttl: float, acquire_timeout: float) -> None:
+        self.max_per_server = max_per_server
+        self.idle_ttl = idle_ttl
+        self.acquire_timeout = acquire_timeout
+
+        self._lock = threading.Condition()
+        self._idle: dict[AssociationKey, list[_IdleAssociation]] = {}
+        self._open_counts: dict[int, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._reaper: threading.Thread | None = None
+        self._reaper_stopped = threading.Event()
+
+    def acquire(self, key: AssociationKey, create: Callable[[], Association]) -> Association:
+        """Get an idle association for the key or establish a new one with `create`.
+
+        Blocks when the maximum number of open associations for the server is reached
+        until another association is released, discarded or evicted.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        stale: list[Association] = []
+
+        try:
+            with self._lock:
+                while True:
+                    stale.extend(self._evict_expired())
+
+                    assoc = self._pop_idle(key)
+                    if assoc:
+                        self.hits += 1
+                        logger.debug("Reusing pooled association for %s.", key)
+                        return assoc
+
+                    if self._open_counts.get(key.server_id, 0) < self.max_per_server:
+                        break
+
+                    # Make room by closing an idle association of this server that was
+                    # negotiated for a different service or with different options.
+                    evicted = self._evict_one_idle(key.server_id)
+                    if evicted:
+                        stale.append(evicted)
+                        continue
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RetriableDicomError(
+                            "Timed out waiting for a free association "
+                            f"({self.max_per_server} associations to server "
+                            f"{key.server_id} in use)."
+                        )
+                    self._lock.wait(remaining)
+
+                self.misses += 1
+                self._open_counts[key.server_id] = self._open_counts.get(key.server_id, 0) + 1
+        finally:
+            # Releasing and establishing associations happens outside the lock as
+            # it may take a while.
+            for assoc in stale:
+                _close_quietly(assoc)
+
+        try:
+            return create()
+        except BaseException:
+            self._forget(key.server_id)
+            raise
+
+    def release(self, key: AssociationKey, assoc: Association) -> None:
+        """Hand a borrowed association back to the pool."""
+        if not assoc.is_alive():
+            self._forget(key.server_id)
+            return
+
+        with self._lock:
+            self._idle.setdefault(key, []).append(_IdleAssociation(assoc))
+            self._lock.notify()
+
+    def discard(self, key: AssociationKey) -> None:
+        """Account for a borrowed association that was aborted by its borrower."""
+        self._forget(key.server_id)
+
+    def evict_expired(self) -> None:
+        """Release all idle associations that expired or were closed by the server."""
+        with self._lock:
+            stale = self._evict_expired()
+            if stale:
+                self._lock.notify_all()
+
+        for assoc in stale:
+            _close_quietly(assoc)
+
+    def start_reaper(self, interval: float) -> None:
+        """Start a daemon thread that evicts expired idle associations periodically."""
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper_stopped.clear()
+            self._reaper = threading.Thread(
+                target=self._reap, args=(interval,), name="association-pool-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def stop_reaper(self) -> None:
+        with self._lock:
+            reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            self._reaper_stopped.set()
+            reaper.join()
+
+    def clear(self) -> None:
+        """Release all idle associations (e.g. on process exit)."""
+        with self._lock:
+            idle = [entry for entries in self._idle.values() for entry in entries]
+            for key, entries in self._idle.items():
+                self._open_counts[key.server_id] -= len(entries)
+            self._idle.clear()
+            self._lock.notify_all()
+
+        for entry in idle:
+            _close_quietly(entry.assoc)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "idle": sum(len(entries) for entries in self._idle.values()),
+                "open": sum(self._open_counts.values()),
+            }
+
+    def _reap(self, interval: float) -> None:
+        while not self._reaper_stopped.wait(interval):
+            try:
+                self.evict_expired()
+            except Exception:
+                logger.exception("Error evicting idle associations.")
+
+    def _pop_idle(self, key: AssociationKey) -> Association | None:
+        entries = self._idle.get(key)
+        while entries:
+            # Prefer the most recently used association as it's the least likely
+            # to have been dropped by the server in the meantime.
+            entry = entries.pop()
+            if entry.assoc.is_alive():
+                return entry.assoc
+            self._open_counts[key.server_id] -= 1
+            self.evictions += 1
+        return None
+
+    def _evict_expired(self) -> list[Association]:
+        now = time.monotonic()
+        evicted: list[Association] = []
+        for key, entries in self._idle.items():
+            expired = [
+                entry
+                for entry in entries
+                if now - entry.idle_since > self.idle_ttl or not entry.assoc.is_alive()
+            ]
+            for entry in expired:
+                entries.remove(entry)
+                self._open_counts[key.server_id] -= 1
+                self.evictions += 1
+                evicted.append(entry.assoc)
+        return evicted
+
+    def _evict_one_idle(self, server_id: int) -> Association | None:
+        oldest_key: AssociationKey | None = None
+        oldest_entry: _IdleAssociation | None = None
+        for key, entries in self._idle.items():
+            if key.server_id != server_id or not entries:
+                continue
+            if oldest_entry is None or entries[0].idle_since < oldest_entry.idle_since:
+                oldest_key, oldest_entry = key, entries[0]
+
+        if oldest_key is None or oldest_entry is None:
+            return None
+
+        self._idle[oldest_key].remove(oldest_entry)
+        self._open_counts[server_id] -= 1
+        self.evictions += 1
+        return oldest_entry.assoc
+
+    def _forget(self, server_id: int) -> None:
+        with self._lock:
+            self._open_counts[server_id] = max(self._open_counts.get(server_id, 0) - 1, 0)
+            self._lock.notify()
+
+
+def _close_quietly(assoc: Association) -> None:
+    try:
+        if assoc.is_alive():
+            assoc.release()
+    except Exception:
+        logger.debug("Error releasing pooled association", exc_info=True)
+
+
+_pool: AssociationPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_association_pool() -> AssociationPool:
+    """Returns the association pool of the current process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AssociationPool(
+                max_per_server=settings.DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER,
+                idle_ttl=settings.DIMSE_ASSOCIATION_POOL_IDLE_TTL,
+                acquire_timeout=settings.DIMSE_ASSOCIATION_POOL_ACQUIRE_TIMEOUT,
+            )
+            _pool.start_reaper(interval=settings.DIMSE_ASSOCIATION_POOL_IDLE_TTL / 2)
+            atexit.register(_shutdown_pool)
+        return _pool
+
+
+def _shutdown_pool() -> None:
+    if _pool is not None:
+        logger.debug("Association pool statistics: %s", _pool.stats())
+        _pool.stop_reaper()
+        _pool.clear()
+
+
+def _reset_pool_in_child() -> None:
+    # Associations are served by threads of the parent process that don't exist in
+    # a forked child (e.g. the pebble subprocess of a DICOM task).
+    global _pool
+    _pool = None
+
+
+os.register_at_fork(after_in_child=_reset_pool_in_child)
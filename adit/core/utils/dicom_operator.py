@@ -14,12 +14,15 @@ import errno
 import logging
 import threading
 import time
-from collections.abc import Callable, Iterable, Iterator
-from concurrent.futures import ThreadPoolExecutor
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from os import PathLike
+from typing import TypeVar
 
 from aiofiles import os as async_os
 from django.conf import settings
+from django.db import close_old_connections
 from pydicom import Dataset
 from pynetdicom.events import Event
 
@@ -34,10 +37,51 @@ from .dicom_utils import (
 )
 from .dicom_web_connector import DicomWebConnector
 from .dimse_connector import DimseConnector
-from .file_transmit import FileTransmitClient, Metadata
+from .file_transmit import FileTransmitClient, FileTransmitError, Metadata
+from .query_cache import cached_query, get_generation, invalidate_server
+from .received_images_tracker import ReceivedImagesTracker
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# The maximum number of fetched images of the async fetch methods that are buffered
+# until the consumer takes them (the fetch waits when full)
+AFETCH_QUEUE_SIZE = 32
+
+# The shared pool the blocking operations of the async methods run on (see
+# DicomOperator._run_in_worker). Created lazily as most processes never use it.
+_async_executor: ThreadPoolExecutor | None = None
+_async_executor_lock = threading.Lock()
+
+# Semaphores that bound the concurrent operations per DICOM server. Semaphores are
+# bound to an event loop, so they are held per loop (and garbage collected with it).
+_async_server_slots: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+
+
+def _get_async_executor() -> ThreadPoolExecutor:
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            _async_executor = ThreadPoolExecutor(
+                max_workers=settings.DICOM_ASYNC_WORKERS,
+                thread_name_prefix="dicom_operator",
+            )
+        return _async_executor
+
+
+def _get_server_slots(server: DicomServer) -> asyncio.Semaphore:
+    slots = _async_server_slots.setdefault(asyncio.get_running_loop(), {})
+    if server.ae_title not in slots:
+        slots[server.ae_title] = asyncio.Semaphore(settings.DICOM_ASYNC_MAX_PER_SERVER)
+    return slots[server.ae_title]
+
+
+class FetchStopped(Exception):
+    """Raised in the fetch callback to abort a fetch whose images are no longer consumed."""
+
 
 class DicomOperator:
     def __init__(
@@ -45,8 +89,12 @@ class DicomOperator:
         server: DicomServer,
         persistent: bool = False,
         dimse_timeout: int | None = 60,
+        query_cache: bool = False,
     ):
         self.server = server
+        # Use the results of identical previous queries (see query_cache.py)
+        self.query_cache = query_cache
+        self._query_cache_generation: int | None = None
         self.dimse_connector = DimseConnector(
             server,
             auto_close=not persistent,
@@ -104,6 +152,13 @@ class DicomOperator:
             "NumberOfPatientRelatedStudies",
         )
 
+        yield from self._query_with_cache(
+            "PATIENT", query, limit_results, self._find_patients(query, limit_results)
+        )
+
+    def _find_patients(
+        self, query: QueryDataset, limit_results: int | None
+    ) -> Iterator[ResultDataset]:
         if self.server.patient_root_find_support or self.server.study_root_find_support:
             if self.server.patient_root_find_support:
                 query.QueryRetrieveLevel = "PATIENT"
@@ -190,6 +245,13 @@ class DicomOperator:
 
         query.QueryRetrieveLevel = "STUDY"
 
+        yield from self._query_with_cache(
+            "STUDY", query, limit_results, self._find_studies(query, limit_results)
+        )
+
+    def _find_studies(
+        self, query: QueryDataset, limit_results: int | None
+    ) -> Iterator[ResultDataset]:
         if self.server.patient_root_find_support or self.server.study_root_find_support:
             results = self.dimse_connector.send_c_find(query, limit_results=limit_results)
             yield from self._handle_found_studies(query, results)
@@ -284,6 +346,14 @@ class DicomOperator:
                         "Patient Root Query/Retrieve Information Model."
                     )
 
+        yield from self._query_with_cache(
+            "SERIES", query, limit_results, self._find_series(query, limit_results)
+        )
+
+    def _find_series(
+        self, query: QueryDataset, limit_results: int | None
+    ) -> Iterator[ResultDataset]:
+        if self.server.patient_root_find_support or self.server.study_root_find_support:
             results = self.dimse_connector.send_c_find(query, limit_results=limit_results)
             yield from self._handle_found_series(query, results)
         else:
@@ -361,12 +431,35 @@ class DicomOperator:
                         "Patient Root Query/Retrieve Information Model."
                     )
 
+        yield from self._query_with_cache(
+            "IMAGE", query, limit_results, self._find_images(query, limit_results)
+        )
+
+    def _find_images(
+        self, query: QueryDataset, limit_results: int | None
+    ) -> Iterator[ResultDataset]:
+        if self.server.patient_root_find_support or self.server.study_root_find_support:
             yield from self.dimse_connector.send_c_find(query, limit_results=limit_results)
         elif self.server.dicomweb_qido_support:
             yield from self.dicom_web_connector.send_qido_rs(query, limit_results=limit_results)
         else:
             raise DicomError("No supported method to find images available.")
 
+    def _query_with_cache(
+        self,
+        level: str,
+        query: QueryDataset,
+        limit_results: int | None,
+        find: Iterator[ResultDataset],
+    ) -> Iterator[ResultDataset]:
+        if not self.query_cache:
+            return find
+        if self._query_cache_generation is None:
+            self._query_cache_generation = get_generation(self.server)
+        return cached_query(
+            self.server, self._query_cache_generation, level, query, limit_results, find
+        )
+
     def fetch_study(
         self,
         patient_id: str,
@@ -389,14 +482,85 @@ class DicomOperator:
         if self.server.dicomweb_wado_support:
             self._fetch_images_with_wado_rs(query, callback)
         elif self.server.patient_root_get_support or self.server.study_root_get_support:
-            self._fetch_images_with_c_get(query, callback)
+            if self.server.max_parallel_retrievals > 1:
+                self._fetch_series_in_parallel(patient_id, study_uid, callback)
+            else:
+                self._fetch_images_with_c_get(query, callback)
         elif self.server.patient_root_move_support or self.server.study_root_move_support:
+            # No parallel retrievals with C-MOVE, as the receiver transmits the images by
+            # study and each series consumer would get (and discard) the whole study.
             self._fetch_images_with_c_move(query, callback)
         else:
             raise DicomError("No supported method to fetch a study available.")
 
         logger.debug("Successfully downloaded study %s.", study_uid)
 
+    def _fetch_series_in_parallel(
+        self,
+        patient_id: str,
+        study_uid: str,
+        callback: Callable[[Dataset], None],
+    ) -> None:
+        """Fetch all series of a study with C-GET over multiple associations at the same time.
+
+        Each series is fetched by its own operator (and so its own association). The
+        callback is called for every fetched image of all series (never concurrently),
+        but the order of the images is not guaranteed.
+        """
+        series_uids = [
+            series.SeriesInstanceUID
+            for series in self.find_series(
+                QueryDataset.create(PatientID=patient_id, StudyInstanceUID=study_uid)
+            )
+        ]
+
+        callback_lock = threading.Lock()
+
+        def synchronized_callback(ds: Dataset) -> None:
+            with callback_lock:
+                callback(ds)
+
+        operators: list[DicomOperator] = []
+
+        def fetch(series_uid: str) -> None:
+            operator = self._create_helper_operator()
+            operators.append(operator)
+            operator.fetch_series(patient_id, study_uid, series_uid, synchronized_callback)
+
+        max_workers = min(self.server.max_parallel_retrievals, len(series_uids)) or 1
+        if settings.DIMSE_ASSOCIATION_POOL_ENABLED:
+            # Don't wait for associations the pool would never hand out
+            max_workers = min(max_workers, settings.DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(fetch, series_uid) for series_uid in series_uids]
+                for future in as_completed(futures):
+                    if future.exception():
+                        # Stop the other retrievals early as the study is incomplete anyway.
+                        for other_future in futures:
+                            other_future.cancel()
+                        for operator in operators:
+                            operator.abort()
+                        future.result()
+        finally:
+            for operator in operators:
+                self.logs.extend(operator.get_logs())
+
+    def _create_helper_operator(self) -> "DicomOperator":
+        """Creates an operator with the options of this one for an additional association.
+
+        The helper is not persistent, as it only fetches a single series.
+        """
+        operator = DicomOperator(
+            self.server,
+            dimse_timeout=self.dimse_connector.dimse_timeout,
+            query_cache=self.query_cache,
+        )
+        operator.dimse_connector.acse_timeout = self.dimse_connector.acse_timeout
+        operator.dimse_connector.connection_timeout = self.dimse_connector.connection_timeout
+        operator.dimse_connector.network_timeout = self.dimse_connector.network_timeout
+        return operator
+
     def fetch_series(
         self,
         patient_id: str,
@@ -466,8 +630,14 @@ class DicomOperator:
         else:
             raise DicomError("No supported method to fetch an image available.")
 
-    def upload_images(self, resource: PathLike | list[Dataset]) -> None:
-        """Upload images from a specified folder or list of images in memory"""
+    def upload_images(
+        self, resource: PathLike | list[Dataset], invalidate_cache: bool = True
+    ) -> None:
+        """Upload images from a specified folder or list of images in memory
+
+        The cached query results of the server are invalidated afterwards, unless the
+        caller does it itself once after multiple uploads (`invalidate_cache=False`).
+        """
 
         if self.server.store_scp_support:
             self.dimse_connector.send_c_store(resource)
@@ -476,6 +646,11 @@ class DicomOperator:
         else:
             raise DicomError("No supported method to upload images available.")
 
+        if invalidate_cache:
+            # Cached queries (of all operators) would miss the new images
+            invalidate_server(self.server)
+            self._query_cache_generation = None
+
     def move_study(
         self,
         patient_id: str,
@@ -667,25 +842,31 @@ class DicomOperator:
         receiving_errors: list[Exception],
     ) -> None:
         async def consume():
-            remaining_image_uids = image_uids[:]
-            last_image_at = time.time()
+            tracker = ReceivedImagesTracker(image_uids)
 
             file_transmit = FileTransmitClient(
-                settings.FILE_TRANSMIT_HOST, settings.FILE_TRANSMIT_PORT
+                settings.FILE_TRANSMIT_HOST,
+                settings.FILE_TRANSMIT_PORT,
+                spool_dir=settings.RECEIVER_SPOOL_DIR or None,
             )
 
             def check_images_received():
-                if remaining_image_uids:
-                    if remaining_image_uids == image_uids:
+                logger.debug("C-MOVE of study %s finished: %s", study_uid, tracker.progress())
+
+                if not tracker.complete:
+                    if tracker.received_count == 0:
                         logger.error("No images of study %s received.", study_uid)
                         receiving_errors.append(
                             RetriableDicomError("Failed to fetch all images with C-MOVE.")
                         )
 
+                    missing = tracker.missing
                     logger.warning(
-                        "These images of study %s were not received: %s",
+                        "These %d of %d images of study %s were not received: %s",
+                        len(missing),
+                        tracker.expected_count,
                         study_uid,
-                        ", ".join(remaining_image_uids),
+                        ", ".join(sorted(missing)),
                     )
                     self.logs.append(
                         {
@@ -700,14 +881,9 @@ class DicomOperator:
                 self._handle_fetched_image(ds, callback)
 
             async def handle_received_file(filename: str, metadata: Metadata):
-                nonlocal last_image_at
-                last_image_at = time.time()
-
-                image_uid = metadata["SOPInstanceUID"]
-
                 try:
-                    if image_uid in remaining_image_uids:
-                        remaining_image_uids.remove(image_uid)
+                    size = await async_os.path.getsize(filename)
+                    if tracker.mark_received(metadata["SOPInstanceUID"], size):
                         # Good to know, exceptions will be propagated by asyncio.to_thread
                         await asyncio.to_thread(read_and_handle_image, filename)
                 except Exception as err:
@@ -715,23 +891,35 @@ class DicomOperator:
                 finally:
                     await async_os.remove(filename)
 
-                if not remaining_image_uids:
-                    return True
+                return tracker.complete
 
-                return False
+            async def subscribe():
+                try:
+                    await file_transmit.subscribe(topic, handle_received_file)
+                except FileTransmitError as err:
+                    receiving_errors.append(
+                        DicomError(
+                            f"Failed to receive images from the receiver: {err}. The receiver "
+                            "and the workers must use the same spool directory "
+                            "(RECEIVER_SPOOL_DIR)."
+                        )
+                    )
 
             topic = f"{self.server.ae_title}\\{study_uid}"
-            subscribe_task = asyncio.create_task(
-                file_transmit.subscribe(topic, handle_received_file)
-            )
+            subscribe_task = asyncio.create_task(subscribe())
 
             while True:
                 await asyncio.sleep(1)
+                logger.debug("Receiving study %s: %s", study_uid, tracker.progress())
 
                 if stop_consumer_event.is_set():
                     subscribe_task.cancel()
                     break
 
+                if subscribe_task.done() and receiving_errors:
+                    # Don't wait for the timeout when the subscription failed
+                    break
+
                 # Start checking the timeout only after the C-MOVE operation is finished
                 if not c_move_finished_event.is_set():
                     continue
@@ -739,7 +927,7 @@ class DicomOperator:
                 if subscribe_task.done():
                     break
 
-                time_since_last_image = time.time() - last_image_at
+                time_since_last_image = time.monotonic() - tracker.last_received_at
                 if time_since_last_image > settings.C_MOVE_DOWNLOAD_TIMEOUT:
                     # Don't accept any more images
                     subscribe_task.cancel()
@@ -766,3 +954,175 @@ class DicomOperator:
             else:
                 # Unknown error
                 raise DicomError(f"Failed to handle image '{ds.SOPInstanceUID}'.") from err
+
+    # Async methods
+    #
+    # The DIMSE and DICOMweb connectors are blocking, so the async methods run the
+    # operations above on a small shared pool of worker threads (DICOM_ASYNC_WORKERS)
+    # instead of a thread per request. At most DICOM_ASYNC_MAX_PER_SERVER operations
+    # run against the same server at a time, further operations wait in the event loop
+    # without occupying a worker (and so don't starve the operations of other servers).
+
+    async def afind_patients(
+        self, query: QueryDataset, limit_results: int | None = None
+    ) -> list[ResultDataset]:
+        return await self._run_in_worker(lambda: list(self.find_patients(query, limit_results)))
+
+    async def afind_studies(
+        self, query: QueryDataset, limit_results: int | None = None
+    ) -> list[ResultDataset]:
+        return await self._run_in_worker(lambda: list(self.find_studies(query, limit_results)))
+
+    async def afind_series(
+        self, query: QueryDataset, limit_results: int | None = None
+    ) -> list[ResultDataset]:
+        return await self._run_in_worker(lambda: list(self.find_series(query, limit_results)))
+
+    async def afind_images(
+        self, query: QueryDataset, limit_results: int | None = None
+    ) -> list[ResultDataset]:
+        return await self._run_in_worker(lambda: list(self.find_images(query, limit_results)))
+
+    def afetch_study(
+        self,
+        patient_id: str,
+        study_uid: str,
+        modifier: Callable[[Dataset], None] | None = None,
+    ) -> AsyncIterator[Dataset]:
+        """Fetch a study and yield the images while they are fetched.
+
+        Args:
+            patient_id: The patient ID.
+            study_uid: The study instance UID.
+            modifier: Called (in the worker) for each image before it is yielded.
+        """
+        return self._afetch(
+            self.fetch_study,
+            modifier,
+            patient_id=patient_id,
+            study_uid=study_uid,
+        )
+
+    def afetch_series(
+        self,
+        patient_id: str,
+        study_uid: str,
+        series_uid: str,
+        modifier: Callable[[Dataset], None] | None = None,
+    ) -> AsyncIterator[Dataset]:
+        """Fetch a series and yield the images while they are fetched (see afetch_study)."""
+        return self._afetch(
+            self.fetch_series,
+            modifier,
+            patient_id=patient_id,
+            study_uid=study_uid,
+            series_uid=series_uid,
+        )
+
+    def afetch_image(
+        self,
+        patient_id: str,
+        study_uid: str,
+        series_uid: str,
+        image_uid: str,
+        modifier: Callable[[Dataset], None] | None = None,
+    ) -> AsyncIterator[Dataset]:
+        """Fetch an image and yield it (see afetch_study)."""
+        return self._afetch(
+            self.fetch_image,
+            modifier,
+            patient_id=patient_id,
+            study_uid=study_uid,
+            series_uid=series_uid,
+            image_uid=image_uid,
+        )
+
+    async def aupload_images(self, resource: PathLike | list[Dataset]) -> None:
+        await self._run_in_worker(lambda: self.upload_images(resource))
+
+    async def _run_in_worker(self, func: Callable[[], T]) -> T:
+        loop = asyncio.get_running_loop()
+        server_slots = _get_server_slots(self.server)
+
+        def run() -> T:
+            # Like database_sync_to_async of channels, as the operations may save
+            # to the database (e.g. the negotiated presentation contexts).
+            close_old_connections()
+            try:
+                return func()
+            finally:
+                close_old_connections()
+
+        def release_slot(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(server_slots.release)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+        await server_slots.acquire()
+        try:
+            future = _get_async_executor().submit(run)
+        except BaseException:
+            server_slots.release()
+            raise
+
+        # A running worker can't be interrupted, so when the awaiting task is cancelled
+        # the slot is only released when the worker is really finished.
+        future.add_done_callback(release_slot)
+        return await asyncio.wrap_future(future)
+
+    async def _afetch(
+        self,
+        fetch: Callable[..., None],
+        modifier: Callable[[Dataset], None] | None,
+        **kwargs: str,
+    ) -> AsyncIterator[Dataset]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[Dataset | None] = asyncio.Queue(AFETCH_QUEUE_SIZE)
+        stopped = threading.Event()
+
+        def put(item: Dataset | None) -> None:
+            # Blocks the fetch while the queue is full, but not when nobody consumes
+            # the queue anymore
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    return future.result(timeout=1)
+                except TimeoutError:
+                    if stopped.is_set():
+                        future.cancel()
+                        raise FetchStopped()
+
+        def callback(ds: Dataset) -> None:
+            if stopped.is_set():
+                raise FetchStopped()
+            if modifier:
+                modifier(ds)
+            put(ds)
+
+        def fetch_with_sentinel() -> None:
+            # The sentinel is put from the same thread after all images of the fetch,
+            # so it is guaranteed to be the last item in the queue.
+            try:
+                fetch(callback=callback, **kwargs)
+            finally:
+                if not stopped.is_set():
+                    put(None)
+
+        fetch_task = asyncio.ensure_future(self._run_in_worker(fetch_with_sentinel))
+
+        try:
+            while (ds := await queue.get()) is not None:
+                yield ds
+        except BaseException:
+            # The consumer stopped early, so the fetch is aborted with the next image
+            # (or not even started when it still waits for a slot).
+            stopped.set()
+            if fetch_task.done() and not fetch_task.cancelled():
+                fetch_task.exception()  # mark the error as retrieved
+            else:
+                fetch_task.cancel()
+            raise
+
+        # Raises the error of the fetch (if any)
+        await fetch_task
@@ -7,6 +7,7 @@ from typing import Any, BinaryIO
 
 from django.conf import settings
 from pydicom import Dataset, dcmread, dcmwrite, valuerep
+from pydicom.uid import UID
 
 from adit.core.utils.sanitize import sanitize_filename
 
@@ -26,13 +27,51 @@ def write_dataset(ds: Dataset, fn: str | bytes | PathLike | BinaryIO) -> None:
     dcmwrite(fn, ds, enforce_file_format=True)
 
 
-def read_dataset(fp: str | bytes | PathLike | BinaryIO) -> Dataset:
+def transcode_dataset(ds: Dataset, transfer_syntax: str) -> bool:
+    """Transcode a DICOM dataset (in place) to another transfer syntax.
+
+    Compressed datasets are only decompressed (never compressed again with another
+    compression), uncompressed datasets can be transcoded to any transfer syntax
+    pydicom has an encoder for. Returns if the dataset is in the requested transfer
+    syntax afterwards, otherwise it is left as it is.
+    """
+    file_meta = getattr(ds, "file_meta", None)
+    current = file_meta.get("TransferSyntaxUID") if file_meta else None
+    target = UID(transfer_syntax)
+    if not current or current == target:
+        return current == target
+
+    if current.is_compressed and target.is_compressed:
+        return False
+
+    try:
+        if current.is_compressed:
+            ds.decompress()
+
+        if target.is_compressed:
+            if "PixelData" not in ds:
+                return False
+            ds.compress(target)
+        else:
+            # Only the encoding changes, which is done when the dataset is written or sent
+            ds.file_meta.TransferSyntaxUID = target
+    except Exception as err:
+        # Missing encoder / decoder plugins, unsupported pixel data, ...
+        logger.warning("Failed to transcode dataset to %s: %s", target.name, err)
+        return False
+
+    return True
+
+
+def read_dataset(
+    fp: str | bytes | PathLike | BinaryIO, stop_before_pixels: bool = False
+) -> Dataset:
     """Read a DICOM dataset from a file or buffer.
 
     This function is a wrapper around pydicom's dcmread function to make sure
     that the dataset is read in a consistent way.
     """
-    return dcmread(fp, force=True)
+    return dcmread(fp, force=True, stop_before_pixels=stop_before_pixels)
 
 
 def has_wildcards(value: str) -> bool:
@@ -64,6 +103,10 @@ def convert_to_python_regex(value: str, case_insensitive=False) -> re.Pattern[st
     return re.compile(value, flags)
 
 
+# The separator of the name components in a person name like "Doe, John"
+PERSON_NAME_SEPARATOR = r"\s*,\s*"
+
+
 def person_name_to_dicom(value: str, add_wildcards=False) -> str:
     """Convert a person name to a DICOM compatible string representation.
 
@@ -74,7 +117,7 @@ def person_name_to_dicom(value: str, add_wildcards=False) -> str:
         name = [s.strip() + "*" for s in name]
         return "^".join(name)
 
-    return re.sub(r"\s*,\s*", "^", value)
+    return re.sub(PERSON_NAME_SEPARATOR, "^", value)
 
 
 def _build_date_time_datetime_range(
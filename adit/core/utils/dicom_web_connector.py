@@ -198,20 +198,21 @@ class DicomWebConnector:
     ):
         retriable_failures: list[str] = []
 
-        def _send_dataset(ds: Dataset) -> None:
-            # Allow to manipulate the dataset by an optional modifier function
+        def _send_datasets(datasets: list[Dataset]) -> None:
+            # Allow to manipulate the datasets by an optional modifier function
             if modifier:
-                modifier(ds)
+                for ds in datasets:
+                    modifier(ds)
 
             assert self.dicomweb_client
 
             try:
-                self.dicomweb_client.store_instances([ds])
+                self.dicomweb_client.store_instances(datasets)
             except HTTPError as err:
                 assert err.response is not None
                 status_code = err.response.status_code
                 if is_retriable_http_status(status_code):
-                    retriable_failures.append(ds.SOPInstanceUID)
+                    retriable_failures.extend(ds.SOPInstanceUID for ds in datasets)
                 else:
                     _handle_dicomweb_error(err, "STOW-RS")
 
@@ -219,11 +220,9 @@ class DicomWebConnector:
             raise DicomError("DICOMweb STOW-RS is not supported by the server.")
 
         if isinstance(resource, list):  # resource is a list of datasets
+            # All images in memory are sent with a single request
             logger.debug("Sending STOW of %d datasets.", len(resource))
-
-            for ds in resource:
-                logger.debug("Sending C-STORE of SOP instance %s.", str(ds.SOPInstanceUID))
-                _send_dataset(ds)
+            _send_datasets(resource)
         else:  # resource is a path to a folder
             folder = Path(resource)
             if not folder.is_dir():
@@ -243,7 +242,7 @@ class DicomWebConnector:
                     invalid_dicoms.append(path)
                     continue  # We try to handle the rest of the images and raise the error later
 
-                _send_dataset(ds)
+                _send_datasets([ds])
 
             if invalid_dicoms:
                 raise DicomError(
@@ -1,7 +1,13 @@
 import inspect
 import logging
+import threading
+import time
+from collections import deque
 from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from functools import wraps
+from itertools import islice
 from os import PathLike
 from pathlib import Path
 from typing import Literal
@@ -9,6 +15,7 @@ from typing import Literal
 from django.conf import settings
 from pydicom import Dataset
 from pydicom.errors import InvalidDicomError
+from pydicom.uid import UID
 from pynetdicom import debug_logger
 from pynetdicom._globals import (
     STATUS_FAILURE,
@@ -23,6 +30,7 @@ from pynetdicom.presentation import (
     BasicWorklistManagementPresentationContexts,
     QueryRetrievePresentationContexts,
     UnifiedProcedurePresentationContexts,
+    build_context,
     build_role,
 )
 from pynetdicom.sop_class import (
@@ -38,9 +46,16 @@ from pynetdicom.status import code_to_category
 from ..errors import DicomError, RetriableDicomError
 from ..models import DicomServer
 from ..types import DicomLogEntry
+from ..utils.association_pool import AssociationKey, get_association_pool
 from ..utils.dicom_dataset import QueryDataset, ResultDataset
-from ..utils.dicom_utils import has_wildcards, read_dataset
-from ..utils.presentation_contexts import StoragePresentationContexts
+from ..utils.dicom_utils import has_wildcards, read_dataset, transcode_dataset
+from ..utils.negotiation_cache import (
+    NegotiationResult,
+    get_negotiation_result,
+    save_negotiation_result,
+    slim_contexts,
+)
+from ..utils.presentation_contexts import StoragePresentationContexts, prefer_transfer_syntaxes
 from ..utils.retry_config import (
     retry_dimse_connect,
     retry_dimse_find,
@@ -54,6 +69,11 @@ DimseService = Literal["C-FIND", "C-GET", "C-MOVE", "C-STORE"]
 
 Modifier = Callable[[Dataset], None]
 
+_GET_MODELS = (
+    PatientRootQueryRetrieveInformationModelGet,
+    StudyRootQueryRetrieveInformationModelGet,
+)
+
 
 def connect_to_server(service: DimseService):
     """Handles the DIMSE association lifecycle based on `auto_connect` and `auto_close`.
@@ -147,6 +167,7 @@ class DimseConnector:
         self.network_timeout = network_timeout
         self.logs: list[DicomLogEntry] = []
         self._current_service: DimseService | None = None
+        self._pool_key: AssociationKey | None = None
 
         if settings.ENABLE_DICOM_DEBUG_LOGGER:
             debug_logger()  # Debug mode of pynetdicom
@@ -157,8 +178,11 @@ class DimseConnector:
                 # Association died (PACS dropped it, timeout, etc.) —
                 # clean up the stale reference so we can reconnect.
                 logger.debug("Cleaning up dead association to %s.", self.server.ae_title)
+                if self._pool_key:
+                    get_association_pool().discard(self._pool_key)
                 self.assoc = None
                 self._current_service = None
+                self._pool_key = None
             else:
                 raise AssertionError("A former connection was not closed properly.")
 
@@ -171,6 +195,32 @@ class DimseConnector:
 
     @retry_dimse_connect
     def _associate(self, service: DimseService):
+        if settings.DIMSE_ASSOCIATION_POOL_ENABLED:
+            pool_key = self._create_pool_key(service)
+            self.assoc = get_association_pool().acquire(
+                pool_key, lambda: self._create_association(service)
+            )
+            self._pool_key = pool_key
+        else:
+            self.assoc = self._create_association(service)
+
+    def _create_pool_key(self, service: DimseService) -> AssociationKey:
+        return AssociationKey(
+            server_id=self.server.pk,
+            service=service,
+            options=(
+                self.server.ae_title,
+                self.server.host,
+                self.server.port,
+                self.acse_timeout,
+                self.connection_timeout,
+                self.dimse_timeout,
+                self.network_timeout,
+                tuple(self.server.preferred_transfer_syntaxes),
+            ),
+        )
+
+    def _create_association(self, service: DimseService) -> Association:
         ae = AE(settings.CALLING_AE_TITLE)
 
         # Speed up by reducing the number of required DIMSE messages
@@ -190,9 +240,8 @@ class DimseConnector:
 
         # Setup the contexts
         # (inspired by https://github.com/pydicom/pynetdicom/blob/master/pynetdicom/apps)
-        ext_neg = []
         if service == "C-FIND":
-            ae.requested_contexts = (
+            contexts = (
                 QueryRetrievePresentationContexts
                 + BasicWorklistManagementPresentationContexts
                 + UnifiedProcedurePresentationContexts
@@ -201,56 +250,89 @@ class DimseConnector:
             # The maximum requested contexts is 128. StoragePresentationContexts currently
             # contains 120 storage contexts. So even with the query/retrieve contexts added we
             # should have no problem.
-            ae.add_requested_context(PatientRootQueryRetrieveInformationModelGet)
-            ae.add_requested_context(StudyRootQueryRetrieveInformationModelGet)
-            for cx in StoragePresentationContexts:
-                assert cx.abstract_syntax is not None
-                ae.add_requested_context(cx.abstract_syntax, cx.transfer_syntax)
-                ext_neg.append(build_role(cx.abstract_syntax, scp_role=True))
+            contexts = [
+                build_context(PatientRootQueryRetrieveInformationModelGet),
+                build_context(StudyRootQueryRetrieveInformationModelGet),
+            ] + StoragePresentationContexts
         elif service == "C-MOVE":
-            ae.requested_contexts = QueryRetrievePresentationContexts
+            contexts = QueryRetrievePresentationContexts
         elif service == "C-STORE":
-            ae.requested_contexts = StoragePresentationContexts
+            contexts = StoragePresentationContexts
         else:
             raise DicomError(f"Invalid DIMSE service: {service}")
 
-        self.assoc = ae.associate(
+        # Don't propose the contexts again that the server rejected before
+        negotiation = get_negotiation_result(self.server, service)
+        if negotiation:
+            contexts = slim_contexts(contexts, negotiation)
+
+        if service in ("C-GET", "C-STORE") and self.server.preferred_transfer_syntaxes:
+            contexts = prefer_transfer_syntaxes(contexts, self.server.preferred_transfer_syntaxes)
+
+        ae.requested_contexts = contexts
+
+        ext_neg = []
+        if service == "C-GET":
+            for cx in ae.requested_contexts:
+                assert cx.abstract_syntax is not None
+                if cx.abstract_syntax not in _GET_MODELS:
+                    ext_neg.append(build_role(cx.abstract_syntax, scp_role=True))
+
+        assoc = ae.associate(
             self.server.host,
             self.server.port,
             ae_title=self.server.ae_title,
             ext_neg=ext_neg,
         )
 
-        if not self.assoc.is_established:
+        if not assoc.is_established:
+            if negotiation:
+                # Maybe the capabilities of the server changed, propose all contexts again
+                save_negotiation_result(self.server, service, None)
             raise RetriableDicomError(f"Could not connect to {self.server}.")
 
+        rejected = [str(cx.abstract_syntax) for cx in assoc.rejected_contexts]
+        if not negotiation:
+            save_negotiation_result(self.server, service, NegotiationResult.from_association(assoc))
+        elif rejected:
+            # Contexts accepted before were rejected, so renegotiate all next time
+            save_negotiation_result(self.server, service, None)
+
         if service == "C-GET":
-            rejected = []
-            for cx in self.assoc.rejected_contexts:
-                rejected.append(f"{cx.abstract_syntax}")
             if rejected:
                 logger.warning(
                     "C-GET: %d presentation contexts rejected by SCP: %s",
                     len(rejected),
                     rejected,
                 )
-            accepted = [cx.abstract_syntax for cx in self.assoc.accepted_contexts]
+            accepted = [cx.abstract_syntax for cx in assoc.accepted_contexts]
             logger.debug("C-GET: %d presentation contexts accepted", len(accepted))
 
+        return assoc
+
     def close_connection(self):
         logger.debug("Closing connection to DICOM server %s.", self.server.ae_title)
 
         assert self.assoc
-        self.assoc.release()
+        if self._pool_key:
+            # Hand the association back to the pool instead of releasing it, so that
+            # it can be reused by the next operation.
+            get_association_pool().release(self._pool_key, self.assoc)
+        else:
+            self.assoc.release()
         self.assoc = None
         self._current_service = None
+        self._pool_key = None
 
     def abort_connection(self):
         if self.assoc:
             logger.debug("Aborting connection to DICOM server %s.", self.server.ae_title)
             self.assoc.abort()
+            if self._pool_key:
+                get_association_pool().discard(self._pool_key)
             self.assoc = None
             self._current_service = None
+            self._pool_key = None
 
     @retry_dimse_find
     @connect_to_server("C-FIND")
@@ -333,9 +415,15 @@ class DimseConnector:
         assert self.assoc and self.assoc.is_alive()
         self.assoc.bind(EVT_C_STORE, store_handler, [store_errors])
 
-        responses = self.assoc.send_c_get(query.dataset, query_model, msg_id)
+        try:
+            responses = self.assoc.send_c_get(query.dataset, query_model, msg_id)
 
-        self._handle_get_and_move_responses(responses, "C-GET")
+            self._handle_get_and_move_responses(responses, "C-GET")
+        finally:
+            # The association may be reused from the pool by an operation with
+            # another store handler.
+            if self.assoc:
+                self.assoc.unbind(EVT_C_STORE, store_handler)
 
     @retry_dimse_retrieve
     @connect_to_server("C-MOVE")
@@ -367,39 +455,17 @@ class DimseConnector:
     def send_c_store(
         self, resource: PathLike | list[Dataset], modifier: Modifier | None = None, msg_id: int = 1
     ) -> None:
-        warnings: list[str] = []
-        failures: list[str] = []
-
-        def _send_dataset(ds: Dataset) -> None:
-            # Allow to manipulate the dataset by an optional modifier function
-            if modifier:
-                modifier(ds)
-
-            assert self.assoc and self.assoc.is_alive()
-            status = self.assoc.send_c_store(ds, msg_id)
-
-            if not status:
-                raise RetriableDicomError(
-                    "Connection timed out, was aborted or received invalid response."
-                )
-            else:
-                status_category = code_to_category(status.Status)
-                if status_category == STATUS_WARNING:
-                    warnings.append(ds.StudyInstanceUID)
-                    logger.warning(f"Warning during C-STORE [{status_category}]:\n{status}")
-                elif status_category != STATUS_SUCCESS:
-                    failures.append(ds.StudyInstanceUID)
-                    logger.error(f"Unexpected error during C-STORE [{status_category}]:\n{status}")
-
         if not self.server.store_scp_support:
             raise DicomError("C-STORE operation not supported by server.")
 
+        stats = _StoreStats()
+
         if isinstance(resource, list):  # resource is a list of datasets
             logger.debug("Sending C-STORE of %d datasets.", len(resource))
 
             for ds in resource:
                 logger.debug("Sending C-STORE of SOP instance %s.", str(ds.SOPInstanceUID))
-                _send_dataset(ds)
+                self._store_dataset(ds, modifier, msg_id, stats)
         else:  # resource is a folder
             folder = Path(resource)
             if not folder.is_dir():
@@ -408,18 +474,8 @@ class DimseConnector:
             logger.debug("Sending C-STORE of folder: %s", folder.absolute())
 
             invalid_dicoms: list[PathLike] = []
-            for path in folder.rglob("*"):
-                if not path.is_file():
-                    continue
-
-                try:
-                    ds = read_dataset(path)
-                except InvalidDicomError as err:
-                    logger.error("Failed to read DICOM file %s: %s", path, err)
-                    invalid_dicoms.append(path)
-                    continue  # We try to handle the rest of the images and raise the error later
-
-                _send_dataset(ds)
+            paths = _collect_files_to_store(folder, invalid_dicoms)
+            self._store_files_in_parallel(paths, modifier, msg_id, stats, invalid_dicoms)
 
             if invalid_dicoms:
                 raise DicomError(
@@ -427,15 +483,198 @@ class DimseConnector:
                     " could not be read for C-STORE."
                 )
 
-        if warnings:
+        if stats.warnings:
             # TODO: Maybe raise a warning or somehow else inform that the task has warnings
             pass
 
-        if failures:
-            plural = len(failures) > 1
+        if stats.failures:
+            plural = len(stats.failures) > 1
+            raise RetriableDicomError(
+                f"{len(stats.failures)} C-STORE operation{'s' if plural else ''} failed."
+            )
+
+    def _store_files_in_parallel(
+        self,
+        paths: list[Path],
+        modifier: Modifier | None,
+        msg_id: int,
+        stats: "_StoreStats",
+        invalid_dicoms: list[PathLike],
+    ) -> None:
+        """Sends the files over this and (optionally) additional associations.
+
+        The files are split into contiguous chunks (one per association), so that files
+        of the same SOP class and transfer syntax mostly stay on the same association.
+        """
+        num_associations = min(self.server.max_parallel_uploads, len(paths)) or 1
+        if settings.DIMSE_ASSOCIATION_POOL_ENABLED:
+            # Don't wait for associations the pool would never hand out
+            num_associations = min(num_associations, settings.DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER)
+
+        chunk_size = -(-len(paths) // num_associations)  # ceil division
+        chunks = [paths[i : i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        if len(chunks) <= 1:
+            self._store_files(paths, modifier, msg_id, stats, invalid_dicoms)
+            self._log_store_throughput(stats, 1)
+            return
+
+        helpers = [
+            DimseConnector(
+                self.server,
+                auto_connect=False,
+                auto_close=False,
+                acse_timeout=self.acse_timeout,
+                connection_timeout=self.connection_timeout,
+                dimse_timeout=self.dimse_timeout,
+                network_timeout=self.network_timeout,
+            )
+            for _ in chunks[1:]
+        ]
+        helper_stats = [_StoreStats() for _ in helpers]
+        helper_invalid: list[list[PathLike]] = [[] for _ in helpers]
+        stop_event = threading.Event()
+
+        def store_with_helper(index: int) -> None:
+            helper = helpers[index]
+            try:
+                helper.open_connection("C-STORE")
+                helper._store_files(
+                    chunks[index + 1],
+                    modifier,
+                    msg_id,
+                    helper_stats[index],
+                    helper_invalid[index],
+                    stop_event,
+                )
+            except Exception:
+                # Let the other associations stop after their current file
+                stop_event.set()
+                helper.abort_connection()
+                raise
+            helper.close_connection()
+
+        errors: list[BaseException] = []
+        with ThreadPoolExecutor(max_workers=len(helpers)) as executor:
+            futures = [executor.submit(store_with_helper, i) for i in range(len(helpers))]
+            try:
+                self._store_files(chunks[0], modifier, msg_id, stats, invalid_dicoms, stop_event)
+            except Exception as err:
+                stop_event.set()
+                errors.append(err)
+
+            for future in futures:
+                err = future.exception()
+                if err:
+                    errors.append(err)
+
+        for helper, helper_stat, invalid in zip(helpers, helper_stats, helper_invalid):
+            stats.merge(helper_stat)
+            invalid_dicoms.extend(invalid)
+            self.logs.extend(helper.logs)
+
+        # Raise the error that made the other associations stop
+        errors = [err for err in errors if not isinstance(err, _StoreStopped)]
+        if errors:
+            raise errors[0]
+
+        self._log_store_throughput(stats, len(chunks))
+
+    def _store_files(
+        self,
+        paths: list[Path],
+        modifier: Modifier | None,
+        msg_id: int,
+        stats: "_StoreStats",
+        invalid_dicoms: list[PathLike],
+        stop_event: threading.Event | None = None,
+    ) -> None:
+        # The next files are already read and decoded while the current one is sent
+        for path, future in _read_ahead(paths, settings.DIMSE_STORE_READ_AHEAD):
+            if stop_event and stop_event.is_set():
+                raise _StoreStopped()
+
+            try:
+                ds = future.result()
+            except InvalidDicomError as err:
+                logger.error("Failed to read DICOM file %s: %s", path, err)
+                invalid_dicoms.append(path)
+                continue  # We try to handle the rest of the images and raise the error later
+
+            stats.bytes += path.stat().st_size
+            self._store_dataset(ds, modifier, msg_id, stats)
+
+    def _store_dataset(
+        self, ds: Dataset, modifier: Modifier | None, msg_id: int, stats: "_StoreStats"
+    ) -> None:
+        # Allow to manipulate the dataset by an optional modifier function
+        if modifier:
+            modifier(ds)
+
+        assert self.assoc and self.assoc.is_alive()
+        self._match_accepted_transfer_syntax(ds)
+        try:
+            status = self.assoc.send_c_store(ds, msg_id)
+        except ValueError as err:
+            # No accepted presentation context for the SOP class or transfer syntax of the
+            # dataset. Retrying won't help as the server rejected it during negotiation.
+            raise DicomError(f"Server {self.server} does not accept this image: {err}") from err
+
+        if not status:
             raise RetriableDicomError(
-                f"{len(failures)} C-STORE operation{'s' if plural else ''} failed."
+                "Connection timed out, was aborted or received invalid response."
             )
+        else:
+            stats.instances += 1
+            status_category = code_to_category(status.Status)
+            if status_category == STATUS_WARNING:
+                stats.warnings.append(ds.StudyInstanceUID)
+                logger.warning(f"Warning during C-STORE [{status_category}]:\n{status}")
+            elif status_category != STATUS_SUCCESS:
+                stats.failures.append(ds.StudyInstanceUID)
+                logger.error(f"Unexpected error during C-STORE [{status_category}]:\n{status}")
+
+    def _match_accepted_transfer_syntax(self, ds: Dataset) -> None:
+        """Transcodes the dataset to the transfer syntax the server accepted for it.
+
+        Only needed if one of both transfer syntaxes is compressed, pynetdicom can't
+        convert those on the fly. If transcoding fails, pynetdicom raises when sending.
+        """
+        assert self.assoc
+        file_meta = getattr(ds, "file_meta", None)
+        transfer_syntax = file_meta.get("TransferSyntaxUID") if file_meta else None
+        if not transfer_syntax:
+            return
+
+        accepted = [
+            cx.transfer_syntax[0]
+            for cx in self.assoc.accepted_contexts
+            if cx.abstract_syntax == ds.get("SOPClassUID") and cx.transfer_syntax
+        ]
+        if not accepted or transfer_syntax in accepted:
+            return
+
+        if not transfer_syntax.is_compressed and not any(UID(ts).is_compressed for ts in accepted):
+            return  # pynetdicom converts between uncompressed transfer syntaxes itself
+
+        for ts in accepted:
+            if transcode_dataset(ds, ts):
+                logger.debug("Transcoded %s to %s for C-STORE.", ds.SOPInstanceUID, UID(ts).name)
+                return
+
+    def _log_store_throughput(self, stats: "_StoreStats", num_associations: int) -> None:
+        if not stats.instances:
+            return
+
+        elapsed = max(time.monotonic() - stats.started_at, 1e-6)
+        megabytes = stats.bytes / 1024 / 1024
+        message = (
+            f"Uploaded {stats.instances} images ({megabytes:.1f} MB) to {self.server.ae_title} "
+            f"in {elapsed:.1f}s over {num_associations} association"
+            f"{'s' if num_associations > 1 else ''} "
+            f"({megabytes / elapsed:.1f} MB/s, {stats.instances / elapsed:.1f} images/s)."
+        )
+        logger.info(message)
+        self.logs.append({"level": "Info", "title": "C-STORE throughput", "message": message})
 
     def _handle_get_and_move_responses(
         self, responses: Iterator[tuple[Dataset, Dataset | None]], op: Literal["C-GET", "C-MOVE"]
@@ -530,3 +769,67 @@ class DimseConnector:
                 raise RetriableDicomError(
                     f"Unexpected error during {op} [{status_category}]:\n{status}"
                 )
+
+
+class _StoreStopped(Exception):
+    """Stops uploading on an association because the upload on another one failed."""
+
+
+@dataclass
+class _StoreStats:
+    instances: int = 0
+    bytes: int = 0
+    warnings: list[str] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    def merge(self, other: "_StoreStats") -> None:
+        self.instances += other.instances
+        self.bytes += other.bytes
+        self.warnings.extend(other.warnings)
+        self.failures.extend(other.failures)
+
+
+def _collect_files_to_store(folder: Path, invalid_dicoms: list[PathLike]) -> list[Path]:
+    """Lists the DICOM files of the folder grouped by SOP class and transfer syntax.
+
+    Only the headers are read here. Sending files of the same kind one after another
+    (and on the same association) avoids switching between presentation contexts.
+    """
+    files: list[tuple[tuple[str, str], Path]] = []
+    for path in folder.rglob("*"):
+        if not path.is_file():
+            continue
+
+        try:
+            ds = read_dataset(path, stop_before_pixels=True)
+        except InvalidDicomError as err:
+            logger.error("Failed to read DICOM file %s: %s", path, err)
+            invalid_dicoms.append(path)
+            continue
+
+        file_meta = getattr(ds, "file_meta", None)
+        transfer_syntax = str(file_meta.get("TransferSyntaxUID", "")) if file_meta else ""
+        files.append(((str(ds.get("SOPClassUID", "")), transfer_syntax), path))
+
+    files.sort(key=lambda file: file[0])
+    return [path for _, path in files]
+
+
+def _read_ahead(paths: list[Path], window: int) -> Iterator[tuple[Path, Future[Dataset]]]:
+    """Reads the datasets in a background thread, up to `window` files ahead."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        remaining = iter(paths)
+        pending: deque[tuple[Path, Future[Dataset]]] = deque(
+            (path, executor.submit(read_dataset, path)) for path in islice(remaining, window)
+        )
+        try:
+            while pending:
+                path, future = pending.popleft()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(read_dataset, next_path)))
+                yield path, future
+        finally:
+            for _, future in pending:
+                future.cancel()
@@ -1,15 +1,29 @@
 import asyncio
+import contextlib
 import json
 import logging
+import os as stdlib_os
 import struct
+import time
+import uuid
 from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from os import PathLike
+from pathlib import Path
+from typing import BinaryIO
 
-import aiofiles
 from aiofiles import os, tempfile
 
 BUFFER_SIZE = 64 * 1024  # 64kb
 
+# The maximum number of files queued per client before publishing waits
+SESSION_QUEUE_SIZE = 64
+
+# Metadata key of files that are sent by reference. Instead of the file content
+# only the path of a hard link to the file (in a directory shared by server and
+# client) is transmitted.
+SPOOL_PATH_KEY = "SpoolPath"
+
 SubscribeHandler = Callable[[str], None | Awaitable[None]]
 UnsubscribeHandler = Callable[[str], None | Awaitable[None]]
 FileSentHandler = Callable[[], None]
@@ -19,39 +33,139 @@ FileReceivedHandler = Callable[[str, Metadata], Awaitable[bool | None] | bool |
 logger = logging.getLogger(__name__)
 
 
+class FileTransmitError(Exception):
+    """Raised by the client when a transmitted file can't be accepted."""
+
+
+@dataclass
+class _QueuedFile:
+    metadata: Metadata
+    # The opened file when sending the content, the hard link when sending by reference
+    file: BinaryIO | None = None
+    link_path: str | None = None
+    queued_at: float = field(default_factory=time.monotonic)
+
+    def discard(self):
+        """Cleans up a file that is not (or not successfully) sent."""
+        if self.file:
+            self.file.close()
+        if self.link_path:
+            with contextlib.suppress(OSError):
+                stdlib_os.remove(self.link_path)
+
+
 class FileTransmitSession:
-    """Each client connection to the server is represented by a session."""
+    """Each client connection to the server is represented by a session.
+
+    Files published to the session are queued and sent by the session's own sender
+    task, so that a slow client only delays itself. The queue is bounded and
+    publishing waits when it is full (backpressure).
+    """
 
-    def __init__(self, topic: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    def __init__(
+        self,
+        topic: str,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        queue_size: int = SESSION_QUEUE_SIZE,
+    ):
         self.topic = topic
         self._reader = reader
         self._writer = writer
+        self._queue: asyncio.Queue[_QueuedFile] = asyncio.Queue(queue_size)
+        self._closed = False
+
+        self.files_sent = 0
+        self.total_send_latency = 0.0
+        self.max_send_latency = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
 
     async def send_file(self, file_path: PathLike | str, metadata: dict[str, str] | None = None):
-        # Send file size
-        file_size = await os.path.getsize(file_path)
-        data = struct.pack("!I", file_size)  # encodes unsigned int to exactly 4 bytes
-        self._writer.write(data)
-        await self._writer.drain()
+        """Queues the content of the file to be sent.
+
+        The file is opened right away, so the publisher may delete it as soon as this
+        returns.
+        """
+        if self._closed:
+            return
+
+        file = await asyncio.to_thread(open, file_path, "rb")
+        await self._enqueue(_QueuedFile(metadata or {}, file=file))
+
+    async def send_file_reference(
+        self, file_path: PathLike | str, metadata: dict[str, str] | None = None
+    ):
+        """Queues only the path of the file to be sent instead of its content.
 
-        # Send metadata
-        if not metadata:
-            metadata = {}
+        The file is hard linked under a unique name for this session (in the same
+        directory, so on the same file system), so that each subscribed client owns
+        its own link and can delete it when done, independent of the publisher and
+        other clients.
+        """
+        if self._closed:
+            return
+
+        link_path = f"{file_path}.{uuid.uuid4().hex}"
+        await os.link(file_path, link_path)
+
+        await self._enqueue(_QueuedFile(metadata or {}, link_path=link_path))
+
+    async def _enqueue(self, queued_file: _QueuedFile):
+        try:
+            await self._queue.put(queued_file)
+        except BaseException:
+            queued_file.discard()
+            raise
+
+        # The session may have been closed while waiting for a free slot (closing drains
+        # the queue), then nobody would consume the file anymore
+        if self._closed:
+            self.close()
+
+    async def run(self):
+        """Sends the queued files until cancelled or the connection is lost."""
+        try:
+            while True:
+                queued_file = await self._queue.get()
+                try:
+                    await self._transmit(queued_file)
+                finally:
+                    queued_file.discard()
+
+                latency = time.monotonic() - queued_file.queued_at
+                self.files_sent += 1
+                self.total_send_latency += latency
+                self.max_send_latency = max(self.max_send_latency, latency)
+        finally:
+            # Don't let publishers wait for a queue that is not consumed anymore
+            self.close()
+
+    def close(self):
+        self._closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait().discard()
+
+    async def _transmit(self, queued_file: _QueuedFile):
+        if queued_file.link_path:
+            metadata = {**queued_file.metadata, SPOOL_PATH_KEY: queued_file.link_path}
+            await self._send_header(0, metadata)
+            # From now on the client owns the link
+            queued_file.link_path = None
+        elif queued_file.file:
+            file_size = stdlib_os.fstat(queued_file.file.fileno()).st_size
+            await self._send_header(file_size, queued_file.metadata)
+            # Let the kernel copy the file to the socket if possible
+            await asyncio.get_running_loop().sendfile(self._writer.transport, queued_file.file)
+
+    async def _send_header(self, file_size: int, metadata: Metadata):
+        data = struct.pack("!I", file_size)  # encodes unsigned int to exactly 4 bytes
         metadata_bytes = (json.dumps(metadata) + "\n").encode()
-        self._writer.write(metadata_bytes)
+        self._writer.write(data + metadata_bytes)
         await self._writer.drain()
 
-        # Send the file itself
-        remaining_bytes = file_size
-        async with aiofiles.open(file_path, mode="rb") as file:
-            # The client writes an eof if it is well served and doesn't need files anymore
-            while remaining_bytes > 0 and not self._reader.at_eof():
-                chunk_size = min(remaining_bytes, BUFFER_SIZE)
-                chunk = await file.read(chunk_size)
-                self._writer.write(chunk)
-                await self._writer.drain()
-                remaining_bytes -= chunk_size
-
 
 class FileTransmitServer:
     """A file transmit server that can be used to send files to clients.
@@ -63,11 +177,12 @@ class FileTransmitServer:
     _server: asyncio.Server | None = None
     _subscribe_handler: SubscribeHandler | None = None
     _unsubscribe_handler: UnsubscribeHandler | None = None
-    _sessions: list[FileTransmitSession] = []
 
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, session_queue_size: int = SESSION_QUEUE_SIZE):
         self._host = host
         self._port = port
+        self._session_queue_size = session_queue_size
+        self._sessions: dict[str, set[FileTransmitSession]] = {}
 
     def set_subscribe_handler(self, subscribe_handler: SubscribeHandler | None):
         """Called when a client subscribes to a topic."""
@@ -82,11 +197,45 @@ class FileTransmitServer:
         topic: str,
         file_path: PathLike | str,
         metadata: dict[str, str] | None = None,
+        by_reference: bool = False,
     ):
-        """Publishes a file to all clients that subscribed to the given topic."""
-        for session in self._sessions:
-            if session.topic == topic:
-                await session.send_file(file_path, metadata)
+        """Publishes a file to all clients that subscribed to the given topic.
+
+        The file is queued for all those clients at once and sent in the background,
+        the file may be deleted when this returns. Only waits if the queue of a client
+        is full.
+
+        With by_reference only the path of the file is published, which requires
+        that the file is in a directory the clients have access to (see
+        FileTransmitSession.send_file_reference).
+        """
+        sessions = self._sessions.get(topic)
+        if not sessions:
+            return
+
+        await asyncio.gather(
+            *(
+                session.send_file_reference(file_path, metadata)
+                if by_reference
+                else session.send_file(file_path, metadata)
+                for session in list(sessions)
+            )
+        )
+
+    def get_metrics(self) -> dict[str, dict[str, int | float]]:
+        """Returns the queue depths and send latencies (in seconds) per topic."""
+        metrics: dict[str, dict[str, int | float]] = {}
+        for topic, sessions in self._sessions.items():
+            files_sent = sum(session.files_sent for session in sessions)
+            total_latency = sum(session.total_send_latency for session in sessions)
+            metrics[topic] = {
+                "sessions": len(sessions),
+                "queue_depth": sum(session.queue_depth for session in sessions),
+                "files_sent": files_sent,
+                "mean_send_latency": total_latency / files_sent if files_sent else 0.0,
+                "max_send_latency": max(session.max_send_latency for session in sessions),
+            }
+        return metrics
 
     async def start(self):
         self._server = await asyncio.start_server(self._handle_connection, self._host, self._port)
@@ -111,8 +260,13 @@ class FileTransmitServer:
         line = await reader.readline()
         topic = line.decode().rstrip()
 
-        session = FileTransmitSession(topic, reader, writer)
-        self._sessions.append(session)
+        session = FileTransmitSession(topic, reader, writer, self._session_queue_size)
+        self._sessions.setdefault(topic, set()).add(session)
+
+        # Start sending before the subscribe handler is called as it may already
+        # publish more files than fit into the queue.
+        sender_task = asyncio.create_task(session.run())
+        sender_task.add_done_callback(lambda _: writer.close())
 
         try:
             if self._subscribe_handler:
@@ -130,7 +284,27 @@ class FileTransmitServer:
         except Exception as err:
             logger.error(f"Exception occurred on topic {topic}: {err}")
         finally:
-            self._sessions.remove(session)
+            sessions = self._sessions[topic]
+            sessions.discard(session)
+            if not sessions:
+                del self._sessions[topic]
+
+            sender_task.cancel()
+            try:
+                await sender_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as err:
+                # Mostly the client closed the connection while files were still sent
+                logger.debug(f"Stopped sending files on topic {topic}: {err}")
+            session.close()
+            logger.debug(
+                "Sent %d files on topic %s (max latency %.3fs).",
+                session.files_sent,
+                topic,
+                session.max_send_latency,
+            )
+
             if not writer.is_closing():
                 writer.close()
                 await writer.wait_closed()
@@ -147,9 +321,11 @@ class FileTransmitClient:
 
     _last_read_at: int | None = None
 
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, spool_dir: PathLike | str | None = None):
         self._host = host
         self._port = port
+        # Files sent by reference are only accepted inside this directory
+        self._spool_dir = Path(spool_dir).resolve() if spool_dir else None
 
     async def subscribe(
         self,
@@ -162,6 +338,9 @@ class FileTransmitClient:
         path to the file received. The handler should process the file, maybe move it to a
         new location or delete it afterward. If the file_received_handler returns True,
         the client will unsubscribe from the topic.
+        Files published by reference are not copied, the handler is directly passed the
+        path in the shared directory instead. Such paths are only accepted if they are
+        inside the spool directory of the client, otherwise a FileTransmitError is raised.
         The filename generator is called when the metadata is received and should return
         the filename to use for the file that is received. If no filename generator is
         set, the filename is randomly generated.
@@ -183,20 +362,34 @@ class FileTransmitClient:
                 metadata_bytes = await reader.readline()
                 metadata: Metadata = json.loads(metadata_bytes.decode().strip())
 
-                async with tempfile.NamedTemporaryFile(delete=False) as f:
-                    remaining_bytes = file_size
-                    while remaining_bytes > 0:
-                        chunk_size = min(remaining_bytes, BUFFER_SIZE)
-                        data = await reader.read(chunk_size)
-                        await f.write(data)
-                        remaining_bytes -= len(data)
+                file_name = metadata.pop(SPOOL_PATH_KEY, None)
+                if file_name is not None and not self._is_in_spool_dir(file_name):
+                    # The client never touches such a file, but it's a misconfiguration
+                    # (or worse), so there is no point in waiting for further files.
+                    if self._spool_dir is None:
+                        raise FileTransmitError(
+                            f"Received a file reference without a spool directory: {file_name}"
+                        )
+                    raise FileTransmitError(
+                        f"Received a reference to a file outside of the spool directory "
+                        f"{self._spool_dir}: {file_name}"
+                    )
+                if file_name is None:
+                    async with tempfile.NamedTemporaryFile(delete=False) as f:
+                        remaining_bytes = file_size
+                        while remaining_bytes > 0:
+                            chunk_size = min(remaining_bytes, BUFFER_SIZE)
+                            data = await reader.read(chunk_size)
+                            await f.write(data)
+                            remaining_bytes -= len(data)
+                    file_name = str(f.name)
 
                 # The file handler can report that no further files are needed by
                 # returning True which stops reading further data from the server.
                 finished = (
-                    await file_received_handler(f.name, metadata)  # type: ignore
+                    await file_received_handler(file_name, metadata)  # type: ignore
                     if asyncio.iscoroutinefunction(file_received_handler)
-                    else file_received_handler(f.name, metadata)  # type: ignore
+                    else file_received_handler(file_name, metadata)  # type: ignore
                 )
                 if finished:
                     break
@@ -212,3 +405,8 @@ class FileTransmitClient:
                 await writer.wait_closed()
             except OSError:
                 pass
+
+    def _is_in_spool_dir(self, file_path: str) -> bool:
+        if self._spool_dir is None:
+            return False
+        return Path(file_path).resolve().is_relative_to(self._spool_dir)
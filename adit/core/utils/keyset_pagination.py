@@ -0,0 +1,106 @@
+import base64
+import json
+from typing import Any
+
+from django.core.exceptions import BadRequest, ValidationError
+from django.db import models
+
+
+def get_keyset_ordering(queryset: models.QuerySet) -> list[str]:
+    """Returns the ordering of the queryset, completed by the primary key so that the
+    ordering is unique (a requirement of keyset pagination)."""
+    pk_name = queryset.model._meta.pk.name
+    ordering: list[str] = []
+    for field in queryset.query.order_by or queryset.model._meta.ordering:
+        descending = field.startswith("-")
+        name = field.lstrip("-")
+        ordering.append(("-" if descending else "") + (pk_name if name == "pk" else name))
+
+    if pk_name not in [field.lstrip("-") for field in ordering]:
+        ordering.append(pk_name)
+    return ordering
+
+
+class KeysetPage:
+    """A page of a queryset that is sought by the values of the ordering fields of the
+    row before (or after) it, instead of by skipping (OFFSET) all rows of the previous
+    pages, which gets slower the deeper the page is.
+
+    The ordering fields must be (non nullable) fields of the model itself and are
+    represented by an opaque cursor in the URLs of the neighboring pages.
+    """
+
+    def __init__(
+        self,
+        queryset: models.QuerySet,
+        per_page: int,
+        after: str | None = None,
+        before: str | None = None,
+    ) -> None:
+        self.per_page = per_page
+        self.ordering = get_keyset_ordering(queryset)
+        self._fields = [
+            queryset.model._meta.get_field(field.lstrip("-")) for field in self.ordering
+        ]
+
+        if before is not None:
+            # Seek backwards in reversed order and reverse the rows again afterwards
+            seek = self._seek_filter(self._decode_cursor(before), forward=False)
+            reversed_ordering = [_reverse(field) for field in self.ordering]
+            rows = list(queryset.filter(seek).order_by(*reversed_ordering)[: per_page + 1])
+            self.has_previous = len(rows) > per_page
+            self.has_next = True
+            self.object_list = rows[:per_page][::-1]
+        else:
+            if after is not None:
+                queryset = queryset.filter(self._seek_filter(self._decode_cursor(after)))
+            rows = list(queryset.order_by(*self.ordering)[: per_page + 1])
+            self.has_previous = after is not None
+            self.has_next = len(rows) > per_page
+            self.object_list = rows[:per_page]
+
+        # A sought page may be empty, e.g. if its rows were deleted in the meantime
+        if not self.object_list:
+            self.has_previous = self.has_next = False
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_previous or self.has_next
+
+    @property
+    def previous_cursor(self) -> str:
+        return self._encode_cursor(self.object_list[0])
+
+    @property
+    def next_cursor(self) -> str:
+        return self._encode_cursor(self.object_list[-1])
+
+    def _seek_filter(self, values: list[Any], forward: bool = True) -> models.Q:
+        # (a, b) > (x, y) is expanded to a > x OR (a = x AND b > y), which also works for
+        # mixed ascending and descending fields
+        seek = models.Q()
+        equal: dict[str, Any] = {}
+        for ordering_field, field, value in zip(self.ordering, self._fields, values, strict=True):
+            descending = ordering_field.startswith("-")
+            lookup = "gt" if descending != forward else "lt"
+            seek |= models.Q(**equal, **{f"{field.name}__{lookup}": value})
+            equal[field.name] = value
+        return seek
+
+    def _encode_cursor(self, obj: models.Model) -> str:
+        # As strings (e.g. datetimes with their full precision) that the fields can parse
+        values = [field.value_to_string(obj) for field in self._fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> list[Any]:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self._fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self._fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise BadRequest("Invalid page cursor.")
+
+
+def _reverse(ordering_field: str) -> str:
+    return ordering_field[1:] if ordering_field.startswith("-") else f"-{ordering_field}"
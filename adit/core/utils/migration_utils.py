@@ -0,0 +1,31 @@
+from django.db import models
+from django.db.models.functions import Coalesce
+
+# The task counter fields of a job and the task status they count (see DicomJob). Fixed
+# here, as migrations must not depend on the current models.
+TASK_COUNT_FIELDS = {
+    "pending_task_count": "PE",
+    "in_progress_task_count": "IP",
+    "canceled_task_count": "CA",
+    "success_task_count": "SU",
+    "warning_task_count": "WA",
+    "failure_task_count": "FA",
+}
+
+
+def set_related_counts(
+    model: type[models.Model],
+    related_model: type[models.Model],
+    count_fields: dict[str, str],
+) -> None:
+    """Sets the counter fields of all rows of a (historical) model to the number of
+    related rows (with a `job` foreign key and a `status`) per status."""
+    for field, status in count_fields.items():
+        counts = (
+            related_model.objects.filter(job=models.OuterRef("pk"), status=status)
+            .order_by()
+            .values("job")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+        model.objects.update(**{field: Coalesce(models.Subquery(counts), models.Value(0))})
@@ -1,6 +1,9 @@
+from itertools import batched
 from typing import TYPE_CHECKING
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from procrastinate.contrib.django import app
 
 if TYPE_CHECKING:
     from ..models import DicomTask
@@ -20,3 +23,43 @@ def reset_tasks(tasks: models.QuerySet["DicomTask"]) -> None:
         start=None,
         end=None,
     )
+
+
+def queue_tasks(
+    tasks: models.QuerySet["DicomTask"],
+    task_name: str,
+    priority: int,
+    tasks_per_job: int = 1,
+) -> int:
+    """Queues the tasks in batches and returns the number of queued tasks.
+
+    For each batch (of DICOM_TASK_QUEUE_BATCH_SIZE tasks) the Procrastinate jobs are
+    inserted at once and the queued jobs of the tasks are set by one update. A job gets
+    the task as `task_id` or, if multiple tasks are processed per job, as `task_ids`.
+    """
+    model = tasks.model
+    model_label = get_model_label(model)
+    deferrer = app.configure_task(task_name, allow_unknown=False, priority=priority)
+
+    task_ids = list(tasks.order_by("id").values_list("id", flat=True))
+    jobs_per_batch = max(settings.DICOM_TASK_QUEUE_BATCH_SIZE // tasks_per_job, 1)
+    for batch in batched(batched(task_ids, tasks_per_job), jobs_per_batch):
+        if tasks_per_job == 1:
+            job_kwargs = [{"model_label": model_label, "task_id": ids[0]} for ids in batch]
+        else:
+            job_kwargs = [{"model_label": model_label, "task_ids": list(ids)} for ids in batch]
+
+        # A job must not be processed without its task knowing about it (and a task
+        # never be queued twice), so the jobs are only committed together with the tasks
+        with transaction.atomic():
+            queued_job_ids = deferrer.batch_defer(*job_kwargs)
+            model.objects.bulk_update(
+                [
+                    model(pk=task_id, queued_job_id=queued_job_id)
+                    for ids, queued_job_id in zip(batch, queued_job_ids, strict=True)
+                    for task_id in ids
+                ],
+                ["queued_job_id"],
+            )
+
+    return len(task_ids)
@@ -0,0 +1,139 @@
+"""Remembers the outcome of the presentation context negotiation with a DICOM server.
+
+Proposing all storage presentation contexts (up to 128 for C-GET) on every association
+is expensive for some PACS servers, and most of the contexts are rejected by them anyway.
+So after a full negotiation the accepted abstract syntaxes (with the transfer syntax
+chosen by the server) and the rejected abstract syntaxes are stored per DIMSE service in
+`DicomServer.negotiated_contexts`. Later associations don't propose the rejected contexts
+again (and propose the transfer syntax chosen by the server first) until the result
+expires after `DIMSE_NEGOTIATION_CACHE_TTL` seconds and the full list is proposed again.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from pynetdicom.association import Association
+from pynetdicom.presentation import PresentationContext, build_context
+
+from ..models import DicomServer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class NegotiationResult:
+    negotiated_at: datetime
+    # Abstract syntax -> transfer syntax chosen by the server
+    accepted: dict[str, str]
+    rejected: frozenset[str]
+
+    @property
+    def expired(self) -> bool:
+        ttl = timedelta(seconds=settings.DIMSE_NEGOTIATION_CACHE_TTL)
+        return timezone.now() - self.negotiated_at > ttl
+
+    def to_dict(self) -> dict:
+        return {
+            "negotiated_at": self.negotiated_at.isoformat(),
+            "accepted": self.accepted,
+            "rejected": sorted(self.rejected),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NegotiationResult":
+        return cls(
+            negotiated_at=datetime.fromisoformat(data["negotiated_at"]),
+            accepted=dict(data["accepted"]),
+            rejected=frozenset(data["rejected"]),
+        )
+
+    @classmethod
+    def from_association(cls, assoc: Association) -> "NegotiationResult":
+        accepted: dict[str, str] = {}
+        for cx in assoc.accepted_contexts:
+            if cx.abstract_syntax and cx.transfer_syntax:
+                accepted.setdefault(str(cx.abstract_syntax), str(cx.transfer_syntax[0]))
+
+        rejected = frozenset(
+            str(cx.abstract_syntax)
+            for cx in assoc.rejected_contexts
+            if cx.abstract_syntax and str(cx.abstract_syntax) not in accepted
+        )
+
+        return cls(negotiated_at=timezone.now(), accepted=accepted, rejected=rejected)
+
+
+def get_negotiation_result(server: DicomServer, service: str) -> NegotiationResult | None:
+    """Returns the still valid negotiation result of a server for a DIMSE service."""
+    if not settings.DIMSE_NEGOTIATION_CACHE_TTL:
+        return None
+
+    data = (server.negotiated_contexts or {}).get(service)
+    if not data:
+        return None
+
+    try:
+        result = NegotiationResult.from_dict(data)
+    except (KeyError, TypeError, ValueError):
+        logger.warning("Ignoring invalid negotiated contexts of %s for %s.", server, service)
+        return None
+
+    if result.expired:
+        return None
+
+    return result
+
+
+def save_negotiation_result(
+    server: DicomServer, service: str, result: NegotiationResult | None
+) -> None:
+    """Stores (or with None removes) the negotiation result of a server for a service."""
+    if not settings.DIMSE_NEGOTIATION_CACHE_TTL or server.pk is None:
+        return
+
+    # Other workers may store the results of other services at the same time
+    with transaction.atomic():
+        locked_server = DicomServer.objects.select_for_update().filter(pk=server.pk).first()
+        if not locked_server:
+            return
+
+        negotiated_contexts = dict(locked_server.negotiated_contexts or {})
+        if result:
+            negotiated_contexts[service] = result.to_dict()
+        else:
+            negotiated_contexts.pop(service, None)
+
+        locked_server.negotiated_contexts = negotiated_contexts
+        locked_server.save(update_fields=["negotiated_contexts"])
+
+    server.negotiated_contexts = negotiated_contexts
+
+
+def slim_contexts(
+    contexts: list[PresentationContext], result: NegotiationResult
+) -> list[PresentationContext]:
+    """Drops the contexts rejected before and puts the chosen transfer syntaxes first.
+
+    The other proposed transfer syntaxes are kept (after the chosen one), so that the
+    server can still accept datasets in another transfer syntax. Contexts unknown to
+    the result (e.g. not proposed at that time) are proposed unchanged.
+    """
+    slimmed: list[PresentationContext] = []
+    for cx in contexts:
+        abstract_syntax = str(cx.abstract_syntax)
+        if abstract_syntax in result.rejected:
+            continue
+
+        transfer_syntaxes = [str(ts) for ts in cx.transfer_syntax]
+        chosen = result.accepted.get(abstract_syntax)
+        if chosen and chosen in transfer_syntaxes:
+            transfer_syntaxes.remove(chosen)
+            transfer_syntaxes.insert(0, chosen)
+
+        slimmed.append(build_context(abstract_syntax, transfer_syntaxes))
+
+    return slimmed
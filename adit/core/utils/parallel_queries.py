@@ -0,0 +1,63 @@
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+from django.conf import settings
+
+from .dicom_dataset import QueryDataset, ResultDataset
+from .dicom_operator import DicomOperator
+
+
+def run_queries(
+    operator: DicomOperator,
+    method: Literal["find_patients", "find_studies", "find_series", "find_images"],
+    queries: list[QueryDataset],
+) -> list[list[ResultDataset]]:
+    """Runs independent queries and returns their results in the order of the queries.
+
+    The queries are sent concurrently over up to `max_parallel_queries` associations
+    of the server of the operator. Each worker thread uses its own persistent operator,
+    which is closed afterwards (its logs are added to the logs of the given operator).
+    """
+    max_workers = min(operator.server.max_parallel_queries, len(queries))
+    if settings.DIMSE_ASSOCIATION_POOL_ENABLED:
+        # Don't wait for associations the pool would never hand out
+        max_workers = min(max_workers, settings.DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER)
+    if max_workers <= 1:
+        return [list(getattr(operator, method)(query)) for query in queries]
+
+    thread_data = threading.local()
+    thread_operators: list[DicomOperator] = []
+    thread_operators_lock = threading.Lock()
+
+    def run(query: QueryDataset) -> list[ResultDataset]:
+        thread_operator: DicomOperator | None = getattr(thread_data, "operator", None)
+        if thread_operator is None:
+            thread_operator = thread_data.operator = DicomOperator(operator.server, persistent=True)
+            with thread_operators_lock:
+                thread_operators.append(thread_operator)
+        return list(getattr(thread_operator, method)(query))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, queries))
+    finally:
+        for thread_operator in thread_operators:
+            thread_operator.close()
+            operator.logs.extend(thread_operator.get_logs())
+
+
+def merge_results(
+    results_of_queries: Iterable[list[ResultDataset]], unique_key: str
+) -> list[ResultDataset]:
+    """Merges the results of multiple queries (in their order) without duplicates."""
+    seen: set[str] = set()
+    merged: list[ResultDataset] = []
+    for results in results_of_queries:
+        for result in results:
+            key = str(result.get(unique_key))
+            if key not in seen:
+                seen.add(key)
+                merged.append(result)
+    return merged
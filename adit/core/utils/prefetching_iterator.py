@@ -0,0 +1,86 @@
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from types import TracebackType
+from typing import Any
+
+from django import db
+
+# Markers of the items in the queue
+_ITEM = "item"
+_ERROR = "error"
+_DONE = "done"
+
+
+class PrefetchingIterator[T]:
+    """Iterates an iterable that is consumed ahead by a background thread.
+
+    The items are produced by the background thread while the previous ones are
+    still processed by the consumer (e.g. the next studies are queried while the
+    current one is transferred). At most `max_prefetched` items are held in the
+    queue, so a slow consumer blocks the producer instead of growing the memory.
+
+    Should be used as a context manager. An exception of the iterable is re-raised
+    by the consumer when it reaches it. When leaving the context early (e.g. because
+    the consumer failed) the producer is stopped and a generator is closed (in the
+    background thread, so that its finally blocks run there).
+    """
+
+    def __init__(self, iterable: Iterable[T], max_prefetched: int) -> None:
+        self._iterable = iterable
+        self._queue: queue.Queue[tuple[str, Any]] = queue.Queue(maxsize=max_prefetched)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+
+    def __enter__(self) -> "PrefetchingIterator[T]":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._stopped.set()
+        # Unblock a producer that waits for a free slot in the queue
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+    def __iter__(self) -> Iterator[T]:
+        while True:
+            kind, value = self._queue.get()
+            if kind == _DONE:
+                return
+            if kind == _ERROR:
+                raise value
+            yield value
+
+    def _produce(self) -> None:
+        iterator = iter(self._iterable)
+        try:
+            for item in iterator:
+                if not self._put(_ITEM, item):
+                    return
+            self._put(_DONE, None)
+        except Exception as err:
+            self._put(_ERROR, err)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            # A database connection of this thread is not closed by Django itself
+            db.connection.close()
+
+    def _put(self, kind: str, value: Any) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put((kind, value), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
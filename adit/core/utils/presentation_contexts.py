@@ -1,4 +1,9 @@
+from collections.abc import Sequence
+
+from pydicom.uid import UID
 from pynetdicom.presentation import (
+    AllStoragePresentationContexts,
+    PresentationContext,
     build_context,
 )
 
@@ -170,3 +175,59 @@ data.
 """
 
 assert len(StoragePresentationContexts) <= 120
+
+StorageScpPresentationContexts = [
+    build_context(
+        cx.abstract_syntax,
+        cx.transfer_syntax
+        + (_compressed_transfer_syntaxes if cx.abstract_syntax in _image_storage else []),
+    )
+    for cx in AllStoragePresentationContexts
+    if cx.abstract_syntax is not None
+] + [
+    build_context(uid, _all_transfer_syntaxes)
+    for uid in sorted(
+        set(_image_storage) - {cx.abstract_syntax for cx in AllStoragePresentationContexts}
+    )
+]
+"""Presentation contexts supported by our Storage SCP (the C-MOVE receiver).
+
+All storage SOP classes known to pynetdicom are supported with its default
+transfer syntaxes, image SOP classes additionally with the compressed transfer
+syntaxes offered above, so that the PACS doesn't have to decompress images for
+C-MOVE. (An SCP has no limit of 128 contexts.)
+"""
+
+TRANSFER_SYNTAX_CHOICES = [(uid, UID(uid).name) for uid in _all_transfer_syntaxes]
+
+LOSSLESS_TRANSFER_SYNTAX_CHOICES = [
+    (uid, UID(uid).name)
+    for uid in [
+        "1.2.840.10008.1.2.1.99",  # Deflated Explicit VR Little Endian
+        "1.2.840.10008.1.2.5",  # RLE Lossless
+        "1.2.840.10008.1.2.4.80",  # JPEG-LS Lossless
+        "1.2.840.10008.1.2.4.90",  # JPEG 2000 Lossless
+    ]
+]
+"""Transfer syntaxes a DICOM folder can store the images in (see transcode_dataset).
+
+Deflated and RLE Lossless work out of the box, JPEG-LS and JPEG 2000 need the
+pydicom encoder plugins (pyjpegls or pylibjpeg-openjpeg) to be installed.
+"""
+
+
+def prefer_transfer_syntaxes(
+    contexts: Sequence[PresentationContext], preferred: Sequence[str]
+) -> list[PresentationContext]:
+    """Reorders the transfer syntaxes of the contexts by the given preference.
+
+    The preferred transfer syntaxes are proposed first (in the given order), but only
+    if the context offers them anyway. The other transfer syntaxes are kept after them.
+    """
+    ordered: list[PresentationContext] = []
+    for cx in contexts:
+        offered = [str(ts) for ts in cx.transfer_syntax]
+        first = [ts for ts in preferred if ts in offered]
+        rest = [ts for ts in offered if ts not in first]
+        ordered.append(build_context(str(cx.abstract_syntax), first + rest))
+    return ordered
@@ -0,0 +1,158 @@
+"""Caches the results of C-FIND and QIDO-RS queries per DICOM server.
+
+The same queries are often sent to a server within minutes (e.g. by the DICOM explorer
+and the selective transfer query). A DicomOperator created with `query_cache=True`
+stores the results of its queries in the Django cache `DICOM_QUERY_CACHE_ALIAS` (by
+default a database cache shared by all web and worker processes) for the query level
+specific time in `DICOM_QUERY_CACHE_TTLS`. The size of the cache is bounded by the
+`MAX_ENTRIES` option of that cache.
+
+The keys contain a generation of the server that is renewed when images are stored
+to the server through ADIT (see `invalidate_server`), so that no outdated results are
+returned afterwards. Images stored to the server by others are only found when the
+cached results expired, so the cache is only meant for interactive queries (and not
+for tasks that must see the current state of a server). The generation is fetched
+once per operator (see `get_generation`), so those operators should be short-lived.
+The hit rates are logged periodically.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Iterable, Iterator
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from pydicom import Dataset
+from pydicom.multival import MultiValue
+
+from ..models import DicomServer
+from .dicom_dataset import QueryDataset, ResultDataset
+
+logger = logging.getLogger(__name__)
+
+# How many lookups (of all levels) until the hit rates are logged again
+STATS_LOG_INTERVAL = 100
+
+_stats_lock = threading.Lock()
+_stats: dict[str, list[int]] = {}  # level -> [hits, misses]
+
+
+def _get_cache() -> BaseCache:
+    return caches[settings.DICOM_QUERY_CACHE_ALIAS]
+
+
+def _get_ttl(level: str) -> int:
+    if not settings.DICOM_QUERY_CACHE_ENABLED:
+        return 0
+    return settings.DICOM_QUERY_CACHE_TTLS.get(level, 0)
+
+
+def _generation_key(server: DicomServer) -> str:
+    return f"dicom_query:{server.pk}:generation"
+
+
+def _normalize_value(value: object) -> str:
+    if isinstance(value, MultiValue | list | tuple):
+        # The order of multiple values (e.g. of ModalitiesInStudy) doesn't matter
+        return "\\".join(sorted(str(v) for v in value))
+    if value is None:
+        return ""
+    return str(value).replace("\u0000", "").strip()
+
+
+def _build_key(
+    server: DicomServer,
+    generation: int,
+    level: str,
+    query: QueryDataset,
+    limit_results: int | None,
+) -> str:
+    # The elements of a dataset are always iterated in the order of their tags
+    normalized = "|".join(
+        f"{elem.tag:08X}={_normalize_value(elem.value)}" for elem in query.dataset
+    )
+    digest = hashlib.sha256(f"{level}|{limit_results}|{normalized}".encode()).hexdigest()
+    return f"dicom_query:{server.pk}:{generation}:{digest}"
+
+
+def _record_lookup(level: str, hit: bool) -> None:
+    with _stats_lock:
+        level_stats = _stats.setdefault(level, [0, 0])
+        level_stats[0 if hit else 1] += 1
+
+        lookups = sum(hits + misses for hits, misses in _stats.values())
+        if lookups % STATS_LOG_INTERVAL:
+            return
+
+        rates = ", ".join(
+            f"{name} {hits / (hits + misses):.0%} of {hits + misses}"
+            for name, (hits, misses) in sorted(_stats.items())
+        )
+
+    logger.info("DICOM query cache hit rates: %s.", rates)
+
+
+def get_query_stats() -> dict[str, tuple[int, int]]:
+    """Returns the hits and misses per query level (of this process)."""
+    with _stats_lock:
+        return {level: (hits, misses) for level, (hits, misses) in _stats.items()}
+
+
+def reset_query_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_generation(server: DicomServer) -> int:
+    """Returns the current generation of the cached query results of a server."""
+    if not settings.DICOM_QUERY_CACHE_ENABLED or server.pk is None:
+        return 0
+    return _get_cache().get_or_set(_generation_key(server), time.time_ns, timeout=None)
+
+
+def cached_query(
+    server: DicomServer,
+    generation: int,
+    level: str,
+    query: QueryDataset,
+    limit_results: int | None,
+    find: Iterable[ResultDataset],
+) -> Iterator[ResultDataset]:
+    """Yields the cached results of the query or the results of `find` (and caches them).
+
+    `find` is a generator that is not started on a cache hit. Its results are only cached
+    when it was fully consumed (and not e.g. aborted early by the caller).
+    """
+    ttl = _get_ttl(level)
+    if not ttl or server.pk is None:
+        yield from find
+        return
+
+    key = _build_key(server, generation, level, query, limit_results)
+    cache = _get_cache()
+
+    datasets: list[Dataset] | None = cache.get(key)
+    _record_lookup(level, datasets is not None)
+    if datasets is not None:
+        logger.debug("Using cached %s query results of %s.", level.lower(), server)
+        for ds in datasets:
+            yield ResultDataset(ds)
+        return
+
+    datasets = []
+    for result in find:
+        datasets.append(result.dataset)
+        yield result
+
+    cache.set(key, datasets, timeout=ttl)
+
+
+def invalidate_server(server: DicomServer) -> None:
+    """Makes all cached query results of a server outdated (e.g. after storing to it)."""
+    if not settings.DICOM_QUERY_CACHE_ENABLED or server.pk is None:
+        return
+
+    # Not a counter, so that an evicted generation is never used again
+    _get_cache().set(_generation_key(server), time.time_ns(), timeout=None)
@@ -0,0 +1,118 @@
+"""Adapts the pace of consecutive requests to a DICOM server to how healthy it is.
+
+Between consecutive units of work against a server (e.g. the studies of a mass transfer)
+the `RateController` of the server waits a delay that is adapted by AIMD (additive
+increase, multiplicative decrease of the rate):
+
+- After every healthy unit the delay is decreased by `DICOM_PACING_DECREASE_STEP`
+  (down to no delay at all), so the throughput rises while the server keeps up.
+- After a congestion signal (an association rejection or another retriable error, or
+  a latency above `DICOM_PACING_LATENCY_TOLERANCE` times the usual one of the server)
+  the delay is multiplied by `DICOM_PACING_BACKOFF_FACTOR` (but is at least
+  `DICOM_PACING_MIN_BACKOFF` and at most `DICOM_PACING_MAX_DELAY`).
+
+The delay and the usual latency (an exponential moving average) of a server are stored
+in the Django cache `DICOM_PACING_CACHE_ALIAS` (by default a database cache shared by
+all web and worker processes, separate from the culled query cache), so that all
+workers back off together. Concurrent
+updates of multiple workers may overwrite each other, which only makes the adaption
+a bit less precise. Without `DICOM_PACING_ENABLED` there is no delay at all.
+"""
+
+import logging
+import time
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+
+from ..models import DicomServer
+
+logger = logging.getLogger(__name__)
+
+# The weight of a new latency in the moving average of the latencies of a server
+LATENCY_SMOOTHING = 0.2
+
+
+@dataclass
+class RateState:
+    delay: float
+    # The moving average of the latencies (None if nothing was observed yet)
+    latency: float | None = None
+
+
+class RateController:
+    def __init__(self, server: DicomServer) -> None:
+        self.server = server
+
+    @property
+    def enabled(self) -> bool:
+        return settings.DICOM_PACING_ENABLED and self.server.pk is not None
+
+    def get_state(self) -> RateState:
+        if not self.enabled:
+            return RateState(delay=0)
+
+        data: dict | None = self._get_cache().get(self._key())
+        if data is None:
+            return RateState(delay=settings.DICOM_PACING_INITIAL_DELAY)
+        return RateState(**data)
+
+    def wait(self) -> None:
+        """Waits the current delay of the server."""
+        delay = self.get_state().delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def record_latency(self, latency: float) -> None:
+        """Records the latency (in seconds) of a successful unit of work."""
+        if not self.enabled:
+            return
+
+        state = self.get_state()
+        usual_latency = state.latency
+        if usual_latency is None:
+            state.latency = latency
+        else:
+            state.latency = (1 - LATENCY_SMOOTHING) * usual_latency + LATENCY_SMOOTHING * latency
+
+        if usual_latency and latency > settings.DICOM_PACING_LATENCY_TOLERANCE * usual_latency:
+            logger.debug(
+                "Latency of %s (%.3fs) far above the usual one (%.3fs).",
+                self.server,
+                latency,
+                usual_latency,
+            )
+            self._back_off(state)
+        else:
+            state.delay = max(0.0, state.delay - settings.DICOM_PACING_DECREASE_STEP)
+
+        self._set_state(state)
+
+    def record_congestion(self) -> None:
+        """Records a congestion of the server (e.g. a rejected association)."""
+        if not self.enabled:
+            return
+
+        state = self.get_state()
+        self._back_off(state)
+        self._set_state(state)
+
+    def _back_off(self, state: RateState) -> None:
+        state.delay = min(
+            max(
+                state.delay * settings.DICOM_PACING_BACKOFF_FACTOR,
+                settings.DICOM_PACING_MIN_BACKOFF,
+            ),
+            settings.DICOM_PACING_MAX_DELAY,
+        )
+        logger.info("Backing off from %s with a delay of %.2fs.", self.server, state.delay)
+
+    def _set_state(self, state: RateState) -> None:
+        self._get_cache().set(self._key(), asdict(state), timeout=None)
+
+    def _get_cache(self) -> BaseCache:
+        return caches[settings.DICOM_PACING_CACHE_ALIAS]
+
+    def _key(self) -> str:
+        return f"dicom_pacing:{self.server.pk}"
@@ -0,0 +1,100 @@
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReceivedImage:
+    received_at: float
+    size: int
+
+
+@dataclass(frozen=True)
+class ReceivingProgress:
+    expected: int
+    received: int
+    duplicates: int
+    unexpected: int
+    total_bytes: int
+    elapsed: float
+
+    @property
+    def images_per_second(self) -> float:
+        return self.received / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.received}/{self.expected} images received "
+            f"({self.total_bytes / 1024 / 1024:.1f} MB, {self.images_per_second:.1f} images/s, "
+            f"{self.duplicates} duplicates, {self.unexpected} unexpected)"
+        )
+
+
+class ReceivedImagesTracker:
+    """Keeps track of the images expected from a C-MOVE and those already received.
+
+    All operations are O(1) per image so that also series with tens of thousands of
+    images can be tracked. The tracker is not thread-safe, it's meant to be used by
+    the single consumer of the receiver.
+    """
+
+    def __init__(self, image_uids: Iterable[str]) -> None:
+        self._expected = set(image_uids)
+        self._pending = set(self._expected)
+        self._received: dict[str, ReceivedImage] = {}
+        self._started_at = time.monotonic()
+
+        self.duplicates = 0
+        self.unexpected = 0
+        self.total_bytes = 0
+        self.last_received_at = self._started_at
+
+    def mark_received(self, image_uid: str, size: int = 0) -> bool:
+        """Records a received image.
+
+        Returns True if the image was expected and not received before, which means
+        that it should be handled. Duplicates and unexpected images are only counted.
+        """
+        self.last_received_at = time.monotonic()
+
+        if image_uid in self._received:
+            self.duplicates += 1
+            return False
+
+        if image_uid not in self._pending:
+            self.unexpected += 1
+            return False
+
+        self._pending.discard(image_uid)
+        self._received[image_uid] = ReceivedImage(self.last_received_at, size)
+        self.total_bytes += size
+        return True
+
+    @property
+    def expected_count(self) -> int:
+        return len(self._expected)
+
+    @property
+    def received_count(self) -> int:
+        return len(self._received)
+
+    @property
+    def complete(self) -> bool:
+        return not self._pending
+
+    @property
+    def missing(self) -> frozenset[str]:
+        return frozenset(self._pending)
+
+    def get_received(self, image_uid: str) -> ReceivedImage | None:
+        return self._received.get(image_uid)
+
+    def progress(self) -> ReceivingProgress:
+        return ReceivingProgress(
+            expected=len(self._expected),
+            received=len(self._received),
+            duplicates=self.duplicates,
+            unexpected=self.unexpected,
+            total_bytes=self.total_bytes,
+            elapsed=time.monotonic() - self._started_at,
+        )
@@ -0,0 +1,28 @@
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+
+from .dicom_dataset import ResultDataset
+
+
+class SeriesCatalog:
+    """The series of a study, indexed by their Series Instance UID.
+
+    Is filled by a single series level query for the whole study, so that all further
+    lookups of series in that study don't need another query.
+    """
+
+    def __init__(self, series_list: Iterable[ResultDataset]) -> None:
+        self._series_list = list(series_list)
+        self._by_uid: dict[str, list[ResultDataset]] = defaultdict(list)
+
+        for series in self._series_list:
+            self._by_uid[series.SeriesInstanceUID].append(series)
+
+    def __iter__(self) -> Iterator[ResultDataset]:
+        return iter(self._series_list)
+
+    def __len__(self) -> int:
+        return len(self._series_list)
+
+    def by_uid(self, series_uid: str) -> list[ResultDataset]:
+        return list(self._by_uid.get(series_uid, []))
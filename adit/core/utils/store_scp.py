@@ -10,9 +10,9 @@ from tempfile import NamedTemporaryFile
 from pynetdicom import debug_logger, evt
 from pynetdicom.ae import ApplicationEntity as AE
 from pynetdicom.events import Event
-from pynetdicom.presentation import AllStoragePresentationContexts
 
 from .dicom_utils import write_dataset
+from .presentation_contexts import StorageScpPresentationContexts
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +46,8 @@ class StoreScp:
         # https://pydicom.github.io/pynetdicom/stable/examples/storage.html#storage-scp
         self._ae.maximum_pdu_size = 0
 
-        self._ae.supported_contexts = AllStoragePresentationContexts
+        # Also accept compressed images, so that the PACS doesn't have to decompress them
+        self._ae.supported_contexts = StorageScpPresentationContexts
         handlers = [
             (evt.EVT_CONN_OPEN, self._on_connect),
             (evt.EVT_CONN_CLOSE, self._on_close),
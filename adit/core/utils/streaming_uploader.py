@@ -0,0 +1,154 @@
+import logging
+import queue
+import tempfile
+import threading
+from pathlib import Path
+from types import TracebackType
+
+from django.conf import settings
+from pydicom import Dataset
+
+from .dicom_operator import DicomOperator
+from .dicom_utils import read_dataset, write_dataset
+from .query_cache import invalidate_server
+from .sanitize import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingUploader:
+    """Uploads images to a server while they are still being fetched from another one.
+
+    Images passed to `put` (e.g. from the callback of a fetch) are queued and uploaded
+    by a background thread, so that the transfer does not need a temporary folder and
+    the destination receives images before the fetch is finished. At most
+    `max_queued_images` images are held in memory, further images are spilled to a
+    temporary folder until the upload catches up (so the fetch is never blocked by a
+    slow destination).
+
+    All images queued at the time are uploaded together (up to `max_queued_images`
+    at once) by a single `DicomOperator.upload_images` call, so a STOW-RS request
+    contains multiple images. The operator should be persistent, so that its C-STORE
+    association is reused between the uploads (even without the association pool). The
+    association is closed and the cached queries of the server are invalidated once
+    when leaving the context.
+
+    Should be used as a context manager. When leaving the context the remaining
+    images are uploaded and an upload error is re-raised.
+    """
+
+    def __init__(self, operator: DicomOperator, max_queued_images: int | None = None) -> None:
+        self.operator = operator
+        self.max_queued_images = max_queued_images or settings.STREAMING_UPLOAD_QUEUE_SIZE
+
+        # The queue itself is unbounded as it also holds the paths of spilled images,
+        # the images in memory are bounded by max_queued_images.
+        self._queue: queue.Queue[Dataset | Path | None] = queue.Queue()
+        self._images_in_memory = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._upload_queued_images, daemon=True)
+        self._spill_dir: tempfile.TemporaryDirectory | None = None
+        self._error: Exception | None = None
+        self._upload_attempted = False
+
+        self.uploaded_images = 0
+        self.spilled_images = 0
+
+    def __enter__(self) -> "StreamingUploader":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc is not None and self._error is None:
+            # Don't upload the remaining images of a failed fetch
+            self._error = UploadCancelled()
+
+        self._queue.put(None)
+        self._thread.join()
+
+        if self._spill_dir:
+            self._spill_dir.cleanup()
+
+        if self._upload_attempted:
+            # Cached queries (of all operators) would miss the new images
+            invalidate_server(self.operator.server)
+        self.operator.close()
+
+        logger.debug(
+            "Uploaded %d images while fetching (%d spilled to disk).",
+            self.uploaded_images,
+            self.spilled_images,
+        )
+
+        # An upload error is the root cause if the fetch failed because of it (see put)
+        if self._error and not isinstance(self._error, UploadCancelled):
+            raise self._error
+
+    def put(self, ds: Dataset) -> None:
+        """Queues an image for upload."""
+        if self._error:
+            # Stop the fetch early, the upload error is raised when leaving the context
+            raise UploadCancelled("Upload to destination failed.")
+
+        with self._lock:
+            in_memory = self._images_in_memory < self.max_queued_images
+            if in_memory:
+                self._images_in_memory += 1
+
+        if in_memory:
+            self._queue.put(ds)
+        else:
+            if not self._spill_dir:
+                self._spill_dir = tempfile.TemporaryDirectory(prefix="adit_spill_")
+            file_path = Path(self._spill_dir.name) / sanitize_filename(f"{ds.SOPInstanceUID}.dcm")
+            write_dataset(ds, file_path)
+            self.spilled_images += 1
+            self._queue.put(file_path)
+
+    def _upload_queued_images(self) -> None:
+        finished = False
+        while not finished:
+            # Wait for the next image and take all the other images queued meanwhile
+            items: list[Dataset | Path] = []
+            item = self._queue.get()
+            while item is not None:
+                items.append(item)
+                if len(items) >= self.max_queued_images:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            finished = item is None
+
+            if items:
+                self._upload(items)
+
+    def _upload(self, items: list[Dataset | Path]) -> None:
+        try:
+            if self._error:
+                return  # skip the remaining images
+
+            images = [read_dataset(item) if isinstance(item, Path) else item for item in items]
+            self._upload_attempted = True
+            self.operator.upload_images(images, invalidate_cache=False)
+            self.uploaded_images += len(images)
+        except Exception as err:
+            logger.error("Failed to upload images while fetching: %s", err)
+            self._error = err
+        finally:
+            for item in items:
+                if isinstance(item, Path):
+                    item.unlink(missing_ok=True)
+                else:
+                    with self._lock:
+                        self._images_in_memory -= 1
+
+
+class UploadCancelled(Exception):
+    """Raised to stop a fetch when the upload of the fetched images failed."""
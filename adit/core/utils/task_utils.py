@@ -2,6 +2,7 @@ import logging
 from typing import cast
 
 from django.apps import apps
+from django.db import models
 
 from adit.core.utils.model_utils import get_model_label
 
@@ -20,3 +21,8 @@ def get_dicom_task(model_label: str, task_id: int) -> DicomTask:
 def get_dicom_processor(dicom_task: DicomTask) -> DicomTaskProcessor:
     processor_class = dicom_processors[get_model_label(dicom_task.__class__)]
     return processor_class(dicom_task)
+
+
+def get_dicom_tasks(model_label: str, task_ids: list[int]) -> models.QuerySet[DicomTask]:
+    DicomTaskModel = cast(type[DicomTask], apps.get_model(model_label))
+    return DicomTaskModel.objects.filter(id__in=task_ids).order_by("id")
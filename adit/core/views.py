@@ -33,6 +33,7 @@ from procrastinate.contrib.django import app
 from adit.core.utils.model_utils import reset_tasks
 from adit.dicom_web.apps import collect_latest_api_usage
 
+from .mixins import KeysetPaginationMixin
 from .models import DicomJob, DicomTask
 from .site import job_stats_collectors
 
@@ -112,6 +113,7 @@ class DicomJobCreateView(
         response = super().form_valid(form)
 
         job = self.object  # set by super().form_valid(form)
+        job.update_task_counts()
         if user.is_staff or transfer_unverified:
             job.status = DicomJob.Status.PENDING
             job.save()
@@ -123,6 +125,7 @@ class DicomJobCreateView(
 
 class DicomJobDetailView(
     LoginRequiredMixin,
+    KeysetPaginationMixin,
     SingleTableMixin,
     RelatedFilterMixin,
     PageSizeSelectMixin,
@@ -169,9 +172,12 @@ class DicomJobDeleteView(LoginRequiredMixin, DeleteView):
         # as the ID afterwards will be None
         success_message = self.success_message % job.__dict__
 
-        for task in job.tasks.all():
-            if task.queued_job_id is not None:
-                app.job_manager.cancel_job_by_id(task.queued_job_id, delete_job=True)
+        # The tasks of a chunk share their queued job (see BatchQueryJob)
+        queued_job_ids = set(
+            job.tasks.filter(queued_job__isnull=False).values_list("queued_job_id", flat=True)
+        )
+        for queued_job_id in queued_job_ids:
+            app.job_manager.cancel_job_by_id(queued_job_id, delete_job=True)
 
         job.delete()
 
@@ -225,26 +231,32 @@ class DicomJobCancelView(LoginRequiredMixin, SingleObjectMixin, View):
                 f"Job with ID {job.pk} and status {job.get_status_display()} is not cancelable."
             )
 
+        # The tasks of a chunk share their queued job (see BatchQueryJob), so each
+        # queued job is only canceled once
         pending_tasks = job.tasks.filter(status=DicomTask.Status.PENDING)
-        for dicom_task in pending_tasks:
-            queued_job_id = dicom_task.queued_job_id
-            if queued_job_id is not None:
-                dicom_task.queued_job_id = None
-                dicom_task.save(update_fields=["queued_job_id"])
-                app.job_manager.cancel_job_by_id(queued_job_id, delete_job=True)
+        queued_job_ids = set(
+            pending_tasks.filter(queued_job__isnull=False).values_list("queued_job_id", flat=True)
+        )
+        pending_tasks.update(queued_job_id=None)
+        for queued_job_id in queued_job_ids:
+            app.job_manager.cancel_job_by_id(queued_job_id, delete_job=True)
         pending_tasks.update(status=DicomTask.Status.CANCELED, message="Task manually canceled")
 
         in_progress_tasks = job.tasks.filter(status=DicomTask.Status.IN_PROGRESS)
-        for dicom_task in in_progress_tasks:
-            queued_job_id = dicom_task.queued_job_id
-            if queued_job_id is not None:
-                app.job_manager.cancel_job_by_id(queued_job_id, abort=True)
+        queued_job_ids = set(
+            in_progress_tasks.filter(queued_job__isnull=False).values_list(
+                "queued_job_id", flat=True
+            )
+        )
+        for queued_job_id in queued_job_ids:
+            app.job_manager.cancel_job_by_id(queued_job_id, abort=True)
 
         if in_progress_tasks.exists():
             job.status = DicomJob.Status.CANCELING
         else:
             job.status = DicomJob.Status.CANCELED
         job.save()
+        job.update_task_counts()
 
         messages.success(request, self.success_message % job.__dict__)
         return redirect(job)
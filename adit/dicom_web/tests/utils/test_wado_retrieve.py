@@ -4,6 +4,7 @@ import pytest
 from pydicom import Dataset
 
 from adit.core.errors import DicomError, RetriableDicomError
+from adit.core.utils.dicom_operator import DicomOperator
 from adit.dicom_web.errors import BadGatewayApiError, ServiceUnavailableApiError
 from adit.dicom_web.utils import wadors_utils
 
@@ -45,7 +46,7 @@ async def test_wado_retrieve_integration(monkeypatch):
             self.study_root_move_support = False
             self.store_scp_support = False
 
-    class FakeDicomOperator:
+    class FakeDicomOperator(DicomOperator):
         def __init__(self, server):
             self.server = server
             self.fetch_study_calls: list[tuple[str, str]] = []
@@ -74,17 +75,9 @@ async def test_wado_retrieve_integration(monkeypatch):
         ) -> None:
             manipulator_calls.append(ds)
 
-    def immediate_sync_to_async(func, *, thread_sensitive=False):
-        async def wrapper(*args, **kwargs):
-            loop = asyncio.get_running_loop()
-            return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
-
-        return wrapper
-
     monkeypatch.setattr(wadors_utils, "DicomServer", FakeDicomServer)
     monkeypatch.setattr(wadors_utils, "DicomOperator", FakeDicomOperator)
     monkeypatch.setattr(wadors_utils, "DicomManipulator", FakeDicomManipulator)
-    monkeypatch.setattr(wadors_utils, "sync_to_async", immediate_sync_to_async)
     query = {
         "PatientID": "P123",
         "StudyInstanceUID": "1.2.840.113845.11.1000000001951524609.20200705182951.2689481",
@@ -132,7 +125,7 @@ async def test_wado_retrieve_with_retriable_error(monkeypatch):
             self.study_root_move_support = False
             self.store_scp_support = False
 
-    class FakeDicomOperator:
+    class FakeDicomOperator(DicomOperator):
         def __init__(self, server):
             self.server = server
 
@@ -143,17 +136,9 @@ async def test_wado_retrieve_with_retriable_error(monkeypatch):
         def manipulate(self, *args, **kwargs):
             return None
 
-    def immediate_sync_to_async(func, *, thread_sensitive=False):
-        async def wrapper(*args, **kwargs):
-            loop = asyncio.get_running_loop()
-            return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
-
-        return wrapper
-
     monkeypatch.setattr(wadors_utils, "DicomServer", FakeDicomServer)
     monkeypatch.setattr(wadors_utils, "DicomOperator", FakeDicomOperator)
     monkeypatch.setattr(wadors_utils, "DicomManipulator", FakeDicomManipulator)
-    monkeypatch.setattr(wadors_utils, "sync_to_async", immediate_sync_to_async)
 
     query = {
         "PatientID": "P123",
@@ -204,7 +189,7 @@ async def test_wado_retrieve_with_non_retriable_error(monkeypatch):
             self.study_root_move_support = False
             self.store_scp_support = False
 
-    class FakeDicomOperator:
+    class FakeDicomOperator(DicomOperator):
         def __init__(self, server):
             self.server = server
 
@@ -215,17 +200,9 @@ async def test_wado_retrieve_with_non_retriable_error(monkeypatch):
         def manipulate(self, *args, **kwargs):
             return None
 
-    def immediate_sync_to_async(func, *, thread_sensitive=False):
-        async def wrapper(*args, **kwargs):
-            loop = asyncio.get_running_loop()
-            return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
-
-        return wrapper
-
     monkeypatch.setattr(wadors_utils, "DicomServer", FakeDicomServer)
     monkeypatch.setattr(wadors_utils, "DicomOperator", FakeDicomOperator)
     monkeypatch.setattr(wadors_utils, "DicomManipulator", FakeDicomManipulator)
-    monkeypatch.setattr(wadors_utils, "sync_to_async", immediate_sync_to_async)
 
     query = {
         "PatientID": "P123",
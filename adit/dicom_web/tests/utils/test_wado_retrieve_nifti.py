@@ -90,10 +90,10 @@ class TestWadoRetrieveNifti:
             def __init__(self, server):
                 pass
 
-            def find_series(self, query_ds):
+            async def afind_series(self, query_ds):
                 return series_list
 
-        def fake_fetch_dicom_data(source_server, query, level):
+        async def fake_fetch_dicom_data(source_server, query, level):
             fetched_series_uids.append(query["SeriesInstanceUID"])
             return [Dataset()]
 
@@ -126,7 +126,7 @@ class TestWadoRetrieveNifti:
             def __init__(self, server):
                 pass
 
-            def find_series(self, query_ds):
+            async def afind_series(self, query_ds):
                 return series_list
 
         monkeypatch.setattr(wadors_utils, "DicomOperator", FakeOperator)
@@ -143,7 +143,7 @@ class TestWadoRetrieveNifti:
     async def test_series_level(self, monkeypatch):
         """Series-level should fetch directly without modality filtering."""
 
-        def fake_fetch_dicom_data(source_server, query, level):
+        async def fake_fetch_dicom_data(source_server, query, level):
             assert level == "SERIES"
             return [Dataset()]
 
@@ -171,7 +171,7 @@ class TestWadoRetrieveNifti:
     async def test_image_level(self, monkeypatch):
         """Image-level should fetch directly without modality filtering."""
 
-        def fake_fetch_dicom_data(source_server, query, level):
+        async def fake_fetch_dicom_data(source_server, query, level):
             assert level == "IMAGE"
             return [Dataset()]
 
@@ -200,7 +200,7 @@ class TestWadoRetrieveNifti:
     async def test_retriable_error(self, monkeypatch):
         """RetriableDicomError should be wrapped as ServiceUnavailableApiError."""
 
-        def fake_fetch_dicom_data(source_server, query, level):
+        async def fake_fetch_dicom_data(source_server, query, level):
             raise RetriableDicomError("timeout")
 
         monkeypatch.setattr(wadors_utils, "DicomOperator", lambda s: None)
@@ -221,7 +221,7 @@ class TestWadoRetrieveNifti:
     async def test_non_retriable_error(self, monkeypatch):
         """DicomError should be wrapped as BadGatewayApiError."""
 
-        def fake_fetch_dicom_data(source_server, query, level):
+        async def fake_fetch_dicom_data(source_server, query, level):
             raise DicomError("permanent failure")
 
         monkeypatch.setattr(wadors_utils, "DicomOperator", lambda s: None)
@@ -1,8 +1,6 @@
 import logging
 from typing import Literal
 
-from adrf.views import sync_to_async
-
 from adit.core.errors import DicomError, RetriableDicomError
 from adit.core.models import DicomServer
 from adit.core.utils.dicom_dataset import QueryDataset, ResultDataset
@@ -23,23 +21,11 @@ async def qido_find(
 
     try:
         if level == "STUDY":
-            results: list[ResultDataset] = list(
-                await sync_to_async(operator.find_studies, thread_sensitive=False)(
-                    query_ds, limit_results
-                )
-            )
+            results = await operator.afind_studies(query_ds, limit_results)
         elif level == "SERIES":
-            results: list[ResultDataset] = list(
-                await sync_to_async(operator.find_series, thread_sensitive=False)(
-                    query_ds, limit_results
-                )
-            )
+            results = await operator.afind_series(query_ds, limit_results)
         elif level == "IMAGE":
-            results: list[ResultDataset] = list(
-                await sync_to_async(operator.find_images, thread_sensitive=False)(
-                    query_ds, limit_results
-                )
-            )
+            results = await operator.afind_images(query_ds, limit_results)
         else:
             raise ValueError(f"Invalid QIDO-RS level: {level}.")
     except RetriableDicomError as err:
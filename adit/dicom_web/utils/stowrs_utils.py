@@ -1,6 +1,5 @@
 import logging
 
-from adrf.views import sync_to_async
 from django.urls import reverse
 from django.utils import timezone
 from pydicom import Dataset, Sequence
@@ -29,7 +28,7 @@ async def stow_store(dest_server: DicomServer, ds: Dataset) -> tuple[Dataset, bo
     original_attributes = await remove_unknow_vr_attributes(ds)
 
     try:
-        await sync_to_async(operator.upload_images, thread_sensitive=False)([ds])
+        await operator.aupload_images([ds])
         result_ds.RetrieveURL = reverse(
             "wado_rs-series_with_study_uid_and_series_uid",
             args=[dest_server.ae_title, ds.StudyInstanceUID, ds.SeriesInstanceUID],
@@ -1,7 +1,6 @@
-import asyncio
 import logging
 import os
-from collections.abc import AsyncIterator, Callable
+from collections.abc import AsyncIterator
 from io import BytesIO
 from pathlib import Path
 from typing import Literal
@@ -41,83 +40,44 @@ async def wado_retrieve(
 ) -> AsyncIterator[Dataset]:
     """WADO retrieve helper.
 
-    Mainly converts a sync callback (by the operator) to an async iterator.
+    Yields the images (manipulated in the worker) while they are fetched by the operator.
     """
     operator = DicomOperator(source_server)
     query_ds = QueryDataset.from_dict(query)
 
-    loop = asyncio.get_running_loop()
-    queue: asyncio.Queue[Dataset | None] = asyncio.Queue()
-
     dicom_manipulator = DicomManipulator()
 
-    def callback(ds: Dataset) -> None:
+    def modifier(ds: Dataset) -> None:
         dicom_manipulator.manipulate(ds, pseudonym, trial_protocol_id, trial_protocol_name)
-        loop.call_soon_threadsafe(queue.put_nowait, ds)
-
-    def fetch_with_sentinel(fetch_func: Callable[..., None], **kwargs: object) -> None:
-        """Wrapper that calls fetch function and schedules sentinel afterward.
-
-        By scheduling the sentinel via call_soon_threadsafe from within the same
-        thread (after the sync function completes), we guarantee FIFO ordering:
-        all data callbacks scheduled during fetch will be processed before the
-        sentinel because they were scheduled first.
-        """
-        try:
-            fetch_func(**kwargs)
-        finally:
-            loop.call_soon_threadsafe(queue.put_nowait, None)
 
     try:
         if level == "STUDY":
-            fetch_coro = sync_to_async(fetch_with_sentinel, thread_sensitive=False)(
-                operator.fetch_study,
+            images = operator.afetch_study(
                 patient_id=query_ds.PatientID,
                 study_uid=query_ds.StudyInstanceUID,
-                callback=callback,
+                modifier=modifier,
             )
         elif level == "SERIES":
-            fetch_coro = sync_to_async(fetch_with_sentinel, thread_sensitive=False)(
-                operator.fetch_series,
+            images = operator.afetch_series(
                 patient_id=query_ds.PatientID,
                 study_uid=query_ds.StudyInstanceUID,
                 series_uid=query_ds.SeriesInstanceUID,
-                callback=callback,
+                modifier=modifier,
             )
         elif level == "IMAGE":
             assert query_ds.has("SeriesInstanceUID")
-            fetch_coro = sync_to_async(fetch_with_sentinel, thread_sensitive=False)(
-                operator.fetch_image,
+            images = operator.afetch_image(
                 patient_id=query_ds.PatientID,
                 study_uid=query_ds.StudyInstanceUID,
                 series_uid=query_ds.SeriesInstanceUID,
                 image_uid=query_ds.SOPInstanceUID,
-                callback=callback,
+                modifier=modifier,
             )
         else:
             raise ValueError(f"Invalid WADO-RS level: {level}.")
 
-        # Start fetch task. Sentinel will be added via call_soon_threadsafe when done.
-        fetch_task = asyncio.create_task(fetch_coro)
-
-        sentinel_received = False
-        try:
-            while True:
-                queue_ds = await queue.get()
-                if queue_ds is None:
-                    sentinel_received = True
-                    break
-                yield queue_ds
-        finally:
-            # Only cancel if the consumer stopped early (not via sentinel).
-            # When the sentinel was received, the fetch function has already
-            # completed and its exception must be propagated, not cancelled.
-            if not sentinel_received and not fetch_task.done():
-                fetch_task.cancel()
-            try:
-                await fetch_task
-            except asyncio.CancelledError:
-                pass
+        async for ds in images:
+            yield ds
 
     except RetriableDicomError as exc:
         raise ServiceUnavailableApiError(str(exc)) from exc
@@ -125,46 +85,39 @@ async def wado_retrieve(
         raise BadGatewayApiError(str(exc)) from exc
 
 
-def _fetch_dicom_data(
+async def _fetch_dicom_data(
     source_server: DicomServer,
     query: dict[str, str],
     level: Literal["STUDY", "SERIES", "IMAGE"],
 ) -> list[Dataset]:
-    """Fetch DICOM data synchronously and return the list of datasets."""
+    """Fetch DICOM data and return the list of datasets."""
     operator = DicomOperator(source_server)
     query_ds = QueryDataset.from_dict(query)
-    dicom_images: list[Dataset] = []
-
-    def callback(ds: Dataset) -> None:
-        dicom_images.append(ds)
 
     if level == "STUDY":
-        operator.fetch_study(
+        images = operator.afetch_study(
             patient_id=query_ds.PatientID,
             study_uid=query_ds.StudyInstanceUID,
-            callback=callback,
         )
     elif level == "SERIES":
-        operator.fetch_series(
+        images = operator.afetch_series(
             patient_id=query_ds.PatientID,
             study_uid=query_ds.StudyInstanceUID,
             series_uid=query_ds.SeriesInstanceUID,
-            callback=callback,
         )
     elif level == "IMAGE":
         if not query_ds.has("SeriesInstanceUID"):
             raise ValueError("SeriesInstanceUID is required for IMAGE-level fetch")
-        operator.fetch_image(
+        images = operator.afetch_image(
             patient_id=query_ds.PatientID,
             study_uid=query_ds.StudyInstanceUID,
             series_uid=query_ds.SeriesInstanceUID,
             image_uid=query_ds.SOPInstanceUID,
-            callback=callback,
         )
     else:
         raise ValueError(f"Invalid WADO-RS level: {level}.")
 
-    return dicom_images
+    return [ds async for ds in images]
 
 
 async def wado_retrieve_nifti(
@@ -185,7 +138,7 @@ async def wado_retrieve_nifti(
 
     try:
         if level == "STUDY":
-            series_list = await sync_to_async(operator.find_series, thread_sensitive=False)(
+            series_list = await operator.afind_series(
                 QueryDataset.create(
                     PatientID=query["PatientID"],
                     StudyInstanceUID=query["StudyInstanceUID"],
@@ -207,16 +160,12 @@ async def wado_retrieve_nifti(
                     "SeriesInstanceUID": series.SeriesInstanceUID,
                 }
 
-                dicom_images = await sync_to_async(_fetch_dicom_data, thread_sensitive=False)(
-                    source_server, series_query, "SERIES"
-                )
+                dicom_images = await _fetch_dicom_data(source_server, series_query, "SERIES")
 
                 async for filename, file_content in _process_single_fetch(dicom_images):
                     yield filename, file_content
         else:
-            dicom_images = await sync_to_async(_fetch_dicom_data, thread_sensitive=False)(
-                source_server, query, level
-            )
+            dicom_images = await _fetch_dicom_data(source_server, query, level)
             async for filename, file_content in _process_single_fetch(dicom_images):
                 yield filename, file_content
 
@@ -0,0 +1,87 @@
+# Generated by Django 6.0.3 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+from adit.core.utils.migration_utils import TASK_COUNT_FIELDS, set_related_counts
+
+VOLUME_COUNT_FIELDS = {
+    "pending_volume_count": "pending",
+    "exported_volume_count": "exported",
+    "converted_volume_count": "converted",
+    "skipped_volume_count": "skipped",
+    "error_volume_count": "error",
+}
+
+
+def set_task_and_volume_counts(apps, schema_editor):
+    MassTransferJob = apps.get_model("mass_transfer.MassTransferJob")
+    MassTransferTask = apps.get_model("mass_transfer.MassTransferTask")
+    MassTransferVolume = apps.get_model("mass_transfer.MassTransferVolume")
+    set_related_counts(MassTransferJob, MassTransferTask, TASK_COUNT_FIELDS)
+    set_related_counts(MassTransferJob, MassTransferVolume, VOLUME_COUNT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mass_transfer", "0005_add_partition_constraint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="pending_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="in_progress_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="canceled_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="success_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="warning_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="failure_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="pending_volume_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="exported_volume_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="converted_volume_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="skipped_volume_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="masstransferjob",
+            name="error_volume_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_task_and_volume_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.3 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mass_transfer", "0006_masstransferjob_task_and_volume_counts"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="masstransfertask",
+            options={"ordering": ("id",)},
+        ),
+        migrations.AddIndex(
+            model_name="masstransfertask",
+            index=models.Index(fields=["job", "status"], name="mass_transf_job_id_1aa1e7_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="masstransfervolume",
+            index=models.Index(fields=["job", "status"], name="mass_transf_job_id_ac4618_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="masstransfervolume",
+            index=models.Index(
+                fields=["job", "partition_key"], name="mass_transf_job_id_296f56_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="masstransfervolume",
+            index=models.Index(
+                fields=["task", "status", "study_datetime", "id"],
+                name="mass_transf_task_id_2f6ecc_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.3 on 2026-10-17 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mass_transfer", "0007_task_and_volume_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="masstransfertask",
+            name="discovery_checksum",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
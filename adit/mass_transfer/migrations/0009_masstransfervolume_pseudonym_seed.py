@@ -0,0 +1,18 @@
+# Generated by Django 6.0.3 on 2026-10-17 20:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mass_transfer", "0008_masstransfertask_discovery_checksum"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="masstransfervolume",
+            name="pseudonym_seed",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Greatest
 from django.urls import reverse
 from procrastinate.contrib.django import app
 
@@ -66,11 +67,51 @@ class MassTransferJob(TransferJob):
             return []
         return [FilterSpec.from_dict(d) for d in self.filters_json]
 
+    # The number of volumes per status (see add_volume_counts)
+    pending_volume_count = models.PositiveIntegerField(default=0)
+    exported_volume_count = models.PositiveIntegerField(default=0)
+    converted_volume_count = models.PositiveIntegerField(default=0)
+    skipped_volume_count = models.PositiveIntegerField(default=0)
+    error_volume_count = models.PositiveIntegerField(default=0)
+
     tasks: models.QuerySet["MassTransferTask"]
+    volumes: models.QuerySet["MassTransferVolume"]
 
     def get_absolute_url(self):
         return reverse("mass_transfer_job_detail", args=[self.pk])
 
+    @property
+    def total_volume_count(self) -> int:
+        return (
+            self.pending_volume_count
+            + self.exported_volume_count
+            + self.converted_volume_count
+            + self.skipped_volume_count
+            + self.error_volume_count
+        )
+
+    def add_volume_counts(self, volume_counts: dict[str, int]) -> None:
+        """Adds the (possibly negative) number of volumes per status to the counters.
+
+        The counters are updated by a single statement in the database, so that tasks of
+        the job processed at the same time don't overwrite each other's changes. Should be
+        called in the same transaction in which the volumes are created, updated or
+        deleted.
+        """
+        changes = {
+            f"{MassTransferVolume.Status(status).name.lower()}_volume_count": count
+            for status, count in volume_counts.items()
+            if count
+        }
+        if changes:
+            # Never below zero, even if some volumes were deleted that were never counted
+            MassTransferJob.objects.filter(pk=self.pk).update(
+                **{
+                    field: Greatest(models.F(field) + count, models.Value(0))
+                    for field, count in changes.items()
+                }
+            )
+
     def clean(self):
         super().clean()
         if self.start_date and self.end_date and self.end_date < self.start_date:
@@ -86,6 +127,7 @@ class MassTransferJob(TransferJob):
             "adit.mass_transfer.tasks.queue_mass_transfer_tasks",
             allow_unknown=False,
         ).defer(job_id=self.pk)
+        self.update_task_counts()
 
 
 class MassTransferTask(TransferTask):
@@ -97,10 +139,13 @@ class MassTransferTask(TransferTask):
     partition_start = models.DateTimeField()
     partition_end = models.DateTimeField()
     partition_key = models.CharField(max_length=64)
+    # The checksum of the filters and partition of the last complete discovery of the
+    # task, so that a retry can resume from its volumes instead of discovering again
+    discovery_checksum = models.CharField(max_length=64, blank=True, default="")
 
     volumes: models.QuerySet["MassTransferVolume"]
 
-    class Meta:
+    class Meta(TransferTask.Meta):
         constraints = [
             models.CheckConstraint(
                 condition=models.Q(partition_start__lt=models.F("partition_end")),
@@ -150,6 +195,9 @@ class MassTransferVolume(models.Model):
     partition_key = models.CharField(max_length=64)
 
     pseudonym = models.CharField(max_length=64, blank=True, default="")
+    # The secret seed of a random pseudonymization (shared by the series of a study),
+    # so that a study gets the same pseudonymized UIDs again when it is resumed
+    pseudonym_seed = models.CharField(max_length=64, blank=True, default="")
     patient_id = models.CharField(max_length=64, blank=True, default="")
     accession_number = models.CharField(max_length=64, blank=True, default="")
     study_instance_uid = models.CharField(max_length=64)
@@ -174,6 +222,13 @@ class MassTransferVolume(models.Model):
 
     class Meta:
         ordering = ("study_datetime", "series_instance_uid")
+        indexes = [
+            models.Index(fields=["job", "status"]),
+            models.Index(fields=["job", "partition_key"]),
+            # Also for the keyset pagination of the (status filtered) volumes of a task in
+            # the default ordering of their table (see MassTransferVolumeTable)
+            models.Index(fields=["task", "status", "study_datetime", "id"]),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["job", "series_instance_uid"],
@@ -184,6 +239,16 @@ class MassTransferVolume(models.Model):
     def __str__(self) -> str:
         return f"MassTransferVolume {self.series_instance_uid}"
 
+    @staticmethod
+    def count_by_status(volumes: models.QuerySet["MassTransferVolume"]) -> dict[str, int]:
+        # Without the default ordering of the volumes, which would otherwise also be grouped by
+        return dict(
+            volumes.order_by()
+            .values("status")
+            .annotate(count=models.Count("id"))
+            .values_list("status", "count")
+        )
+
     def add_log(self, msg: str) -> None:
         if self.log:
             self.log += "\n"
@@ -1,29 +1,42 @@
+import hashlib
 import json
 import logging
 import secrets
 import shutil
 import tempfile
 import time
-from dataclasses import dataclass
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass, replace
 from datetime import date, datetime, timedelta
+from itertools import batched
 from pathlib import Path
 from typing import Literal, cast
 
 import pydicom
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from pydicom import Dataset
 from pydicom.errors import InvalidDicomError
 
 from adit.core.errors import DcmToNiftiConversionError, DicomError, ErrorKind, RetriableDicomError
-from adit.core.models import DicomNode, DicomTask
+from adit.core.models import DicomNode, DicomServer, DicomTask
 from adit.core.processors import DicomTaskProcessor
 from adit.core.utils.dicom_dataset import QueryDataset, ResultDataset
 from adit.core.utils.dicom_manipulator import DicomManipulator
 from adit.core.utils.dicom_operator import DicomOperator
-from adit.core.utils.dicom_utils import convert_to_python_regex, write_dataset
+from adit.core.utils.dicom_utils import (
+    convert_to_python_regex,
+    transcode_dataset,
+    write_dataset,
+)
+from adit.core.utils.parallel_queries import merge_results, run_queries
+from adit.core.utils.prefetching_iterator import PrefetchingIterator
 from adit.core.utils.pseudonymizer import Pseudonymizer, compute_pseudonym
+from adit.core.utils.rate_controller import RateController
 from adit.core.utils.sanitize import sanitize_filename
+from adit.core.utils.streaming_uploader import StreamingUploader
 
 from .models import (
     MassTransferJob,
@@ -31,6 +44,7 @@ from .models import (
     MassTransferTask,
     MassTransferVolume,
 )
+from .utils.study_windows import StudyWindowStats
 
 
 @dataclass(frozen=True)
@@ -73,7 +87,9 @@ class FilterSpec:
 logger = logging.getLogger(__name__)
 
 _MIN_SPLIT_WINDOW = timedelta(minutes=30)
-_DELAY_BETWEEN_STUDIES = 0.5  # seconds between studies to avoid overwhelming the PACS
+
+# How many studies are handed over at once to the (concurrent) series queries
+_SERIES_QUERY_CHUNK_SIZE = 20
 
 # Deterministic pseudonyms use 14 characters. Random pseudonyms use 15 so the
 # two modes can be distinguished by length.
@@ -110,6 +126,64 @@ def _dicom_match(pattern: str, value: str | None, case_insensitive: bool = False
     return bool(regex.fullmatch(str(value)))
 
 
+def _series_have_institution(series_list: list[ResultDataset], institution_name: str) -> bool:
+    return any(
+        _dicom_match(institution_name, series.get("InstitutionName", None))
+        for series in series_list
+    )
+
+
+def _study_matches_filter(study: ResultDataset, mf: FilterSpec) -> bool:
+    if mf.modality and mf.modality not in study.ModalitiesInStudy:
+        return False
+
+    if mf.study_description and not _dicom_match(mf.study_description, study.StudyDescription):
+        return False
+
+    # Exact client-side age filtering using actual StudyDate and
+    # PatientBirthDate (the query birth date range is approximate).
+    birth_date = study.PatientBirthDate
+    has_age_filter = mf.min_age is not None or mf.max_age is not None
+    if birth_date and study.StudyDate and has_age_filter:
+        age = _age_at_study(birth_date, study.StudyDate)
+        if mf.min_age is not None and age < mf.min_age:
+            return False
+        if mf.max_age is not None and age > mf.max_age:
+            return False
+
+    return True
+
+
+def _discovery_checksum(filters: list[FilterSpec], task: MassTransferTask) -> str:
+    """A checksum of everything the discovery of the series of a partition depends on."""
+    data = {
+        "filters": [asdict(mf) for mf in filters],
+        "source": str(task.source_id),
+        "start": str(task.partition_start),
+        "end": str(task.partition_end),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _prune_folder(folder: Path, kept_paths: set[Path]) -> None:
+    """Remove everything in the folder except the kept paths (and their parents)."""
+    for path in folder.iterdir():
+        if path in kept_paths:
+            continue
+        if path.is_dir() and not path.is_symlink():
+            if any(kept_path.is_relative_to(path) for kept_path in kept_paths):
+                _prune_folder(path, kept_paths)
+            else:
+                shutil.rmtree(path)
+        else:
+            path.unlink()
+
+
+def _study_query_key(mf: FilterSpec) -> str:
+    # The parts of the filter that are sent to the server with the study query
+    return f"{mf.modality}|{mf.study_description}|{mf.min_age}|{mf.max_age}"
+
+
 def _short_error_reason(error: str) -> str:
     lines = [line.strip() for line in error.strip().splitlines() if line.strip()]
     return lines[-1] if lines else error
@@ -306,11 +380,21 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
     dicom_task_class = MassTransferTask
     app_settings_class = MassTransferSettings
 
+    # The retriable errors (e.g. rejected associations) of the transferred series
+    _retriable_errors = 0
+
+    # The time spent waiting for the source server while fetching series (without
+    # handling the fetched images), which is what the pacing of the source is based on
+    _fetch_seconds = 0.0
+
     def __init__(self, dicom_task: DicomTask) -> None:
         assert isinstance(dicom_task, MassTransferTask)
         super().__init__(dicom_task)
         self.mass_task = dicom_task
 
+        # The pseudonymizers of randomly pseudonymized studies (by their seed)
+        self._seeded_pseudonymizers: dict[str, Pseudonymizer] = {}
+
     def process(self):
         if self.is_suspended():
             return {
@@ -331,7 +415,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         dest_operator: DicomOperator | None = None
         output_base: Path | None = None
         if destination_node.node_type == DicomNode.NodeType.SERVER:
-            dest_operator = DicomOperator(destination_node.dicomserver)
+            dest_operator = DicomOperator(destination_node.dicomserver, persistent=True)
         else:
             assert destination_node.node_type == DicomNode.NodeType.FOLDER
             output_base = _destination_base_dir(destination_node, job)
@@ -346,42 +430,105 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                     "log": "Mass transfer requires at least one filter.",
                 }
 
-            # Clean up on retry
-            if output_base:
-                partition_path = output_base / self.mass_task.partition_key
-                if partition_path.exists():
-                    shutil.rmtree(partition_path)
-
-            MassTransferVolume.objects.filter(
-                job=job,
-                partition_key=self.mass_task.partition_key,
-            ).delete()
-
             pseudonymizer: Pseudonymizer | None = None
             if job.pseudonymize and job.pseudonym_salt:
                 pseudonymizer = Pseudonymizer(seed=job.pseudonym_salt)
             elif job.pseudonymize:
                 pseudonymizer = Pseudonymizer()
 
+            # Resume from the volumes of a previous attempt: the volumes whose series
+            # were completely transferred are kept, all others are transferred again.
+            previous_volumes = list(
+                MassTransferVolume.objects.filter(
+                    job=job,
+                    partition_key=self.mass_task.partition_key,
+                )
+            )
+            kept_volumes = self._keep_transferred_volumes(
+                previous_volumes, job, pseudonymizer, output_base, dest_operator
+            )
+            unfinished_volumes = [
+                volume
+                for volume in previous_volumes
+                if volume.series_instance_uid not in kept_volumes
+            ]
+
+            if output_base:
+                partition_path = output_base / self.mass_task.partition_key
+                if partition_path.exists():
+                    _prune_folder(
+                        partition_path,
+                        {
+                            self._series_output_path(volume, output_base)
+                            for volume in kept_volumes.values()
+                            if volume.status != MassTransferVolume.Status.SKIPPED
+                        },
+                    )
+
+            # The pseudonyms (and seeds) of the kept volumes are also used for the new
+            # volumes of the same patient (or study)
+            pseudonyms: dict[str, str] = {}
+            pseudonym_seeds: dict[str, str] = {}
+            for volume in kept_volumes.values():
+                if volume.pseudonym:
+                    key = volume.patient_id if job.pseudonym_salt else volume.study_instance_uid
+                    pseudonyms[key] = volume.pseudonym
+                if volume.pseudonym_seed:
+                    pseudonym_seeds[volume.study_instance_uid] = volume.pseudonym_seed
+
             operator = DicomOperator(source_node.dicomserver, persistent=True)
 
-            # Discovery: query the source server for all matching series
-            discovered = self._discover_series(operator, filters)
-            operator.close()
+            checksum = _discovery_checksum(filters, self.mass_task)
+            if previous_volumes and self.mass_task.discovery_checksum == checksum:
+                # The previous discovery completed with the same filters, so only the
+                # series that were not transferred completely are transferred again
+                logger.info(
+                    "Resuming partition %s (%d of %d series already transferred).",
+                    self.mass_task.partition_key,
+                    len(kept_volumes),
+                    len(previous_volumes),
+                )
+                self._reset_volumes(unfinished_volumes, job)
+                return self._transfer_volumes(
+                    operator,
+                    [unfinished_volumes] if unfinished_volumes else [],
+                    job,
+                    pseudonymizer,
+                    output_base,
+                    dest_operator,
+                    kept_volumes,
+                )
 
-            # Create PENDING volumes so they appear in the UI immediately
-            volumes = self._create_pending_volumes(discovered, job, pseudonymizer)
-            grouped_volumes = self._group_volumes(volumes)
+            self._delete_volumes(unfinished_volumes, job)
+            self.mass_task.discovery_checksum = ""
+            self.mass_task.save(update_fields=["discovery_checksum"])
 
-            # Transfer: fetch series grouped by study
-            return self._transfer_grouped_series(
-                operator,
-                grouped_volumes,
-                job,
-                pseudonymizer,
-                output_base,
-                dest_operator,
+            # Discovery runs in the background (over its own associations) and the
+            # studies are transferred as soon as their series are discovered, so that
+            # both the network and the source server are busy all the time.
+            discovered_studies = PrefetchingIterator(
+                self._discover_studies(source_node.dicomserver, filters),
+                settings.MASS_TRANSFER_DISCOVERY_QUEUE_SIZE,
             )
+            with discovered_studies:
+                return self._transfer_volumes(
+                    operator,
+                    self._create_discovered_volumes(
+                        discovered_studies,
+                        job,
+                        pseudonymizer,
+                        pseudonyms,
+                        pseudonym_seeds,
+                        kept_volumes,
+                        output_base,
+                        checksum,
+                    ),
+                    job,
+                    pseudonymizer,
+                    output_base,
+                    dest_operator,
+                    kept_volumes,
+                )
         finally:
             if dest_operator:
                 dest_operator.close()
@@ -391,35 +538,45 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         discovered: list[DiscoveredSeries],
         job: MassTransferJob,
         pseudonymizer: Pseudonymizer | None,
+        pseudonyms: dict[str, str] | None = None,
+        pseudonym_seeds: dict[str, str] | None = None,
     ) -> list[MassTransferVolume]:
         """Bulk-create PENDING volumes for all discovered series.
 
         Handles all three pseudonym modes:
         - Deterministic (linked): same patient always gets same pseudonym.
-        - Random: per-study random pseudonym.
+        - Random: per-study random pseudonym (and seed for the pseudonymizer).
         - No pseudonymization: pseudonym left empty.
+
+        The pseudonyms (by patient ID or study UID) and the seeds (by study UID) can
+        be shared between multiple calls for the series of the same partition.
         """
-        deterministic_ids: dict[str, str] = {}
-        random_pseudonyms: dict[str, str] = {}
+        if pseudonyms is None:
+            pseudonyms = {}
+        if pseudonym_seeds is None:
+            pseudonym_seeds = {}
 
         volumes = []
         for series in discovered:
             pid = series.patient_id
             study_uid = series.study_instance_uid
 
+            pseudonym_seed = ""
             if pseudonymizer and job.pseudonym_salt:
-                if pid not in deterministic_ids:
-                    deterministic_ids[pid] = compute_pseudonym(
+                if pid not in pseudonyms:
+                    pseudonyms[pid] = compute_pseudonym(
                         job.pseudonym_salt, pid, length=_DETERMINISTIC_PSEUDONYM_LENGTH
                     )
-                pseudonym = deterministic_ids[pid]
+                pseudonym = pseudonyms[pid]
             elif pseudonymizer:
-                if study_uid not in random_pseudonyms:
-                    random_seed = secrets.token_hex(16)
-                    random_pseudonyms[study_uid] = compute_pseudonym(
-                        random_seed, pid, length=_RANDOM_PSEUDONYM_LENGTH
+                if study_uid not in pseudonym_seeds:
+                    pseudonym_seeds[study_uid] = secrets.token_hex(16)
+                pseudonym_seed = pseudonym_seeds[study_uid]
+                if study_uid not in pseudonyms:
+                    pseudonyms[study_uid] = compute_pseudonym(
+                        pseudonym_seed, pid, length=_RANDOM_PSEUDONYM_LENGTH
                     )
-                pseudonym = random_pseudonyms[study_uid]
+                pseudonym = pseudonyms[study_uid]
             else:
                 pseudonym = ""
 
@@ -430,6 +587,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                     partition_key=self.mass_task.partition_key,
                     patient_id=series.patient_id,
                     pseudonym=pseudonym,
+                    pseudonym_seed=pseudonym_seed,
                     accession_number=series.accession_number,
                     study_instance_uid=series.study_instance_uid,
                     series_instance_uid=series.series_instance_uid,
@@ -444,7 +602,10 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                 )
             )
 
-        return MassTransferVolume.objects.bulk_create(volumes)
+        with transaction.atomic():
+            volumes = MassTransferVolume.objects.bulk_create(volumes)
+            job.add_volume_counts({MassTransferVolume.Status.PENDING: len(volumes)})
+        return volumes
 
     @staticmethod
     def _group_volumes(
@@ -458,73 +619,342 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
             )
         return grouped
 
-    def _transfer_grouped_series(
+    def _create_discovered_volumes(
+        self,
+        discovered_studies: Iterable[list[DiscoveredSeries]],
+        job: MassTransferJob,
+        pseudonymizer: Pseudonymizer | None,
+        pseudonyms: dict[str, str],
+        pseudonym_seeds: dict[str, str],
+        kept_volumes: dict[str, MassTransferVolume],
+        output_base: Path | None,
+        checksum: str,
+    ) -> Iterator[list[MassTransferVolume]]:
+        """Create PENDING volumes for the series of the studies while they are discovered
+        (so they appear in the UI immediately).
+
+        The series of the kept volumes are not created again. Once the discovery is
+        complete, the kept volumes that were not discovered again (as the filters
+        changed) are deleted and the checksum of the discovery is saved.
+        """
+        discovered_uids: set[str] = set()
+        for discovered in discovered_studies:
+            new_series: list[DiscoveredSeries] = []
+            for series in discovered:
+                discovered_uids.add(series.series_instance_uid)
+                if series.series_instance_uid not in kept_volumes:
+                    new_series.append(series)
+
+            if new_series:
+                yield self._create_pending_volumes(
+                    new_series, job, pseudonymizer, pseudonyms, pseudonym_seeds
+                )
+
+        outdated_volumes = [
+            kept_volumes.pop(series_uid)
+            for series_uid in list(kept_volumes)
+            if series_uid not in discovered_uids
+        ]
+        if outdated_volumes:
+            self._delete_volumes(outdated_volumes, job)
+            if output_base:
+                for volume in outdated_volumes:
+                    shutil.rmtree(self._series_output_path(volume, output_base), ignore_errors=True)
+
+        self.mass_task.discovery_checksum = checksum
+        self.mass_task.save(update_fields=["discovery_checksum"])
+
+    def _transfer_volumes(
         self,
         operator: DicomOperator,
-        grouped_volumes: dict[str, dict[str, list[MassTransferVolume]]],
+        volume_batches: Iterable[list[MassTransferVolume]],
         job: MassTransferJob,
         pseudonymizer: Pseudonymizer | None,
         output_base: Path | None,
         dest_operator: DicomOperator | None = None,
+        kept_volumes: dict[str, MassTransferVolume] | None = None,
     ) -> dict:
-        """Transfer all grouped series.
+        """Transfer the PENDING volumes study by study, updating each volume in place.
 
-        Iterates patients -> studies -> volumes, updating each volume in place.
+        The volume batches may be created while the studies are still discovered. The
+        kept volumes (transferred by a previous attempt) are only counted, which
+        happens after all batches were transferred.
         """
         total_processed = 0
         total_skipped = 0
         total_failed = 0
         total_volumes = 0
-        study_count = 0
+        transferred_studies = 0
+        study_uids: set[str] = set()
         failed_reasons: dict[str, int] = {}
-
-        for patient_id, studies in grouped_volumes.items():
-            for study_uid, volumes_list in studies.items():
-                study_count += 1
-
-                if study_count > 1:
-                    # Pacing delay between consecutive studies. Each study opens a
-                    # fresh association and switches patient/study context, which is
-                    # where a busy PACS is most likely to reject or drop requests.
-                    # Series inside the same study fetch back-to-back over the already
-                    # open association.
-                    # TODO: Investigate if this is still necessary.
-                    time.sleep(_DELAY_BETWEEN_STUDIES)
-
-                # One fetch association per study
-                try:
-                    for volume in volumes_list:
-                        total_volumes += 1
-
-                        subject_id = volume.pseudonym or sanitize_filename(volume.patient_id)
-                        self._transfer_single_series(
-                            operator,
-                            volume,
-                            job,
-                            pseudonymizer,
-                            subject_id,
-                            output_base,
-                            dest_operator,
+        rate_controller = RateController(operator.server)
+
+        for volumes in volume_batches:
+            for studies in self._group_volumes(volumes).values():
+                for study_uid, volumes_list in studies.items():
+                    study_uids.add(study_uid)
+                    transferred_studies += 1
+
+                    if transferred_studies > 1:
+                        # Pacing delay between consecutive studies. Each study switches
+                        # the patient/study context (and may need a new association
+                        # if the pooled one was dropped), which is where a busy PACS is
+                        # most likely to reject or drop requests. Series inside the
+                        # same study fetch back-to-back over the same association.
+                        rate_controller.wait()
+
+                    retriable_errors = self._retriable_errors
+                    fetch_seconds = self._fetch_seconds
+
+                    # One fetch association per study
+                    try:
+                        for volume in volumes_list:
+                            total_volumes += 1
+
+                            subject_id = volume.pseudonym or sanitize_filename(volume.patient_id)
+                            self._transfer_single_series(
+                                operator,
+                                volume,
+                                job,
+                                pseudonymizer,
+                                subject_id,
+                                output_base,
+                                dest_operator,
+                            )
+
+                            if volume.status == MassTransferVolume.Status.ERROR:
+                                total_failed += 1
+                                reason = (
+                                    _short_error_reason(volume.log) if volume.log else "Unknown"
+                                )
+                                failed_reasons[reason] = failed_reasons.get(reason, 0) + 1
+                            elif volume.status == MassTransferVolume.Status.SKIPPED:
+                                total_skipped += 1
+                            else:
+                                total_processed += 1
+                    except RetriableDicomError:
+                        rate_controller.record_congestion()
+                        raise
+                    finally:
+                        operator.close()
+
+                    if self._retriable_errors > retriable_errors:
+                        # Series given up on the final attempt
+                        rate_controller.record_congestion()
+                    else:
+                        # Only the fetching is measured, as a slow conversion or
+                        # destination says nothing about the source server.
+                        image_count = sum(volume.number_of_images for volume in volumes_list)
+                        rate_controller.record_latency(
+                            (self._fetch_seconds - fetch_seconds) / max(image_count, 1)
                         )
 
-                        if volume.status == MassTransferVolume.Status.ERROR:
-                            total_failed += 1
-                            reason = _short_error_reason(volume.log) if volume.log else "Unknown"
-                            failed_reasons[reason] = failed_reasons.get(reason, 0) + 1
-                        elif volume.status == MassTransferVolume.Status.SKIPPED:
-                            total_skipped += 1
-                        else:
-                            total_processed += 1
-                finally:
-                    operator.close()
+        total_kept = 0
+        for volume in (kept_volumes or {}).values():
+            total_kept += 1
+            total_volumes += 1
+            study_uids.add(volume.study_instance_uid)
+            if volume.status == MassTransferVolume.Status.SKIPPED:
+                total_skipped += 1
+            else:
+                total_processed += 1
 
         return self._build_task_summary(
             total_volumes,
-            study_count,
+            len(study_uids),
             total_processed,
             total_skipped,
             total_failed,
             failed_reasons,
+            total_kept,
+        )
+
+    def _keep_transferred_volumes(
+        self,
+        volumes: list[MassTransferVolume],
+        job: MassTransferJob,
+        pseudonymizer: Pseudonymizer | None,
+        output_base: Path | None,
+        dest_operator: DicomOperator | None,
+    ) -> dict[str, MassTransferVolume]:
+        """Return the volumes of a previous attempt (by series UID) that don't have to be
+        transferred again.
+
+        Exported and converted volumes are only kept if their images (or NIfTI files)
+        are still completely at the destination. Skipped volumes are always kept.
+        """
+        exported_to_server: set[str] = set()
+        if dest_operator:
+            exported_to_server = self._find_series_on_server(
+                dest_operator,
+                [v for v in volumes if v.status == MassTransferVolume.Status.EXPORTED],
+            )
+
+        kept_volumes: dict[str, MassTransferVolume] = {}
+        for volume in volumes:
+            if volume.status == MassTransferVolume.Status.SKIPPED:
+                kept = True
+            elif volume.status == MassTransferVolume.Status.CONVERTED:
+                converted_files = [Path(f) for f in volume.converted_file.splitlines() if f]
+                kept = bool(converted_files) and all(f.is_file() for f in converted_files)
+            elif volume.status == MassTransferVolume.Status.EXPORTED:
+                if dest_operator:
+                    kept = volume.series_instance_uid in exported_to_server
+                else:
+                    kept = output_base is not None and self._is_exported_to_folder(
+                        volume, output_base
+                    )
+            else:
+                kept = False
+
+            if kept:
+                kept_volumes[volume.series_instance_uid] = volume
+
+        if pseudonymizer and not job.pseudonym_salt:
+            # The UIDs of volumes without a stored seed (created by an older version)
+            # are pseudonymized randomly by each attempt, so the series of such a study
+            # can only be kept together
+            incomplete_studies = {
+                volume.study_instance_uid
+                for volume in volumes
+                if not volume.pseudonym_seed and volume.series_instance_uid not in kept_volumes
+            }
+            kept_volumes = {
+                series_uid: volume
+                for series_uid, volume in kept_volumes.items()
+                if volume.study_instance_uid not in incomplete_studies
+            }
+
+        return kept_volumes
+
+    def _is_exported_to_folder(self, volume: MassTransferVolume, output_base: Path) -> bool:
+        """Whether the output folder of the volume contains (at least) all its images."""
+        output_path = self._series_output_path(volume, output_base)
+        if not output_path.is_dir():
+            return False
+        image_count = sum(1 for _ in output_path.glob("*.dcm"))
+        # Without the number of images in the source the export can't be verified
+        return volume.number_of_images > 0 and image_count >= volume.number_of_images
+
+    def _find_series_on_server(
+        self,
+        dest_operator: DicomOperator,
+        volumes: list[MassTransferVolume],
+    ) -> set[str]:
+        """Return the series UIDs of the volumes whose images are all on the destination
+        server (queried once per study, and once per series if the server doesn't return
+        the number of images of a series)."""
+        volumes_of_studies: dict[tuple[str, str], list[MassTransferVolume]] = {}
+        for volume in volumes:
+            patient_id = volume.pseudonym or volume.patient_id
+            study_uid = volume.study_instance_uid_pseudonymized or volume.study_instance_uid
+            volumes_of_studies.setdefault((patient_id, study_uid), []).append(volume)
+
+        found: set[str] = set()
+        for (patient_id, study_uid), study_volumes in volumes_of_studies.items():
+            query = QueryDataset.create(PatientID=patient_id, StudyInstanceUID=study_uid)
+            try:
+                image_counts = {
+                    series.SeriesInstanceUID: _parse_int(
+                        series.get("NumberOfSeriesRelatedInstances")
+                    )
+                    for series in dest_operator.find_series(query)
+                }
+            except DicomError:
+                logger.warning(
+                    "Failed to query the series of study %s on the destination server.",
+                    study_uid,
+                    exc_info=True,
+                )
+                continue
+
+            for volume in study_volumes:
+                series_uid = volume.series_instance_uid_pseudonymized or volume.series_instance_uid
+                # Without the number of images in the source the transfer can't be verified
+                if series_uid not in image_counts or volume.number_of_images <= 0:
+                    continue
+                image_count = image_counts[series_uid]
+                if image_count is None:
+                    # Not every server returns the number of images of a series
+                    image_count = self._count_images_on_server(
+                        dest_operator, patient_id, study_uid, series_uid
+                    )
+                if image_count is not None and image_count >= volume.number_of_images:
+                    found.add(volume.series_instance_uid)
+
+        return found
+
+    def _count_images_on_server(
+        self,
+        dest_operator: DicomOperator,
+        patient_id: str,
+        study_uid: str,
+        series_uid: str,
+    ) -> int | None:
+        """Count the images of a series on the destination server (None if that fails)."""
+        query = QueryDataset.create(
+            PatientID=patient_id, StudyInstanceUID=study_uid, SeriesInstanceUID=series_uid
+        )
+        try:
+            return sum(1 for _ in dest_operator.find_images(query))
+        except DicomError:
+            logger.warning(
+                "Failed to query the images of series %s on the destination server.",
+                series_uid,
+                exc_info=True,
+            )
+            return None
+
+    def _reset_volumes(self, volumes: list[MassTransferVolume], job: MassTransferJob) -> None:
+        """Reset the volumes to PENDING so that they are transferred again."""
+        status_counts = Counter(volume.status for volume in volumes)
+        for volume in volumes:
+            volume.task = self.mass_task
+            volume.status = MassTransferVolume.Status.PENDING
+            volume.log = ""
+            volume.study_instance_uid_pseudonymized = ""
+            volume.series_instance_uid_pseudonymized = ""
+            volume.converted_file = ""
+
+        with transaction.atomic():
+            MassTransferVolume.objects.bulk_update(
+                volumes,
+                [
+                    "task",
+                    "status",
+                    "log",
+                    "study_instance_uid_pseudonymized",
+                    "series_instance_uid_pseudonymized",
+                    "converted_file",
+                ],
+            )
+            volume_counts = {status: -count for status, count in status_counts.items()}
+            volume_counts[MassTransferVolume.Status.PENDING] = volume_counts.get(
+                MassTransferVolume.Status.PENDING, 0
+            ) + len(volumes)
+            job.add_volume_counts(volume_counts)
+
+    def _delete_volumes(self, volumes: list[MassTransferVolume], job: MassTransferJob) -> None:
+        deleted_volumes = MassTransferVolume.objects.filter(
+            pk__in=[volume.pk for volume in volumes]
+        )
+        with transaction.atomic():
+            volume_counts = MassTransferVolume.count_by_status(deleted_volumes)
+            deleted_volumes.delete()
+            job.add_volume_counts({status: -count for status, count in volume_counts.items()})
+
+    def _series_output_path(self, volume: MassTransferVolume, output_base: Path) -> Path:
+        subject_id = volume.pseudonym or sanitize_filename(volume.patient_id)
+        return (
+            output_base
+            / self.mass_task.partition_key
+            / subject_id
+            / _study_folder_name(volume.study_description, volume.study_datetime)
+            / _series_folder_name(
+                volume.series_description,
+                volume.series_number,
+                volume.series_instance_uid,
+            )
         )
 
     def _is_final_attempt(self) -> bool:
@@ -562,22 +992,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                 )
             else:
                 assert output_base is not None
-                study_folder = _study_folder_name(
-                    volume.study_description,
-                    volume.study_datetime,
-                )
-                series_folder = _series_folder_name(
-                    volume.series_description,
-                    volume.series_number,
-                    volume.series_instance_uid,
-                )
-                output_path = (
-                    output_base
-                    / self.mass_task.partition_key
-                    / subject_id
-                    / study_folder
-                    / series_folder
-                )
+                output_path = self._series_output_path(volume, output_base)
 
                 if job.convert_to_nifti:
                     if volume.modality in settings.MODALITIES_EXCLUDED_FROM_NIFTI_CONVERSION:
@@ -604,6 +1019,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                         output_path,
                     )
         except RetriableDicomError as err:
+            self._retriable_errors += 1
             volume.status = MassTransferVolume.Status.ERROR
             if self._is_final_attempt():
                 # Final attempt: don't abort the whole partition for one dead
@@ -635,16 +1051,18 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                 volume.status = MassTransferVolume.Status.ERROR
                 volume.log = "Internal error: volume status was not updated after transfer."
             try:
-                volume.save(
-                    update_fields=[
-                        "status",
-                        "log",
-                        "study_instance_uid_pseudonymized",
-                        "series_instance_uid_pseudonymized",
-                        "converted_file",
-                        "updated",
-                    ]
-                )
+                with transaction.atomic():
+                    volume.save(
+                        update_fields=[
+                            "status",
+                            "log",
+                            "study_instance_uid_pseudonymized",
+                            "series_instance_uid_pseudonymized",
+                            "converted_file",
+                            "updated",
+                        ]
+                    )
+                    job.add_volume_counts({MassTransferVolume.Status.PENDING: -1, volume.status: 1})
             except Exception:
                 logger.exception(
                     "Failed to save volume %s status to database",
@@ -729,32 +1147,29 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         subject_id: str,
         dest_operator: DicomOperator,
     ) -> None:
-        """Export a series to a temp dir and upload to a destination server.
+        """Export a series directly to a destination server.
 
+        The images are uploaded while they are fetched (see StreamingUploader).
         Updates volume fields in place (status, pseudonymized UIDs).
         """
-        with tempfile.TemporaryDirectory(prefix="adit_") as tmpdir:
-            tmp_path = Path(tmpdir)
-            image_count, study_uid_pseudonymized, series_uid_pseudonymized = self._export_series(
+        with StreamingUploader(dest_operator) as uploader:
+            image_count, study_uid_pseudonymized, series_uid_pseudonymized = self._fetch_series(
                 operator,
                 volume,
-                tmp_path,
                 subject_id,
                 pseudonymizer,
+                uploader.put,
             )
 
-            if image_count == 0:
-                self._set_zero_image_status(
-                    volume, study_uid_pseudonymized, series_uid_pseudonymized
-                )
-                return
+        if image_count == 0:
+            self._set_zero_image_status(volume, study_uid_pseudonymized, series_uid_pseudonymized)
+            return
 
-            logger.debug(
-                "Uploading %d images for series %s to destination server",
-                image_count,
-                volume.series_instance_uid,
-            )
-            dest_operator.upload_images(tmp_path)
+        logger.debug(
+            "Uploaded %d images for series %s to destination server",
+            image_count,
+            volume.series_instance_uid,
+        )
 
         volume.study_instance_uid_pseudonymized = study_uid_pseudonymized
         volume.series_instance_uid_pseudonymized = series_uid_pseudonymized
@@ -786,6 +1201,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         total_skipped: int,
         total_failed: int,
         failed_reasons: dict[str, int],
+        total_kept: int = 0,
     ) -> dict:
         """Build the final status dict returned to the task processor."""
         log_lines = [
@@ -794,6 +1210,8 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
             f"Series found: {total_volumes}",
             f"Processed: {total_processed}",
         ]
+        if total_kept:
+            log_lines.append(f"Kept from previous attempts: {total_kept}")
         if total_skipped:
             log_lines.append(f"Skipped: {total_skipped}")
         if total_failed:
@@ -828,11 +1246,40 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
             "log": "\n".join(log_lines),
         }
 
+    def _discover_studies(
+        self,
+        server: DicomServer,
+        filters: list[FilterSpec],
+    ) -> Iterator[list[DiscoveredSeries]]:
+        """Discover the matching series grouped by their study (in the order of their
+        discovery) over a separate operator of the source server."""
+        operator = DicomOperator(server, persistent=True)
+        try:
+            series_of_study: list[DiscoveredSeries] = []
+            for series in self._discover_series(operator, filters):
+                if (
+                    series_of_study
+                    and series.study_instance_uid != series_of_study[0].study_instance_uid
+                ):
+                    yield series_of_study
+                    series_of_study = []
+                series_of_study.append(series)
+
+            if series_of_study:
+                yield series_of_study
+        finally:
+            operator.close()
+
     def _discover_series(
         self,
         operator: DicomOperator,
         filters: list[FilterSpec],
-    ) -> list[DiscoveredSeries]:
+    ) -> Iterator[DiscoveredSeries]:
+        """Discover the matching series study by study.
+
+        The series are yielded as soon as the series of their study are queried, so
+        that they can be transferred while the following studies are discovered.
+        """
         start = self.mass_task.partition_start
         end = self.mass_task.partition_end
 
@@ -842,90 +1289,92 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         if not include_filters:
             raise DicomError("Mass transfer requires at least one include filter.")
 
-        found: dict[str, DiscoveredSeries] = {}
-
-        for mf in include_filters:
-            studies = self._find_studies(operator, mf, start, end)
+        # The UIDs of the series already found by a previous study or filter
+        found: set[str] = set()
 
-            for study in studies:
-                if mf.modality and mf.modality not in study.ModalitiesInStudy:
-                    continue
-
-                if mf.study_description and not _dicom_match(
-                    mf.study_description, study.StudyDescription
-                ):
-                    continue
+        # The series of the studies by their StudyInstanceUID. A study is queried at
+        # most once, even if it is needed for the institution check and the series
+        # expansion of multiple filters (only then the series are kept for the
+        # following filters).
+        series_of_studies: dict[str, list[ResultDataset]] = {}
 
-                if mf.institution_name and mf.apply_institution_on_study:
-                    if not self._study_has_institution(operator, study, mf.institution_name):
-                        continue
-
-                # Exact client-side age filtering using actual StudyDate and
-                # PatientBirthDate (the query birth date range is approximate).
-                birth_date = study.PatientBirthDate
-                has_age_filter = mf.min_age is not None or mf.max_age is not None
-                if birth_date and study.StudyDate and has_age_filter:
-                    age = _age_at_study(birth_date, study.StudyDate)
-                    if mf.min_age is not None and age < mf.min_age:
-                        continue
-                    if mf.max_age is not None and age > mf.max_age:
-                        continue
-
-                series_query = QueryDataset.create(
-                    PatientID=study.PatientID,
-                    StudyInstanceUID=study.StudyInstanceUID,
+        for mf in include_filters:
+            studies = [
+                study
+                for study in self._find_studies(operator, mf, start, end)
+                if _study_matches_filter(study, mf)
+            ]
+
+            for chunk in batched(studies, _SERIES_QUERY_CHUNK_SIZE):
+                chunk_series: dict[str, list[ResultDataset]] = {}
+                unqueried_studies: dict[str, ResultDataset] = {}
+                for study in chunk:
+                    study_uid = str(study.StudyInstanceUID)
+                    if study_uid in series_of_studies:
+                        chunk_series[study_uid] = series_of_studies[study_uid]
+                    else:
+                        unqueried_studies[study_uid] = study
+                chunk_series.update(
+                    zip(
+                        unqueried_studies,
+                        self._find_series_of_studies(operator, list(unqueried_studies.values())),
+                        strict=True,
+                    )
                 )
-                series_query.dataset.InstitutionName = ""
-
-                series_list = list(operator.find_series(series_query))
-
-                for series in series_list:
-                    series_uid = series.SeriesInstanceUID
-                    if not series_uid:
-                        continue
-
-                    if series_uid in found:
-                        continue
-
-                    series_number = _parse_int(series.get("SeriesNumber"), default=None)
-                    study_dt = _study_datetime(study)
-                    discovered = DiscoveredSeries(
-                        patient_id=str(study.PatientID),
-                        accession_number=str(study.get("AccessionNumber", "")),
-                        study_instance_uid=str(study.StudyInstanceUID),
-                        series_instance_uid=str(series_uid),
-                        modality=str(series.Modality),
-                        study_description=str(study.get("StudyDescription", "")),
-                        series_description=str(series.get("SeriesDescription", "")),
-                        series_number=series_number,
-                        study_datetime=study_dt,
-                        institution_name=str(series.get("InstitutionName", "")),
-                        number_of_images=_parse_int(
-                            series.get("NumberOfSeriesRelatedInstances"), default=0
+                if len(include_filters) > 1:
+                    series_of_studies.update(chunk_series)
+
+                for study in chunk:
+                    series_list = chunk_series[str(study.StudyInstanceUID)]
+
+                    if mf.institution_name and mf.apply_institution_on_study:
+                        if not _series_have_institution(series_list, mf.institution_name):
+                            continue
+
+                    for series in series_list:
+                        series_uid = series.SeriesInstanceUID
+                        if not series_uid:
+                            continue
+
+                        if series_uid in found:
+                            continue
+
+                        series_number = _parse_int(series.get("SeriesNumber"), default=None)
+                        study_dt = _study_datetime(study)
+                        discovered = DiscoveredSeries(
+                            patient_id=str(study.PatientID),
+                            accession_number=str(study.get("AccessionNumber", "")),
+                            study_instance_uid=str(study.StudyInstanceUID),
+                            series_instance_uid=str(series_uid),
+                            modality=str(series.Modality),
+                            study_description=str(study.get("StudyDescription", "")),
+                            series_description=str(series.get("SeriesDescription", "")),
+                            series_number=series_number,
+                            study_datetime=study_dt,
+                            institution_name=str(series.get("InstitutionName", "")),
+                            number_of_images=_parse_int(
+                                series.get("NumberOfSeriesRelatedInstances"), default=0
+                            )
+                            or 0,
+                            patient_birth_date=study.PatientBirthDate,
                         )
-                        or 0,
-                        patient_birth_date=birth_date,
-                    )
 
-                    if not _series_matches_filter(
-                        discovered,
-                        mf,
-                        check_institution=not mf.apply_institution_on_study,
-                    ):
-                        continue
+                        if not _series_matches_filter(
+                            discovered,
+                            mf,
+                            check_institution=not mf.apply_institution_on_study,
+                        ):
+                            continue
 
-                    found[series_uid] = discovered
+                        found.add(series_uid)
 
-        if not exclude_filters:
-            return list(found.values())
+                        if any(
+                            _series_matches_filter(discovered, exclude_filter, age_permissive=True)
+                            for exclude_filter in exclude_filters
+                        ):
+                            continue
 
-        return [
-            series
-            for series in found.values()
-            if not any(
-                _series_matches_filter(series, mf, age_permissive=True) for mf in exclude_filters
-            )
-        ]
+                        yield discovered
 
     def _find_studies(
         self,
@@ -935,6 +1384,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         end: datetime,
     ) -> list[ResultDataset]:
         max_results = operator.server.max_search_results
+        window_stats = StudyWindowStats(operator.server, _study_query_key(mf))
 
         # DICOM applies StudyTime independently per day, so a cross-midnight
         # range like Date=20250227-20250228 Time=234500-000730 does NOT mean
@@ -949,79 +1399,142 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
             if days_apart <= 1:
                 # Cross-midnight: split at midnight boundary
                 midnight = datetime.combine(end.date(), datetime.min.time(), tzinfo=end.tzinfo)
-                left = self._find_studies(operator, mf, start, midnight - timedelta(seconds=1))
-                right = self._find_studies(operator, mf, midnight, end)
-
-                seen: set[str] = {str(s.StudyInstanceUID) for s in left}
-                for study in right:
-                    if str(study.StudyInstanceUID) not in seen:
-                        left.append(study)
-                        seen.add(str(study.StudyInstanceUID))
-
-                return left
+                return merge_results(
+                    [
+                        self._find_studies(operator, mf, start, midnight - timedelta(seconds=1)),
+                        self._find_studies(operator, mf, midnight, end),
+                    ],
+                    "StudyInstanceUID",
+                )
 
             # Multi-day: full-day times, splitting will narrow by date
             study_time = (datetime.min.time(), datetime.max.time().replace(microsecond=0))
         else:
             study_time = (start.time(), end.time())
 
-        birth_range = _birth_date_range(
-            start.date(),
-            end.date(),
-            mf.min_age,
-            mf.max_age,
-        )
-        birth_date_kwarg: dict[str, tuple[date, date]] = {}
-        if birth_range:
-            birth_date_kwarg["PatientBirthDate"] = birth_range
-        query = QueryDataset.create(
-            StudyDate=(start.date(), end.date()),
-            StudyTime=study_time,
-            **birth_date_kwarg,  # type: ignore[arg-type]
+        # Split the window up front if the study density learned from previous queries
+        # suggests that it exceeds the limit anyway (see study_windows.py)
+        windows = window_stats.split(
+            start, end, max_results * settings.MASS_TRANSFER_STUDY_WINDOW_FILL
         )
+        if len(windows) > 1:
+            return merge_results(
+                (
+                    self._find_studies(operator, mf, window_start, window_end)
+                    for window_start, window_end in windows
+                ),
+                "StudyInstanceUID",
+            )
 
-        if mf.modality:
-            query.dataset.ModalitiesInStudy = mf.modality
-        if mf.study_description:
-            query.dataset.StudyDescription = mf.study_description
+        splittable = end - start >= _MIN_SPLIT_WINDOW
+
+        # A window whose query is known to exceed the limit is not queried again
+        known_count = window_stats.get_count(start, end)
+        if splittable and known_count is not None and known_count > max_results:
+            studies = None
+        else:
+            birth_range = _birth_date_range(
+                start.date(),
+                end.date(),
+                mf.min_age,
+                mf.max_age,
+            )
+            birth_date_kwarg: dict[str, tuple[date, date]] = {}
+            if birth_range:
+                birth_date_kwarg["PatientBirthDate"] = birth_range
+            query = QueryDataset.create(
+                StudyDate=(start.date(), end.date()),
+                StudyTime=study_time,
+                **birth_date_kwarg,  # type: ignore[arg-type]
+            )
+
+            if mf.modality:
+                query.dataset.ModalitiesInStudy = mf.modality
+            if mf.study_description:
+                query.dataset.StudyDescription = mf.study_description
 
-        studies = list(operator.find_studies(query, limit_results=max_results + 1))
+            studies = list(operator.find_studies(query, limit_results=max_results + 1))
+            window_stats.record(start, end, studies)
 
-        if len(studies) > max_results:
-            if end - start < _MIN_SPLIT_WINDOW:
-                raise DicomError(f"Time window too small ({start} to {end}) for filter {mf}.")
+            if len(studies) <= max_results:
+                return studies
 
-            mid = start + (end - start) / 2
-            left = self._find_studies(operator, mf, start, mid)
-            right = self._find_studies(operator, mf, mid + timedelta(seconds=1), end)
+        if not splittable:
+            return self._find_studies_by_modality(operator, mf, start, end, studies or [])
 
-            seen: set[str] = {str(s.StudyInstanceUID) for s in left}
-            for study in right:
-                if str(study.StudyInstanceUID) not in seen:
-                    left.append(study)
-                    seen.add(str(study.StudyInstanceUID))
+        mid = start + (end - start) / 2
+        return merge_results(
+            [
+                self._find_studies(operator, mf, start, mid),
+                self._find_studies(operator, mf, mid + timedelta(seconds=1), end),
+            ],
+            "StudyInstanceUID",
+        )
+
+    def _find_studies_by_modality(
+        self,
+        operator: DicomOperator,
+        mf: FilterSpec,
+        start: datetime,
+        end: datetime,
+        truncated_studies: list[ResultDataset],
+    ) -> list[ResultDataset]:
+        """Find the studies of a window that can't be narrowed any further by querying
+        them modality by modality.
+
+        Besides the modalities of `MASS_TRANSFER_SPLIT_MODALITIES` the modalities of the
+        (truncated) results of the whole window are queried. If a study of those
+        results is still missing afterwards, the studies can't be found completely.
+        """
+        if mf.modality:
+            raise DicomError(f"Time window too small ({start} to {end}) for filter {mf}.")
 
-            return left
+        modalities = set(settings.MASS_TRANSFER_SPLIT_MODALITIES)
+        for study in truncated_studies:
+            modalities.update(modality for modality in study.ModalitiesInStudy if modality)
+
+        logger.info(
+            "Too many studies between %s and %s, querying them by %d modalities.",
+            start,
+            end,
+            len(modalities),
+        )
+        studies = merge_results(
+            (
+                self._find_studies(operator, replace(mf, modality=modality), start, end)
+                for modality in sorted(modalities)
+            ),
+            "StudyInstanceUID",
+        )
+
+        study_uids = {str(study.StudyInstanceUID) for study in studies}
+        if any(str(study.StudyInstanceUID) not in study_uids for study in truncated_studies):
+            raise DicomError(
+                f"Time window too small ({start} to {end}) for filter {mf} "
+                "(and not all studies found by modality)."
+            )
 
         return studies
 
-    def _study_has_institution(
+    def _find_series_of_studies(
         self,
         operator: DicomOperator,
-        study: ResultDataset,
-        institution_name: str,
-    ) -> bool:
-        series_query = QueryDataset.create(
-            PatientID=study.PatientID,
-            StudyInstanceUID=study.StudyInstanceUID,
-        )
-        series_query.dataset.InstitutionName = ""
+        studies: list[ResultDataset],
+    ) -> list[list[ResultDataset]]:
+        """Returns the series of the studies in the order of the studies.
 
-        series_list = list(operator.find_series(series_query))
-        return any(
-            _dicom_match(institution_name, series.get("InstitutionName", None))
-            for series in series_list
-        )
+        The series queries are sent concurrently (see run_queries).
+        """
+        queries: list[QueryDataset] = []
+        for study in studies:
+            series_query = QueryDataset.create(
+                PatientID=study.PatientID,
+                StudyInstanceUID=study.StudyInstanceUID,
+            )
+            series_query.dataset.InstitutionName = ""
+            queries.append(series_query)
+
+        return run_queries(operator, "find_series", queries)
 
     def _export_series(
         self,
@@ -1036,16 +1549,68 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         Returns (image_count, pseudonymized_study_uid, pseudonymized_series_uid).
         """
         output_path.mkdir(parents=True, exist_ok=True)
+        transfer_syntax = self._folder_transfer_syntax()
+
+        def write_image(ds: Dataset) -> None:
+            if transfer_syntax:
+                transcode_dataset(ds, transfer_syntax)
+            file_path = output_path / sanitize_filename(f"{ds.SOPInstanceUID}.dcm")
+            # Written under a temporary name first, so that an image cut off by a crash
+            # is not taken for an exported one when the transfer is resumed
+            partial_path = file_path.with_name(f"{file_path.name}.partial")
+            write_dataset(ds, partial_path)
+            partial_path.replace(file_path)
+
+        image_count, study_uid_pseudonymized, series_uid_pseudonymized = self._fetch_series(
+            operator, volume, subject_id, pseudonymizer, write_image
+        )
+
+        if image_count == 0:
+            try:
+                if output_path.exists() and not any(output_path.iterdir()):
+                    output_path.rmdir()
+            except OSError:
+                logger.debug("Failed to remove empty directory %s", output_path, exc_info=True)
+
+        return image_count, study_uid_pseudonymized, series_uid_pseudonymized
 
+    def _folder_transfer_syntax(self) -> str:
+        """The transfer syntax a folder destination wants the images to be stored in."""
+        destination = self.mass_task.destination
+        if (
+            destination.node_type != DicomNode.NodeType.FOLDER
+            or self.mass_task.job.convert_to_nifti
+        ):
+            # Images converted to NIfTI are only stored temporarily
+            return ""
+        return destination.dicomfolder.transfer_syntax
+
+    def _fetch_series(
+        self,
+        operator: DicomOperator,
+        volume: MassTransferVolume,
+        subject_id: str,
+        pseudonymizer: Pseudonymizer | None,
+        handle_image: Callable[[Dataset], None],
+    ) -> tuple[int, str, str]:
+        """Fetch (and pseudonymize) the images of a series and pass them to handle_image.
+
+        Returns (image_count, pseudonymized_study_uid, pseudonymized_series_uid).
+        """
+        if pseudonymizer and volume.pseudonym_seed:
+            pseudonymizer = self._get_seeded_pseudonymizer(volume.pseudonym_seed)
         manipulator = DicomManipulator(pseudonymizer=pseudonymizer) if pseudonymizer else None
         image_count = 0
         study_uid_pseudonymized = ""
         series_uid_pseudonymized = ""
+        handling_seconds = 0.0
 
         def callback(ds: Dataset | None) -> None:
             nonlocal image_count, study_uid_pseudonymized, series_uid_pseudonymized
+            nonlocal handling_seconds
             if ds is None:
                 return
+            started = time.monotonic()
             if manipulator:
                 job = self.mass_task.job
                 manipulator.manipulate(
@@ -1057,9 +1622,24 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                 if not study_uid_pseudonymized:
                     study_uid_pseudonymized = str(ds.StudyInstanceUID)
                     series_uid_pseudonymized = str(ds.SeriesInstanceUID)
-            file_name = sanitize_filename(f"{ds.SOPInstanceUID}.dcm")
-            write_dataset(ds, output_path / file_name)
+            handle_image(ds)
             image_count += 1
+            handling_seconds += time.monotonic() - started
+
+        def fetch() -> None:
+            started = time.monotonic()
+            handled_before = handling_seconds
+            try:
+                operator.fetch_series(
+                    patient_id=volume.patient_id,
+                    study_uid=volume.study_instance_uid,
+                    series_uid=volume.series_instance_uid,
+                    callback=callback,
+                )
+            finally:
+                # The images are handled (e.g. written or uploaded) while they are fetched
+                elapsed = time.monotonic() - started
+                self._fetch_seconds += max(elapsed - (handling_seconds - handled_before), 0.0)
 
         # Reconciliation between the discovery and transfer phases: discovery
         # recorded volume.number_of_images from the PACS's own C-FIND response;
@@ -1070,12 +1650,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
         # failures are still handled by stamina/procrastinate at lower layers.
         # TODO: Revisit whether this belongs here, in the operator/connector
         # layer, or should be handled via a stamina retry on a raised exception.
-        operator.fetch_series(
-            patient_id=volume.patient_id,
-            study_uid=volume.study_instance_uid,
-            series_uid=volume.series_instance_uid,
-            callback=callback,
-        )
+        fetch()
         if image_count == 0 and volume.number_of_images > 0:
             logger.warning(
                 "Fetch returned 0 images for %s (PACS reports %d) — retrying in %ds",
@@ -1084,12 +1659,7 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                 settings.MASS_TRANSFER_FETCH_RECONCILIATION_DELAY,
             )
             time.sleep(settings.MASS_TRANSFER_FETCH_RECONCILIATION_DELAY)
-            operator.fetch_series(
-                patient_id=volume.patient_id,
-                study_uid=volume.study_instance_uid,
-                series_uid=volume.series_instance_uid,
-                callback=callback,
-            )
+            fetch()
 
         if image_count == 0 and volume.number_of_images > 0:
             logger.error(
@@ -1098,15 +1668,14 @@ class MassTransferTaskProcessor(DicomTaskProcessor):
                 volume.number_of_images,
             )
 
-        if image_count == 0:
-            try:
-                if output_path.exists() and not any(output_path.iterdir()):
-                    output_path.rmdir()
-            except OSError:
-                logger.debug("Failed to remove empty directory %s", output_path, exc_info=True)
-
         return image_count, study_uid_pseudonymized, series_uid_pseudonymized
 
+    def _get_seeded_pseudonymizer(self, seed: str) -> Pseudonymizer:
+        """The pseudonymizer of a randomly pseudonymized study (by its stored seed)."""
+        if seed not in self._seeded_pseudonymizers:
+            self._seeded_pseudonymizers[seed] = Pseudonymizer(seed=seed)
+        return self._seeded_pseudonymizers[seed]
+
     def _convert_series(
         self,
         volume: MassTransferVolume,
@@ -7,6 +7,7 @@ from procrastinate.contrib.django import app
 
 from adit.core.models import DicomJob, DicomTask
 from adit.core.tasks import DICOM_TASK_RETRY_STRATEGY, _run_dicom_task
+from adit.core.utils.model_utils import queue_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,7 @@ def queue_mass_transfer_tasks(job_id: int):
     """Queues all pending tasks for a mass transfer job.
 
     Runs on the default worker so that the HTTP view returns immediately
-    instead of blocking on thousands of individual defer() calls.
+    instead of blocking on queueing thousands of tasks (which are queued in batches).
     """
     from .models import MassTransferJob
 
@@ -48,19 +49,21 @@ def queue_mass_transfer_tasks(job_id: int):
         )
         return
 
+    priority = job.default_priority
+    if job.urgent:
+        priority = job.urgent_priority
+
     try:
-        for mass_task in job.tasks.filter(
-            status=DicomTask.Status.PENDING,
-            queued_job__isnull=True,  # Skip tasks already queued (idempotency guard)
-        ):
-            try:
-                mass_task.queue_pending_task()
-            except Exception:
-                logger.exception(
-                    "Failed to queue MassTransferTask %d for job %d",
-                    mass_task.pk,
-                    job_id,
-                )
-                raise
+        queue_tasks(
+            job.tasks.filter(
+                status=DicomTask.Status.PENDING,
+                queued_job__isnull=True,  # Skip tasks already queued (idempotency guard)
+            ),
+            "adit.mass_transfer.tasks.process_mass_transfer_task",
+            priority,
+        )
+    except Exception:
+        logger.exception("Failed to queue the tasks of MassTransferJob %d", job_id)
+        raise
     finally:
         db.close_old_connections()
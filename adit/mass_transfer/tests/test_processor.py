@@ -1,4 +1,5 @@
 import json
+import threading
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from types import SimpleNamespace
@@ -7,6 +8,7 @@ from unittest.mock import MagicMock
 import pytest
 from adit_radis_shared.accounts.factories import UserFactory
 from django.conf import settings
+from django.test import override_settings
 from django.utils import timezone
 from pydicom import Dataset
 from pytest_mock import MockerFixture
@@ -30,6 +32,7 @@ from adit.mass_transfer.processors import (
     _birth_date_range,
     _destination_base_dir,
     _dicom_match,
+    _discovery_checksum,
     _parse_int,
     _series_folder_name,
     _series_matches_filter,
@@ -317,7 +320,7 @@ def test_find_studies_cross_midnight_splits_at_midnight(mocker: MockerFixture):
     end = datetime(2024, 1, 2, 0, 15, 0)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
     # Two sub-queries: before midnight and after midnight
     operator.find_studies.side_effect = [
         [_make_study("1")],
@@ -359,6 +362,119 @@ def test_find_studies_preserves_order_with_unique_studies(mocker: MockerFixture)
     assert result_uids == ["1.2.1", "1.2.2", "1.2.3"]
 
 
+def _make_modality_study(study_uid: str, modality: str) -> ResultDataset:
+    study = _make_study(study_uid)
+    study.dataset.ModalitiesInStudy = [modality]
+    return study
+
+
+@override_settings(MASS_TRANSFER_SPLIT_MODALITIES=["CT", "MR"])
+def test_find_studies_falls_back_to_modalities_when_window_too_small(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    mf = _make_filter(modality="")
+
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    end = datetime(2024, 1, 1, 8, 10, 0)
+
+    def find_studies(query, limit_results=None):
+        modality = query.dataset.get("ModalitiesInStudy")
+        if modality is None:
+            return [_make_modality_study("1", "CT"), _make_modality_study("2", "US")]
+        return {
+            "CT": [_make_modality_study("1", "CT")],
+            "US": [_make_modality_study("2", "US")],
+        }.get(modality, [])
+
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_search_results=1)
+    operator.find_studies.side_effect = find_studies
+
+    result = processor._find_studies(operator, mf, start, end)
+
+    assert [str(s.StudyInstanceUID) for s in result] == ["1", "2"]
+    queried_modalities = [
+        call.args[0].dataset.get("ModalitiesInStudy")
+        for call in operator.find_studies.call_args_list[1:]
+    ]
+    # The configured modalities and the ones of the truncated results
+    assert queried_modalities == ["CT", "MR", "US"]
+
+
+@override_settings(MASS_TRANSFER_SPLIT_MODALITIES=["CT"])
+def test_find_studies_raises_when_modalities_miss_studies(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    mf = _make_filter(modality="")
+
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    end = datetime(2024, 1, 1, 8, 10, 0)
+
+    def find_studies(query, limit_results=None):
+        if query.dataset.get("ModalitiesInStudy") is None:
+            # A study without modalities in the results can't be found by a modality
+            study = _make_study("2")
+            study.dataset.ModalitiesInStudy = []
+            return [_make_study("1"), study]
+        return [_make_study("1")]
+
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_search_results=1)
+    operator.find_studies.side_effect = find_studies
+
+    with pytest.raises(DicomError, match="not all studies found by modality"):
+        processor._find_studies(operator, mf, start, end)
+
+
+def test_find_studies_splits_window_by_learned_density(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    mf = _make_filter(modality="CT")
+
+    start = datetime(2024, 1, 1, 0, 0, 0)
+    end = datetime(2024, 1, 1, 23, 59, 59)
+    noon = datetime(2024, 1, 1, 12, 0, 0)
+
+    window_stats = mocker.MagicMock()
+    window_stats.split.side_effect = lambda s, e, max_studies: (
+        [(start, noon - timedelta(seconds=1)), (noon, end)] if (s, e) == (start, end) else [(s, e)]
+    )
+    window_stats.get_count.return_value = None
+    mocker.patch("adit.mass_transfer.processors.StudyWindowStats", return_value=window_stats)
+
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_search_results=10)
+    operator.find_studies.side_effect = [[_make_study("1")], [_make_study("2")]]
+
+    result = processor._find_studies(operator, mf, start, end)
+
+    # The whole day is never queried as it is expected to exceed the limit
+    assert [str(s.StudyInstanceUID) for s in result] == ["1", "2"]
+    assert operator.find_studies.call_count == 2
+    assert window_stats.split.call_args_list[0].args == (start, end, 8)
+    assert window_stats.record.call_count == 2
+
+
+def test_find_studies_skips_query_of_window_known_to_exceed_limit(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    mf = _make_filter(modality="CT")
+
+    start = datetime(2024, 1, 1, 0, 0, 0)
+    end = datetime(2024, 1, 1, 23, 59, 59)
+
+    window_stats = mocker.MagicMock()
+    window_stats.split.side_effect = lambda s, e, max_studies: [(s, e)]
+    window_stats.get_count.side_effect = lambda s, e: 20 if (s, e) == (start, end) else None
+    mocker.patch("adit.mass_transfer.processors.StudyWindowStats", return_value=window_stats)
+
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_search_results=10)
+    operator.find_studies.side_effect = [[_make_study("1")], [_make_study("2")]]
+
+    result = processor._find_studies(operator, mf, start, end)
+
+    # Only the two halves are queried
+    assert [str(s.StudyInstanceUID) for s in result] == ["1", "2"]
+    assert operator.find_studies.call_count == 2
+
+
 # ---------------------------------------------------------------------------
 # _discover_series tests
 # ---------------------------------------------------------------------------
@@ -388,7 +504,7 @@ def test_discover_series_filters_by_modality(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT", "MR"]
@@ -400,7 +516,7 @@ def test_discover_series_filters_by_modality(mocker: MockerFixture):
 
     # Filter for MR only
     filters = [_make_filter(modality="MR")]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     assert len(result) == 1
     assert result[0].series_instance_uid == "1.2.3.202"
@@ -412,7 +528,7 @@ def test_discover_series_deduplicates_across_filters(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -423,7 +539,7 @@ def test_discover_series_deduplicates_across_filters(mocker: MockerFixture):
 
     # Two filters that both match the same series
     filters = [_make_filter(modality="CT"), _make_filter(modality="CT")]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     assert len(result) == 1
 
@@ -434,7 +550,7 @@ def test_discover_series_filters_by_series_description(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -445,7 +561,7 @@ def test_discover_series_filters_by_series_description(mocker: MockerFixture):
     operator.find_series.return_value = [axial, sagittal]
 
     filters = [_make_filter(modality="CT", series_description="Axial*")]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     assert len(result) == 1
     assert result[0].series_instance_uid == "1.2.3.401"
@@ -457,7 +573,7 @@ def test_discover_series_filters_by_min_instances(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -468,7 +584,7 @@ def test_discover_series_filters_by_min_instances(mocker: MockerFixture):
     operator.find_series.return_value = [big_series, small_series]
 
     filters = [_make_filter(modality="CT", min_number_of_series_related_instances=5)]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     assert len(result) == 1
     assert result[0].series_instance_uid == "1.2.3.501"
@@ -480,7 +596,7 @@ def test_discover_series_no_min_instances_filter_includes_all(mocker: MockerFixt
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -491,7 +607,7 @@ def test_discover_series_no_min_instances_filter_includes_all(mocker: MockerFixt
     operator.find_series.return_value = [big_series, small_series]
 
     filters = [_make_filter(modality="CT")]  # no min_number_of_series_related_instances
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     assert len(result) == 2
 
@@ -502,7 +618,7 @@ def test_discover_series_exclude_removes_matching_series(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -516,7 +632,7 @@ def test_discover_series_exclude_removes_matching_series(mocker: MockerFixture):
         _make_filter(modality="CT"),
         FilterSpec(mode="exclude", series_description="Localizer"),
     ]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     series_uids = {s.series_instance_uid for s in result}
     assert series_uids == {"1.2.3.601"}
@@ -530,7 +646,7 @@ def test_discover_series_exclude_is_case_insensitive(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -544,7 +660,7 @@ def test_discover_series_exclude_is_case_insensitive(mocker: MockerFixture):
         _make_filter(modality="CT"),
         FilterSpec(mode="exclude", series_description="*topo*"),
     ]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     series_uids = {s.series_instance_uid for s in result}
     assert series_uids == {"1.2.3.601"}
@@ -557,7 +673,7 @@ def test_discover_series_exclude_does_not_trigger_find(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -568,7 +684,7 @@ def test_discover_series_exclude_does_not_trigger_find(mocker: MockerFixture):
         _make_filter(modality="CT"),
         FilterSpec(mode="exclude", series_description="nonexistent"),
     ]
-    processor._discover_series(operator, filters)
+    list(processor._discover_series(operator, filters))
 
     # One include filter => one study-level query and one series-level query.
     # Excludes must not add additional PACS round-trips.
@@ -582,7 +698,7 @@ def test_discover_series_exclude_matches_any_of_multiple(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -598,7 +714,7 @@ def test_discover_series_exclude_matches_any_of_multiple(mocker: MockerFixture):
         FilterSpec(mode="exclude", series_description="Localizer"),
         FilterSpec(mode="exclude", series_description="Scout"),
     ]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     series_uids = {s.series_instance_uid for s in result}
     assert series_uids == {"1.2.3.801"}
@@ -611,11 +727,11 @@ def test_discover_series_rejects_all_exclude_filters(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     filters = [FilterSpec(mode="exclude", series_description="Scout")]
     with pytest.raises(DicomError, match="at least one include filter"):
-        processor._discover_series(operator, filters)
+        list(processor._discover_series(operator, filters))
 
 
 def test_discover_series_include_age_drops_unknown_birth_date(mocker: MockerFixture):
@@ -625,7 +741,7 @@ def test_discover_series_include_age_drops_unknown_birth_date(mocker: MockerFixt
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")  # no PatientBirthDate
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -633,7 +749,7 @@ def test_discover_series_include_age_drops_unknown_birth_date(mocker: MockerFixt
     operator.find_series.return_value = [_make_series_result("1.2.3.601")]
 
     filters = [_make_filter(modality="CT", min_age=18)]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     assert result == []
 
@@ -645,7 +761,7 @@ def test_discover_series_exclude_age_drops_unknown_birth_date(mocker: MockerFixt
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")  # no PatientBirthDate
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -656,7 +772,7 @@ def test_discover_series_exclude_age_drops_unknown_birth_date(mocker: MockerFixt
         _make_filter(modality="CT"),  # include without age constraint -> series enters `found`
         FilterSpec(mode="exclude", min_age=18),
     ]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     assert result == []
 
@@ -667,7 +783,7 @@ def test_discover_series_exclude_by_institution(mocker: MockerFixture):
     processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
 
     operator = mocker.create_autospec(DicomOperator)
-    operator.server = mocker.MagicMock(max_search_results=200)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
 
     study = _make_study("1.2.3.100")
     study.dataset.ModalitiesInStudy = ["CT"]
@@ -681,12 +797,67 @@ def test_discover_series_exclude_by_institution(mocker: MockerFixture):
         _make_filter(modality="CT", apply_institution_on_study=False),
         FilterSpec(mode="exclude", institution_name="External"),
     ]
-    result = processor._discover_series(operator, filters)
+    result = list(processor._discover_series(operator, filters))
 
     series_uids = {s.series_instance_uid for s in result}
     assert series_uids == {"1.2.3.901"}
 
 
+def test_discover_series_queries_series_of_study_once(mocker: MockerFixture):
+    """The institution check and the series expansion of all filters share the
+    series of a study."""
+    processor = _make_processor(mocker)
+    processor.mass_task.partition_start = datetime(2024, 1, 1, 0, 0)
+    processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
+
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=1)
+
+    study = _make_study("1.2.3.100")
+    study.dataset.ModalitiesInStudy = ["CT"]
+    operator.find_studies.return_value = [study]
+    operator.find_series.return_value = [
+        _make_series_result("1.2.3.911", series_description="Axial"),
+        _make_series_result("1.2.3.912", series_description="Coronal"),
+    ]
+
+    filters = [
+        _make_filter(modality="CT", institution_name="Radiology", series_description="Axial"),
+        _make_filter(modality="CT", institution_name="Radiology", series_description="Coronal"),
+    ]
+    result = list(processor._discover_series(operator, filters))
+
+    assert {s.series_instance_uid for s in result} == {"1.2.3.911", "1.2.3.912"}
+    assert operator.find_series.call_count == 1
+
+
+def test_discover_series_queries_series_concurrently(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    processor.mass_task.partition_start = datetime(2024, 1, 1, 0, 0)
+    processor.mass_task.partition_end = datetime(2024, 1, 1, 23, 59, 59)
+
+    operator = mocker.create_autospec(DicomOperator)
+    operator.server = mocker.MagicMock(max_search_results=200, max_parallel_queries=3)
+    operator.logs = []
+    operator.find_studies.return_value = [_make_study(f"1.2.3.{i}") for i in range(10)]
+
+    def find_series(query):
+        return [_make_series_result(f"{query.StudyInstanceUID}.1")]
+
+    thread_operator_class = mocker.patch("adit.core.utils.parallel_queries.DicomOperator")
+    thread_operator_class.return_value.find_series.side_effect = find_series
+
+    result = list(processor._discover_series(operator, [_make_filter(modality="CT")]))
+
+    # In the order of the studies
+    assert [s.series_instance_uid for s in result] == [f"1.2.3.{i}.1" for i in range(10)]
+    assert operator.find_series.call_count == 0
+    assert thread_operator_class.return_value.find_series.call_count == 10
+    assert 1 <= thread_operator_class.call_count <= 3
+    thread_operator_class.assert_called_with(operator.server, persistent=True)
+    assert thread_operator_class.return_value.close.call_count == thread_operator_class.call_count
+
+
 # ---------------------------------------------------------------------------
 # process() tests — mocked environment
 # ---------------------------------------------------------------------------
@@ -735,6 +906,8 @@ def _make_process_env(
         side_effect=lambda objs: objs,
     )
     mocker.patch.object(MassTransferVolume, "save")
+    # The volumes and their counts of the job are updated in transactions
+    mocker.patch("adit.mass_transfer.processors.transaction")
 
     return processor
 
@@ -775,10 +948,11 @@ def _make_process_env_server_dest(
     source_mock = mocker.MagicMock()
     if dest_operator is None:
         dest_operator = mocker.MagicMock()
-    # dest DicomOperator is created first, source second
+    # dest DicomOperator is created first, source second and the one of the
+    # (background) discovery last
     mocker.patch(
         "adit.mass_transfer.processors.DicomOperator",
-        side_effect=[dest_operator, source_mock],
+        side_effect=[dest_operator, source_mock, mocker.MagicMock()],
     )
 
     # Mock DB operations used by the processor
@@ -793,6 +967,8 @@ def _make_process_env_server_dest(
         side_effect=lambda objs: objs,
     )
     mocker.patch.object(MassTransferVolume, "save")
+    # The volumes and their counts of the job are updated in transactions
+    mocker.patch("adit.mass_transfer.processors.transaction")
 
     return processor, dest_operator
 
@@ -812,6 +988,115 @@ def test_process_reraises_retriable_dicom_error(mocker: MockerFixture, tmp_path:
         processor.process()
 
 
+def test_process_transfers_studies_while_discovering(mocker: MockerFixture, tmp_path: Path):
+    processor = _make_process_env(mocker, tmp_path)
+    first_exported = threading.Event()
+
+    def discover_series(operator, filters):
+        yield _make_discovered(study_uid="study-1", series_uid="s-1")
+        yield _make_discovered(study_uid="study-2", series_uid="s-2")
+        # Only discovered if the first study is transferred in the meantime
+        assert first_exported.wait(timeout=5)
+        yield _make_discovered(study_uid="study-3", series_uid="s-3")
+
+    def export_series(*args, **kwargs):
+        first_exported.set()
+        return _fake_export_success()
+
+    mocker.patch.object(processor, "_discover_series", side_effect=discover_series)
+    mocker.patch.object(processor, "_export_series", side_effect=export_series)
+
+    result = processor.process()
+
+    assert result["status"] == MassTransferTask.Status.SUCCESS
+    assert "Studies found: 3" in result["log"]
+    assert "Processed: 3" in result["log"]
+
+
+def test_process_reraises_discovery_error(mocker: MockerFixture, tmp_path: Path):
+    processor = _make_process_env(mocker, tmp_path)
+
+    def discover_series(operator, filters):
+        yield _make_discovered(study_uid="study-1", series_uid="s-1")
+        raise DicomError("Time window too small")
+
+    mocker.patch.object(processor, "_discover_series", side_effect=discover_series)
+    mocker.patch.object(processor, "_export_series", side_effect=_fake_export_success)
+
+    with pytest.raises(DicomError, match="Time window too small"):
+        processor.process()
+
+
+def test_process_paces_studies_by_server_health(mocker: MockerFixture, tmp_path: Path):
+    processor = _make_process_env(mocker, tmp_path)
+    processor.mass_task.attempts = settings.DICOM_TASK_MAX_ATTEMPTS
+    rate_controller = mocker.patch("adit.mass_transfer.processors.RateController").return_value
+    series = [
+        _make_discovered(study_uid="study-1", series_uid="s-1"),
+        _make_discovered(study_uid="study-2", series_uid="s-2"),
+        _make_discovered(study_uid="study-3", series_uid="s-3"),
+    ]
+    mocker.patch.object(processor, "_discover_series", return_value=series)
+
+    def fake_export(*args, **kwargs):
+        if args[1].series_instance_uid == "s-2":
+            raise RetriableDicomError("Association rejected")
+        return (1, "", "")
+
+    mocker.patch.object(processor, "_export_series", side_effect=fake_export)
+
+    processor.process()
+
+    # Before every study but the first one
+    assert rate_controller.wait.call_count == 2
+    assert rate_controller.record_latency.call_count == 2
+    assert rate_controller.record_congestion.call_count == 1
+
+
+def test_fetch_series_measures_only_the_source_fetch(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    clock = SimpleNamespace(now=0.0)
+    mocker.patch("adit.mass_transfer.processors.time.monotonic", side_effect=lambda: clock.now)
+    volume = MassTransferVolume(
+        series_instance_uid="s-1",
+        study_instance_uid="study-1",
+        patient_id="PAT1",
+        number_of_images=1,
+        study_datetime=timezone.now(),
+    )
+
+    def fetch_series(patient_id, study_uid, series_uid, callback):
+        clock.now += 2
+        callback(Dataset())
+
+    def handle_image(ds: Dataset) -> None:
+        # A slow destination (or conversion) must not count as source latency
+        clock.now += 10
+
+    operator = mocker.MagicMock()
+    operator.fetch_series.side_effect = fetch_series
+
+    image_count, _, _ = processor._fetch_series(operator, volume, "PAT1", None, handle_image)
+
+    assert image_count == 1
+    assert processor._fetch_seconds == 2
+
+
+def test_process_records_congestion_before_retrying(mocker: MockerFixture, tmp_path: Path):
+    processor = _make_process_env(mocker, tmp_path)
+    rate_controller = mocker.patch("adit.mass_transfer.processors.RateController").return_value
+    mocker.patch.object(processor, "_discover_series", return_value=[_make_discovered()])
+    mocker.patch.object(
+        processor, "_export_series", side_effect=RetriableDicomError("Association rejected")
+    )
+
+    with pytest.raises(RetriableDicomError):
+        processor.process()
+
+    rate_controller.record_congestion.assert_called_once()
+    rate_controller.record_latency.assert_not_called()
+
+
 def test_process_returns_warning_on_partial_failure(mocker: MockerFixture, tmp_path: Path):
     processor = _make_process_env(mocker, tmp_path)
     series = [
@@ -894,7 +1179,7 @@ def test_process_returns_success_for_empty_partition(mocker: MockerFixture, tmp_
 
 
 def test_process_cleans_partition_on_retry(mocker: MockerFixture, tmp_path: Path):
-    """On retry, ALL pre-existing volumes for the partition are deleted and rediscovered."""
+    """On retry, the volumes that were not transferred completely are deleted and rediscovered."""
     processor = _make_process_env(mocker, tmp_path)
     series = [
         _make_discovered(series_uid="s-1"),
@@ -935,16 +1220,18 @@ def test_process_server_destination_exports_and_uploads(mocker: MockerFixture):
 
     mocker.patch.object(processor, "_discover_series", return_value=series)
 
-    def fake_export(op, s, path, subject_id, pseudonymizer):
-        path.mkdir(parents=True, exist_ok=True)
-        (path / "dummy.dcm").write_bytes(b"fake")
+    ds = Dataset()
+    ds.SOPInstanceUID = "1.2.3"
+
+    def fake_fetch(op, s, subject_id, pseudonymizer, handle_image):
+        handle_image(ds)
         return (1, "pseudo-study-uid", "pseudo-series-uid")
 
-    mocker.patch.object(processor, "_export_series", side_effect=fake_export)
+    mocker.patch.object(processor, "_fetch_series", side_effect=fake_fetch)
 
     result = processor.process()
 
-    mock_dest_operator.upload_images.assert_called()
+    mock_dest_operator.upload_images.assert_called_once_with([ds], invalidate_cache=False)
     assert result["status"] == MassTransferTask.Status.SUCCESS
 
 
@@ -958,7 +1245,7 @@ def test_process_server_destination_cleans_volumes_on_retry(mocker: MockerFixtur
     mock_filter_qs = mocker.MagicMock()
     mocker.patch.object(MassTransferVolume.objects, "filter", return_value=mock_filter_qs)
 
-    mocker.patch.object(processor, "_export_series", side_effect=_fake_export_success)
+    mocker.patch.object(processor, "_fetch_series", side_effect=_fake_export_success)
 
     processor.process()
 
@@ -971,7 +1258,7 @@ def test_process_server_destination_closes_dest_operator(mocker: MockerFixture):
     series = [_make_discovered(series_uid="s-1")]
 
     mocker.patch.object(processor, "_discover_series", return_value=series)
-    mocker.patch.object(processor, "_export_series", side_effect=DicomError("PACS down"))
+    mocker.patch.object(processor, "_fetch_series", side_effect=DicomError("PACS down"))
 
     processor.process()
 
@@ -979,7 +1266,7 @@ def test_process_server_destination_closes_dest_operator(mocker: MockerFixture):
 
 
 def test_export_series_to_server_skips_upload_on_zero_images(mocker: MockerFixture):
-    """When _export_series returns 0 images, upload_images must NOT be called."""
+    """When _fetch_series returns 0 images, upload_images must NOT be called."""
     processor = _make_processor(mocker)
     volume = MassTransferVolume(
         series_instance_uid="s-1",
@@ -991,7 +1278,7 @@ def test_export_series_to_server_skips_upload_on_zero_images(mocker: MockerFixtu
     mock_operator = mocker.MagicMock()
     mock_dest_operator = mocker.MagicMock()
 
-    mocker.patch.object(processor, "_export_series", return_value=(0, "", ""))
+    mocker.patch.object(processor, "_fetch_series", return_value=(0, "", ""))
 
     processor._export_series_to_server(mock_operator, volume, None, "subject-1", mock_dest_operator)
 
@@ -1012,7 +1299,7 @@ def test_export_series_to_server_skips_non_image_series(mocker: MockerFixture):
     mock_operator = mocker.MagicMock()
     mock_dest_operator = mocker.MagicMock()
 
-    mocker.patch.object(processor, "_export_series", return_value=(0, "", ""))
+    mocker.patch.object(processor, "_fetch_series", return_value=(0, "", ""))
 
     processor._export_series_to_server(mock_operator, volume, None, "subject-1", mock_dest_operator)
 
@@ -1027,10 +1314,11 @@ def test_server_destination_upload_dicom_error_marks_failure(mocker: MockerFixtu
 
     mocker.patch.object(processor, "_discover_series", return_value=series)
 
-    def fake_export(op, s, path, subject_id, pseudonymizer):
+    def fake_fetch(op, s, subject_id, pseudonymizer, handle_image):
+        handle_image(Dataset())
         return (1, "pseudo-study-uid", "pseudo-series-uid")
 
-    mocker.patch.object(processor, "_export_series", side_effect=fake_export)
+    mocker.patch.object(processor, "_fetch_series", side_effect=fake_fetch)
     mock_dest_operator.upload_images.side_effect = DicomError("C-STORE rejected")
 
     result = processor.process()
@@ -1045,10 +1333,11 @@ def test_server_destination_upload_retriable_error_propagates(mocker: MockerFixt
 
     mocker.patch.object(processor, "_discover_series", return_value=series)
 
-    def fake_export(op, s, path, subject_id, pseudonymizer):
+    def fake_fetch(op, s, subject_id, pseudonymizer, handle_image):
+        handle_image(Dataset())
         return (1, "pseudo-study-uid", "pseudo-series-uid")
 
-    mocker.patch.object(processor, "_export_series", side_effect=fake_export)
+    mocker.patch.object(processor, "_fetch_series", side_effect=fake_fetch)
     mock_dest_operator.upload_images.side_effect = RetriableDicomError("Connection reset")
 
     with pytest.raises(RetriableDicomError, match="Connection reset"):
@@ -1385,7 +1674,7 @@ def test_process_creates_error_volume_on_failure(mocker: MockerFixture, mass_tra
 
 @pytest.mark.django_db
 def test_process_deletes_all_volumes_on_retry(mocker: MockerFixture, mass_transfer_env):
-    """On retry, ALL volumes from prior runs are deleted before rediscovery."""
+    """On retry, failed volumes from prior runs are deleted before rediscovery."""
     env = mass_transfer_env
     job, task = env.job, env.task
 
@@ -1424,6 +1713,42 @@ def test_process_deletes_all_volumes_on_retry(mocker: MockerFixture, mass_transf
     assert vol.status == MassTransferVolume.Status.EXPORTED
 
 
+@pytest.mark.django_db
+def test_process_maintains_volume_counts_of_job(mocker: MockerFixture, mass_transfer_env):
+    env = mass_transfer_env
+    series = [
+        _make_discovered(patient_id="PAT1", series_uid="1.2.3.4.5"),
+        _make_discovered(patient_id="PAT1", series_uid="1.2.3.4.6"),
+    ]
+
+    processor = MassTransferTaskProcessor(env.task)
+    mocker.patch.object(processor, "_discover_series", return_value=series)
+    mocker.patch("adit.mass_transfer.processors.DicomOperator")
+    mocker.patch.object(
+        processor,
+        "_export_series",
+        side_effect=[_fake_export_success(), DicomError("Export failed")],
+    )
+
+    processor.process()
+
+    env.job.refresh_from_db()
+    assert env.job.pending_volume_count == 0
+    assert env.job.exported_volume_count == 1
+    assert env.job.error_volume_count == 1
+    assert env.job.total_volume_count == 2
+
+    # A retry replaces the volumes of the partition (and their counts)
+    mocker.patch.object(processor, "_export_series", side_effect=_fake_export_success)
+
+    processor.process()
+
+    env.job.refresh_from_db()
+    assert env.job.exported_volume_count == 2
+    assert env.job.error_volume_count == 0
+    assert env.job.total_volume_count == 2
+
+
 @pytest.mark.django_db
 def test_process_deterministic_pseudonyms_across_partitions(mocker: MockerFixture, tmp_path: Path):
     """Same patient gets the same pseudonym across different partitions (linking mode)."""
@@ -2018,6 +2343,7 @@ def test_create_pending_volumes_no_anonymization(mocker: MockerFixture):
         "bulk_create",
         side_effect=lambda objs: objs,
     )
+    mocker.patch("adit.mass_transfer.processors.transaction")
 
     series = [
         _make_discovered(patient_id="PAT1", study_uid="study-A", series_uid="s-1"),
@@ -2043,6 +2369,7 @@ def test_create_pending_volumes_random_assigns_per_study(mocker: MockerFixture):
         "bulk_create",
         side_effect=lambda objs: objs,
     )
+    mocker.patch("adit.mass_transfer.processors.transaction")
 
     ps = Pseudonymizer()
 
@@ -2063,6 +2390,9 @@ def test_create_pending_volumes_random_assigns_per_study(mocker: MockerFixture):
     # Different study → different pseudonym
     assert volumes[0].pseudonym != volumes[2].pseudonym
     assert volumes[2].pseudonym != ""
+    # The seed of the pseudonymizer is stored per study as well
+    assert volumes[0].pseudonym_seed == volumes[1].pseudonym_seed
+    assert volumes[0].pseudonym_seed != volumes[2].pseudonym_seed
 
 
 # ---------------------------------------------------------------------------
@@ -2138,7 +2468,7 @@ def test_retriable_error_saves_volume_as_error(mocker: MockerFixture, tmp_path:
 
 @pytest.mark.django_db
 def test_partition_cleanup_deletes_folder_and_volumes(mocker: MockerFixture, mass_transfer_env):
-    """process() deletes the partition folder on disk and all volumes for that partition."""
+    """process() deletes the outputs and volumes of the partition that are incomplete."""
     env = mass_transfer_env
     job, task, destination = env.job, env.task, env.destination
 
@@ -2177,9 +2507,9 @@ def test_partition_cleanup_deletes_folder_and_volumes(mocker: MockerFixture, mas
     result = processor.process()
 
     assert result["status"] == MassTransferTask.Status.SUCCESS
-    # Old partition folder was deleted (process recreates it for the new export)
+    # Files in the partition folder that don't belong to a kept volume were deleted
     assert not (partition_dir / "some_file.dcm").exists()
-    # Old volumes were deleted, only the new one remains
+    # Old volumes (without their images) were deleted, only the new one remains
     vols = MassTransferVolume.objects.filter(job=job, partition_key="20240101")
     assert vols.count() == 1
     vol = vols.first()
@@ -2187,6 +2517,283 @@ def test_partition_cleanup_deletes_folder_and_volumes(mocker: MockerFixture, mas
     assert vol.series_instance_uid == "1.2.3.new"
 
 
+# ---------------------------------------------------------------------------
+# Resumption tests
+# ---------------------------------------------------------------------------
+
+
+def _create_previous_volume(
+    env: SimpleNamespace,
+    series_uid: str,
+    series_number: int,
+    status: MassTransferVolume.Status,
+    *,
+    study_uid: str = "study-1",
+) -> MassTransferVolume:
+    return MassTransferVolume.objects.create(
+        job=env.job,
+        task=env.task,
+        partition_key="20240101",
+        patient_id="PAT1",
+        study_instance_uid=study_uid,
+        series_instance_uid=series_uid,
+        modality="CT",
+        study_description="Brain CT",
+        series_description="Axial",
+        series_number=series_number,
+        study_datetime=timezone.make_aware(datetime(2024, 1, 1, 12, 0)),
+        number_of_images=2,
+        status=status,
+    )
+
+
+def _write_images(
+    processor: MassTransferTaskProcessor, volume: MassTransferVolume, count: int
+) -> Path:
+    output_path = processor._series_output_path(
+        volume, _destination_base_dir(volume.task.destination, volume.job)
+    )
+    output_path.mkdir(parents=True)
+    for i in range(count):
+        (output_path / f"{i}.dcm").write_text("dummy")
+    return output_path
+
+
+@pytest.mark.django_db
+def test_process_resumes_partition_with_previous_discovery(
+    mocker: MockerFixture, mass_transfer_env
+):
+    """Only the series not completely transferred before are transferred again."""
+    env = mass_transfer_env
+    exported = _create_previous_volume(env, "1.2.3.1", 1, MassTransferVolume.Status.EXPORTED)
+    failed = _create_previous_volume(env, "1.2.3.2", 2, MassTransferVolume.Status.ERROR)
+    env.task.discovery_checksum = _discovery_checksum(env.job.get_filters(), env.task)
+    env.task.save()
+
+    processor = MassTransferTaskProcessor(env.task)
+    exported_path = _write_images(processor, exported, 2)
+    discover_series = mocker.patch.object(processor, "_discover_series")
+    mocker.patch("adit.mass_transfer.processors.DicomOperator")
+    export_series = mocker.patch.object(
+        processor, "_export_series", side_effect=_fake_export_success
+    )
+
+    result = processor.process()
+
+    assert result["status"] == MassTransferTask.Status.SUCCESS
+    assert "Series found: 2" in result["log"]
+    assert "Kept from previous attempts: 1" in result["log"]
+    discover_series.assert_not_called()
+    assert [call.args[1].series_instance_uid for call in export_series.call_args_list] == [
+        failed.series_instance_uid
+    ]
+    assert len(list(exported_path.iterdir())) == 2
+
+    exported.refresh_from_db()
+    failed.refresh_from_db()
+    assert exported.status == MassTransferVolume.Status.EXPORTED
+    assert failed.status == MassTransferVolume.Status.EXPORTED
+    assert failed.log == ""
+
+
+@pytest.mark.django_db
+def test_process_transfers_incompletely_exported_series_again(
+    mocker: MockerFixture, mass_transfer_env
+):
+    env = mass_transfer_env
+    partial = _create_previous_volume(env, "1.2.3.1", 1, MassTransferVolume.Status.EXPORTED)
+
+    processor = MassTransferTaskProcessor(env.task)
+    partial_path = _write_images(processor, partial, 1)
+    series = [_make_discovered(series_uid="1.2.3.1")]
+    mocker.patch.object(processor, "_discover_series", return_value=series)
+    mocker.patch("adit.mass_transfer.processors.DicomOperator")
+    export_series = mocker.patch.object(
+        processor, "_export_series", side_effect=_fake_export_success
+    )
+
+    result = processor.process()
+
+    assert result["status"] == MassTransferTask.Status.SUCCESS
+    assert export_series.call_count == 1
+    # The partial images were removed before the series was exported again
+    assert not partial_path.exists()
+    vol = MassTransferVolume.objects.get(job=env.job, series_instance_uid="1.2.3.1")
+    assert vol.pk != partial.pk
+    assert vol.status == MassTransferVolume.Status.EXPORTED
+
+
+@pytest.mark.django_db
+def test_process_rediscovery_keeps_transferred_series(mocker: MockerFixture, mass_transfer_env):
+    """Without a complete previous discovery the transferred series are still kept, but
+    the ones no longer discovered are deleted."""
+    env = mass_transfer_env
+    kept = _create_previous_volume(env, "1.2.3.1", 1, MassTransferVolume.Status.EXPORTED)
+    outdated = _create_previous_volume(env, "1.2.3.2", 2, MassTransferVolume.Status.EXPORTED)
+
+    processor = MassTransferTaskProcessor(env.task)
+    kept_path = _write_images(processor, kept, 2)
+    outdated_path = _write_images(processor, outdated, 2)
+    series = [_make_discovered(series_uid="1.2.3.1"), _make_discovered(series_uid="1.2.3.3")]
+    mocker.patch.object(processor, "_discover_series", return_value=series)
+    mocker.patch("adit.mass_transfer.processors.DicomOperator")
+    export_series = mocker.patch.object(
+        processor, "_export_series", side_effect=_fake_export_success
+    )
+
+    result = processor.process()
+
+    assert result["status"] == MassTransferTask.Status.SUCCESS
+    assert [call.args[1].series_instance_uid for call in export_series.call_args_list] == [
+        "1.2.3.3"
+    ]
+    assert kept_path.exists()
+    assert not outdated_path.exists()
+    assert set(
+        MassTransferVolume.objects.filter(job=env.job).values_list("series_instance_uid", flat=True)
+    ) == {"1.2.3.1", "1.2.3.3"}
+
+    # The next attempt can reuse the (now complete) discovery
+    env.task.refresh_from_db()
+    assert env.task.discovery_checksum == _discovery_checksum(env.job.get_filters(), env.task)
+
+
+def _make_volume(series_uid: str, status: str, study_uid: str = "study-1") -> MassTransferVolume:
+    return MassTransferVolume(
+        patient_id="PAT1",
+        pseudonym="PSEUDO1",
+        study_instance_uid=study_uid,
+        series_instance_uid=series_uid,
+        number_of_images=10,
+        status=status,
+    )
+
+
+def test_keep_transferred_volumes_keeps_randomly_pseudonymized_studies_as_whole(
+    mocker: MockerFixture,
+):
+    processor = _make_processor(mocker)
+    job = mocker.MagicMock(pseudonym_salt="")
+    volumes = [
+        _make_volume("s-1", MassTransferVolume.Status.SKIPPED, study_uid="study-1"),
+        _make_volume("s-2", MassTransferVolume.Status.ERROR, study_uid="study-1"),
+        _make_volume("s-3", MassTransferVolume.Status.SKIPPED, study_uid="study-2"),
+    ]
+
+    kept = processor._keep_transferred_volumes(volumes, job, mocker.MagicMock(), None, None)
+
+    assert list(kept) == ["s-3"]
+
+
+def test_keep_transferred_volumes_keeps_series_of_seeded_incomplete_studies(
+    mocker: MockerFixture,
+):
+    processor = _make_processor(mocker)
+    job = mocker.MagicMock(pseudonym_salt="")
+    volumes = [
+        _make_volume("s-1", MassTransferVolume.Status.SKIPPED),
+        _make_volume("s-2", MassTransferVolume.Status.ERROR),
+    ]
+    for volume in volumes:
+        volume.pseudonym_seed = "seed-1"
+
+    kept = processor._keep_transferred_volumes(volumes, job, mocker.MagicMock(), None, None)
+
+    # The study is pseudonymized with the same UIDs again, so its series can be kept
+    assert list(kept) == ["s-1"]
+
+
+def test_seeded_pseudonymizer_keeps_the_uids_of_a_study(mocker: MockerFixture):
+    def pseudonymize(seed: str) -> Dataset:
+        processor = _make_processor(mocker)
+        processor._seeded_pseudonymizers = {}
+        ds = Dataset()
+        ds.PatientID = "PAT1"
+        ds.StudyInstanceUID = "1.2.3"
+        ds.SeriesInstanceUID = "1.2.3.4"
+        processor._get_seeded_pseudonymizer(seed).pseudonymize(ds, "PSEUDO1")
+        return ds
+
+    # Like the resumed transfer of a study by another attempt (and process)
+    first = pseudonymize("seed-1")
+    second = pseudonymize("seed-1")
+    other = pseudonymize("seed-2")
+
+    assert first.StudyInstanceUID != "1.2.3"
+    assert first.StudyInstanceUID == second.StudyInstanceUID
+    assert first.SeriesInstanceUID == second.SeriesInstanceUID
+    assert first.StudyInstanceUID != other.StudyInstanceUID
+
+
+@pytest.mark.django_db
+def test_partially_written_images_are_not_counted_as_exported(
+    mocker: MockerFixture, mass_transfer_env
+):
+    volume = _create_previous_volume(
+        mass_transfer_env, "1.2.3.1", 1, MassTransferVolume.Status.EXPORTED
+    )
+    processor = MassTransferTaskProcessor(mass_transfer_env.task)
+    output_path = _write_images(processor, volume, 1)
+    # An image that was cut off while it was written
+    (output_path / "1.dcm.partial").write_text("dum")
+    output_base = _destination_base_dir(volume.task.destination, volume.job)
+
+    assert not processor._is_exported_to_folder(volume, output_base)
+
+
+def test_find_series_on_server_checks_number_of_images(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    volumes = [
+        _make_volume("s-1", MassTransferVolume.Status.EXPORTED),
+        _make_volume("s-2", MassTransferVolume.Status.EXPORTED),
+        _make_volume("s-3", MassTransferVolume.Status.EXPORTED),
+    ]
+
+    def make_series(series_uid: str, image_count: int) -> ResultDataset:
+        ds = Dataset()
+        ds.SeriesInstanceUID = series_uid
+        ds.NumberOfSeriesRelatedInstances = image_count
+        return ResultDataset(ds)
+
+    dest_operator = mocker.MagicMock()
+    dest_operator.find_series.return_value = [make_series("s-1", 10), make_series("s-2", 4)]
+
+    found = processor._find_series_on_server(dest_operator, volumes)
+
+    assert found == {"s-1"}
+    # A single query for the series of the study
+    dest_operator.find_series.assert_called_once()
+    query = dest_operator.find_series.call_args.args[0]
+    assert query.dataset.PatientID == "PSEUDO1"
+    assert query.dataset.StudyInstanceUID == "study-1"
+
+
+def test_find_series_on_server_counts_images_without_number_of_images(mocker: MockerFixture):
+    processor = _make_processor(mocker)
+    complete = _make_volume("s-1", MassTransferVolume.Status.EXPORTED)
+    partial = _make_volume("s-2", MassTransferVolume.Status.EXPORTED)
+    unknown = _make_volume("s-3", MassTransferVolume.Status.EXPORTED)
+    unknown.number_of_images = 0
+
+    def make_series(series_uid: str) -> ResultDataset:
+        ds = Dataset()
+        ds.SeriesInstanceUID = series_uid
+        return ResultDataset(ds)
+
+    dest_operator = mocker.MagicMock()
+    dest_operator.find_series.return_value = [make_series(uid) for uid in ["s-1", "s-2", "s-3"]]
+    image_counts = {"s-1": 10, "s-2": 4}
+    dest_operator.find_images.side_effect = lambda query: [
+        Dataset() for _ in range(image_counts[query.dataset.SeriesInstanceUID])
+    ]
+
+    found = processor._find_series_on_server(dest_operator, [complete, partial, unknown])
+
+    # A series without the number of images in the source can't be verified
+    assert found == {"s-1"}
+    assert dest_operator.find_images.call_count == 2
+
+
 # ---------------------------------------------------------------------------
 # MassTransferJob.get_filters() tests
 # ---------------------------------------------------------------------------
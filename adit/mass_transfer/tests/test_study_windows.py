@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.core.cache import caches
+from pydicom import Dataset
+from pytest_django.fixtures import Settings
+
+from adit.core.factories import DicomServerFactory
+from adit.core.utils.dicom_dataset import ResultDataset
+
+from ..utils.study_windows import StudyWindowStats
+
+
+@pytest.fixture(autouse=True)
+def study_stats(settings: Settings):
+    settings.MASS_TRANSFER_STUDY_STATS_ENABLED = True
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.MASS_TRANSFER_STUDY_STATS_CACHE_ALIAS: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test_mass_transfer_study_stats",
+        },
+    }
+    caches[settings.MASS_TRANSFER_STUDY_STATS_CACHE_ALIAS].clear()
+
+
+def _make_studies(study_times: list[str]) -> list[ResultDataset]:
+    studies: list[ResultDataset] = []
+    for i, study_time in enumerate(study_times):
+        ds = Dataset()
+        ds.StudyInstanceUID = f"1.2.{i}"
+        ds.StudyTime = study_time
+        studies.append(ResultDataset(ds))
+    return studies
+
+
+def _day(hour: int = 0, minute: int = 0, second: int = 0, day: int = 1) -> datetime:
+    return datetime(2024, 1, day, hour, minute, second)
+
+
+def _end_of_day(day: int = 1) -> datetime:
+    return _day(23, 59, 59, day=day)
+
+
+@pytest.mark.django_db
+def test_nothing_learned_keeps_window():
+    stats = StudyWindowStats(DicomServerFactory.create(), "CT")
+
+    assert stats.estimate(_day(), _end_of_day()) is None
+    assert stats.split(_day(), _end_of_day(), 10) == [(_day(), _end_of_day())]
+
+
+@pytest.mark.django_db
+def test_learns_density_per_hour_of_day():
+    stats = StudyWindowStats(DicomServerFactory.create(max_search_results=100), "CT")
+
+    # 20 studies between 8 and 10 o'clock, 4 in the rest of the day
+    study_times = ["083000"] * 10 + ["093000"] * 10 + ["010000", "120000", "150000", "200000"]
+    stats.record(_day(), _end_of_day(), _make_studies(study_times))
+
+    assert stats.estimate(_day(8), _day(9, 59, 59)) == pytest.approx(20)
+    assert stats.estimate(_day(day=2), _end_of_day(day=2)) == pytest.approx(24)
+
+    windows = stats.split(_day(day=2), _end_of_day(day=2), 10)
+
+    assert windows[0][0] == _day(day=2)
+    assert windows[-1][1] == _end_of_day(day=2)
+    for (_, window_end), (next_start, _) in zip(windows, windows[1:]):
+        assert next_start == window_end + timedelta(seconds=1)
+    # The busy hours are split finer than the rest of the day
+    assert len(windows) == 3
+    assert all(stats.estimate(start, end) <= 10 + 1e-6 for start, end in windows)
+
+
+@pytest.mark.django_db
+def test_splits_multiple_days_at_midnight():
+    stats = StudyWindowStats(DicomServerFactory.create(max_search_results=100), "CT")
+    stats.record(_day(), _end_of_day(), _make_studies(["120000"] * 10))
+
+    windows = stats.split(_day(day=2), _end_of_day(day=7), 25)
+
+    assert windows == [
+        (_day(day=2), _end_of_day(day=3)),
+        (_day(day=4), _end_of_day(day=5)),
+        (_day(day=6), _end_of_day(day=7)),
+    ]
+
+
+@pytest.mark.django_db
+def test_truncated_results_only_remember_window_count():
+    stats = StudyWindowStats(DicomServerFactory.create(max_search_results=2), "CT")
+
+    stats.record(_day(), _end_of_day(), _make_studies(["120000"] * 3))
+
+    assert stats.get_count(_day(), _end_of_day()) == 3
+    assert stats.get_count(_day(), _day(12)) is None
+    assert stats.estimate(_day(), _end_of_day()) is None
+
+
+@pytest.mark.django_db
+def test_stats_are_separated_by_server_and_query():
+    server = DicomServerFactory.create(max_search_results=100)
+    StudyWindowStats(server, "CT").record(_day(), _end_of_day(), _make_studies(["120000"]))
+
+    assert StudyWindowStats(server, "MR").estimate(_day(), _end_of_day()) is None
+    assert (
+        StudyWindowStats(DicomServerFactory.create(), "CT").get_count(_day(), _end_of_day()) is None
+    )
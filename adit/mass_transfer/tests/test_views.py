@@ -288,3 +288,25 @@ def test_task_detail_foreign_task_is_not_found(client: Client, settings_no_toolb
     response = client.get(reverse("mass_transfer_task_detail", args=[task.pk]))
 
     assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_task_detail_paginates_volumes_by_keyset(client: Client, settings_no_toolbar):
+    owner = UserFactory.create(is_active=True)
+    job = MassTransferJobFactory.create(owner=owner)
+    task = MassTransferTaskFactory.create(job=job)
+    for i in range(3):
+        _make_volume(job, task=task, series_instance_uid=f"1.2.3.{i}")
+    client.force_login(owner)
+    url = reverse("mass_transfer_task_detail", args=[task.pk])
+
+    first_page = client.get(url, {"per_page": 2})
+    next_page = client.get(f"{url}?{first_page.context['keyset_next_query']}")
+
+    assert first_page.status_code == 200
+    assert len(first_page.context["table"].rows) == 2
+    assert "keyset_previous_query" not in first_page.context
+    assert next_page.status_code == 200
+    assert len(next_page.context["table"].rows) == 1
+    assert "keyset_next_query" not in next_page.context
+    assert client.get(url, {"after": "invalid"}).status_code == 400
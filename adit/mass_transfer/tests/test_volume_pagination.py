@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+from django.core.exceptions import BadRequest
+from django.db import connection
+from django.utils import timezone
+
+from adit.core.utils.keyset_pagination import KeysetPage
+
+from ..factories import MassTransferTaskFactory
+from ..models import MassTransferTask, MassTransferVolume
+from ..tables import MassTransferVolumeTable
+
+
+def _create_volumes(task: MassTransferTask, count: int) -> list[MassTransferVolume]:
+    start = timezone.now()
+    statuses = [MassTransferVolume.Status.PENDING, MassTransferVolume.Status.EXPORTED]
+    return MassTransferVolume.objects.bulk_create(
+        MassTransferVolume(
+            job=task.job,
+            task=task,
+            partition_key=task.partition_key,
+            study_instance_uid=f"1.2.{i}",
+            series_instance_uid=f"1.2.{i}.1",
+            # Some volumes share the same study time to check the tie breaking by id
+            study_datetime=start + timedelta(minutes=i // 3),
+            status=statuses[i % 2],
+        )
+        for i in range(count)
+    )
+
+
+def _volumes(task: MassTransferTask):
+    return task.volumes.order_by(*MassTransferVolumeTable._meta.order_by)
+
+
+@pytest.mark.django_db
+def test_keyset_pages_cover_all_volumes_in_order():
+    task = MassTransferTaskFactory.create(status=MassTransferTask.Status.PENDING)
+    _create_volumes(task, 23)
+    expected = list(_volumes(task).order_by("status", "study_datetime", "id"))
+
+    pages = [KeysetPage(_volumes(task), 5)]
+    while pages[-1].has_next:
+        pages.append(KeysetPage(_volumes(task), 5, after=pages[-1].next_cursor))
+
+    assert [volume for page in pages for volume in page.object_list] == expected
+    assert [len(page.object_list) for page in pages] == [5, 5, 5, 5, 3]
+    assert not pages[0].has_previous
+    assert all(page.has_previous for page in pages[1:])
+
+    previous_page = KeysetPage(_volumes(task), 5, before=pages[2].previous_cursor)
+    assert previous_page.object_list == pages[1].object_list
+    assert previous_page.has_previous
+    assert previous_page.has_next
+
+
+@pytest.mark.django_db
+def test_keyset_page_rejects_invalid_cursor():
+    task = MassTransferTaskFactory.create(status=MassTransferTask.Status.PENDING)
+
+    with pytest.raises(BadRequest):
+        KeysetPage(_volumes(task), 5, after="invalid")
+
+
+@pytest.mark.django_db
+def test_keyset_page_of_volumes_uses_index():
+    task = MassTransferTaskFactory.create(status=MassTransferTask.Status.PENDING)
+    _create_volumes(task, 50)
+
+    after = KeysetPage(_volumes(task), 10).next_cursor
+    page = KeysetPage(_volumes(task), 10, after=after)
+    queryset = _volumes(task).filter(page._seek_filter(page._decode_cursor(after)))
+
+    with connection.cursor() as cursor:
+        # The table is way too small for the planner to prefer an index on its own
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    plan = queryset.order_by(*page.ordering)[:11].explain()
+
+    assert "mass_transf_task_id_2f6ecc_idx" in plan
@@ -0,0 +1,231 @@
+"""Learns how many studies a source server has in the time windows of study queries.
+
+The study queries of a mass transfer are limited by `max_search_results` of the source
+server, so a too large time window has to be split into smaller ones. Instead of only
+bisecting windows whose query exceeded the limit (and throwing the results of that
+query away), the density of the studies per hour of the day is learned from the
+complete results of previous queries (of previous partitions, too). Windows that are
+expected to exceed the limit are split up front into windows of the same expected
+number of studies.
+
+In addition, the number of studies of each queried window is remembered, so that a
+window known to exceed the limit (e.g. on a retry of the partition) is split without
+querying it again.
+
+Both are stored per source server and query (the filter parts that are sent to the
+server) in the Django cache `MASS_TRANSFER_STUDY_STATS_CACHE_ALIAS` (by default a
+database cache shared by all workers, separate from the culled query cache) for
+`MASS_TRANSFER_STUDY_STATS_TTL` seconds.
+"""
+
+import hashlib
+import math
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+
+from adit.core.models import DicomServer
+from adit.core.utils.dicom_dataset import ResultDataset
+
+HOURS_PER_DAY = 24
+
+
+def _hour_segments(start: datetime, end: datetime) -> list[tuple[datetime, datetime, int]]:
+    """Splits the window (with an inclusive end like the windows of the study queries)
+    at the full hours and returns the start, (exclusive) end and hour of the day of
+    every segment."""
+    segments: list[tuple[datetime, datetime, int]] = []
+    current = start
+    window_end = end + timedelta(seconds=1)
+    while current < window_end:
+        next_hour = current.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        segment_end = min(next_hour, window_end)
+        segments.append((current, segment_end, current.hour))
+        current = segment_end
+    return segments
+
+
+def _hours(delta: timedelta) -> float:
+    return delta.total_seconds() / 3600
+
+
+def _estimate(rates: list[float], start: datetime, end: datetime) -> float:
+    return sum(
+        rates[hour] * _hours(segment_end - segment_start)
+        for segment_start, segment_end, hour in _hour_segments(start, end)
+    )
+
+
+def _split_days(
+    rates: list[float], start: datetime, end: datetime, max_studies: float
+) -> list[tuple[datetime, datetime]]:
+    """Groups the consecutive days of the window as long as they are expected to have
+    at most `max_studies` studies."""
+    windows: list[tuple[datetime, datetime]] = []
+    window_start = start
+    window_estimate = 0.0
+    day_start = start
+    while day_start <= end:
+        next_midnight = datetime.combine(
+            day_start.date() + timedelta(days=1), time.min, tzinfo=start.tzinfo
+        )
+        day_estimate = _estimate(rates, day_start, min(next_midnight - timedelta(seconds=1), end))
+        if day_start > window_start and window_estimate + day_estimate > max_studies:
+            windows.append((window_start, day_start - timedelta(seconds=1)))
+            window_start = day_start
+            window_estimate = 0.0
+        window_estimate += day_estimate
+        day_start = next_midnight
+    windows.append((window_start, end))
+    return windows
+
+
+def _split_day(
+    rates: list[float], start: datetime, end: datetime, window_count: int
+) -> list[tuple[datetime, datetime]]:
+    """Splits the window (within a day) into windows of the same expected number of
+    studies."""
+    studies_per_window = _estimate(rates, start, end) / window_count
+
+    # The (inclusive) ends of all windows but the last one
+    window_ends: list[datetime] = []
+    cumulated = 0.0
+    for segment_start, segment_end, hour in _hour_segments(start, end):
+        segment_estimate = rates[hour] * _hours(segment_end - segment_start)
+        while len(window_ends) < window_count - 1:
+            studies_until_end = studies_per_window * (len(window_ends) + 1)
+            if cumulated + segment_estimate < studies_until_end:
+                break
+            missing = max(0.0, studies_until_end - cumulated)
+            offset = timedelta(hours=missing / rates[hour]) if rates[hour] else timedelta()
+            window_end = (segment_start + offset).replace(microsecond=0)
+            if window_ends and window_end <= window_ends[-1]:
+                window_end = window_ends[-1] + timedelta(seconds=1)
+            window_ends.append(window_end)
+        cumulated += segment_estimate
+
+    windows: list[tuple[datetime, datetime]] = []
+    window_start = start
+    for window_end in window_ends:
+        if window_start <= window_end < end:
+            windows.append((window_start, window_end))
+            window_start = window_end + timedelta(seconds=1)
+    windows.append((window_start, end))
+    return windows
+
+
+class StudyWindowStats:
+    def __init__(self, server: DicomServer, query_key: str) -> None:
+        self.server = server
+        self._digest = hashlib.sha256(query_key.encode()).hexdigest()[:16]
+
+    @property
+    def enabled(self) -> bool:
+        return settings.MASS_TRANSFER_STUDY_STATS_ENABLED and self.server.pk is not None
+
+    def get_count(self, start: datetime, end: datetime) -> int | None:
+        """Returns the remembered number of studies of the window (more than the limit
+        of the server if its query exceeded it)."""
+        if not self.enabled:
+            return None
+        return self._get_cache().get(self._window_key(start, end))
+
+    def record(self, start: datetime, end: datetime, studies: list[ResultDataset]) -> None:
+        """Records the studies found in the window.
+
+        Only complete results (not exceeding the limit of the server) are used to learn
+        the density.
+        """
+        if not self.enabled:
+            return
+
+        cache = self._get_cache()
+        cache.set(self._window_key(start, end), len(studies), self._ttl())
+
+        if len(studies) > self.server.max_search_results:
+            return
+
+        if start.date() != end.date():
+            # The time range of a query over multiple days covers these days completely
+            start = datetime.combine(start.date(), time.min, tzinfo=start.tzinfo)
+            end = datetime.combine(end.date(), time.max, tzinfo=end.tzinfo).replace(microsecond=0)
+
+        counts, hours = self._get_density()
+        for segment_start, segment_end, hour in _hour_segments(start, end):
+            hours[hour] += _hours(segment_end - segment_start)
+        for study in studies:
+            try:
+                counts[study.StudyTime.hour] += 1
+            except (AttributeError, ValueError, AssertionError):
+                # Studies without a (valid) study time are not assigned to an hour
+                pass
+        cache.set(self._density_key(), {"counts": counts, "hours": hours}, self._ttl())
+
+    def estimate(self, start: datetime, end: datetime) -> float | None:
+        """Returns the expected number of studies of the window (None if unknown)."""
+        rates = self._get_rates()
+        if rates is None:
+            return None
+        return _estimate(rates, start, end)
+
+    def split(
+        self, start: datetime, end: datetime, max_studies: float
+    ) -> list[tuple[datetime, datetime]]:
+        """Splits the window into windows that are each expected to have at most
+        `max_studies` studies.
+
+        Returns the window itself if it is not expected to exceed it (or nothing was
+        learned yet). A window over multiple days is only split at midnight (as the
+        time range of a study query applies to each day of its date range), so a single
+        day may still exceed it and has to be split again.
+        """
+        rates = self._get_rates()
+        if rates is None:
+            return [(start, end)]
+
+        estimate = _estimate(rates, start, end)
+        if estimate <= max_studies:
+            return [(start, end)]
+
+        if start.date() != end.date():
+            return _split_days(rates, start, end, max_studies)
+        return _split_day(rates, start, end, math.ceil(estimate / max_studies))
+
+    def _get_rates(self) -> list[float] | None:
+        """Returns the studies per hour for every hour of the day. Hours never observed
+        get the average rate of the observed ones."""
+        if not self.enabled:
+            return None
+
+        counts, hours = self._get_density()
+        observed = [hour for hour in range(HOURS_PER_DAY) if hours[hour] > 0]
+        if not observed:
+            return None
+
+        average = sum(counts[hour] for hour in observed) / sum(hours[hour] for hour in observed)
+        return [
+            counts[hour] / hours[hour] if hours[hour] > 0 else average
+            for hour in range(HOURS_PER_DAY)
+        ]
+
+    def _get_density(self) -> tuple[list[int], list[float]]:
+        data: dict | None = self._get_cache().get(self._density_key())
+        if data is None:
+            return [0] * HOURS_PER_DAY, [0.0] * HOURS_PER_DAY
+        return data["counts"], data["hours"]
+
+    def _get_cache(self) -> BaseCache:
+        return caches[settings.MASS_TRANSFER_STUDY_STATS_CACHE_ALIAS]
+
+    def _ttl(self) -> int:
+        return settings.MASS_TRANSFER_STUDY_STATS_TTL
+
+    def _density_key(self) -> str:
+        return f"mass_transfer_density:{self.server.pk}:{self._digest}"
+
+    def _window_key(self, start: datetime, end: datetime) -> str:
+        return (
+            f"mass_transfer_window:{self.server.pk}:{self._digest}:"
+            f"{start.isoformat()}:{end.isoformat()}"
+        )
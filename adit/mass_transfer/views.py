@@ -12,6 +12,7 @@ from django.urls import reverse_lazy
 from django.views import View
 from django_tables2 import SingleTableMixin
 
+from adit.core.mixins import KeysetPaginationMixin
 from adit.core.views import (
     DicomJobCancelView,
     DicomJobCreateView,
@@ -172,6 +173,7 @@ class MassTransferJobRestartView(MassTransferLockedMixin, DicomJobRestartView):
 
 class MassTransferTaskDetailView(
     MassTransferLockedMixin,
+    KeysetPaginationMixin,
     SingleTableMixin,
     RelatedFilterMixin,
     PageSizeSelectMixin,
@@ -244,7 +244,7 @@ class SelectiveTransferConsumer(AsyncJsonWebsocketConsumer):
 
             source = cast(DicomNode, form.cleaned_data["source"])
             assert source.node_type == DicomNode.NodeType.SERVER
-            operator = DicomOperator(source.dicomserver)
+            operator = DicomOperator(source.dicomserver, query_cache=True)
 
             self.query_operators.append(operator)
 
@@ -396,6 +396,7 @@ class SelectiveTransferConsumer(AsyncJsonWebsocketConsumer):
                 study_uid=study_uid,
                 pseudonym=pseudonym,
             )
+        job.update_task_counts()
 
         if user.is_staff or settings.START_SELECTIVE_TRANSFER_UNVERIFIED:
             job.status = SelectiveTransferJob.Status.PENDING
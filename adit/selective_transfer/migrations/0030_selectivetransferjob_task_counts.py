@@ -0,0 +1,52 @@
+# Generated by Django 6.0.3 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+from adit.core.utils.migration_utils import TASK_COUNT_FIELDS, set_related_counts
+
+
+def set_task_counts(apps, schema_editor):
+    SelectiveTransferJob = apps.get_model("selective_transfer.SelectiveTransferJob")
+    SelectiveTransferTask = apps.get_model("selective_transfer.SelectiveTransferTask")
+    set_related_counts(SelectiveTransferJob, SelectiveTransferTask, TASK_COUNT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("selective_transfer", "0029_alter_selectivetransfersettings_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="selectivetransferjob",
+            name="pending_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="selectivetransferjob",
+            name="in_progress_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="selectivetransferjob",
+            name="canceled_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="selectivetransferjob",
+            name="success_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="selectivetransferjob",
+            name="warning_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="selectivetransferjob",
+            name="failure_task_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_task_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("selective_transfer", "0030_selectivetransferjob_task_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="selectivetransfertask",
+            index=models.Index(fields=["job", "status"], name="selective_t_job_id_71f42c_idx"),
+        ),
+    ]
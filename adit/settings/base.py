@@ -396,6 +396,16 @@ STORE_SCP_PORT = env.int("STORE_SCP_PORT", 11112)
 FILE_TRANSMIT_HOST = env.str("FILE_TRANSMIT_HOST", "localhost")
 FILE_TRANSMIT_PORT = env.int("FILE_TRANSMIT_PORT", 14638)
 
+# A directory shared by the receiver and the workers (e.g. /var/spool/adit, the
+# shared volume of the containers when they all run on the same host). If set, the
+# receiver stores the files it receives there and only transmits the file paths to
+# the workers, which then read the files directly instead of receiving a copy over
+# the socket.
+# Must be on a single file system as the files are hard linked per worker. The
+# receiver and all workers must set the same directory, otherwise the workers reject
+# the transmitted file paths (and the C-MOVE fails).
+RECEIVER_SPOOL_DIR = env.str("RECEIVER_SPOOL_DIR", "")
+
 # Usually a transfer job must be verified by an admin. By setting
 # this option to True ADIT will schedule unverified transfers
 # (and directly set the status of the job to PENDING).
@@ -442,6 +452,24 @@ C_MOVE_DOWNLOAD_TIMEOUT = 30  # seconds
 # (discovery + export + convert) and can run for hours.
 MASS_TRANSFER_PROCESS_TIMEOUT = 24 * 60 * 60  # seconds (24 hours)
 
+# How many studies of a partition may be discovered ahead of the transfer (while
+# the series of the current study are still transferred).
+MASS_TRANSFER_DISCOVERY_QUEUE_SIZE = 100
+
+# The study density per hour of the day and the number of studies of the queried time
+# windows are learned per source server to split the time windows of the study queries
+# of a mass transfer up front (see adit/mass_transfer/utils/study_windows.py). The
+# windows are split so that they are expected to be filled up to the fill factor of the
+# maximum search results of the server. A window that can't be split any further is
+# queried by each of the modalities (and the modalities of its truncated results).
+MASS_TRANSFER_STUDY_STATS_ENABLED = env.bool("MASS_TRANSFER_STUDY_STATS_ENABLED", default=True)
+MASS_TRANSFER_STUDY_STATS_TTL = 30 * 24 * 60 * 60  # seconds (30 days)
+MASS_TRANSFER_STUDY_WINDOW_FILL = 0.8
+MASS_TRANSFER_SPLIT_MODALITIES = [
+    "CR", "CT", "DX", "ES", "IO", "MG", "MR", "NM", "OT", "PT", "PX", "RF", "SC", "SR",
+    "US", "XA",
+]  # fmt: skip
+
 # Delay before the mass transfer fetch reconciliation re-attempt. When discovery
 # reported N images for a series but the fetch delivered 0, the processor waits this
 # long before probing once more to distinguish a momentarily overloaded PACS from a
@@ -451,6 +479,100 @@ MASS_TRANSFER_FETCH_RECONCILIATION_DELAY = 3  # seconds
 # Show DICOM debug messages of pynetdicom
 ENABLE_DICOM_DEBUG_LOGGER = False
 
+# Reuse established DIMSE associations (per process) instead of negotiating a new
+# association for every DIMSE operation.
+DIMSE_ASSOCIATION_POOL_ENABLED = env.bool("DIMSE_ASSOCIATION_POOL_ENABLED", default=True)
+
+# The maximum number of open (idle and in use) associations per DICOM server and process.
+DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER = env.int("DIMSE_ASSOCIATION_POOL_MAX_PER_SERVER", default=4)
+
+# How long an idle association is kept open. Should be lower than the network timeout
+# of the DimseConnector and the idle timeout of the PACS servers.
+DIMSE_ASSOCIATION_POOL_IDLE_TTL = 60  # seconds
+
+# How long to wait for a free association when the maximum is reached.
+DIMSE_ASSOCIATION_POOL_ACQUIRE_TIMEOUT = 120  # seconds
+
+# How long (in seconds) the outcome of a presentation context negotiation is remembered
+# per DICOM server and DIMSE service (see DicomServer.negotiated_contexts). Until then
+# contexts rejected by the server are not proposed again. 0 disables it.
+DIMSE_NEGOTIATION_CACHE_TTL = env.int("DIMSE_NEGOTIATION_CACHE_TTL", default=24 * 60 * 60)
+
+# How many DICOM files are read (in a background thread) ahead of the file currently
+# sent when uploading a folder with C-STORE.
+DIMSE_STORE_READ_AHEAD = 8
+
+# Transfers between two servers upload the images while they are still fetched.
+# This many images are held in memory for the upload, further images are spilled
+# to disk until the upload catches up.
+STREAMING_UPLOAD_QUEUE_SIZE = 32
+
+# The async methods of the DicomOperator (used by the DICOMweb API) run the blocking
+# DICOM operations on a shared pool with this many worker threads (per process).
+DICOM_ASYNC_WORKERS = env.int("DICOM_ASYNC_WORKERS", default=16)
+
+# How many of those operations may run at the same time against the same DICOM server,
+# further operations wait (without occupying a worker) until one is finished.
+DICOM_ASYNC_MAX_PER_SERVER = env.int("DICOM_ASYNC_MAX_PER_SERVER", default=4)
+
+# Results of C-FIND and QIDO-RS queries of operators created with query_cache=True
+# (see adit/core/utils/query_cache.py) are cached for the given seconds per query level
+# (0 disables caching of that level).
+DICOM_QUERY_CACHE_ENABLED = env.bool("DICOM_QUERY_CACHE_ENABLED", default=True)
+DICOM_QUERY_CACHE_TTLS = {
+    "PATIENT": 300,
+    "STUDY": 300,
+    "SERIES": 120,
+    "IMAGE": 60,
+}
+
+# The cached query results are shared by all web and worker processes in the database
+# (the table is created by `./manage.py createcachetable`). When the maximum number of
+# entries is reached, a third of them is removed (in the order of their keys, regardless
+# of when they expire).
+DICOM_QUERY_CACHE_ALIAS = "dicom_query"
+DICOM_STATE_CACHE_ALIAS = "dicom_state"
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    DICOM_QUERY_CACHE_ALIAS: {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "dicom_query_cache",
+        "OPTIONS": {
+            "MAX_ENTRIES": env.int("DICOM_QUERY_CACHE_MAX_ENTRIES", default=10000),
+            "CULL_FREQUENCY": 3,
+        },
+    },
+    # State that must not be culled together with the cached query results (like the
+    # pacing of the DICOM servers or the learned study stats of mass transfers). Its
+    # entries are small and comparably few, so the maximum is never reached in practice.
+    DICOM_STATE_CACHE_ALIAS: {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "dicom_state_cache",
+        "OPTIONS": {
+            "MAX_ENTRIES": 1_000_000,
+        },
+    },
+}
+
+# Adaptive pacing of consecutive work (e.g. the studies of a mass transfer) against a
+# DICOM server (see adit/core/utils/rate_controller.py). The delay starts with the
+# initial delay, is decreased by the step after every healthy unit of work and is
+# multiplied by the factor (to at least the minimum backoff and at most the maximum
+# delay) after an association rejection, a retriable error or a latency that is more
+# than the tolerance times the usual one. The state of every server is shared by all
+# web and worker processes in the database (in its own cache, see above).
+DICOM_PACING_ENABLED = env.bool("DICOM_PACING_ENABLED", default=True)
+DICOM_PACING_INITIAL_DELAY = 0.5  # seconds
+DICOM_PACING_DECREASE_STEP = 0.05  # seconds
+DICOM_PACING_BACKOFF_FACTOR = 2
+DICOM_PACING_MIN_BACKOFF = 1  # seconds
+DICOM_PACING_MAX_DELAY = 30  # seconds
+DICOM_PACING_LATENCY_TOLERANCE = 3
+DICOM_PACING_CACHE_ALIAS = DICOM_STATE_CACHE_ALIAS
+MASS_TRANSFER_STUDY_STATS_CACHE_ALIAS = DICOM_STATE_CACHE_ALIAS
+
 # DICOM Task Retry Configuration
 # ==============================
 #
@@ -486,6 +608,16 @@ DICOM_TASK_PROCESS_TIMEOUT = 60 * 20  # 20 minutes
 # How often to check the database if the DICOM task should be canceled
 DICOM_TASK_CANCELED_MONITOR_INTERVAL = 10  # 10 seconds
 
+# How many tasks are queued at once, i.e. with one insert of their Procrastinate jobs and
+# one update of the tasks (see queue_tasks in adit.core.utils.model_utils)
+DICOM_TASK_QUEUE_BATCH_SIZE = 1000
+
+# How many batch query tasks (one per query, i.e. row of the batch file) are processed
+# together in one worker process (sharing its associations) instead of each in its
+# own. Each task still gets its own status and results, but can't be killed on its own
+# anymore (only the whole job can be canceled). 1 processes each task in its own process.
+BATCH_QUERY_TASKS_PER_CHUNK = env.int("BATCH_QUERY_TASKS_PER_CHUNK", default=20)
+
 # The maximum number of batch queries a normal user can process in one job
 # (staff user are not limited)
 MAX_BATCH_QUERY_SIZE = 1000
@@ -20,3 +20,18 @@ DEBUG_TOOLBAR_CONFIG = {"SHOW_TOOLBAR_CALLBACK": lambda request: False}
 # No real backups as a side effect of tests that run the worker (the periodic
 # backup_db task would fire when a test run crosses its cron time).
 BACKUP_ENABLED = False
+
+# Tests mock single associations and check that they are released after each operation.
+DIMSE_ASSOCIATION_POOL_ENABLED = False
+
+# Tests mock the associations and their negotiated presentation contexts.
+DIMSE_NEGOTIATION_CACHE_TTL = 0
+
+# Tests mock the query results, so they must not be cached between tests.
+DICOM_QUERY_CACHE_ENABLED = False
+
+# Tests mock the transfers, so they must not be paced (or share the pacing between tests).
+DICOM_PACING_ENABLED = False
+
+# Tests mock the query results, so the study windows must not be learned between tests.
+MASS_TRANSFER_STUDY_STATS_ENABLED = False